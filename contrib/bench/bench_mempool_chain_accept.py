@@ -0,0 +1,95 @@
+'''Mempool acceptance of deep unconfirmed chains.
+
+MemPool._accept_transactions visits new txs in dependency order, so one call
+accepts a whole chain.  Before, it visited them in arrival order and
+_process_mempool called it until nothing more was accepted: a chain that
+arrives children-first (as the daemon's unordered mempool can return it)
+took one pass per link, O(n^2) in the chain length.
+
+Run from the repository root:
+
+    python contrib/bench/bench_mempool_chain_accept.py
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from electrumx.lib.coins import Radiant  # noqa: E402
+from electrumx.lib.hash import HASHX_LEN  # noqa: E402
+from electrumx.server.mempool import MemPool, MemPoolAPI, MemPoolTx  # noqa: E402
+
+
+class _API(MemPoolAPI):
+    async def height(self):
+        return 0
+
+    def cached_height(self):
+        return 0
+
+    def db_height(self):
+        return 0
+
+    async def mempool_hashes(self):
+        return []
+
+    async def raw_transactions(self, hex_hashes):
+        return []
+
+    async def lookup_utxos(self, prevouts):
+        return []
+
+    async def on_mempool(self, touched, height):
+        pass
+
+
+class _ArrivalOrderMemPool(MemPool):
+    '''The previous behaviour: arrival order, repeated to a fixed point.'''
+
+    @staticmethod
+    def _topological_order(tx_map):
+        return iter(list(tx_map))
+
+
+def _chain(length):
+    hashX = os.urandom(HASHX_LEN)
+    root = (os.urandom(32), 0)
+    chain, prevout = {}, root
+    for n in range(length):
+        tx_hash = os.urandom(32)
+        chain[tx_hash] = MemPoolTx((prevout, ), None, ((hashX, 10**8 - n), ),
+                                   0, 200, [[]], [b''])
+        prevout = (tx_hash, 0)
+    # Children first: the worst arrival order.
+    return dict(reversed(list(chain.items()))), {root: (os.urandom(HASHX_LEN), 10**8)}
+
+
+def _run(mempool_class, length):
+    tx_map, utxo_map = _chain(length)
+    mempool = mempool_class(Radiant, _API())
+    touched = set()
+    passes = 0
+    start = time.perf_counter()
+    prior_count = None
+    while tx_map and len(tx_map) != prior_count:
+        prior_count = len(tx_map)
+        tx_map, utxo_map = mempool._accept_transactions(tx_map, utxo_map, touched)
+        passes += 1
+    elapsed = time.perf_counter() - start
+    assert not tx_map and len(mempool.txs) == length
+    return elapsed, passes
+
+
+def main():
+    print(f'{"chain":>7} {"arrival order":>22} {"dependency order":>22} {"speedup":>8}')
+    for length in (100, 500, 1000, 2000):
+        old, old_passes = _run(_ArrivalOrderMemPool, length)
+        new, new_passes = _run(MemPool, length)
+        print(f'{length:>7,d} {old * 1000:>10.1f} ms {old_passes:>5,d} passes '
+              f'{new * 1000:>10.1f} ms {new_passes:>5,d} passes {old / new:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
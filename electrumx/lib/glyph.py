@@ -120,8 +120,8 @@ DMINT_MAX_TOTAL_SUPPLY = (1 << 63) - 1
 MAX_CBOR_PAYLOAD_BYTES = 655_360  # 640 KiB (512 KiB content + headroom)
 
 
-def cbor_loads_capped(data: bytes):
-    """``cbor2.loads(data)`` with a hard input-size cap applied first.
+def cbor_loads_capped(data: bytes, **kwargs):
+    """``cbor2.loads(data, **kwargs)`` with a hard input-size cap applied first.
 
     Raises ``ValueError`` if the payload exceeds ``MAX_CBOR_PAYLOAD_BYTES`` so a
     caller's existing ``try/except`` treats an oversized body as a decode
@@ -134,7 +134,7 @@ def cbor_loads_capped(data: bytes):
         raise ValueError(
             f"CBOR payload too large: {n} > {MAX_CBOR_PAYLOAD_BYTES} bytes"
         )
-    return cbor2.loads(data)
+    return cbor2.loads(data, **kwargs)
 
 
 # Envelope flags
@@ -1,4 +1,5 @@
 import asyncio
+import bisect
 import heapq
 import json
 import os
@@ -11,6 +12,7 @@ from electrumx.lib import util
 from electrumx.lib.hash import Base58
 from electrumx.lib.hash import HASHX_LEN
 from electrumx.lib.util import pack_be_uint32, encode_undo, decode_undo
+from electrumx.server.pagination import cursor_page, decode_cursor
 
 # M1 (DoS): the rich-list / get_stats endpoints scan the whole AB balance
 # keyspace. To stop an attacker forcing a full scan per request by rotating the
@@ -676,11 +678,14 @@ class AnalyticsIndex:
             elif amount > heap[0][0]:
                 heapq.heapreplace(heap, entry)
 
-        self._top_pool = sorted(heap, key=lambda t: t[0], reverse=True)
+        # hashX breaks ties so the order, and any cursor into it, is stable.
+        self._top_pool = sorted(heap, key=lambda t: (-t[0], t[1]))
         self._top_total = total
         self._top_scan_ts = now
 
-    def get_top_addresses(self, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+    def get_top_addresses(self, limit: int = 100, offset: int = 0,
+                          cursor: Optional[str] = None,
+                          _use_cursor: bool = False) -> Dict[str, Any]:
         """Rich list (top RXD balances).
 
         Pages are sliced from a cached top pool produced by a single scan that
@@ -689,6 +694,11 @@ class AnalyticsIndex:
         ``offset`` is hard-capped at ``TOP_ADDRESSES_MAX_OFFSET`` and ``limit``
         at ``TOP_ADDRESSES_MAX_LIMIT`` so a request can never reach beyond the
         cached pool.
+
+        With ``_use_cursor`` the page is ``{total, limit, rows, next_cursor,
+        has_more}`` and resumes at the (balance, hashX) of the cursor, so a
+        pool refresh between pages neither repeats nor skips an address that
+        kept its balance. ValueError if the cursor is malformed.
         """
         # Clamp inputs so a page can never escape the cached pool (defence in
         # depth — the REST layer rejects oversized offsets before we get here).
@@ -697,6 +707,15 @@ class AnalyticsIndex:
 
         self._refresh_top_pool()
         pool = self._top_pool or []
+        if _use_cursor:
+            offset = 0
+            after = decode_cursor(cursor)
+            if after is not None:
+                if len(after) <= 8:
+                    raise ValueError('invalid cursor')
+                amount = struct.unpack('>Q', after[:8])[0]
+                offset = bisect.bisect_left([(-a, h) for a, h in pool],
+                                            (-amount, after[8:]))
         page = pool[offset:offset + limit]
 
         rows = []
@@ -707,6 +726,19 @@ class AnalyticsIndex:
                 'address': display.decode() if display else hashX.hex(),
                 'balance': amount,
             })
+        if _use_cursor:
+            next_key = None
+            if offset + limit < len(pool) and limit:
+                amount, hashX = pool[offset + limit]
+                next_key = struct.pack('>Q', amount) + hashX
+            result = cursor_page(rows, next_key)
+            return {
+                'total': self._top_total,
+                'limit': limit,
+                'rows': result['entries'],
+                'next_cursor': result['next_cursor'],
+                'has_more': result['has_more'],
+            }
         return {
             'total': self._top_total,
             'limit': limit,
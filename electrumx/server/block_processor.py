@@ -32,7 +32,8 @@ from electrumx.lib.script import is_unspendable_legacy, is_unspendable_genesis,
 from electrumx.lib.util import (
     class_logger, pack_le_uint32, pack_le_uint64, unpack_le_uint64, unpack_le_uint32_from
 )
-from electrumx.server.db import FlushData
+from electrumx.server.db import BlockSummary, FlushData, block_summary_key
+from electrumx.server.migrations import MigrationRunner
 
 # Import GlyphIndex for token indexing
 try:
@@ -120,6 +121,8 @@ class Prefetcher:
         self.fetched_height = None
         self.semaphore = asyncio.Semaphore()
         self.refill_event = asyncio.Event()
+        # Set by wake_up() to cut a polling_delay sleep short
+        self.wakeup_event = asyncio.Event()
         # The prefetched block cache size.  The min cache size has
         # little effect on sync time.
         self.cache_size = 0
@@ -135,8 +138,13 @@ class Prefetcher:
             try:
                 # Sleep a while if there is nothing to prefetch
                 await self.refill_event.wait()
+                self.wakeup_event.clear()
                 if not await self._prefetch_blocks():
-                    await sleep(self.polling_delay)
+                    try:
+                        await asyncio.wait_for(self.wakeup_event.wait(),
+                                               self.polling_delay)
+                    except asyncio.TimeoutError:
+                        pass
             except DaemonError as e:
                 self.logger.info(f'ignoring daemon error: {e}')
             except CancelledError as e:
@@ -145,6 +153,11 @@ class Prefetcher:
             except Exception:   # pylint:disable=W0703
                 self.logger.exception('ignoring unexpected exception')
 
+    def wake_up(self):
+        '''Poll the daemon now rather than after polling_delay, e.g. when it
+        announces a new block.'''
+        self.wakeup_event.set()
+
     def get_prefetched_blocks(self):
         '''Called by block processor when it is processing queued blocks.'''
         blocks = self.blocks
@@ -253,6 +266,10 @@ class BlockProcessor:
         # Signalled after backing up during a reorg
         self.backed_up_event = asyncio.Event()
 
+        # Background schema migrations handed over by the indexes once their
+        # schema checks have run (see _first_open_dbs).
+        self.migrations = MigrationRunner(db)
+
         self.coin = env.coin
         self.prefetcher = Prefetcher(daemon, env.coin, self.blocks_event)
         self.logger = class_logger(__name__, self.__class__.__name__)
@@ -592,7 +609,11 @@ class BlockProcessor:
         height = self.height + 1
 
         is_unspendable = is_unspendable_legacy
-        undo_info, ref_loc_undo_info = self.advance_txs(block.transactions, is_unspendable)
+        summary = BlockSummary(timestamp=unpack_le_uint32_from(block.header, 68)[0],
+                               size=len(block.raw))
+        undo_info, ref_loc_undo_info = self.advance_txs(block.transactions, is_unspendable,
+                                                        summary)
+        self.data_cache[block_summary_key(height)] = summary.to_bytes()
         if height >= min_height:
             self.undo_infos.append((undo_info, height))
             self.ref_loc_undo_infos.append((ref_loc_undo_info, height))
@@ -633,7 +654,9 @@ class BlockProcessor:
             return False
         return True
 
-    def advance_txs(self, txs, is_unspendable):
+    def advance_txs(self, txs, is_unspendable, summary=None):
+        '''Index a block's transactions.  If summary (a BlockSummary) is
+        given, its transaction and overlay counts are filled in.'''
         self.tx_hashes.append(b''.join(tx_hash for tx, tx_hash in txs))
 
         # Use local vars for speed in the loops
@@ -658,8 +681,12 @@ class BlockProcessor:
         to_le_uint32 = pack_le_uint32
         to_le_uint64 = pack_le_uint64
         mints = set()
+        input_count = output_count = output_value = 0
+        glyph_txs = ref_outputs = ref_mints = 0
 
         for tx, tx_hash in txs:
+            input_count += len(tx.inputs)
+            output_count += len(tx.outputs)
             hashXs = []
             append_hashX = hashXs.append
             tx_numb = to_le_uint64(tx_num)[:5]
@@ -722,6 +749,7 @@ class BlockProcessor:
 
             # Add the new UTXOs
             for idx, txout in enumerate(tx.outputs):
+                output_value += txout.value
                 # P0.3: Add the UTXO iff _output_indexable is True.  This single
                 # shared predicate (is_unspendable_legacy OR Script.zero_refs
                 # raises) is the SAME one _backup_txs uses to decide whether to
@@ -772,6 +800,7 @@ class BlockProcessor:
                             ref_type = 1 if singleton_refs_dedup.get(ref_id) and not normal_refs_dedup.get(ref_id) else 0
                             vout_refs.append((ref_id, ref_type))
                         output_refs_by_vout[idx] = vout_refs
+                        ref_outputs += 1
                     # Save all the refs if any for the utxo
                     refs_value = b''
                     for ref_id in all_refs_dedup.keys():
@@ -791,6 +820,7 @@ class BlockProcessor:
                             # Track singleton ref mints
                             mints.add(ref)
                             put_ref_mint(ref, tx_hash)
+                            ref_mints += 1
                         else:
                             # Track location of singleton refs
                             put_ref_loc(ref, tx_hash)
@@ -809,6 +839,7 @@ class BlockProcessor:
                         if ref in spent_outpoints:  # R13: O(1) lookup
                             put_ref_mint(ref, tx_hash)
                             append_ref(ref)
+                            ref_mints += 1
 
                     # We could check for refs used in inputs that are burnt in this tx,
                     # but current burn implementations are done using op return so this may not be needed
@@ -858,6 +889,8 @@ class BlockProcessor:
                         'skipping glyph overlay for this tx',
                         hash_to_hex_str(tx_hash), self.height + 1
                     )
+                if glyph_envelope:
+                    glyph_txs += 1
 
                 # Process for WAVE naming. Call wave_index when there's a WAVE
                 # envelope (registration / mod) OR when a singleton was spent — a
@@ -948,6 +981,19 @@ class BlockProcessor:
 
             tx_num += 1
 
+        # Token balance deltas are folded per (hashX, ref) across the block and
+        # applied here once per key, with one batched read for undo + balances.
+        if self.glyph_index:
+            try:
+                self.glyph_index.apply_balance_deltas()
+            except MemoryError:
+                raise
+            except Exception:
+                self.logger.exception(
+                    'glyph_index.apply_balance_deltas failed at height %d; skipping',
+                    self.height + 1
+                )
+
         if self.analytics_index and (analytics_spends or analytics_adds):
             # Best-effort analytics overlay: a single malformed block's
             # adversarial data must not halt the indexer.  MemoryError is
@@ -965,6 +1011,15 @@ class BlockProcessor:
 
         self.db.history.add_unflushed(hashXs_by_tx, self.tx_count)
 
+        if summary is not None:
+            summary.tx_count = len(txs)
+            summary.input_count = input_count
+            summary.output_count = output_count
+            summary.output_value = output_value
+            summary.glyph_txs = glyph_txs
+            summary.ref_outputs = ref_outputs
+            summary.ref_mints = ref_mints
+
         self.tx_count = tx_num
         self.db.tx_counts.append(tx_num)
 
@@ -999,6 +1054,7 @@ class BlockProcessor:
         self.tip = coin.header_prevhash(block.header)
         is_unspendable = is_unspendable_legacy
         self._backup_txs(block.transactions, is_unspendable)
+        self.db_deletes.append(block_summary_key(self.height))
         self.height -= 1
         self.db.tx_counts.pop()
 
@@ -1290,6 +1346,8 @@ class BlockProcessor:
         self.tx_count = self.db.db_tx_count
         if self.glyph_index:
             self.glyph_index.post_open_init()
+            for migration in self.glyph_index.background_migrations():
+                self.migrations.add(migration)
         if self.wave_index and self.glyph_index:
             count = self.wave_index.backfill_from_glyph_db(self.glyph_index)
             if count > 0:
@@ -1326,6 +1384,8 @@ class BlockProcessor:
                 await group.spawn(self._process_blocks())
                 if self.analytics_index and self.height >= 0:
                     await group.spawn(self.analytics_index.backfill(self.height, caught_up_event))
+                if self.migrations.pending:
+                    await group.spawn(self.migrations.run(caught_up_event, self.state_lock))
 
                 async for task in group:
                     if not task.cancelled():
@@ -0,0 +1,183 @@
+'''LRU caches bounded by estimated bytes rather than entry counts.
+
+The history, UTXO list, balance and tx hash caches were ``pylru`` caches of
+a fixed number of entries. One history or UTXO list entry can hold ten items
+or a million, so memory use was unpredictable and the counts had to be kept
+small. A ``ByteLRUCache`` charges each entry the size its ``sizeof``
+function estimates and evicts the least recently used once ``max_bytes`` is
+exceeded, so a budget in MB can safely be raised.
+
+It is a drop-in for the ``pylru.lrucache`` operations the server uses;
+``KeyError`` from ``cache[key]`` is a miss like before. Each cache exports
+``rxindexer_server_cache_requests_total{cache,result}``,
+``rxindexer_server_cache_bytes{cache}`` and ``rxindexer_cache_size{cache}``
+(entries); ``info()`` gives the same for ``getinfo``.
+
+Sizes are estimates from ``sys.getsizeof`` of typical objects plus the
+dict slot holding them, not exact accounting.
+
+Histories are cached as ``PackedHistory`` (about 36 bytes an entry, against
+about 160 for a list of ``(tx_hash, height)`` tuples).
+'''
+
+import sys
+from array import array
+from collections import OrderedDict
+
+from electrumx.server import metrics as _metrics
+
+MB = 1024 * 1024
+
+# An OrderedDict slot: hash table entry plus the linked-list node
+ENTRY_OVERHEAD = 100
+_INT_SIZE = sys.getsizeof(2**40)
+_HASH_SIZE = sys.getsizeof(bytes(32))
+_HASHX_SIZE = sys.getsizeof(bytes(11))
+# A UTXO namedtuple of 5 fields, its tx hash and integers, and its list slot
+UTXO_SIZE = sys.getsizeof((0, ) * 5) + _HASH_SIZE + 3 * _INT_SIZE + 8
+TX_HASH_ENTRY_SIZE = (ENTRY_OVERHEAD + _INT_SIZE + sys.getsizeof((0, 0))
+                      + _HASH_SIZE + _INT_SIZE)
+BALANCE_ENTRY_SIZE = ENTRY_OVERHEAD + _HASHX_SIZE + _INT_SIZE
+
+
+def tx_hash_entry_size(tx_num, entry):
+    '''tx_num -> (tx_hash, height).'''
+    return TX_HASH_ENTRY_SIZE
+
+
+def balance_entry_size(hashX, balance):
+    '''hashX -> balance.'''
+    return BALANCE_ENTRY_SIZE
+
+
+def utxo_list_size(hashX, utxos):
+    '''hashX -> list of UTXOs.'''
+    return ENTRY_OVERHEAD + _HASHX_SIZE + sys.getsizeof([]) + len(utxos) * UTXO_SIZE
+
+
+def utxo_refs_size(hashX, entry):
+    '''hashX -> (id of a UTXO list, {(tx_hash, tx_pos): raw refs}). Each
+    ref costs its value plus a (tx_hash, tx_pos) key and dict slot.'''
+    _list_id, refs = entry
+    return (ENTRY_OVERHEAD + _HASHX_SIZE + _INT_SIZE + sys.getsizeof(refs)
+            + sum(len(value) + 160 for value in refs.values()))
+
+
+def history_size(hashX, history):
+    '''hashX -> PackedHistory, or the RPCError of a history too large.'''
+    nbytes = getattr(history, 'nbytes', 200)
+    return ENTRY_OVERHEAD + _HASHX_SIZE + nbytes
+
+
+class PackedHistory:
+    '''A confirmed history as two packed arrays: the 32-byte tx hashes back
+    to back, and the heights. Iterates as ``(tx_hash, height)`` pairs in
+    order, like the list ``DB.limited_history`` returns.'''
+
+    __slots__ = ('hashes', 'heights')
+
+    def __init__(self, history):
+        self.hashes = b''.join(tx_hash for tx_hash, _height in history)
+        self.heights = array('I', (height for _tx_hash, height in history))
+
+    def __len__(self):
+        return len(self.heights)
+
+    def __iter__(self):
+        hashes = self.hashes
+        return zip((hashes[n: n + 32] for n in range(0, len(hashes), 32)),
+                   self.heights)
+
+    @property
+    def nbytes(self):
+        return (sys.getsizeof(self.hashes) + sys.getsizeof(self.heights)
+                + 2 * ENTRY_OVERHEAD)
+
+
+class ByteLRUCache:
+    '''LRU cache of at most ``max_bytes``, entries sized by
+    ``sizeof(key, value)`` (see module doc).'''
+
+    def __init__(self, name, max_bytes, sizeof):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._sizes = {}
+        self._hit_metric = _metrics.server_cache_requests.labels(cache=name, result='hit')
+        self._miss_metric = _metrics.server_cache_requests.labels(cache=name, result='miss')
+        self._bytes_metric = _metrics.server_cache_bytes.labels(cache=name)
+        self._size_metric = _metrics.cache_size.labels(cache=name)
+
+    def __len__(self):
+        return len(self._store)
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def __contains__(self, key):
+        return key in self._store
+
+    def __getitem__(self, key):
+        try:
+            value = self._store[key]
+        except KeyError:
+            self.misses += 1
+            self._miss_metric.inc()
+            raise
+        self._store.move_to_end(key)
+        self.hits += 1
+        self._hit_metric.inc()
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        size = self.sizeof(key, value)
+        if key in self._store:
+            self._remove(key)
+        if size <= self.max_bytes:
+            self._store[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._store)))
+        self._update_metrics()
+
+    def __delitem__(self, key):
+        self._remove(key)
+        self._update_metrics()
+
+    def pop(self, key, default=None):
+        if key not in self._store:
+            return default
+        value = self._store[key]
+        del self[key]
+        return value
+
+    def clear(self):
+        self._store.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+        self._update_metrics()
+
+    def info(self):
+        '''A summary for getinfo.'''
+        return (f'{self.hits + self.misses:,d} lookups {self.hits:,d} hits '
+                f'{len(self):,d} entries {self.nbytes / MB:,.1f}/'
+                f'{self.max_bytes / MB:,.0f} MB')
+
+    def _remove(self, key):
+        del self._store[key]
+        self.nbytes -= self._sizes.pop(key)
+
+    def _update_metrics(self):
+        self._bytes_metric.set(self.nbytes)
+        self._size_metric.set(len(self._store))
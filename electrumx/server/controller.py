@@ -8,7 +8,7 @@
 from asyncio import Event
 import os
 
-from aiorpcx import _version as aiorpcx_version, TaskGroup
+from aiorpcx import _version as aiorpcx_version, TaskGroup, run_in_thread
 
 import electrumx
 from electrumx.lib.server_base import ServerBase
@@ -38,6 +38,8 @@ class Notifications(object):
         self._touched_mp = {}
         self._touched_bp = {}
         self._highest_block = -1
+        # Called after each block; set to MemPool.reconcile_soon
+        self.block_processed = None
 
     async def _maybe_notify(self):
         tmp, tbp = self._touched_mp, self._touched_bp
@@ -67,12 +69,19 @@ class Notifications(object):
         await self.notify(height, set())
 
     async def on_mempool(self, touched, height):
-        self._touched_mp[height] = touched
+        # Pushed txs can report several times at a height before a
+        # pending block is processed
+        if height in self._touched_mp:
+            self._touched_mp[height].update(touched)
+        else:
+            self._touched_mp[height] = touched
         await self._maybe_notify()
 
     async def on_block(self, touched, height):
         self._touched_bp[height] = touched
         self._highest_block = height
+        if self.block_processed:
+            self.block_processed()
         await self._maybe_notify()
 
 # pylint:disable=W0201
@@ -116,6 +125,16 @@ class Controller(ServerBase):
             rest_enabled = os.getenv('REST_API_ENABLED', '0').strip().lower() in ('1', 'true', 'yes')
             rest_host = os.getenv('REST_API_HOST', '0.0.0.0').strip()
             rest_port = int(os.getenv('REST_API_PORT', '8000'))
+            rest_workers = 0
+            if rest_enabled:
+                from electrumx.server.rest_worker import REST_WORKERS
+                rest_workers = REST_WORKERS
+                if rest_workers and env.db_engine.lower() != 'rocksdb':
+                    self.logger.error('REST_WORKERS needs DB_ENGINE=rocksdb; '
+                                      'serving REST in-process instead')
+                    rest_workers = 0
+            # The workers catch up with each flush from the published tip.
+            db.publish_tip = rest_workers > 0
 
             # Set notifications up to implement the MemPoolAPI
             def get_db_height():
@@ -130,10 +149,14 @@ class Controller(ServerBase):
             mempool = MemPool(env.coin, notifications, env=env,
                               refresh_secs=env.mempool_refresh_secs,
                               glyph_index=bp.glyph_index, swap_index=bp.swap_index,
-                              subscriptions=bp.subscriptions)
+                              subscriptions=bp.subscriptions,
+                              reconcile_secs=env.mempool_reconcile_secs,
+                              persist_secs=env.mempool_persist_secs)
+            # Drop newly confirmed txs without waiting for the next refresh
+            notifications.block_processed = mempool.reconcile_soon
 
             async def run_rest_api():
-                if not rest_enabled:
+                if not rest_enabled or rest_workers:
                     return
                 try:
                     import uvicorn
@@ -169,6 +192,20 @@ class Controller(ServerBase):
                     await rest_group.spawn(stop_when_shutdown())
                     await rest_group.spawn(server.serve())
 
+            async def run_rest_workers():
+                from electrumx.server.rest_worker import start_workers, stop_workers
+
+                # Workers open the DB read-only, so it must exist and be
+                # current before they start.
+                db.write_tip_file()
+                processes = start_workers(rest_workers)
+                self.logger.info(f'started {rest_workers} REST worker processes '
+                                 f'on {rest_host}:{rest_port}')
+                try:
+                    await shutdown_event.wait()
+                finally:
+                    await run_in_thread(stop_workers, processes)
+
             session_mgr = SessionManager(env, db, bp, daemon, mempool,
                                          shutdown_event)
 
@@ -179,10 +216,28 @@ class Controller(ServerBase):
             caught_up_event = Event()
             mempool_event = Event()
 
+            def push_subscriber():
+                if not env.daemon_zmq_url:
+                    return None
+                from electrumx.server.push import PushSubscriber, ZMQSource
+                try:
+                    source = ZMQSource(env.daemon_zmq_url)
+                except RuntimeError as e:
+                    self.logger.error(f'push notifications disabled: {e}')
+                    return None
+                self.logger.info(f'subscribed to daemon push notifications '
+                                 f'at {env.daemon_zmq_url}')
+                return PushSubscriber(source, mempool, bp.prefetcher.wake_up)
+
             async def wait_for_catchup():
                 await caught_up_event.wait()
                 await group.spawn(db.populate_header_merkle_cache())
                 await group.spawn(mempool.keep_synchronized(mempool_event))
+                subscriber = push_subscriber()
+                if subscriber:
+                    await group.spawn(subscriber.run())
+                if rest_workers:
+                    await group.spawn(run_rest_workers())
 
             async with TaskGroup() as group:
                 await group.spawn(run_rest_api())
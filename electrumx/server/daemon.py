@@ -239,13 +239,17 @@ class Daemon(object):
         return await self._send_single('getrawtransaction',
                                        (hex_hash, int(verbose)))
 
-    async def getrawtransactions(self, hex_hashes, replace_errs=True):
-        '''Return the serialized raw transactions with the given hashes.
+    async def getrawtransactions(self, hex_hashes, replace_errs=True,
+                                 verbose=False):
+        '''Return the serialized raw transactions with the given hashes,
+        or the daemon's decoded form of each if verbose is true.
 
         Replaces errors with None by default.'''
-        params_iterable = ((hex_hash, 0) for hex_hash in hex_hashes)
+        params_iterable = ((hex_hash, int(verbose)) for hex_hash in hex_hashes)
         txs = await self._send_vector('getrawtransaction', params_iterable,
                                       replace_errs=replace_errs)
+        if verbose:
+            return txs
         # Convert hex strings to bytes
         return [hex_to_bytes(tx) if tx else None for tx in txs]
 
@@ -12,13 +12,12 @@
 import array
 import ast
 import os
+import struct
 import time
 from bisect import bisect_right
 from collections import namedtuple
 from glob import glob
 
-import pylru
-
 import attr
 from aiorpcx import run_in_thread, sleep
 
@@ -29,6 +28,8 @@ from electrumx.lib.util import (
     formatted_time, pack_be_uint16, pack_be_uint32, pack_le_uint32,
     unpack_le_uint32, unpack_be_uint32, unpack_le_uint64
 )
+from electrumx.server import byte_cache
+from electrumx.server.byte_cache import ByteLRUCache
 from electrumx.server.storage import db_class
 from electrumx.server.history import History
 
@@ -38,6 +39,43 @@ from electrumx.lib.util import (
 
 UTXO = namedtuple("UTXO", "tx_num tx_pos tx_hash height value")
 
+# b'BS' + height (4 be) -> BlockSummary.  Written with the block's other data
+# at connect, deleted when the block is backed up.  Big-endian heights make a
+# run of blocks one contiguous range of keys.
+BLOCK_SUMMARY_PREFIX = b'BS'
+_BLOCK_SUMMARY = struct.Struct('<IIIIIQIII')
+
+
+def block_summary_key(height):
+    return BLOCK_SUMMARY_PREFIX + pack_be_uint32(height)
+
+
+@attr.s(slots=True)
+class BlockSummary(object):
+    '''Compact per-height block statistics for the block explorer routes.
+
+    Values are fee-less: fees would need every prevout's value, which is only
+    known to the UTXO cache at connect time for spends, not for the block.'''
+    timestamp = attr.ib(default=0)
+    tx_count = attr.ib(default=0)
+    size = attr.ib(default=0)
+    input_count = attr.ib(default=0)
+    output_count = attr.ib(default=0)
+    output_value = attr.ib(default=0)
+    glyph_txs = attr.ib(default=0)       # txs carrying a Glyph envelope
+    ref_outputs = attr.ib(default=0)     # outputs carrying push refs
+    ref_mints = attr.ib(default=0)       # refs minted in the block
+
+    def to_bytes(self):
+        return _BLOCK_SUMMARY.pack(*attr.astuple(self))
+
+    @classmethod
+    def from_bytes(cls, raw):
+        return cls(*_BLOCK_SUMMARY.unpack(raw[:_BLOCK_SUMMARY.size]))
+
+    def to_dict(self):
+        return attr.asdict(self)
+
 
 @attr.s(slots=True)
 class FlushData(object):
@@ -76,6 +114,9 @@ class DB(object):
     # genesis; there is no automatic migration for this bump.
     DB_VERSIONS = [9]
 
+    # Flushed height and tip, published for the REST worker processes.
+    TIP_FILE = 'meta/tip'
+
     class DBError(Exception):
         '''Raised on general DB errors generally indicating corruption.'''
 
@@ -102,6 +143,8 @@ class DB(object):
         self.wall_time = 0
         self.first_sync = True
         self.db_version = -1
+        # Set by the controller when REST workers follow this DB.
+        self.publish_tip = False
 
         self.logger.info(f'using {self.env.db_engine} for DB backend')
 
@@ -113,26 +156,35 @@ class DB(object):
         self.tx_counts_file = util.LogicalFile('meta/txcounts', 2, 2000000)
         self.hashes_file = util.LogicalFile('meta/hashes', 4, 16000000)
 
-        # LRU cache for fs_tx_hash: tx_num -> (tx_hash, tx_height).
+        # LRU caches bounded by estimated bytes (byte_cache.py).
+        MB = byte_cache.MB
+        # fs_tx_hash: tx_num -> (tx_hash, tx_height).
         # tx_num mappings are immutable (a confirmed tx never changes its
         # hash or height), so this cache never needs invalidation except on
         # reorg, where the existing retry loop in all_utxos handles stale
-        # reads.  50k entries covers ~50k most-recently-queried txs.
-        self._tx_hash_cache = pylru.lrucache(env.tx_hash_cache_size)
+        # reads.
+        self._tx_hash_cache = ByteLRUCache(
+            'tx_hash', env.tx_hash_cache_MB * MB, byte_cache.tx_hash_entry_size)
 
         # Confirmed balance cache: hashX -> confirmed balance (int).
         # Invalidated on block flush (flush_dbs/flush_backup) and on mempool
         # refresh via invalidate_balance_cache().  A miss falls through to
         # all_utxos, so correctness is preserved even if invalidation is
-        # delayed.  Capped at 100k entries (~7MB) to prevent unbounded growth
-        # under high-throughput bursts (Photon Cannon).
-        self._balance_cache = pylru.lrucache(env.balance_cache_size)
+        # delayed.  Bounded to prevent unbounded growth under
+        # high-throughput bursts (Photon Cannon).
+        self._balance_cache = ByteLRUCache(
+            'balance', env.balance_cache_MB * MB, byte_cache.balance_entry_size)
 
         # UTXO list cache: hashX -> sorted list of UTXO namedtuples.
         # Same invalidation semantics as the balance cache.  Avoids repeated
-        # RocksDB prefix scans in all_utxos for listunspent calls.  Capped
-        # at 10k entries (~50MB) — each entry is a list of UTXO tuples.
-        self._utxo_list_cache = pylru.lrucache(env.utxo_list_cache_size)
+        # RocksDB prefix scans in all_utxos for listunspent calls.  Sized by
+        # the length of each list, so one whale address cannot hold far more
+        # memory than its share.
+        self._utxo_list_cache = ByteLRUCache(
+            'utxo_list', env.utxo_list_cache_MB * MB, byte_cache.utxo_list_size)
+        # hashX -> (id of a UTXO list, its raw refs); see utxo_refs
+        self._utxo_refs_cache = ByteLRUCache(
+            'utxo_refs', env.utxo_list_cache_MB * MB, byte_cache.utxo_refs_size)
 
     async def _read_tx_counts(self):
         if self.tx_counts is not None:
@@ -196,6 +248,69 @@ class DB(object):
             self.utxo_db = None
         await self._open_dbs(False, False)
 
+    # Read-only access for the REST workers (electrumx/server/rest_worker.py)
+
+    async def open_for_reading(self):
+        '''Open the databases read-only, alongside the indexer process.
+
+        Nothing is written: recovery, compaction and upgrades are left to
+        the indexer.  Call catch_up() to follow its flushes.
+        '''
+        assert self.utxo_db is None
+        self.utxo_db = self.db_class('utxo', False, read_only=True)
+        self.read_utxo_state()
+        self.utxo_flush_count = self.history.open_db(
+            self.db_class, False, self.utxo_flush_count, False, read_only=True)
+        await self._read_tx_counts()
+
+    async def catch_up(self):
+        '''Bring a DB opened with open_for_reading() up to the indexer's
+        last flush.
+
+        Returns True if the chain tip moved (new blocks or a reorg); the
+        balance, UTXO list and tx hash caches are then cleared, as they
+        may hold reads of blocks that are no longer on the chain.
+        '''
+        def catch_up():
+            self.utxo_db.catch_up()
+            self.history.db.catch_up()
+            state = self._parse_utxo_state(self.utxo_db.get(b'state'))
+            if (state['height'], state['tip']) == (self.db_height, self.db_tip):
+                return False
+            size = (state['height'] + 1) * 8
+            tx_counts = array.array('Q', self.tx_counts_file.read(0, size))
+            if len(tx_counts) != state['height'] + 1 or (
+                    tx_counts and tx_counts[-1] != state['tx_count']):
+                raise self.DBError(f'tx counts file does not match UTXO DB '
+                                   f'state at height {state["height"]:,d}')
+            self.tx_counts = tx_counts
+            self.db_tx_count = self.fs_tx_count = state['tx_count']
+            self.fs_height = state['height']
+            self.db_height, self.db_tip = state['height'], state['tip']
+            return True
+
+        moved = await run_in_thread(catch_up)
+        if moved:
+            self.invalidate_all_balances()
+        return moved
+
+    def write_tip_file(self):
+        '''Publish the flushed tip to the REST workers: they catch up when
+        the file changes.  Written atomically.'''
+        tmp = self.TIP_FILE + '.tmp'
+        with util.open_truncate(tmp) as f:
+            f.write(f'{self.db_height} {hash_to_hex_str(self.db_tip)}\n'.encode())
+        os.replace(tmp, self.TIP_FILE)
+
+    @classmethod
+    def read_tip_file(cls):
+        '''The last tip written by write_tip_file(), or None.'''
+        try:
+            with open(cls.TIP_FILE, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
     # Header merkle cache
 
     async def populate_header_merkle_cache(self):
@@ -274,6 +389,8 @@ class DB(object):
         # Update and put the wall time again - otherwise we drop the
         # time it took to commit the batch
         self.flush_state(self.utxo_db)
+        if self.publish_tip:
+            self.write_tip_file()
 
         elapsed = self.last_flush - start_time
         self.logger.info(f'flush #{self.history.flush_count:,d} took '
@@ -448,6 +565,9 @@ class DB(object):
             # Flush state last as it reads the wall time.
             self.flush_state(batch)
         
+        if self.publish_tip:
+            self.write_tip_file()
+
         # Re-sync dMint contracts from Glyph index after reorg
         if dmint_contracts and glyph_index:
             dmint_contracts.sync_from_index(flush_data.height)
@@ -495,6 +615,44 @@ class DB(object):
 
         return await run_in_thread(read_headers)
 
+    async def raw_headers(self, heights):
+        '''Return a {height: binary header} dict for the given heights,
+        read in one pass off the event loop.  Heights not on disk are
+        omitted.'''
+        def read_headers():
+            db_height = self.db_height
+            read = self.headers_file.read
+            return {height: read(height * 80, 80)
+                    for height in sorted(set(heights))
+                    if 0 <= height <= db_height}
+
+        return await run_in_thread(read_headers)
+
+    def fs_block_summaries(self, top_height, count):
+        '''Return up to count blocks ending at top_height, newest first, as
+        (height, header, BlockSummary or None) triples.
+
+        Headers come from one contiguous read of the headers file and
+        summaries from one reverse range scan.  Blocks indexed before
+        summaries were recorded have None in their place.'''
+        top_height = min(top_height, self.db_height)
+        start = max(0, top_height - count + 1)
+        count = top_height - start + 1
+        if count <= 0:
+            return []
+        headers = self.headers_file.read(start * 80, count * 80)
+        summaries = {}
+        for key, value in self.utxo_db.iterator(prefix=BLOCK_SUMMARY_PREFIX,
+                                                reverse=True,
+                                                seek=block_summary_key(top_height)):
+            height, = unpack_be_uint32(key[-4:])
+            if height < start:
+                break
+            summaries[height] = BlockSummary.from_bytes(value)
+        return [(height, headers[(height - start) * 80:(height - start + 1) * 80],
+                 summaries.get(height))
+                for height in range(top_height, start - 1, -1)]
+
     def fs_tx_hash(self, tx_num):
         '''Return a pair (tx_hash, tx_height) for the given tx number.
 
@@ -563,6 +721,32 @@ class DB(object):
             self.logger.warning('limited_history: tx hash not found (reorg?), retrying...')
             await sleep(0.25)
 
+    async def history_page(self, hashX, *, offset=0, limit=25, reverse=True):
+        '''Return a (page, total) pair for one page of a hashX's history.
+
+        page is the list of (tx_hash, height) pairs for rows
+        [offset, offset + limit), newest first unless reverse is False;
+        total is the number of confirmed transactions in the history.
+        Only the rows on the page have their hashes read from disk.
+        '''
+        def read_page():
+            end = offset + limit
+            tx_nums = []
+            total = 0
+            for tx_num in self.history.get_txnums(hashX, None, reverse):
+                if offset <= total < end:
+                    tx_nums.append(tx_num)
+                total += 1
+            fs_tx_hash = self.fs_tx_hash
+            return [fs_tx_hash(tx_num) for tx_num in tx_nums], total
+
+        while True:
+            page, total = await run_in_thread(read_page)
+            if all(hash is not None for hash, height in page):
+                return page, total
+            self.logger.warning('history_page: tx hash not found (reorg?), retrying...')
+            await sleep(0.25)
+
     # -- Undo information
 
     def min_undo_height(self, max_height):
@@ -666,38 +850,14 @@ class DB(object):
     # -- UTXO database
 
     def read_utxo_state(self):
-        state = self.utxo_db.get(b'state')
-        if not state:
-            self.db_height = -1
-            self.db_tx_count = 0
-            self.db_tip = b'\0' * 32
-            self.db_version = max(self.DB_VERSIONS)
-            self.utxo_flush_count = 0
-            self.wall_time = 0
-            self.first_sync = True
-        else:
-            state = ast.literal_eval(state.decode())
-            if not isinstance(state, dict):
-                raise self.DBError('failed reading state from DB')
-            self.db_version = state['db_version']
-            if self.db_version not in self.DB_VERSIONS:
-                raise self.DBError('your UTXO DB version is {} but this '
-                                   'software only handles versions {}'
-                                   .format(self.db_version, self.DB_VERSIONS))
-            # backwards compat
-            genesis_hash = state['genesis']
-            if isinstance(genesis_hash, bytes):
-                genesis_hash = genesis_hash.decode()
-            if genesis_hash != self.coin.GENESIS_HASH:
-                raise self.DBError('DB genesis hash {} does not match coin {}'
-                                   .format(genesis_hash,
-                                           self.coin.GENESIS_HASH))
-            self.db_height = state['height']
-            self.db_tx_count = state['tx_count']
-            self.db_tip = state['tip']
-            self.utxo_flush_count = state['utxo_flush_count']
-            self.wall_time = state['wall_time']
-            self.first_sync = state['first_sync']
+        state = self._parse_utxo_state(self.utxo_db.get(b'state'))
+        self.db_version = state['db_version']
+        self.db_height = state['height']
+        self.db_tx_count = state['tx_count']
+        self.db_tip = state['tip']
+        self.utxo_flush_count = state['utxo_flush_count']
+        self.wall_time = state['wall_time']
+        self.first_sync = state['first_sync']
 
         # These are our state as we move ahead of DB state
         self.fs_height = self.db_height
@@ -706,6 +866,9 @@ class DB(object):
 
         # Upgrade DB
         if self.db_version != max(self.DB_VERSIONS):
+            if getattr(self.utxo_db, 'read_only', False):
+                raise self.DBError('UTXO DB needs upgrading; run the indexer '
+                                   'before opening it read-only')
             self.upgrade_db()
 
         # Log some stats
@@ -721,6 +884,29 @@ class DB(object):
             self.logger.info('sync time so far: {}'
                              .format(util.formatted_time(self.wall_time)))
 
+    def _parse_utxo_state(self, state):
+        '''Decode and check the UTXO DB state record.'''
+        if not state:
+            return {'db_version': max(self.DB_VERSIONS), 'height': -1,
+                    'tx_count': 0, 'tip': b'\0' * 32, 'utxo_flush_count': 0,
+                    'wall_time': 0, 'first_sync': True}
+        state = ast.literal_eval(state.decode())
+        if not isinstance(state, dict):
+            raise self.DBError('failed reading state from DB')
+        if state['db_version'] not in self.DB_VERSIONS:
+            raise self.DBError('your UTXO DB version is {} but this '
+                               'software only handles versions {}'
+                               .format(state['db_version'], self.DB_VERSIONS))
+        # backwards compat
+        genesis_hash = state['genesis']
+        if isinstance(genesis_hash, bytes):
+            genesis_hash = genesis_hash.decode()
+        if genesis_hash != self.coin.GENESIS_HASH:
+            raise self.DBError('DB genesis hash {} does not match coin {}'
+                               .format(genesis_hash,
+                                       self.coin.GENESIS_HASH))
+        return state
+
     def upgrade_db(self):
         self.logger.info(f'UTXO DB version: {self.db_version}')
         self.logger.info('Upgrading your DB; this can take some time...')
@@ -824,33 +1010,56 @@ class DB(object):
         with self.utxo_db.write_batch() as batch:
             self.write_utxo_state(batch)
 
+    def _read_utxos(self, hashX):
+        '''Read the UTXOs of an address from the DB (blocking).'''
+        utxos = []
+        utxos_append = utxos.append
+        # Key: b'u' + address_hashX + tx_idx + tx_num
+        # Value: the UTXO value as a 64-bit unsigned integer
+        prefix = b'u' + hashX
+        for db_key, db_value in self.utxo_db.iterator(prefix=prefix):
+            tx_pos, = unpack_le_uint32(db_key[-9:-5])
+            tx_num, = unpack_le_uint64(db_key[-5:] + bytes(3))
+            value, = unpack_le_uint64(db_value)
+            tx_hash, height = self.fs_tx_hash(tx_num)
+            utxos_append(UTXO(tx_num, tx_pos, tx_hash, height, value))
+        return utxos
+
     async def all_utxos(self, hashX):
         '''Return all UTXOs for an address sorted in no particular order.'''
-        cached = self._utxo_list_cache.get(hashX)
-        if cached is not None:
-            return cached
+        return (await self.all_utxos_batch([hashX]))[hashX]
 
-        def read_utxos():
-            utxos = []
-            utxos_append = utxos.append
-            # Key: b'u' + address_hashX + tx_idx + tx_num
-            # Value: the UTXO value as a 64-bit unsigned integer
-            prefix = b'u' + hashX
-            for db_key, db_value in self.utxo_db.iterator(prefix=prefix):
-                tx_pos, = unpack_le_uint32(db_key[-9:-5])
-                tx_num, = unpack_le_uint64(db_key[-5:] + bytes(3))
-                value, = unpack_le_uint64(db_value)
-                tx_hash, height = self.fs_tx_hash(tx_num)
-                utxos_append(UTXO(tx_num, tx_pos, tx_hash, height, value))
-            return utxos
+    async def all_utxos_batch(self, hashXs):
+        '''Return a {hashX: UTXOs} dict for several addresses.
 
-        while True:
-            utxos = await run_in_thread(read_utxos)
-            if all(utxo.tx_hash is not None for utxo in utxos):
-                self._utxo_list_cache[hashX] = utxos
-                return utxos
+        Cached lists are served directly; the rest are read in a single
+        thread hop rather than one per address.
+        '''
+        result = {}
+        missing = []
+        for hashX in hashXs:
+            cached = self._utxo_list_cache.get(hashX)
+            if cached is not None:
+                result[hashX] = cached
+            elif hashX not in result:
+                missing.append(hashX)
+                result[hashX] = None
+
+        def read_utxos():
+            return [self._read_utxos(hashX) for hashX in missing]
+
+        while missing:
+            lists = await run_in_thread(read_utxos)
+            if all(utxo.tx_hash is not None for utxos in lists for utxo in utxos):
+                for hashX, utxos in zip(missing, lists):
+                    # The refs cached for an older list go with it
+                    self._utxo_refs_cache.pop(hashX, None)
+                    self._utxo_list_cache[hashX] = utxos
+                    result[hashX] = utxos
+                break
             self.logger.warning('all_utxos: tx hash not found (reorg?), retrying...')
             await sleep(0.25)
+        return result
 
     def get_cached_balance(self, hashX):
         '''Return cached confirmed balance for hashX, or None on miss.'''
@@ -866,13 +1075,24 @@ class DB(object):
         for hashX in hashXs:
             self._balance_cache.pop(hashX, None)
             self._utxo_list_cache.pop(hashX, None)
+            self._utxo_refs_cache.pop(hashX, None)
 
     def invalidate_all_balances(self):
         '''Clear the entire balance and UTXO list cache (used on reorg).'''
         self._balance_cache.clear()
         self._utxo_list_cache.clear()
+        self._utxo_refs_cache.clear()
         self._tx_hash_cache.clear()
 
+    def cache_info(self):
+        '''A summary of the read caches for getinfo.'''
+        return {
+            'balance': self._balance_cache.info(),
+            'tx hash': self._tx_hash_cache.info(),
+            'utxo list': self._utxo_list_cache.info(),
+            'utxo refs': self._utxo_refs_cache.info(),
+        }
+
     async def codescripthash_all_utxos(self, codeScriptHash):
         '''Return all UTXOs for a codescripthash sorted in no particular order.'''
         def read_utxos():
@@ -971,9 +1191,40 @@ class DB(object):
         return None
 
     def get_refs_by_outpoint(self, outpoint): 
+        return self.decode_refs(self.utxo_db.get(b'ri' + outpoint))
+
+    def get_refs_by_outpoints(self, outpoints):
+        '''get_refs_by_outpoint for many outpoints with one multi-key read.'''
+        values = self.utxo_db.multi_get([b'ri' + outpoint for outpoint in outpoints])
+        return [self.decode_refs(value) for value in values]
+
+    def read_utxo_refs(self, utxos):
+        '''Return a {(tx_hash, tx_pos): raw refs} dict for those of utxos
+        carrying refs, read with one multi-key read.  Format the values
+        with decode_refs.'''
+        keys = [(utxo.tx_hash, utxo.tx_pos) for utxo in utxos]
+        values = self.utxo_db.multi_get([b'ri' + tx_hash + pack_le_uint32(tx_pos)
+                                         for tx_hash, tx_pos in keys])
+        return {key: value for key, value in zip(keys, values) if value}
+
+    async def utxo_refs(self, hashX, utxos):
+        '''read_utxo_refs for the list all_utxos(hashX) returned, cached for
+        as long as that list is current: the refs of an unspent output never
+        change, and a new list is read whenever the UTXOs change.
+
+        The entry holds the list's id, not the list, so it does not keep an
+        evicted list alive. all_utxos drops the entry whenever it reads a new
+        list for hashX, so an id cannot be reused by a later list while the
+        entry survives.'''
+        cached = self._utxo_refs_cache.get(hashX)
+        if cached is not None and cached[0] == id(utxos):
+            return cached[1]
+        refs = await run_in_thread(self.read_utxo_refs, utxos)
+        self._utxo_refs_cache[hashX] = (id(utxos), refs)
+        return refs
+
+    def decode_refs(self, value):
         refs = []
-        key = b'ri' + outpoint
-        value = self.utxo_db.get(key)
         if not value:
             return []
         for x in range(0, len(value), 37):
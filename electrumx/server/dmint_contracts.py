@@ -19,7 +19,7 @@ from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional, Set, Tuple
 
 from electrumx.lib import util
-from electrumx.lib.hash import hash_to_hex_str
+from electrumx.lib.hash import hash_to_hex_str, sha256
 from electrumx.lib.glyph import DMINT_MAX_TOTAL_SUPPLY
 
 
@@ -203,6 +203,14 @@ class DMintContractsManager:
             self.logger.info('Purged %d denied dMint contract(s) from listings', removed)
         return removed
     
+    def reload(self):
+        """Re-read the contract and denylist files, which another process
+        (the indexer, for a REST worker) may have rewritten."""
+        self._load_contracts()
+        self._load_denylist()
+        # After a reorg the reloaded set can carry an updated_height it had before
+        self._token_summary_cache = None
+
     def _load_contracts(self):
         """Load contracts from extended JSON file."""
         if os.path.exists(self.extended_path):
@@ -290,6 +298,7 @@ class DMintContractsManager:
             'daa_mode_name': 'Fixed',
             'icon_type': None,
             'icon_data': None,
+            'icon_hash': None,
             'icon_url': None,
             'icon_ref': None,
             'total_supply': 0,
@@ -332,6 +341,16 @@ class DMintContractsManager:
             return value
         return None
 
+    @staticmethod
+    def _icon_hash(icon_data: Optional[str]) -> Optional[str]:
+        '''sha256 hex of hex icon_data (the icon route's ETag), or None.'''
+        if not icon_data:
+            return None
+        try:
+            return sha256(bytes.fromhex(icon_data)).hex()
+        except ValueError:
+            return None
+
     def _extract_icon_fields(self, token: Dict[str, Any]) -> Dict[str, Optional[str]]:
         embed = token.get('embed') if isinstance(token.get('embed'), dict) else None
         remote = token.get('remote') if isinstance(token.get('remote'), dict) else None
@@ -412,6 +431,7 @@ class DMintContractsManager:
             if existing:
                 # Update existing contract with latest data
                 changed = False
+                prev_icon_data = existing.get('icon_data')
                 dmint = token.get('dmint', {})
                 icon_fields = self._extract_icon_fields(token)
                 sync_fields = {
@@ -432,6 +452,10 @@ class DMintContractsManager:
                     if value and value != existing.get(key):
                         existing[key] = value
                         changed = True
+                # Hashed once per icon, not per icon request
+                if (existing.get('icon_data') != prev_icon_data
+                        or 'icon_hash' not in existing):
+                    existing['icon_hash'] = self._icon_hash(existing.get('icon_data'))
                 
                 # Recompute liveness from ground truth each sync. `active`,
                 # `orphaned` and `burned` must NOT be one-way latches.
@@ -537,6 +561,7 @@ class DMintContractsManager:
                         daa_mode_name=dmint.get('daa_mode_name', 'Fixed'),
                         icon_type=icon_fields.get('icon_type'),
                         icon_data=icon_fields.get('icon_data'),
+                        icon_hash=self._icon_hash(icon_fields.get('icon_data')),
                         icon_url=icon_fields.get('icon_url'),
                         icon_ref=icon_fields.get('icon_ref'),
                         total_supply=token.get('total_supply', 0),
@@ -39,7 +39,8 @@ class Env(EnvBase):
         self.obsolete(["MAX_SUBSCRIPTIONS", "MAX_SUBS", "MAX_SESSION_SUBS", "BANDWIDTH_LIMIT",
                        "HOST", "TCP_PORT", "SSL_PORT", "RPC_HOST", "RPC_PORT", "REPORT_HOST",
                        "REPORT_TCP_PORT", "REPORT_SSL_PORT", "REPORT_HOST_TOR",
-                       "REPORT_TCP_PORT_TOR", "REPORT_SSL_PORT_TOR"])
+                       "REPORT_TCP_PORT_TOR", "REPORT_SSL_PORT_TOR",
+                       "TX_HASH_CACHE_SIZE", "BALANCE_CACHE_SIZE", "UTXO_LIST_CACHE_SIZE"])
 
         # Core items
 
@@ -73,13 +74,22 @@ class Env(EnvBase):
         self.donation_address = self.default('DONATION_ADDRESS', '')
         self.drop_client = self.custom("DROP_CLIENT", None, re.compile)
         self.cache_MB = self.integer('CACHE_MB', 1200)
-        # DB-layer LRU cache sizes (see db.py) — tunable without a rebuild
-        self.tx_hash_cache_size = self.integer('TX_HASH_CACHE_SIZE', 50000)
-        self.balance_cache_size = self.integer('BALANCE_CACHE_SIZE', 100000)
-        self.utxo_list_cache_size = self.integer('UTXO_LIST_CACHE_SIZE', 10000)
+        # LRU cache budgets in estimated MB (byte_cache.py): the DB's tx
+        # hash, balance and UTXO list caches, and the sessions' history cache
+        self.tx_hash_cache_MB = self.integer('TX_HASH_CACHE_MB', 16)
+        self.balance_cache_MB = self.integer('BALANCE_CACHE_MB', 16)
+        self.utxo_list_cache_MB = self.integer('UTXO_LIST_CACHE_MB', 64)
+        self.history_cache_MB = self.integer('HISTORY_CACHE_MB', 64)
         # Mempool poll interval; the mempool retains a full MemPoolTx per tx,
         # so a longer interval trades freshness for CPU and daemon RPC load
         self.mempool_refresh_secs = self.custom('MEMPOOL_REFRESH_SECS', 2.0, float)
+        # Optional daemon ZMQ endpoint (push.py).  While subscribed, the full
+        # mempool reconciliation runs every MEMPOOL_RECONCILE_SECS instead
+        self.daemon_zmq_url = self.default('DAEMON_ZMQ_URL', None)
+        self.mempool_reconcile_secs = self.custom('MEMPOOL_RECONCILE_SECS', 30.0, float)
+        # Seconds between warm-restart snapshots of the mempool (also saved
+        # on shutdown); 0 disables them
+        self.mempool_persist_secs = self.custom('MEMPOOL_PERSIST_SECS', 300.0, float)
 
         # R26: use coin.REORG_LIMIT as default (Radiant coin sets 69 = node max reorg depth)
         # Warn if set to an unreasonably low value
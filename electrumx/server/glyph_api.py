@@ -31,6 +31,7 @@ from electrumx.lib.glyph import (
 )
 from electrumx.lib.hash import hash_to_hex_str, hex_str_to_hash
 from electrumx.server.glyph_subscriptions import SubscriptionLimitError
+from electrumx.server.pagination import check_offset
 
 
 # Sentinel distinguishing "client did not pass cursor" (legacy list shape)
@@ -492,7 +493,7 @@ class GlyphAPIMixin:
 
             if cursor is _CURSOR_UNSET:
                 return self.glyph_index.get_token_history(
-                    ref_bytes, limit=limit, offset=offset
+                    ref_bytes, limit=limit, offset=check_offset(offset)
                 )
             return self.glyph_index.get_token_history(
                 ref_bytes, limit=limit, cursor=cursor, _use_cursor=True
@@ -800,7 +801,8 @@ class GlyphAPIMixin:
         
         return result
 
-    async def dmint_get_mint_history(self, ref: str, limit: int = 100, offset: int = 0):
+    async def dmint_get_mint_history(self, ref: str, limit: int = 100, offset: int = 0,
+                                     cursor=_CURSOR_UNSET):
         """
         Get mint history for a dMint token.
         
@@ -808,6 +810,9 @@ class GlyphAPIMixin:
             ref: Token ref in format "txid_vout"
             limit: Maximum results (default 100)
             offset: Pagination offset (default 0)
+            cursor: Opaque pagination cursor. When supplied, the ``mints``
+                    page comes with ``next_cursor`` and ``has_more``.
+                    See docs/pagination-cursors.md.
             
         Returns:
             Dict with mint events, total counts, and supply info
@@ -819,8 +824,12 @@ class GlyphAPIMixin:
         
         try:
             ref_bytes = self._parse_ref(ref)
+            if cursor is _CURSOR_UNSET:
+                return self.glyph_index.get_mint_history(
+                    ref_bytes, limit=min(limit, 500), offset=check_offset(offset)
+                )
             return self.glyph_index.get_mint_history(
-                ref_bytes, limit=min(limit, 500), offset=offset
+                ref_bytes, limit=min(limit, 500), cursor=cursor, _use_cursor=True
             )
         except Exception as e:
             return {'error': str(e)}
@@ -1110,7 +1119,10 @@ class GlyphAPIMixin:
             return {'error': 'Swap indexing not enabled'}
 
         limit = max(1, min(int(limit), 200))
-        offset = max(0, int(offset))
+        try:
+            offset = check_offset(offset)
+        except (ValueError, TypeError) as e:
+            return {'error': str(e)}
 
         try:
             base_bytes = self._parse_ref(base_ref) if base_ref else None
@@ -1161,7 +1173,10 @@ class GlyphAPIMixin:
             return {'trades': [], 'error': 'base_ref is required'}
 
         limit = max(1, min(int(limit), 200))
-        offset = max(0, int(offset))
+        try:
+            offset = check_offset(offset)
+        except (ValueError, TypeError) as e:
+            return {'error': str(e)}
 
         try:
             base_bytes = self._parse_ref(base_ref)
@@ -1198,18 +1213,28 @@ class GlyphAPIMixin:
             return {'error': 'market not found'}
         return rec
 
-    async def market_list(self, limit: int = 50, offset: int = 0):
-        """List discovered RadiantSwap prediction markets, newest-first. limit max 200."""
+    async def market_list(self, limit: int = 50, offset: int = 0,
+                          cursor=_CURSOR_UNSET):
+        """List discovered RadiantSwap prediction markets, newest-first. limit max 200.
+
+        Supplying ``cursor`` (``null`` on the first call) switches the response
+        to ``{entries, next_cursor, has_more}``; see docs/pagination-cursors.md.
+        """
         self.bump_cost(2.0)
         if not self.predict_index:
             return {'error': 'Prediction-market indexing not enabled'}
         try:
-            return self.predict_index.list_markets(limit=limit, offset=offset)
+            if cursor is _CURSOR_UNSET:
+                return self.predict_index.list_markets(
+                    limit=limit, offset=check_offset(offset))
+            return self.predict_index.list_markets(
+                limit=limit, cursor=cursor, _use_cursor=True)
         except Exception as e:
             return {'error': str(e)}
 
     async def royalty_get_listings(self, ref: str = None, seller: str = None,
-                                   limit: int = 100, offset: int = 0):
+                                   limit: int = 100, offset: int = 0,
+                                   cursor=_CURSOR_UNSET):
         """List active royalty-covenant listings (cross-seller discovery).
 
         With no args: the global feed of every NFT listed for sale, newest-first.
@@ -1218,20 +1243,31 @@ class GlyphAPIMixin:
 
         Each entry carries the full terms + ``covenant_script`` so a wallet can
         build a purchase without the seller's off-chain descriptor.
+
+        Supplying ``cursor`` (``null`` on the first call) switches the response
+        to ``{entries, next_cursor, has_more}``; see docs/pagination-cursors.md.
         """
         self.bump_cost(2.0)
         if not self.royalty_index:
             return {'error': 'Royalty indexing not enabled'}
         limit = max(1, min(int(limit), 200))
-        offset = max(0, int(offset))
+        try:
+            offset = check_offset(offset)
+        except (ValueError, TypeError) as e:
+            return {'error': str(e)}
         try:
             ref_bytes = self._parse_ref(ref) if ref else None
             seller_bytes = bytes.fromhex(seller) if seller else None
             if seller_bytes is not None and len(seller_bytes) != 32:
                 return {'error': 'seller must be a 32-byte scripthash hex'}
+            if cursor is _CURSOR_UNSET:
+                return self.royalty_index.get_listings(
+                    ref=ref_bytes, seller_scripthash=seller_bytes,
+                    limit=limit, offset=offset,
+                )
             return self.royalty_index.get_listings(
                 ref=ref_bytes, seller_scripthash=seller_bytes,
-                limit=limit, offset=offset,
+                limit=limit, cursor=cursor, _use_cursor=True,
             )
         except (ValueError, TypeError) as e:
             return {'error': f'Invalid input: {e}'}
@@ -1532,6 +1568,10 @@ class GlyphAPIMixin:
             return {'error': 'WAVE indexing not enabled'}
 
         if cursor is _CURSOR_UNSET:
+            try:
+                offset = check_offset(offset)
+            except (ValueError, TypeError) as e:
+                return {'error': str(e)}
             return self.wave_index.get_subdomains(
                 parent_name, limit=min(limit, 1000), offset=offset
             )
@@ -1596,7 +1636,8 @@ class GlyphAPIMixin:
     # ========================================================================
 
     async def realm_list(self, kind: str = None, owner: str = None,
-                         q: str = None, sort: str = 'new', limit: int = 200):
+                         q: str = None, sort: str = 'new', limit: int = 200,
+                         cursor=_CURSOR_UNSET):
         """
         List indexed realms (worlds/arenas/experiences), filtered + sorted.
 
@@ -1607,6 +1648,9 @@ class GlyphAPIMixin:
             q: Optional case-insensitive substring over name + desc + id.
             sort: 'new' (default, newest-minted first) | 'name'.
             limit: Maximum results (default 200, max 1000).
+            cursor: Opaque pagination cursor. When supplied (``null`` on the
+                    first call), response shape becomes
+                    ``{entries, next_cursor, has_more}``.
 
         Returns:
             List of realm records. Each carries the immutable discovery fields
@@ -1618,8 +1662,15 @@ class GlyphAPIMixin:
         if not getattr(self, 'realm_index', None):
             return {'error': 'Realm indexing not enabled'}
 
-        return self.realm_index.list(kind=kind, owner=owner, q=q,
-                                     sort=sort or 'new', limit=limit)
+        if cursor is _CURSOR_UNSET:
+            return self.realm_index.list(kind=kind, owner=owner, q=q,
+                                         sort=sort or 'new', limit=limit)
+        try:
+            return self.realm_index.list(kind=kind, owner=owner, q=q,
+                                         sort=sort or 'new', limit=limit,
+                                         cursor=cursor, _use_cursor=True)
+        except ValueError as e:
+            return {'error': str(e)}
 
     async def realm_get_by_id(self, realm_id: str):
         """
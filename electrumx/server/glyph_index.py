@@ -5,15 +5,21 @@ This module provides database storage and indexing for Glyph v1/v2 tokens.
 Handles token registration, balance tracking, and history.
 """
 
-import base64
 import struct
-from typing import Optional, Dict, Any, List, Tuple, Set
+import zlib
+from hashlib import blake2b
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple, Set
 from collections import defaultdict
 
 from electrumx.lib import util
 from electrumx.lib.hash import hash_to_hex_str, hex_str_to_hash, sha256, HASHX_LEN, Base58, Base58Error
 from electrumx.lib.script import Script, ScriptError, OpCodes
 from electrumx.lib.util import pack_be_uint32, encode_undo, decode_undo
+from electrumx.server.migrations import BackgroundMigration
+from electrumx.server.pagination import (
+    CURSOR_SCAN_BUDGET, clamp_offset, cursor_key, cursor_page, decode_cursor,
+    encode_cursor,
+)
 from electrumx.lib.glyph import (
     GLYPH_MAGIC,
     GlyphProtocol,
@@ -67,6 +73,15 @@ class GlyphDBKeys:
     BY_TYPE_RECENT = b'GZ'     # GZ + type(1) + inv_height(4 be) + ref(36) -> b''
     BY_PROTO = b'GP'           # GP + proto(1) + inv_height(4 be) + ref(36) -> b''
     GLOBAL_RECENT = b'GQ'      # GQ + inv_height(4 be) + ref(36) -> type(1)
+    # --- v5 materialised list-summary rows (see _summary_row / _migrate_4_to_5) ---
+    # scope = token_type, or SUMMARY_SCOPE_ALL for the all-types listing, so a
+    # type-filtered page is one bounded prefix scan like the unfiltered one.
+    SUMMARY = b'GA'            # GA + ref(36) -> CBOR summary row (no inline blobs)
+    SUMMARY_BY_ACTIVITY = b'GE'  # GE + scope(1) + inv_activity_height(4 be) + ref(36) -> b''
+    SUMMARY_BY_DEPLOY = b'GD'  # GD + scope(1) + deploy_height(4 be) + ref(36) -> b''
+    # --- v6 content-addressed blob store (see split_metadata_blobs) ---
+    BLOB = b'GF'               # GF + sha256(payload) -> codec(1) + mime_len(1) + mime + payload
+    BLOB_REFS = b'GU'          # GU + sha256(payload) -> uint32 le count of GM records using it
 
 
 # v3: per-dMint-contract liveness (`live_contracts`) for correct burn detection.
@@ -74,7 +89,13 @@ class GlyphDBKeys:
 # v4: recency-ordered discovery indexes (BY_TYPE_RECENT / BY_PROTO / GLOBAL_RECENT).
 #     Backfillable in place from existing GT rows (deploy_height + protocols are
 #     already stored) — no radiantd rescan; see _migrate_3_to_4.
-CURRENT_SCHEMA_VERSION = 4
+# v5: materialised list-summary rows (SUMMARY / SUMMARY_BY_ACTIVITY /
+#     SUMMARY_BY_DEPLOY) backing get_all_tokens_summary. Backfillable in place
+#     from GT + GM; see _migrate_4_to_5.
+# v6: large byte strings in GM records move to the BLOB store, deduplicated by
+#     content hash. Backfillable in place by rewriting GM rows; see
+#     _migrate_blob_row.
+CURRENT_SCHEMA_VERSION = 6
 
 
 # History event types
@@ -228,6 +249,243 @@ def pack_global_recent_key(deploy_height: int, ref: bytes) -> bytes:
     return GlyphDBKeys.GLOBAL_RECENT + _inv_height(deploy_height) + ref
 
 
+# v5 summary rows -----------------------------------------------------------
+# The all-types listing shares the per-type key layout under a scope byte no
+# token_type uses, so both are the same prefix scan.
+SUMMARY_SCOPE_ALL = 0xFF
+
+
+def pack_summary_key(ref: bytes) -> bytes:
+    """GA + ref — the materialised list-summary row for a token."""
+    return GlyphDBKeys.SUMMARY + ref
+
+
+def pack_summary_activity_key(scope: int, activity_height: int, ref: bytes) -> bytes:
+    """GE + scope(1) + inv_activity_height(4) + ref — most recently changed first."""
+    return (GlyphDBKeys.SUMMARY_BY_ACTIVITY + struct.pack('<B', scope & 0xFF)
+            + _inv_height(activity_height) + ref)
+
+
+def pack_summary_deploy_key(scope: int, deploy_height: int, ref: bytes) -> bytes:
+    """GD + scope(1) + deploy_height(4) + ref — oldest deploy first.
+
+    Ascending on purpose: new deploys append at the tail, so a cursor walk of
+    the catalogue never sees rows shift underneath it. Newest-deployed-first is
+    already served by the v4 GQ/GZ indexes.
+    """
+    h = deploy_height if 0 <= deploy_height <= INV_HEIGHT_MAX else 0
+    return (GlyphDBKeys.SUMMARY_BY_DEPLOY + struct.pack('<B', scope & 0xFF)
+            + pack_be_uint32(h) + ref)
+
+
+# v6 blob store ---------------------------------------------------------------
+# Byte strings at least this long move out of a GM record into the BLOB store.
+# Smaller ones stay inline: a blob costs two more keys and a second read.
+BLOB_MIN_SIZE = 1024
+# CBOR tag standing in for a moved byte string: [sha256(payload), len(payload)].
+# Only interpreted inside records that start with SPLIT_RECORD_MARKER, so the
+# same tag number in on-chain metadata is never mistaken for a pointer.
+BLOB_REF_TAG = 0x52584246
+# First byte of a GM record whose blobs were split out. 0xFF is the CBOR
+# "break" code, which never starts a well-formed item, so an unsplit record
+# can not be mistaken for one.
+SPLIT_RECORD_MARKER = b'\xff'
+BLOB_CODEC_RAW = 0
+BLOB_CODEC_ZLIB = 1
+# Nodes visited when splitting one record before giving up and storing it
+# unsplit (cbor_loads_capped already bounds the payload size).
+_SPLIT_MAX_NODES = 100_000
+
+# _record_undo default: read the previous value from the DB
+_READ_PREV = object()
+# A GU undo value of this byte + uint32 le n releases the n references its
+# block added, rather than restoring a count (GU values are 4 bytes)
+_BLOB_RELEASE_UNDO = b'\xff'
+
+
+class BlobRef(NamedTuple):
+    """A byte string moved to the BLOB store, as it decodes from a GM record."""
+    hash: bytes
+    size: int
+
+
+def pack_blob_key(blob_hash: bytes) -> bytes:
+    """GF + sha256(payload) — one stored blob."""
+    return GlyphDBKeys.BLOB + blob_hash
+
+
+def pack_blob_refs_key(blob_hash: bytes) -> bytes:
+    """GU + sha256(payload) — how many GM records point at the blob."""
+    return GlyphDBKeys.BLOB_REFS + blob_hash
+
+
+def encode_blob(payload: bytes, mime: Optional[str]) -> bytes:
+    """Pack a GF value: codec(1) + mime_len(1) + mime + body.
+
+    The body is zlib-compressed only when that saves at least 10% — embeds are
+    mostly already-compressed images, and inflating those on every read would
+    buy nothing.
+    """
+    mime_b = mime.encode('utf-8', 'replace')[:255] if isinstance(mime, str) else b''
+    codec, body = BLOB_CODEC_RAW, payload
+    packed = zlib.compress(payload, 6)
+    if len(packed) < len(payload) * 9 // 10:
+        codec, body = BLOB_CODEC_ZLIB, packed
+    return bytes([codec, len(mime_b)]) + mime_b + body
+
+
+def decode_blob(raw: bytes) -> Tuple[bytes, Optional[str]]:
+    """Unpack a GF value into ``(payload, mime_type)``."""
+    codec, mime_len = raw[0], raw[1]
+    mime = raw[2:2 + mime_len].decode('utf-8', 'replace') or None
+    body = raw[2 + mime_len:]
+    if codec == BLOB_CODEC_ZLIB:
+        return zlib.decompress(body), mime
+    if codec == BLOB_CODEC_RAW:
+        return body, mime
+    raise ValueError(f'unknown blob codec {codec}')
+
+
+def split_metadata_blobs(cbor_data: bytes, min_size: int = BLOB_MIN_SIZE
+                         ) -> Tuple[bytes, Dict[bytes, Tuple[bytes, Optional[str]]]]:
+    """Move the large byte strings of a CBOR metadata body out of the record.
+
+    Returns ``(record, blobs)``. ``blobs`` maps sha256(payload) to
+    ``(payload, mime_type)`` — the mime type is the sibling ``t`` field of the
+    file object, when there is one — and ``record`` is the GM value to store:
+    the body re-encoded with a ``BLOB_REF_TAG`` pointer in place of each moved
+    byte string, behind ``SPLIT_RECORD_MARKER``. A body with nothing to move,
+    one that does not decode, or one that already uses the pointer tag is
+    returned unchanged with no blobs.
+    """
+    if not HAS_CBOR:
+        return cbor_data, {}
+    blobs: Dict[bytes, Tuple[bytes, Optional[str]]] = {}
+    budget = [_SPLIT_MAX_NODES]
+
+    def walk(node, mime):
+        budget[0] -= 1
+        if budget[0] < 0:
+            raise ValueError('metadata too complex to split')
+        if isinstance(node, (bytes, bytearray)):
+            if len(node) < min_size:
+                return node
+            payload = bytes(node)
+            blob_hash = sha256(payload)
+            blobs.setdefault(blob_hash, (payload, mime))
+            return cbor2.CBORTag(BLOB_REF_TAG, [blob_hash, len(payload)])
+        if isinstance(node, dict):
+            t = node.get('t')
+            child_mime = t if isinstance(t, str) else None
+            return {k: walk(v, child_mime) for k, v in node.items()}
+        if isinstance(node, list):
+            return [walk(v, mime) for v in node]
+        if isinstance(node, cbor2.CBORTag):
+            if node.tag == BLOB_REF_TAG:
+                raise ValueError('metadata already uses the blob pointer tag')
+            return cbor2.CBORTag(node.tag, walk(node.value, mime))
+        return node
+
+    try:
+        record = walk(cbor_loads_capped(cbor_data), None)
+        if not blobs:
+            return cbor_data, {}
+        return SPLIT_RECORD_MARKER + cbor2.dumps(record), blobs
+    except Exception:
+        return cbor_data, {}
+
+
+def _blob_tag_hook(*args):
+    # cbor2 < 6 calls tag_hook(decoder, tag); 6.x calls tag_hook(tag, immutable).
+    tag = next(a for a in args if isinstance(a, cbor2.CBORTag))
+    value = tag.value
+    if (tag.tag == BLOB_REF_TAG and isinstance(value, (list, tuple)) and len(value) == 2
+            and isinstance(value[0], bytes) and isinstance(value[1], int)):
+        return BlobRef(value[0], value[1])
+    return tag
+
+
+def load_metadata_record(raw: bytes):
+    """Decode a GM record; moved byte strings come back as ``BlobRef``."""
+    if raw[:1] == SPLIT_RECORD_MARKER:
+        return cbor_loads_capped(raw[1:], tag_hook=_blob_tag_hook)
+    return cbor_loads_capped(raw)
+
+
+def iter_blob_refs(node):
+    """Yield every ``BlobRef`` in a decoded metadata record."""
+    if isinstance(node, BlobRef):
+        yield node
+    elif isinstance(node, dict):
+        for v in node.values():
+            yield from iter_blob_refs(v)
+    elif isinstance(node, list):
+        for v in node:
+            yield from iter_blob_refs(v)
+    elif HAS_CBOR and isinstance(node, cbor2.CBORTag):
+        yield from iter_blob_refs(node.value)
+
+
+class KnownRefFilter:
+    """Bloom filter over every ref that has a GT row.
+
+    Answers "is this ref definitely *not* a token?" without a DB read, which is
+    the common case: most ref-carrying outputs seen during sync are not glyph
+    tokens. A hit only means "maybe" and still goes to the DB.
+
+    Refs are only ever added, never removed, so the filter stays a superset of
+    the GT keyspace across reorgs — a token unwound by ``backup()`` just becomes
+    a false positive that the DB read resolves. Once more refs have been added
+    than it was sized for, ``saturated`` asks the owner to rebuild it larger.
+    """
+
+    BITS_PER_KEY = 10   # ~1% false positives at capacity with K = 7
+    K = 7
+    MIN_CAPACITY = 1 << 16
+
+    def __init__(self, capacity: int):
+        self.capacity = max(self.MIN_CAPACITY, capacity)
+        self.nbits = self.capacity * self.BITS_PER_KEY
+        self.bits = bytearray((self.nbits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, ref: bytes):
+        # Double hashing (Kirsch-Mitzenmacher) off one 128-bit digest. The ref
+        # is not hashed raw: refs from one tx share their 32-byte txid prefix.
+        digest = blake2b(ref, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        nbits = self.nbits
+        for i in range(self.K):
+            yield (h1 + i * h2) % nbits
+
+    def add(self, ref: bytes):
+        # Count a ref only if it set a bit: flushes re-add every cached ref,
+        # and counting those would make ``saturated`` fire spuriously. A new
+        # ref whose bits were all set already goes uncounted, like a false
+        # positive.
+        bits = self.bits
+        flipped = False
+        for pos in self._positions(ref):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                flipped = True
+        if flipped:
+            self.count += 1
+
+    def __contains__(self, ref: bytes) -> bool:
+        bits = self.bits
+        for pos in self._positions(ref):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
 class GlyphTokenInfo:
     """
     Represents indexed token information.
@@ -517,6 +775,10 @@ class GlyphIndex:
         self.balance_cache: Dict[bytes, int] = {}  # key -> amount
         self.balance_height: Dict[bytes, int] = {}
         self.balance_deletes: Set[bytes] = set()  # balance keys to delete from DB on flush
+        # Per-block net balance deltas, (hashX, ref) -> (floor, net), folded by
+        # update_balance and applied once per key by apply_balance_deltas.
+        self._pending_balances: Dict[Tuple[bytes, bytes], Tuple[int, int]] = {}
+        self._pending_balance_height: Optional[int] = None
         # hashX -> base scriptPubKey, for resolving holder rows to a displayable
         # owner identity (address / full scripthash).  Idempotent: a given hashX
         # always maps to the same script, so we never need to delete or undo it.
@@ -541,6 +803,23 @@ class GlyphIndex:
         # Transient set of refs known to exist as tokens (cleared on flush, R14).
         # Prevents redundant DB lookups within a flush window.
         self._known_refs: Set[bytes] = set()
+        # Negative filter over every persisted GT ref, loaded in post_open_init
+        # and extended at flush. None until loaded: _is_known_token then falls
+        # back to a DB read for every unknown ref, as before.
+        self._ref_filter: Optional[KnownRefFilter] = None
+
+        # Resumable in-place backfills for schema upgrades. Scheduled by
+        # _check_schema_version and run by the block processor's
+        # MigrationRunner; query paths check ``.complete``.
+        self.discovery_migration = BackgroundMigration(
+            'glyph_v4_discovery', GlyphDBKeys.TOKEN, self._migrate_discovery_row)
+        self.summary_migration = BackgroundMigration(
+            'glyph_v5_summary', GlyphDBKeys.TOKEN, self._migrate_summary_row)
+        self.blob_migration = BackgroundMigration(
+            'glyph_v6_blobs', GlyphDBKeys.METADATA, self._migrate_blob_row,
+            begin_chunk=self._begin_blob_chunk, end_chunk=self._end_blob_chunk)
+        # hash -> [payload, mime, new references, height] for the running chunk.
+        self._migration_blobs: Dict[bytes, list] = {}
 
         # Per-height undo information for reorg safety.
         # We store the previous value of each key (or None if absent) the first time
@@ -581,6 +860,25 @@ class GlyphIndex:
             self._check_schema_version()
             if self._dmint_denylist:
                 self._scrub_denylist_metadata()
+            self._load_ref_filter()
+
+    def _load_ref_filter(self, extra_refs=()):
+        """(Re)build the known-ref filter from the GT keyspace.
+
+        Sized at twice the current token count so sync can run a long way
+        before ``flush`` has to rebuild it. ``extra_refs`` covers tokens whose
+        GT rows are in the flush batch but not yet committed.
+        """
+        prefix = GlyphDBKeys.TOKEN
+        refs = [key[len(prefix):] for key in
+                self.db.utxo_db.iterator(prefix=prefix, include_value=False)]
+        refs.extend(extra_refs)
+        ref_filter = KnownRefFilter(len(refs) * 2)
+        for ref in refs:
+            ref_filter.add(ref)
+        self._ref_filter = ref_filter
+        self.logger.info(f'known-ref filter loaded: {len(refs):,d} refs, '
+                         f'{len(ref_filter.bits) // 1024:,d} KB')
     
     def _check_schema_version(self):
         """R21 — Verify/upgrade DB schema version.
@@ -588,18 +886,21 @@ class GlyphIndex:
         Three cases:
           * Fresh DB (no version key): stamp CURRENT and return. A from-scratch
             reindex replays every block through the token write path, which now
-            populates the v4 discovery indexes natively — no migration needed.
-          * Up to date: log and return.
-          * Behind: apply in-place migrations one step at a time where an
-            in-place migrator exists; hard-fail (full reindex required) for any
-            gap without one. This preserves the old safety net for schema
-            changes that genuinely need a rescan, while letting the v3->v4
-            discovery-index upgrade run without deleting the DB.
+            populates the v4/v5 derived rows natively — no migration needed.
+          * Up to date: log and return. Background migrations scheduled by an
+            earlier upgrade may still be pending; their checkpoints are loaded
+            either way and resumed by the block processor's MigrationRunner.
+          * Behind: schedule the in-place backfills and stamp CURRENT in one
+            batch, then return without running them — they run in the
+            background. Hard-fail (full reindex required) for any gap without an
+            in-place migration, preserving the old safety net for schema changes
+            that genuinely need a rescan.
         """
         raw = self.db.utxo_db.get(GlyphDBKeys.SCHEMA_VERSION)
         if raw is None:
             self.db.utxo_db.put(GlyphDBKeys.SCHEMA_VERSION,
                                 bytes([CURRENT_SCHEMA_VERSION]))
+            self.load_migrations()
             self.logger.info(f'Glyph DB schema version initialised to {CURRENT_SCHEMA_VERSION}')
             return
 
@@ -611,106 +912,184 @@ class GlyphIndex:
                 f'or reindex.'
             )
         if v == CURRENT_SCHEMA_VERSION:
+            self.load_migrations()
             self.logger.info(f'Glyph DB schema version {v} OK')
             return
 
-        # v < CURRENT — walk the in-place migration chain.
-        migrations = {3: self._migrate_3_to_4}
-        while v < CURRENT_SCHEMA_VERSION:
-            migrator = migrations.get(v)
-            if migrator is None:
+        # v < CURRENT — every step needs an in-place (background) migration.
+        migrations = {3: self.discovery_migration, 4: self.summary_migration,
+                      5: self.blob_migration}
+        for step in range(v, CURRENT_SCHEMA_VERSION):
+            if step not in migrations:
                 raise RuntimeError(
                     f'FATAL: Glyph DB schema version {v} < {CURRENT_SCHEMA_VERSION} '
                     f'has no in-place migration. A full reindex is required. '
                     f'Delete the DB directory and restart.'
                 )
-            self.logger.info(f'Glyph DB schema migration v{v} -> v{v + 1} starting…')
-            migrator()
-            v += 1
-            self.db.utxo_db.put(GlyphDBKeys.SCHEMA_VERSION, bytes([v]))
-            self.logger.info(f'Glyph DB schema upgraded to v{v}')
+        with self.db.utxo_db.write_batch() as batch:
+            for step in range(v, CURRENT_SCHEMA_VERSION):
+                migrations[step].schedule(batch)
+            batch.put(GlyphDBKeys.SCHEMA_VERSION, bytes([CURRENT_SCHEMA_VERSION]))
+        self.load_migrations()
+        self.logger.info(
+            f'Glyph DB schema upgraded v{v} -> v{CURRENT_SCHEMA_VERSION}; '
+            f'backfill scheduled in the background')
+
+    def load_migrations(self):
+        for migration in self.background_migrations():
+            migration.load(self.db.utxo_db)
+
+    def background_migrations(self) -> List[BackgroundMigration]:
+        """Migrations for the block processor's MigrationRunner, oldest first."""
+        return [self.discovery_migration, self.summary_migration,
+                self.blob_migration]
+
+    @property
+    def discovery_rows_ready(self) -> bool:
+        """Whether the v4 recency and protocol rows cover every token.
+
+        False until the schema check has run and the v3 -> v4 backfill (if one
+        was scheduled) has finished. Until then the recency and protocol lists
+        are served by scanning GT / BY_TYPE in ref order, as
+        get_all_tokens_summary does before ``summary_rows_ready``.
+        """
+        return self.discovery_migration.complete
 
-    def _migrate_3_to_4(self) -> int:
-        """v3 -> v4: backfill the recency-ordered discovery indexes in place.
-
-        Walks existing GT rows — each already stores ``deploy_height`` and
-        ``protocols`` — and writes the BY_TYPE_RECENT / BY_PROTO / GLOBAL_RECENT
-        rows. No radiantd rescan and no block reprocessing.
-
-        Notes:
-          * Idempotent — re-writing the same derived keys is a no-op, so a run
-            interrupted before the version stamp is safe to repeat.
-          * Page-committed via ``seek`` so it never holds a RocksDB iterator open
-            across a ``write_batch`` commit and never buffers the whole keyspace.
-          * No undo is recorded. The migration runs at startup before block sync,
-            so no reorg is concurrent; the only residue a later deep reorg could
-            leave is an orphan recency row for a just-deployed token whose GT row
-            is unwound — and every list query hydrates via ``get_token`` and
-            skips a ref whose token is gone, so orphans are inert (self-healing).
+    @property
+    def summary_rows_ready(self) -> bool:
+        """Whether the v5 summary rows cover every token.
+
+        False until the schema check has run and the v4 -> v5 backfill (if one
+        was scheduled) has finished. Until then get_all_tokens_summary keeps
+        serving from GT so a half-populated GA table is never listed.
         """
-        prefix = GlyphDBKeys.TOKEN
-        PAGE = 5000
-        seek = prefix
-        total = 0
-        pages = 0
-        while True:
-            page = []
-            for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
-                page.append((key, value))
-                if len(page) >= PAGE:
-                    break
-            if not page:
-                break
-            with self.db.utxo_db.write_batch() as batch:
-                for key, value in page:
-                    ref = key[len(prefix):]
-                    if len(ref) != 36:
-                        continue
-                    try:
-                        token = GlyphTokenInfo.from_bytes(value)
-                    except Exception:
-                        continue
-                    # Same key computation as the live write path (no undo here;
-                    # the migration runs at startup before any reorg).
-                    for k, v in self._discovery_rows(ref, token):
-                        batch.put(k, v)
-                    total += 1
-            pages += 1
-            self.logger.info(
-                f'Glyph v4 migration: {total} tokens indexed ({pages} page(s))')
-            if len(page) < PAGE:
-                break
-            # Resume strictly after the last key (seek is inclusive; a trailing
-            # 0x00 byte is the smallest key greater than a fixed-length GT row).
-            seek = page[-1][0] + b'\x00'
-        self.logger.info(
-            f'Glyph v4 migration complete: {total} tokens backfilled into '
-            f'discovery indexes (GZ/GP/GQ)')
-        return total
+        return self.summary_migration.complete
+
+    def _migrate_discovery_row(self, batch, key: bytes, value: bytes) -> None:
+        """v3 -> v4: write the recency-ordered discovery rows for one GT row.
+
+        GT rows already store ``deploy_height`` and ``protocols``, so the
+        BY_TYPE_RECENT / BY_PROTO / GLOBAL_RECENT rows are the same key
+        computation as the live write path — no radiantd rescan and no block
+        reprocessing. Idempotent: re-writing the same derived keys is a no-op.
+
+        No undo is recorded. The only residue a deep reorg could leave is an
+        orphan recency row for a just-deployed token whose GT row is unwound —
+        and every list query hydrates via ``get_token`` and skips a ref whose
+        token is gone, so orphans are inert (self-healing).
+        """
+        ref = key[len(GlyphDBKeys.TOKEN):]
+        if len(ref) != 36:
+            return
+        try:
+            token = GlyphTokenInfo.from_bytes(value)
+        except Exception:
+            return
+        for k, v in self._discovery_rows(ref, token):
+            batch.put(k, v)
+
+    def _migrate_summary_row(self, batch, key: bytes, value: bytes) -> None:
+        """v4 -> v5: materialise the list-summary row for one GT row.
+
+        Built by ``_summary_row`` (the live flush path), so the only difference
+        from an indexed-from-scratch DB is that ``activity_height`` starts at the
+        deploy height — the last-change height was never stored. Rows move to
+        their true recency slot the next time the token changes.
+
+        A token whose GA row already exists was written by a flush since the
+        upgrade and is newer than what GT alone can give, so it is left alone.
+        That flush's undo restores this same GT-derived row rather than
+        deleting it (see ``_write_summary_rows``), so a reorg after the backfill
+        has passed the token cannot drop it.
+        """
+        ref = key[len(GlyphDBKeys.TOKEN):]
+        if len(ref) != 36:
+            return
+        if self.db.utxo_db.get(pack_summary_key(ref)) is not None:
+            return
+        row = self._summary_row_from_gt(value)
+        if row is None:
+            return
+        batch.put(pack_summary_key(ref), cbor2.dumps(row))
+        for k in self._summary_index_keys(ref, row):
+            batch.put(k, b'')
+
+    def _migrate_blob_row(self, batch, key: bytes, value: bytes) -> None:
+        """v5 -> v6: move one GM record's large byte strings to the BLOB store.
+
+        A record that is already split was rewritten by a flush since the
+        upgrade, which counted its blob references itself, so it is skipped —
+        every record is counted exactly once. Reference counts are summed over
+        the chunk and written by ``_end_blob_chunk`` in the same batch.
+        """
+        if value[:1] == SPLIT_RECORD_MARKER:
+            return
+        record, blobs = split_metadata_blobs(value)
+        if not blobs:
+            return
+        self._stage_blobs(self._migration_blobs, blobs, None)
+        batch.put(key, record)
+
+    def _begin_blob_chunk(self) -> None:
+        self._migration_blobs = {}
+
+    def _end_blob_chunk(self, batch) -> None:
+        self._write_blobs(batch, self._migration_blobs)
+        self._migration_blobs = {}
+
+    def _migrate_3_to_4(self) -> int:
+        """Run the v4 discovery backfill synchronously from the start."""
+        with self.db.utxo_db.write_batch() as batch:
+            self.discovery_migration.schedule(batch)
+        return self.discovery_migration.run_to_completion(self.db.utxo_db)
+
+    def _migrate_4_to_5(self) -> int:
+        """Run the v5 summary-row backfill synchronously from the start."""
+        with self.db.utxo_db.write_batch() as batch:
+            self.summary_migration.schedule(batch)
+        return self.summary_migration.run_to_completion(self.db.utxo_db)
 
     def _scrub_denylist_metadata(self) -> None:
         """Delete stored CBOR metadata blobs (GM keys) for all denylisted tokens.
 
         Called once on startup when the denylist is non-empty.  The GT token
         record is preserved (supply/dmint fields remain queryable); only the
-        raw CBOR payload — which holds the embedded JPEG — is erased.
+        raw CBOR payload — which holds the embedded JPEG — is erased. For a
+        split (v6) record that means releasing its BLOB references too; a blob
+        is deleted once no other record points at it.
 
         Safe to call repeatedly: a missing GM key is silently ignored.
         """
         to_delete = []
+        released: Dict[bytes, int] = {}
+        seen = set()
         for token_ref in self._dmint_denylist:
             token = self.token_cache.get(token_ref) or self.get_token(token_ref)
             if not token or not token.metadata_hash:
                 continue
             gm_key = GlyphDBKeys.METADATA + token.metadata_hash
+            if gm_key in seen:
+                continue
+            seen.add(gm_key)
             existing = self.db.utxo_db.get(gm_key)
-            if existing is not None:
-                to_delete.append((gm_key, token_ref, len(existing)))
+            if existing is None:
+                continue
+            size = len(existing)
+            if existing[:1] == SPLIT_RECORD_MARKER:
+                try:
+                    refs = set(iter_blob_refs(load_metadata_record(existing)))
+                except Exception:
+                    refs = set()
+                for blob in refs:
+                    released[blob.hash] = released.get(blob.hash, 0) + 1
+                    size += blob.size
+            to_delete.append((gm_key, token_ref, size))
 
         if not to_delete:
             return
 
         with self.db.utxo_db.write_batch() as batch:
+            self._release_blobs(batch, released)
             for gm_key, token_ref, size in to_delete:
                 batch.delete(gm_key)
                 self.logger.info(
@@ -997,6 +1376,8 @@ class GlyphIndex:
         if ref in self.token_cache:
             self._known_refs.add(ref)
             return True
+        if self._ref_filter is not None and ref not in self._ref_filter:
+            return False
         key = pack_token_key(ref)
         if self.db.utxo_db.get(key) is not None:
             self._known_refs.add(ref)
@@ -1687,7 +2068,8 @@ class GlyphIndex:
         Consistency note: like every other list endpoint, this now reflects
         flushed DB state (the BY_PROTO rows are written on flush); a token
         deployed in the current, not-yet-flushed batch appears on the next flush.
-        The opaque cursor is an index key, not the pre-v4 integer offset.
+        The opaque cursor is an index key, not the pre-v4 integer offset. Until
+        ``discovery_rows_ready`` the list is filtered from GT in ref order.
         """
         if not self.enabled:
             return []
@@ -1698,42 +2080,102 @@ class GlyphIndex:
         else:
             proto = GlyphProtocol.GLYPH_ENCRYPTED
             predicate = None
-        prefix = GlyphDBKeys.BY_PROTO + struct.pack('<B', proto)
-        return self._paginate_hydrated(prefix, limit, cursor, predicate=predicate)
+        return self._paginate_protocol(proto, limit, cursor, predicate)
 
     def update_balance(self, height: int, scripthash: bytes, ref: bytes, delta: int):
-        """Update a token balance."""
+        """Queue a token balance change for the block at ``height``.
+
+        Nothing is read or undo-recorded here: a batch transfer can touch the
+        same (hashX, ref) many times in one block, so changes are folded into
+        one pending entry and applied by ``apply_balance_deltas``.
+
+        Each change is ``balance = max(0, balance + delta)``. Any run of those
+        composes to ``max(floor, balance + net)``, so the fold keeps exactly
+        the per-step clamping of applying them one at a time.
+        """
         if not self.enabled:
             return
+        if self._pending_balance_height != height:
+            self.apply_balance_deltas()
+            self._pending_balance_height = height
+        pending_key = (scripthash, ref)
+        prev = self._pending_balances.get(pending_key)
+        if prev is None:
+            self._pending_balances[pending_key] = (0, delta)
+        else:
+            floor, net = prev
+            self._pending_balances[pending_key] = (max(0, floor + delta), net + delta)
 
-        key = pack_balance_key(scripthash, ref)
-        holder_key = pack_holder_key(ref, scripthash)
-        self._record_undo(height, key)
-        self._record_undo(height, holder_key)
+    def apply_balance_deltas(self):
+        """Apply the pending per-block balance deltas to the balance caches.
 
-        # Check cache first, then balance_deletes (zeroed this cycle),
-        # then DB for existing balance.  This ordering prevents stale-read
-        # bugs where the DB returns a value from a previous flush cycle
-        # after the balance was zeroed in the current cycle.
-        if key in self.balance_cache:
-            current = self.balance_cache[key]
-        elif key in self.balance_deletes:
-            current = 0
-        else:
-            db_val = self.db.utxo_db.get(key)
-            current = struct.unpack('<Q', db_val)[0] if db_val and len(db_val) == 8 else 0
+        Called by the block processor at the end of each block (and by
+        ``flush`` as a safety net). Every GB/GR key gets one undo record, and
+        the undo reads plus the current-balance reads go to the DB as a
+        single batched read.
+        """
+        pending = self._pending_balances
+        height = self._pending_balance_height
+        if not pending:
+            return
+        self._pending_balances = {}
+
+        entries = []
+        for (scripthash, ref), fold in pending.items():
+            entries.append((pack_balance_key(scripthash, ref),
+                            pack_holder_key(ref, scripthash), fold))
+
+        undo_seen = self._undo_seen[height]
+        to_read = set()
+        for key, holder_key, _fold in entries:
+            if key not in undo_seen or (key not in self.balance_cache
+                                        and key not in self.balance_deletes):
+                to_read.add(key)
+            if holder_key not in undo_seen:
+                to_read.add(holder_key)
+        read = self._multi_get(to_read)
+
+        for key, holder_key, (floor, net) in entries:
+            for undo_key in (key, holder_key):
+                if undo_key not in undo_seen:
+                    undo_seen.add(undo_key)
+                    self._undo_cache[height].append((undo_key, read[undo_key]))
+
+            # Cache first, then balance_deletes (zeroed this cycle), then DB.
+            # This ordering prevents stale-read bugs where the DB returns a
+            # value from a previous flush cycle after the balance was zeroed in
+            # the current cycle.
+            if key in self.balance_cache:
+                current = self.balance_cache[key]
+            elif key in self.balance_deletes:
+                current = 0
+            else:
+                db_val = read[key]
+                current = struct.unpack('<Q', db_val)[0] if db_val and len(db_val) == 8 else 0
 
-        new_balance = max(0, current + delta)
+            new_balance = max(floor, current + net)
 
-        if new_balance > 0:
-            self.balance_cache[key] = new_balance
-            self.balance_height[key] = height
-            self.balance_deletes.discard(key)
+            if new_balance > 0:
+                self.balance_cache[key] = new_balance
+                self.balance_height[key] = height
+                self.balance_deletes.discard(key)
+            else:
+                self.balance_cache.pop(key, None)
+                self.balance_height.pop(key, None)
+                # Mark for deletion from DB on next flush
+                self.balance_deletes.add(key)
+
+    def _multi_get(self, keys) -> Dict[bytes, Optional[bytes]]:
+        """Batched point reads, keyed by key."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        multi_get = getattr(self.db.utxo_db, 'multi_get', None)
+        if multi_get is None:
+            values = [self.db.utxo_db.get(key) for key in keys]
         else:
-            self.balance_cache.pop(key, None)
-            self.balance_height.pop(key, None)
-            # Mark for deletion from DB on next flush
-            self.balance_deletes.add(key)
+            values = multi_get(keys)
+        return dict(zip(keys, values))
 
     # Ref data format: each entry is 36 bytes ref_id + 1 byte ref_type
     REF_ENTRY_SIZE = 37
@@ -1781,14 +2223,16 @@ class GlyphIndex:
     def _undo_key(self, height: int) -> bytes:
         return GlyphDBKeys.UNDO + pack_be_uint32(height)
     
-    def _record_undo(self, height: int, key: bytes):
-        """Record undo information for a key."""
+    def _record_undo(self, height: int, key: bytes, prev_value=_READ_PREV):
+        """Record undo information for a key: its current DB value, unless
+        ``prev_value`` says what a reorg should restore instead."""
         if not self.enabled:
             return
         if key in self._undo_seen[height]:
             return
         self._undo_seen[height].add(key)
-        prev_value = self.db.utxo_db.get(key)
+        if prev_value is _READ_PREV:
+            prev_value = self.db.utxo_db.get(key)
         self._undo_cache[height].append((key, prev_value))
     
     def backup(self, batch, height: int):
@@ -1805,6 +2249,10 @@ class GlyphIndex:
         for key, prev in entries:
             if prev is None:
                 batch.delete(key)
+            elif (len(prev) == 5 and prev[:1] == _BLOB_RELEASE_UNDO
+                  and key.startswith(GlyphDBKeys.BLOB_REFS)):
+                blob_hash = key[len(GlyphDBKeys.BLOB_REFS):]
+                self._release_blobs(batch, {blob_hash: struct.unpack('<I', prev[1:])[0]})
             else:
                 batch.put(key, prev)
         batch.delete(self._undo_key(height))
@@ -1841,6 +2289,7 @@ class GlyphIndex:
             + len(self.balance_cache) * 140
             + len(self.balance_height) * 140
             + len(self.balance_deletes) * 100
+            + len(self._pending_balances) * 200
             + len(self.owner_cache) * 120
             + len(self.history_cache) * 250
             + len(self.metadata_cache) * 600
@@ -1951,6 +2400,7 @@ class GlyphIndex:
         # Important: record undo entries for keys touched during this flush
         # first, then persist undo records at the end.
 
+        self.apply_balance_deltas()
         self._prune_old_undo_keys(batch)
         
         # Flush tokens
@@ -1959,6 +2409,8 @@ class GlyphIndex:
             if height is None:
                 continue
             key = pack_token_key(ref)
+            if self._ref_filter is not None:
+                self._ref_filter.add(ref)
             # Count each distinct token exactly once, here at the single GT
             # write point — there are several registration paths and counting
             # at each drifts (the GSTAT total previously undercounted the GT row
@@ -1991,6 +2443,10 @@ class GlyphIndex:
             # v4 recency-ordered discovery indexes (by type, by protocol, global).
             self._write_discovery_rows(batch, ref, token, height)
 
+            # v5 list-summary row + its order indexes (only for changed tokens —
+            # this loop is exactly the set touched since the last flush).
+            self._write_summary_rows(batch, ref, token, height, existing_raw)
+
             # Index by name (if present)
             if token.name:
                 name_hash = sha256(token.name.lower().encode('utf-8'))[:16]
@@ -2044,13 +2500,22 @@ class GlyphIndex:
             self._record_undo(height, key)
             batch.put(key, value)
         
-        # Flush metadata
+        # Flush metadata. Large byte strings go to the content-addressed BLOB
+        # store (v6). A record that is already stored split has the same
+        # content (GM is keyed by its hash), so its blobs are counted already.
+        staged_blobs: Dict[bytes, list] = {}
         for hash_bytes, cbor_data in self.metadata_cache.items():
             key = GlyphDBKeys.METADATA + hash_bytes
             height = self.metadata_height.get(hash_bytes)
+            record, blobs = split_metadata_blobs(cbor_data)
+            if blobs:
+                existing = self.db.utxo_db.get(key)
+                if existing is None or existing[:1] != SPLIT_RECORD_MARKER:
+                    self._stage_blobs(staged_blobs, blobs, height)
             if height is not None:
                 self._record_undo(height, key)
-            batch.put(key, cbor_data)
+            batch.put(key, record)
+        self._write_blobs(batch, staged_blobs)
 
         # R2: Flush key reveals (atomic write inside batch with undo)
         for ref, cbor_data in self.key_reveal_cache.items():
@@ -2074,7 +2539,10 @@ class GlyphIndex:
             batch.put(self._undo_key(height), encode_undo(entries))  # R22
         self._undo_cache.clear()
         self._undo_seen.clear()
-        
+
+        if self._ref_filter is not None and self._ref_filter.saturated:
+            self._load_ref_filter(extra_refs=self.token_cache.keys())
+
         # Clear caches
         self.token_cache.clear()
         self.balance_cache.clear()
@@ -2107,6 +2575,19 @@ class GlyphIndex:
         if data:
             return GlyphTokenInfo.from_bytes(data)
         return None
+
+    def get_tokens(self, refs: List[bytes]) -> List[Optional[GlyphTokenInfo]]:
+        """``get_token`` for many refs, reading the uncached ones with a
+        single multi-key read. Results are in ``refs`` order."""
+        tokens = [self.token_cache.get(ref) for ref in refs]
+        missing = [i for i, token in enumerate(tokens) if token is None]
+        if missing:
+            values = self.db.utxo_db.multi_get(
+                [pack_token_key(refs[i]) for i in missing])
+            for i, data in zip(missing, values):
+                if data:
+                    tokens[i] = GlyphTokenInfo.from_bytes(data)
+        return tokens
     
     def _flush_stats_counter(self, batch):
         """R11 — Merge stats delta into persisted GSTAT counter."""
@@ -2246,17 +2727,18 @@ class GlyphIndex:
             return None
         return None
 
-    def _owner_identity(self, hashX: bytes) -> Dict[str, Any]:
+    def _owner_identity(self, hashX: bytes, source=None) -> Dict[str, Any]:
         """Resolve a holder hashX to a displayable owner identity.
 
         Returns ``{'address', 'scripthash', 'hashX'}``.  ``address`` and the
         full 32-byte Electrum ``scripthash`` are populated when the owner index
         (``GO``) has the base scriptPubKey for this hashX (written during
         indexing / resync); otherwise they are ``None`` and only the one-way
-        ``hashX`` is available.
+        ``hashX`` is available.  ``source`` is the store to read (a snapshot
+        for exports); default the live utxo DB.
         """
         ident = {'address': None, 'scripthash': None, 'hashX': hashX.hex()}
-        script = self.db.utxo_db.get(pack_owner_key(hashX))
+        script = (source or self.db.utxo_db).get(pack_owner_key(hashX))
         if script:
             # Electrum scripthash convention: sha256(script) reversed.
             ident['scripthash'] = sha256(script)[::-1].hex()
@@ -2265,47 +2747,46 @@ class GlyphIndex:
 
     def get_balance(self, scripthash: bytes, ref: bytes) -> int:
         """Get token balance for an address scripthash + token ref."""
-        key = pack_balance_key(self._scripthash_to_hashX(scripthash), ref)
-        
-        # Check cache
+        hashX = self._scripthash_to_hashX(scripthash)
+        key = pack_balance_key(hashX, ref)
+
+        balance = self._cached_balance(key)
+        if balance is None:
+            # Query database
+            data = self.db.utxo_db.get(key)
+            balance = struct.unpack('<Q', data)[0] if data else 0
+        return self._with_pending(hashX, ref, balance)
+
+    def get_balances(self, pairs: List[Tuple[bytes, bytes]]) -> List[int]:
+        """``get_balance`` for many ``(scripthash, ref)`` pairs, reading the
+        uncached ones with a single multi-key read. Results are in order."""
+        hashXs = [self._scripthash_to_hashX(scripthash) for scripthash, _ref in pairs]
+        keys = [pack_balance_key(hashX, ref) for hashX, (_sh, ref) in zip(hashXs, pairs)]
+        balances = [self._cached_balance(key) for key in keys]
+        missing = [i for i, balance in enumerate(balances) if balance is None]
+        if missing:
+            values = self.db.utxo_db.multi_get([keys[i] for i in missing])
+            for i, data in zip(missing, values):
+                balances[i] = struct.unpack('<Q', data)[0] if data else 0
+        return [self._with_pending(hashX, ref, balance)
+                for hashX, (_sh, ref), balance in zip(hashXs, pairs, balances)]
+
+    def _cached_balance(self, key: bytes) -> Optional[int]:
+        """Unflushed balance for a balance key, or None to read the DB."""
         if key in self.balance_cache:
             return self.balance_cache[key]
-        
-        # Query database
-        data = self.db.utxo_db.get(key)
-        if data:
-            return struct.unpack('<Q', data)[0]
-        return 0
-    
-    @staticmethod
-    def _decode_cursor(cursor: Optional[str]) -> Optional[bytes]:
-        """R16: Decode an opaque base64 cursor to a raw RocksDB seek key.
-
-        Accepts BOTH the URL-safe alphabet (what ``_encode_cursor`` now emits)
-        and the legacy standard alphabet (cursors already held by clients).
-        A ``+`` that a query-string parser turned into a space is restored
-        before decoding — that mangling silently reset REST pagination to
-        page 1 (decode failed → seek fell back to the prefix).
-        """
-        if not cursor:
-            return None
-        try:
-            normalised = cursor.replace(' ', '+').replace('-', '+').replace('_', '/')
-            return base64.b64decode(normalised)
-        except Exception:
-            return None
-
-    @staticmethod
-    def _encode_cursor(raw_key: bytes) -> str:
-        """R16: Encode a raw RocksDB key as an opaque cursor.
-
-        URL-safe alphabet (``-_`` instead of ``+/``): cursors travel in REST
-        query strings, where ``+`` is form-decoded to a space and breaks the
-        round-trip. ``_decode_cursor`` still accepts old standard-alphabet
-        cursors.
-        """
-        return base64.urlsafe_b64encode(raw_key).decode()
+        if key in self.balance_deletes:
+            return 0
+        return None
 
+    def _with_pending(self, hashX: bytes, ref: bytes, balance: int) -> int:
+        """Overlay the current block's not-yet-applied deltas (read-only)."""
+        pending = self._pending_balances.get((hashX, ref))
+        if pending is not None:
+            floor, net = pending
+            balance = max(floor, balance + net)
+        return balance
+    
     def cursor_for_type_ref(self, token_type: int, ref: bytes) -> str:
         """Cursor that resumes a ``get_tokens_by_type(order='ref')`` walk *at*
         ``ref`` — i.e. ``ref`` is the first token the next page returns.
@@ -2322,7 +2803,7 @@ class GlyphIndex:
         index keys embed deploy_height, so its cursors are not reconstructible
         from a ref alone.
         """
-        return self._encode_cursor(
+        return encode_cursor(
             GlyphDBKeys.BY_TYPE + struct.pack('<B', token_type & 0xFF) + ref)
 
     def get_balances_for_scripthash(self, scripthash: bytes,
@@ -2335,12 +2816,12 @@ class GlyphIndex:
         """
         results = []
         prefix = GlyphDBKeys.BALANCE + self._scripthash_to_hashX(scripthash)
-        seek = self._decode_cursor(cursor) or prefix
+        seek = cursor_key(cursor) or prefix
         next_cursor = None
 
         for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
             if len(results) >= limit:
-                next_cursor = self._encode_cursor(key)
+                next_cursor = encode_cursor(key)
                 break
 
             ref = key[len(prefix):]
@@ -2382,12 +2863,12 @@ class GlyphIndex:
         prefix = GlyphDBKeys.HISTORY + ref
 
         if _use_cursor:
-            seek = self._decode_cursor(cursor) or prefix
+            seek = cursor_key(cursor) or prefix
             entries = []
             next_cursor = None
             for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
                 if len(entries) >= limit:
-                    next_cursor = self._encode_cursor(key)
+                    next_cursor = encode_cursor(key)
                     break
                 prefix_len = len(prefix)
                 height = struct.unpack('>I', key[prefix_len:prefix_len + 4])[0]
@@ -2406,6 +2887,7 @@ class GlyphIndex:
                 'has_more': next_cursor is not None,
             }
 
+        offset = clamp_offset(offset)
         results = []
         count = 0
         for key, value in self.db.utxo_db.iterator(prefix=prefix):
@@ -2431,12 +2913,37 @@ class GlyphIndex:
         return results
     
     def get_mint_history(self, ref: bytes, limit: int = 100,
-                         offset: int = 0) -> Dict[str, Any]:
+                         offset: int = 0,
+                         cursor: Optional[str] = None,
+                         _use_cursor: bool = False):
         """
         Get dMint mint history for a token.
         
         Returns only MINT events, including minted_amount per event.
+        With ``_use_cursor`` the page is ``{entries, next_cursor, has_more}``
+        (see ``_event_page``); otherwise the legacy dict, with ``offset``
+        capped at ``PAGINATION_MAX_OFFSET``.
         """
+        def mint_row(key, value):
+            prefix_len = len(GlyphDBKeys.HISTORY) + 36  # R5: absolute offsets
+            height = struct.unpack('>I', key[prefix_len:prefix_len + 4])[0]
+            tx_idx = struct.unpack('>H', key[prefix_len + 4:prefix_len + 6])[0]
+            tx_hash = value[1:33] if len(value) >= 33 else b''
+            # MINT events store minted_amount as uint64 after txid
+            minted_amount = 0
+            if len(value) >= 41:
+                minted_amount = struct.unpack('<Q', value[33:41])[0]
+            return {
+                'height': height,
+                'tx_idx': tx_idx,
+                'txid': hash_to_hex_str(tx_hash) if tx_hash else None,
+                'minted_amount': minted_amount,
+            }
+
+        if _use_cursor:
+            return self._event_page(ref, GlyphEventType.MINT, limit, cursor, mint_row)
+
+        offset = clamp_offset(offset)
         mints = []
         total_mints = 0
         prefix = GlyphDBKeys.HISTORY + ref
@@ -2450,21 +2957,7 @@ class GlyphIndex:
             
             total_mints += 1
             if total_mints > offset and len(mints) < limit:
-                prefix_len = len(GlyphDBKeys.HISTORY) + 36  # R5: absolute offsets
-                height = struct.unpack('>I', key[prefix_len:prefix_len + 4])[0]
-                tx_idx = struct.unpack('>H', key[prefix_len + 4:prefix_len + 6])[0]
-                tx_hash = value[1:33] if len(value) >= 33 else b''
-                # MINT events store minted_amount as uint64 after txid
-                minted_amount = 0
-                if len(value) >= 41:
-                    minted_amount = struct.unpack('<Q', value[33:41])[0]
-                
-                mints.append({
-                    'height': height,
-                    'tx_idx': tx_idx,
-                    'txid': hash_to_hex_str(tx_hash) if tx_hash else None,
-                    'minted_amount': minted_amount,
-                })
+                mints.append(mint_row(key, value))
         
         # Get token info for context
         token = self.get_token(ref)
@@ -2482,6 +2975,33 @@ class GlyphIndex:
             'limit': limit,
             'offset': offset,
         }
+
+    def _event_page(self, ref: bytes, event_type: int, limit: int,
+                    cursor: Optional[str], row) -> Dict[str, Any]:
+        """One cursor page of a token's history events of one type.
+
+        Seeks to the cursor key in the token's GH rows and keeps the rows of
+        ``event_type``, built with ``row(key, value)``. At most
+        ``CURSOR_SCAN_BUDGET`` rows are examined, so a rare event type comes
+        back in short pages with ``has_more`` set rather than in one
+        unbounded scan. Raises ValueError for a malformed cursor or one from
+        another token.
+        """
+        prefix = GlyphDBKeys.HISTORY + ref
+        seek = decode_cursor(cursor)
+        if seek is not None and not seek.startswith(prefix):
+            raise ValueError('invalid cursor')
+        entries = []
+        next_key = None
+        scanned = 0
+        for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek or prefix):
+            if len(entries) >= limit or scanned >= CURSOR_SCAN_BUDGET:
+                next_key = key
+                break
+            scanned += 1
+            if value and value[0] == event_type:
+                entries.append(row(key, value))
+        return cursor_page(entries, next_key)
     
     def get_dmint_tokens(self, limit: int = 100, active_only: bool = True,
                          cursor: Optional[str] = None) -> Dict[str, Any]:
@@ -2493,7 +3013,7 @@ class GlyphIndex:
         """
         tokens = []
         prefix = GlyphDBKeys.BY_TYPE + struct.pack('<B', GlyphTokenType.DMINT)
-        seek = self._decode_cursor(cursor) or prefix
+        seek = cursor_key(cursor) or prefix
         next_cursor = None
 
         for key, _ in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
@@ -2510,7 +3030,7 @@ class GlyphIndex:
                 if m is False or (m is None and token.is_spent):
                     continue
             if len(tokens) >= limit:
-                next_cursor = self._encode_cursor(key)
+                next_cursor = encode_cursor(key)
                 break
             tokens.append(self._token_to_dict(token))
 
@@ -2539,11 +3059,11 @@ class GlyphIndex:
 
         if _use_cursor:
             entries = []
-            seek = self._decode_cursor(cursor) or prefix
+            seek = cursor_key(cursor) or prefix
             next_cursor = None
             for key, _ in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
                 if len(entries) >= limit:
-                    next_cursor = self._encode_cursor(key)
+                    next_cursor = encode_cursor(key)
                     break
                 ref = key[len(prefix):]
                 token = self.get_token(ref)
@@ -2571,7 +3091,8 @@ class GlyphIndex:
     
     def _paginate_hydrated(self, prefix: bytes, limit: int,
                            cursor: Optional[str] = None,
-                           predicate=None) -> Dict[str, Any]:
+                           predicate=None,
+                           scan_budget: Optional[int] = None) -> Dict[str, Any]:
         """Seek a secondary index whose keys END in a 36-byte ref, hydrate each
         token, and paginate with an opaque forward cursor (the raw next key).
 
@@ -2582,14 +3103,22 @@ class GlyphIndex:
         which keeps the v4 backfill self-healing. ``predicate``, if given, is a
         ``token -> bool`` filter applied after hydration (the cursor still points
         at the next raw key, so pagination stays correct across filtered rows).
+        With ``scan_budget`` at most that many rows are examined per page; a
+        page that runs out comes back short with a cursor. A cursor from another
+        index (e.g. one issued before a migration finished) restarts the list.
         """
         results = []
-        seek = self._decode_cursor(cursor) or prefix
+        seek = cursor_key(cursor)
+        if seek is None or not seek.startswith(prefix):
+            seek = prefix
         next_cursor = None
+        scanned = 0
         for key, _ in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
-            if len(results) >= limit:
-                next_cursor = self._encode_cursor(key)
+            if len(results) >= limit or (scan_budget is not None
+                                         and scanned >= scan_budget):
+                next_cursor = encode_cursor(key)
                 break
+            scanned += 1
             token = self.get_token(key[-36:])
             if token and (predicate is None or predicate(token)):
                 # No raw embed payloads in LIST pages — see _token_to_dict.
@@ -2647,10 +3176,14 @@ class GlyphIndex:
 
         ``order='recent'`` additionally hides companion singletons (see
         ``_discovery_rows``); ``order='ref'`` does not, so the legacy listing
-        stays a complete enumeration of the type.
+        stays a complete enumeration of the type. Until ``discovery_rows_ready``
+        it is served from BY_TYPE in ref order.
         """
         if order == 'recent':
-            prefix = GlyphDBKeys.BY_TYPE_RECENT + struct.pack('<B', token_type & 0xFF)
+            if self.discovery_rows_ready:
+                prefix = GlyphDBKeys.BY_TYPE_RECENT + struct.pack('<B', token_type & 0xFF)
+            else:
+                prefix = GlyphDBKeys.BY_TYPE + struct.pack('<B', token_type & 0xFF)
             predicate = lambda t: not self._is_companion_singleton(t)  # noqa: E731
         else:
             prefix = GlyphDBKeys.BY_TYPE + struct.pack('<B', token_type & 0xFF)
@@ -2668,13 +3201,20 @@ class GlyphIndex:
         immediately, without a re-migration. The cursor still advances over
         skipped rows (see ``_paginate_hydrated``), so pagination is unaffected.
 
-        See ``_discovery_rows`` for what each exclusion covers and why.
+        See ``_discovery_rows`` for what each exclusion covers and why. Until
+        ``discovery_rows_ready`` it is served from GT in ref order, at most
+        ``CURSOR_SCAN_BUDGET`` rows a page.
         """
-        return self._paginate_hydrated(
-            GlyphDBKeys.GLOBAL_RECENT, limit, cursor,
-            predicate=lambda token: (
-                token.token_type != GlyphTokenType.UNKNOWN
-                and not self._is_companion_singleton(token)))
+        def predicate(token):
+            return (token.token_type != GlyphTokenType.UNKNOWN
+                    and not self._is_companion_singleton(token))
+
+        if self.discovery_rows_ready:
+            return self._paginate_hydrated(
+                GlyphDBKeys.GLOBAL_RECENT, limit, cursor, predicate=predicate)
+        return self._paginate_hydrated(GlyphDBKeys.TOKEN, limit, cursor,
+                                       predicate=predicate,
+                                       scan_budget=CURSOR_SCAN_BUDGET)
 
     def get_tokens_by_protocol(self, proto: int, limit: int = 100,
                                cursor: Optional[str] = None) -> Dict[str, Any]:
@@ -2682,13 +3222,36 @@ class GlyphIndex:
 
         Gives first-class, index-backed lists for protocol facets that are not a
         primary token_type: encrypted(8), mutable(5), timelock(9), container(7),
-        authority(10), etc. — no full GT scan.
+        authority(10), etc. — no full GT scan. Until ``discovery_rows_ready``
+        it filters GT in ref order instead, at most ``CURSOR_SCAN_BUDGET`` rows
+        a page.
         """
-        prefix = GlyphDBKeys.BY_PROTO + struct.pack('<B', proto & 0xFF)
-        return self._paginate_hydrated(prefix, limit, cursor)
+        return self._paginate_protocol(proto, limit, cursor)
 
-    def get_metadata(self, metadata_hash: bytes) -> Optional[Dict]:
-        """Get parsed metadata by hash."""
+    def _paginate_protocol(self, proto: int, limit: int, cursor: Optional[str],
+                           predicate=None) -> Dict[str, Any]:
+        """``_paginate_hydrated`` over the BY_PROTO rows of ``proto``, or over
+        GT filtered on ``protocols`` until ``discovery_rows_ready``."""
+        if self.discovery_rows_ready:
+            prefix = GlyphDBKeys.BY_PROTO + struct.pack('<B', proto & 0xFF)
+            return self._paginate_hydrated(prefix, limit, cursor, predicate=predicate)
+
+        def from_gt(token):
+            return (proto in (token.protocols or ())
+                    and (predicate is None or predicate(token)))
+
+        return self._paginate_hydrated(GlyphDBKeys.TOKEN, limit, cursor,
+                                       predicate=from_gt,
+                                       scan_budget=CURSOR_SCAN_BUDGET)
+
+    def get_metadata(self, metadata_hash: bytes,
+                     resolve_blobs: bool = True) -> Optional[Dict]:
+        """Get parsed metadata by hash.
+
+        Byte strings moved to the BLOB store are read back in place, unless
+        ``resolve_blobs`` is False — then they stay ``BlobRef`` pointers, which
+        is all a caller needing only sizes and hashes should pay for.
+        """
         # Check cache
         if metadata_hash in self.metadata_cache:
             cbor_data = self.metadata_cache[metadata_hash]
@@ -2701,10 +3264,80 @@ class GlyphIndex:
                 # Size-capped to match index-time decoding; an over-cap or
                 # malformed body fails closed (returns None) rather than feeding
                 # an unbounded structure to the JSON serialiser.
-                return cbor_loads_capped(cbor_data)
+                meta = load_metadata_record(cbor_data)
             except Exception:
-                pass
+                return None
+            if resolve_blobs and cbor_data[:1] == SPLIT_RECORD_MARKER:
+                return self._resolve_blobs(meta)
+            return meta
         return None
+
+    def get_blob(self, blob_hash: bytes) -> Optional[Tuple[bytes, Optional[str]]]:
+        """Return ``(payload, mime_type)`` for a stored blob, or None."""
+        raw = self.db.utxo_db.get(pack_blob_key(blob_hash))
+        if not raw:
+            return None
+        try:
+            return decode_blob(raw)
+        except Exception:
+            return None
+
+    def _resolve_blobs(self, node):
+        """Replace each ``BlobRef`` in a decoded record with its bytes (None
+        if the blob is gone, e.g. scrubbed)."""
+        if isinstance(node, BlobRef):
+            blob = self.get_blob(node.hash)
+            return blob[0] if blob else None
+        if isinstance(node, dict):
+            return {k: self._resolve_blobs(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [self._resolve_blobs(v) for v in node]
+        if isinstance(node, cbor2.CBORTag):
+            return cbor2.CBORTag(node.tag, self._resolve_blobs(node.value))
+        return node
+
+    @staticmethod
+    def _stage_blobs(staged: Dict[bytes, list], blobs, height: Optional[int]):
+        """Add one record's blobs to ``staged`` (one new reference each),
+        counted per height."""
+        for blob_hash, (payload, mime) in blobs.items():
+            entry = staged.get(blob_hash)
+            if entry is None:
+                entry = staged[blob_hash] = [payload, mime, {}]
+            by_height = entry[2]
+            by_height[height] = by_height.get(height, 0) + 1
+
+    def _write_blobs(self, batch, staged: Dict[bytes, list]):
+        """Write staged blobs and bump their reference counts.
+
+        The GF row is written only for a blob's first reference. The undo of
+        each block's references releases just those (see ``backup``): a
+        reorg must not drop references the migration added since, which
+        have no undo of their own (height None).
+        """
+        for blob_hash, (payload, mime, by_height) in staged.items():
+            refs_key = pack_blob_refs_key(blob_hash)
+            raw = self.db.utxo_db.get(refs_key)
+            count = struct.unpack('<I', raw)[0] if raw else 0
+            for height, added in by_height.items():
+                if height is not None:
+                    self._record_undo(height, refs_key,
+                                      _BLOB_RELEASE_UNDO + struct.pack('<I', added))
+            if not count:
+                batch.put(pack_blob_key(blob_hash), encode_blob(payload, mime))
+            batch.put(refs_key, struct.pack('<I', count + sum(by_height.values())))
+
+    def _release_blobs(self, batch, released: Dict[bytes, int]):
+        """Drop references to blobs, deleting any no record points at."""
+        for blob_hash, n in released.items():
+            refs_key = pack_blob_refs_key(blob_hash)
+            raw = self.db.utxo_db.get(refs_key)
+            count = struct.unpack('<I', raw)[0] if raw else 0
+            if count <= n:
+                batch.delete(refs_key)
+                batch.delete(pack_blob_key(blob_hash))
+            else:
+                batch.put(refs_key, struct.pack('<I', count - n))
     
     def _token_to_dict(self, token: GlyphTokenInfo, include_dmint: bool = True,
                         include_content: bool = True,
@@ -2774,7 +3407,8 @@ class GlyphIndex:
             # Classify files by content (like Photonic Wallet filterFileObj),
             # not by key name, since 'main' can be either embed or remote.
             if token.metadata_hash:
-                raw_meta = self.get_metadata(token.metadata_hash)
+                raw_meta = self.get_metadata(token.metadata_hash,
+                                             resolve_blobs=include_embed_data)
                 if raw_meta and isinstance(raw_meta, dict):
                     file_obj = None
                     for fkey in ('main', 'preview', 'embed', 'em', 'remote', 'rm'):
@@ -2786,7 +3420,8 @@ class GlyphIndex:
                         # Classify by content: 'u'/'url' = remote, 'b' = embed
                         has_url = isinstance(file_obj.get('u'), str) or isinstance(file_obj.get('url'), str)
                         raw_b = file_obj.get('b')
-                        has_bytes = isinstance(raw_b, (bytes, bytearray)) or hasattr(raw_b, 'value')
+                        has_bytes = (isinstance(raw_b, (bytes, bytearray, BlobRef))
+                                     or hasattr(raw_b, 'value'))
                         if has_url:
                             hs = file_obj.get('hs')
                             result['remote'] = {
@@ -2800,9 +3435,13 @@ class GlyphIndex:
                             # CBORTag 64 = typed array; value may be hex str or bytes
                             if hasattr(b, 'value'):
                                 b = bytes.fromhex(b.value) if isinstance(b.value, str) else b.value
+                            if isinstance(b, BlobRef):
+                                size = b.size
+                            else:
+                                size = len(b) if isinstance(b, (bytes, bytearray)) else None
                             result['embed'] = {
                                 'type': file_obj.get('t') or file_obj.get('type'),
-                                'size': len(b) if isinstance(b, (bytes, bytearray)) else None,
+                                'size': size,
                                 'data': (bytes(b).hex() if isinstance(b, (bytes, bytearray)) else None)
                                         if include_embed_data else None,
                             }
@@ -2945,7 +3584,7 @@ class GlyphIndex:
         """
         holders = []
         prefix = GlyphDBKeys.HOLDER_BY_REF + ref
-        seek = self._decode_cursor(cursor) or prefix
+        seek = cursor_key(cursor) or prefix
         next_cursor = None
 
         for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
@@ -2953,7 +3592,7 @@ class GlyphIndex:
             if balance <= 0:
                 continue
             if len(holders) >= limit:
-                next_cursor = self._encode_cursor(key)
+                next_cursor = encode_cursor(key)
                 break
             hashX = key[len(prefix):]
             ident = self._owner_identity(hashX)
@@ -2973,6 +3612,27 @@ class GlyphIndex:
             'next_cursor': next_cursor,
         }
     
+    def export_holders(self, snapshot, ref: bytes, seek: Optional[bytes] = None):
+        """Yield ``(key, row)`` for every holder of ``ref`` read from
+        ``snapshot``, in ``GR`` key order from ``seek``; rows are shaped like
+        ``get_token_holders`` entries. Backs the NDJSON holder export."""
+        prefix = GlyphDBKeys.HOLDER_BY_REF + ref
+        if not seek or not seek.startswith(prefix):
+            seek = prefix
+        ref_hex = ref.hex()
+        for key, value in snapshot.iterator(prefix=prefix, seek=seek):
+            balance = struct.unpack('<Q', value)[0] if len(value) == 8 else 0
+            if balance <= 0:
+                continue
+            ident = self._owner_identity(key[len(prefix):], snapshot)
+            yield key, {
+                'ref': ref_hex,
+                'address': ident['address'],
+                'scripthash': ident['scripthash'],
+                'hashX': ident['hashX'],
+                'amount': balance,
+            }
+
     def get_token_supply(self, ref: bytes) -> Optional[Dict[str, Any]]:
         """
         Get detailed supply information for a token.
@@ -3022,12 +3682,33 @@ class GlyphIndex:
             'percent_mined': token.percent_mined() if token.total_supply > 0 else None,
         }
     
-    def get_token_burns(self, ref: bytes, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+    @staticmethod
+    def _event_row(key: bytes, value: bytes) -> Dict[str, Any]:
+        height = struct.unpack('>I', key[-6:-2])[0]
+        tx_idx = struct.unpack('>H', key[-2:])[0]
+        tx_hash = value[1:33] if len(value) >= 33 else b''
+        return {
+            'height': height,
+            'tx_idx': tx_idx,
+            'txid': hash_to_hex_str(tx_hash) if tx_hash else None,
+        }
+
+    def get_token_burns(self, ref: bytes, limit: int = 50, offset: int = 0,
+                        cursor: Optional[str] = None,
+                        _use_cursor: bool = False):
         """
         Get burn history for a token.
         
-        Returns list of burn events with transaction details.
+        Returns list of burn events with transaction details. With
+        ``_use_cursor`` the page is ``{entries, next_cursor, has_more}``
+        (see ``_event_page``); otherwise the legacy dict, with ``offset``
+        capped at ``PAGINATION_MAX_OFFSET``.
         """
+        if _use_cursor:
+            return self._event_page(ref, GlyphEventType.BURN, limit, cursor,
+                                    self._event_row)
+
+        offset = clamp_offset(offset)
         burns = []
         total_burns = 0
         
@@ -3041,16 +3722,7 @@ class GlyphIndex:
             
             total_burns += 1
             if total_burns > offset and len(burns) < limit:
-                # Extract height and tx_idx from key
-                height = struct.unpack('>I', key[-6:-2])[0]
-                tx_idx = struct.unpack('>H', key[-2:])[0]
-                tx_hash = value[1:33] if len(value) >= 33 else b''
-                
-                burns.append({
-                    'height': height,
-                    'tx_idx': tx_idx,
-                    'txid': hash_to_hex_str(tx_hash) if tx_hash else None,
-                })
+                burns.append(self._event_row(key, value))
         
         return {
             'ref': ref_to_display(ref),
@@ -3061,12 +3733,24 @@ class GlyphIndex:
             'offset': offset,
         }
     
-    def get_token_trades(self, ref: bytes, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+    def get_token_trades(self, ref: bytes, limit: int = 50, offset: int = 0,
+                         cursor: Optional[str] = None,
+                         _use_cursor: bool = False):
         """
         Get trade/transfer history for a token.
         
-        Returns list of transfer events.
+        Returns list of transfer events. Paginated like ``get_token_burns``.
         """
+        def trade_row(key, value):
+            row = self._event_row(key, value)
+            row['event'] = 'transfer'
+            return row
+
+        if _use_cursor:
+            return self._event_page(ref, GlyphEventType.TRANSFER, limit, cursor,
+                                    trade_row)
+
+        offset = clamp_offset(offset)
         trades = []
         total_trades = 0
         
@@ -3080,16 +3764,7 @@ class GlyphIndex:
             
             total_trades += 1
             if total_trades > offset and len(trades) < limit:
-                height = struct.unpack('>I', key[-6:-2])[0]
-                tx_idx = struct.unpack('>H', key[-2:])[0]
-                tx_hash = value[1:33] if len(value) >= 33 else b''
-                
-                trades.append({
-                    'height': height,
-                    'tx_idx': tx_idx,
-                    'txid': hash_to_hex_str(tx_hash) if tx_hash else None,
-                    'event': 'transfer',
-                })
+                trades.append(trade_row(key, value))
         
         return {
             'ref': ref_to_display(ref),
@@ -3156,9 +3831,88 @@ class GlyphIndex:
         GlyphTokenType.AUTHORITY: 'Authority',
     }
 
-    def _summary_entry(self, token: 'GlyphTokenInfo') -> Dict[str, Any]:
-        """Build a list-summary row for a token (with grid image metadata)."""
-        entry = {
+    @staticmethod
+    def _summary_files(raw_meta) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Pick the (remote, embed) file objects a summary row describes.
+
+        Returns ``(remote, embed)`` where at most one is set: ``remote`` is the
+        raw CBOR sub-dict, ``embed`` is ``{'type', 'b'}`` with ``b`` decoded to
+        bytes (CBORTag 64 typed arrays unwrapped), a ``BlobRef`` if the payload
+        lives in the BLOB store, or ``None`` if unusable.
+        """
+        if not isinstance(raw_meta, dict):
+            return None, None
+        remote = raw_meta.get('remote') or raw_meta.get('rm')
+        embed = raw_meta.get('embed') or raw_meta.get('em') or raw_meta.get('main')
+        if remote and isinstance(remote, dict):
+            return remote, None
+        if embed and isinstance(embed, dict):
+            b = embed.get('b')
+            if hasattr(b, 'value'):
+                b = bytes.fromhex(b.value) if isinstance(b.value, str) else b.value
+            if isinstance(b, (bytes, bytearray)):
+                b = bytes(b)
+            elif not isinstance(b, BlobRef):
+                b = None
+            return None, {'type': embed.get('t') or embed.get('type'), 'b': b}
+        return None, None
+
+    def _summary_media(self, token: 'GlyphTokenInfo') -> Dict[str, Any]:
+        """Icon pointers for a summary row — type, size and content hash.
+
+        Never the payload itself: a listing page of icon-heavy tokens used to
+        hex-encode every embed inline. ``embed.data`` stays in the shape (as
+        ``None``, like the other LIST responses) and the bytes are served by
+        ``get_embedded_icon``.
+        """
+        media = {}
+        if not token.metadata_hash:
+            return media
+        remote, embed = self._summary_files(
+            self.get_metadata(token.metadata_hash, resolve_blobs=False))
+        if remote is not None:
+            h = remote.get('h')
+            hs = remote.get('hs')
+            if isinstance(hs, BlobRef):
+                hs_size = hs.size
+            else:
+                hs_size = len(hs) if isinstance(hs, (bytes, bytearray)) else 0
+            media['remote'] = {
+                'url': remote.get('u') or remote.get('url'),
+                'type': remote.get('t') or remote.get('type'),
+                'hash': bytes(h).hex() if isinstance(h, (bytes, bytearray)) else None,
+                'hashstamp': None,
+                'hashstamp_size': hs_size,
+            }
+        elif embed is not None:
+            b = embed['b']
+            if isinstance(b, BlobRef):
+                # The blob key is the sha256 of the payload already.
+                size, digest = b.size, b.hash.hex()
+            elif b is not None:
+                size, digest = len(b), sha256(b).hex()
+            else:
+                size = digest = None
+            media['embed'] = {
+                'type': embed['type'],
+                'size': size,
+                'hash': digest,
+                'data': None,
+            }
+        return media
+
+    def _summary_row(self, token: 'GlyphTokenInfo', activity_height: int,
+                     prev_row: Optional[Dict]) -> Dict[str, Any]:
+        """Build the materialised list-summary row for a token.
+
+        ``activity_height`` is the height the token last changed at (it keys the
+        recency order). The icon pointers are re-derived only when the metadata
+        hash moved since ``prev_row`` — a dMint token re-flushed for every mint
+        would otherwise re-read its (often image-sized) GM blob each time.
+        """
+        metadata_hash = (hash_to_hex_str(token.metadata_hash)
+                         if token.metadata_hash else None)
+        row = {
             'ref': ref_to_display(token.ref),
             'ref_hex': token.ref.hex(),
             'name': token.name,
@@ -3169,84 +3923,259 @@ class GlyphIndex:
             'total_supply': token.total_supply,
             'current_supply': token.current_supply,
             'deploy_height': token.deploy_height,
+            'activity_height': activity_height,
             'is_spent': token.is_spent,
+            'metadata_hash': metadata_hash,
             'icon_ref': token.icon_ref,
             'icon_type': token.icon_type,
         }
-        # Include embed/remote for image rendering in the grid
-        if token.metadata_hash:
-            raw_meta = self.get_metadata(token.metadata_hash)
-            if raw_meta and isinstance(raw_meta, dict):
-                remote = raw_meta.get('remote') or raw_meta.get('rm')
-                embed = raw_meta.get('embed') or raw_meta.get('em') or raw_meta.get('main')
-                if remote and isinstance(remote, dict):
-                    hs = remote.get('hs')
-                    entry['remote'] = {
-                        'url': remote.get('u') or remote.get('url'),
-                        'type': remote.get('t') or remote.get('type'),
-                        'hash': (remote.get('h') or b'').hex() if isinstance(remote.get('h'), (bytes, bytearray)) else None,
-                        'hashstamp': bytes(hs).hex() if isinstance(hs, (bytes, bytearray)) else None,
-                    }
-                elif embed and isinstance(embed, dict):
-                    b = embed.get('b')
-                    if hasattr(b, 'value'):
-                        b = bytes.fromhex(b.value) if isinstance(b.value, str) else b.value
-                    entry['embed'] = {
-                        'type': embed.get('t') or embed.get('type'),
-                        'size': len(b) if isinstance(b, (bytes, bytearray)) else None,
-                        'data': bytes(b).hex() if isinstance(b, (bytes, bytearray)) else None,
-                    }
-        return entry
+        if prev_row is not None and prev_row.get('metadata_hash') == metadata_hash:
+            for k in ('remote', 'embed'):
+                if k in prev_row:
+                    row[k] = prev_row[k]
+        else:
+            row.update(self._summary_media(token))
+        return to_jsonsafe(row)
+
+    @staticmethod
+    def _summary_index_keys(ref: bytes, row: Dict[str, Any]):
+        """Yield the GE/GD order-index keys a summary row owns.
+
+        A pure function of the stored row, so ``_write_summary_rows`` can drop a
+        superseded row's keys from the previous row alone.
+        """
+        tt = row.get('type_id') or 0
+        for scope in (SUMMARY_SCOPE_ALL, tt):
+            yield pack_summary_activity_key(scope, row.get('activity_height') or 0, ref)
+            yield pack_summary_deploy_key(scope, row.get('deploy_height') or 0, ref)
+
+    def _write_summary_rows(self, batch, ref: bytes, token: 'GlyphTokenInfo',
+                            height: int, prev_gt_raw: Optional[bytes] = None):
+        """Rewrite a changed token's summary row and move its order-index keys
+        (undo-recorded, so a reorg's backup() restores the previous row).
+
+        While the v4 -> v5 backfill runs, a token it has not reached yet has
+        no row to restore, and once this row exists the backfill skips it. So
+        the undo restores the row the backfill would have built from
+        ``prev_gt_raw``, the GT value before this flush, rather than deleting
+        it.
+        """
+        key = pack_summary_key(ref)
+        prev_row = None
+        prev_raw = self.db.utxo_db.get(key)
+        if prev_raw:
+            try:
+                prev_row = cbor2.loads(prev_raw)
+            except Exception:
+                prev_row = None
+        undo_values = {}
+        if prev_raw is None and not self.summary_rows_ready:
+            prev_row = self._summary_row_from_gt(prev_gt_raw)
+            if prev_row is not None:
+                undo_values[key] = cbor2.dumps(prev_row)
+                undo_values.update((k, b'') for k in self._summary_index_keys(ref, prev_row))
+        row = self._summary_row(token, height, prev_row)
+        new_keys = set(self._summary_index_keys(ref, row))
+        if isinstance(prev_row, dict):
+            for k in self._summary_index_keys(ref, prev_row):
+                if k not in new_keys:
+                    self._record_undo(height, k, undo_values.get(k, _READ_PREV))
+                    batch.delete(k)
+        self._record_undo(height, key, undo_values.get(key, _READ_PREV))
+        batch.put(key, cbor2.dumps(row))
+        for k in new_keys:
+            self._record_undo(height, k, undo_values.get(k, _READ_PREV))
+            batch.put(k, b'')
+
+    def _summary_row_from_gt(self, raw: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        """The row ``_migrate_summary_row`` builds from a token's GT value, or
+        None if there is none."""
+        if not raw:
+            return None
+        try:
+            token = GlyphTokenInfo.from_bytes(raw)
+        except Exception:
+            return None
+        return self._summary_row(token, token.deploy_height, None)
+
+    def get_embedded_icon(self, ref: bytes) -> Optional[Tuple[bytes, Optional[str], str]]:
+        """Return ``(bytes, mime_type, sha256 hex)`` for a token's embedded
+        icon, or None.
+
+        The byte source behind the summary rows' ``embed`` pointers. The hash
+        is the one already stored (the blob key, or the summary row's
+        ``embed.hash``); the payload is only hashed if neither has it.
+        """
+        token = self.get_token(ref)
+        if not token or not token.metadata_hash:
+            return None
+        _remote, embed = self._summary_files(
+            self.get_metadata(token.metadata_hash, resolve_blobs=False))
+        if embed is None or embed['b'] is None:
+            return None
+        b = embed['b']
+        if isinstance(b, BlobRef):
+            blob = self.get_blob(b.hash)
+            if blob is None:
+                return None
+            return blob[0], embed['type'], b.hash.hex()
+        return b, embed['type'], self._summary_embed_hash(ref) or sha256(b).hex()
+
+    def _summary_embed_hash(self, ref: bytes) -> Optional[str]:
+        """``embed.hash`` of a token's summary row, or None."""
+        raw = self.db.utxo_db.get(pack_summary_key(ref))
+        if not raw:
+            return None
+        try:
+            embed = cbor2.loads(raw).get('embed')
+        except Exception:
+            return None
+        return embed.get('hash') if isinstance(embed, dict) else None
 
     def get_all_tokens_summary(self, limit: int = 100, offset: int = 0,
-                               token_type: int = None) -> Dict[str, Any]:
+                               token_type: int = None,
+                               cursor: Optional[str] = None,
+                               order: str = 'ref') -> Dict[str, Any]:
         """Summary of all indexed tokens with pagination.
 
-        ``total`` comes from the O(1) GSTAT counter — never a full keyspace scan.
-        Only the rows on the requested page are CBOR-decoded and have metadata
-        fetched; earlier rows are skipped at the iterator without decoding and we
-        stop as soon as the page is full.  Optionally filter by token type (uses
-        the BY_TYPE secondary index so the scan is bounded to that type).
+        Served from the v5 materialised summary rows: one prefix scan over the
+        chosen order index plus (except for the unfiltered ``ref`` order, whose
+        values *are* the rows) a point read per returned row. Nothing is
+        CBOR-decoded from GT or GM and no embed payload is hex-encoded; icons
+        are pointers (see ``_summary_media``).
+
+        ``order``: ``'ref'`` (legacy stable order by ref bytes), ``'recent'``
+        (most recently changed first) or ``'deploy'`` (oldest deploy first).
+        ``cursor`` is the opaque ``next_cursor`` of a previous page and is
+        order-specific. ``offset`` is only honoured without a cursor, as a
+        compatibility mode — it still walks the skipped keys, so it is capped
+        at ``PAGINATION_MAX_OFFSET``.
+
+        ``total`` comes from the O(1) GSTAT counter — never a full keyspace
+        scan. Until the v5 rows are complete (``summary_rows_ready``) the page
+        is built from GT in ref order; its cursors are GT keys, which the v5
+        path does not accept, so a walk spanning the switch restarts.
         """
+        offset = clamp_offset(offset)
         stats = self.get_stats()
-        tokens = []
-
         if token_type is None:
             total = stats.get('total_tokens', 0)
-            prefix = GlyphDBKeys.TOKEN
-            seen = 0
-            for key, value in self.db.utxo_db.iterator(prefix=prefix):
-                if len(tokens) >= limit:
-                    break
-                if seen < offset:
-                    seen += 1
-                    continue
-                seen += 1
-                try:
-                    tokens.append(self._summary_entry(GlyphTokenInfo.from_bytes(value)))
-                except Exception:
-                    continue
         else:
             total = stats.get('by_type', {}).get(
                 self._TYPE_TO_STAT.get(token_type, 'unknown'), 0)
-            prefix = GlyphDBKeys.BY_TYPE + struct.pack('<B', token_type)
-            seen = 0
-            for key, _ in self.db.utxo_db.iterator(prefix=prefix):
-                if len(tokens) >= limit:
-                    break
-                if seen < offset:
-                    seen += 1
-                    continue
-                seen += 1
-                ref = key[len(prefix):]
-                token = self.get_token(ref)
-                if token:
-                    tokens.append(self._summary_entry(token))
+
+        if self.summary_rows_ready:
+            tokens, next_cursor = self._summary_page(
+                limit, offset, token_type, cursor, order)
+        else:
+            tokens, next_cursor = self._summary_page_from_gt(
+                limit, offset, token_type, cursor)
 
         return {
             'total': total,
             'tokens': tokens,
             'limit': limit,
             'offset': offset,
+            'order': order,
+            'next_cursor': next_cursor,
             'filter_type': self._type_name(token_type) if token_type else None,
         }
+
+    def _summary_page(self, limit: int, offset: int, token_type: Optional[int],
+                      cursor: Optional[str], order: str):
+        """One page of materialised summary rows; returns (rows, next_cursor)."""
+        scope = struct.pack(
+            '<B', SUMMARY_SCOPE_ALL if token_type is None else token_type & 0xFF)
+        if order == 'recent':
+            prefix = GlyphDBKeys.SUMMARY_BY_ACTIVITY + scope
+        elif order == 'deploy':
+            prefix = GlyphDBKeys.SUMMARY_BY_DEPLOY + scope
+        elif token_type is None:
+            prefix = GlyphDBKeys.SUMMARY
+        else:
+            prefix = GlyphDBKeys.BY_TYPE + scope
+        rows_inline = prefix == GlyphDBKeys.SUMMARY
+
+        seek = cursor_key(cursor)
+        skip = 0 if seek else offset
+        tokens = []
+        next_cursor = None
+        for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek or prefix):
+            if skip:
+                skip -= 1
+                continue
+            if len(tokens) >= limit:
+                next_cursor = encode_cursor(key)
+                break
+            raw = value if rows_inline else self.db.utxo_db.get(pack_summary_key(key[-36:]))
+            if not raw:
+                continue
+            try:
+                tokens.append(cbor2.loads(raw))
+            except Exception:
+                continue
+        return tokens, next_cursor
+
+    def export_tokens(self, snapshot, seek: Optional[bytes] = None):
+        """Yield ``(key, row)`` for every token summary row in ``snapshot``,
+        in ref order from ``seek``. Backs the NDJSON catalogue export.
+
+        Before the v5 rows are complete the rows are built from ``GT`` as
+        ``_summary_page_from_gt`` does; their icon pointers then come from
+        the live metadata.
+        """
+        if self.summary_rows_ready:
+            prefix = GlyphDBKeys.SUMMARY
+        else:
+            prefix = GlyphDBKeys.TOKEN
+        if not seek or not seek.startswith(prefix):
+            seek = prefix
+        for key, value in snapshot.iterator(prefix=prefix, seek=seek):
+            try:
+                if prefix == GlyphDBKeys.SUMMARY:
+                    row = cbor2.loads(value)
+                else:
+                    token = GlyphTokenInfo.from_bytes(value)
+                    row = self._summary_row(token, token.deploy_height, None)
+            except Exception:
+                continue
+            if isinstance(row, dict):
+                yield key, row
+
+    def _summary_page_from_gt(self, limit: int, offset: int,
+                              token_type: Optional[int],
+                              cursor: Optional[str] = None):
+        """Pre-v5 fallback: build summary rows on the fly from GT.
+
+        Earlier rows are skipped at the iterator without decoding — or sought
+        past, given a cursor — and we stop as soon as the page is full.
+        Optionally filter by token type (uses the BY_TYPE secondary index so
+        the scan is bounded to that type). Returns (rows, next_cursor).
+        """
+        if token_type is None:
+            prefix = GlyphDBKeys.TOKEN
+        else:
+            prefix = GlyphDBKeys.BY_TYPE + struct.pack('<B', token_type)
+        seek = cursor_key(cursor)
+        if seek is not None and not seek.startswith(prefix):
+            seek = None
+        skip = 0 if seek else offset
+        tokens = []
+        next_cursor = None
+        for key, value in self.db.utxo_db.iterator(prefix=prefix, seek=seek or prefix):
+            if skip:
+                skip -= 1
+                continue
+            if len(tokens) >= limit:
+                next_cursor = encode_cursor(key)
+                break
+            try:
+                if token_type is None:
+                    token = GlyphTokenInfo.from_bytes(value)
+                else:
+                    token = self.get_token(key[len(prefix):])
+                if token:
+                    tokens.append(self._summary_row(token, token.deploy_height, None))
+            except Exception:
+                continue
+        return tokens, next_cursor
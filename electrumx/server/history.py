@@ -39,7 +39,13 @@ class History(object):
         self.upgrade_cursor = -1
         self.db = None
 
-    def open_db(self, db_class, for_sync, utxo_flush_count, compacting):
+    def open_db(self, db_class, for_sync, utxo_flush_count, compacting,
+                read_only=False):
+        if read_only:
+            # A reader leaves recovery and compaction to the indexer.
+            self.db = db_class('hist', False, read_only=True)
+            self.read_state()
+            return self.flush_count
         self.db = db_class('hist', for_sync)
         self.read_state()
         self.clear_excess(utxo_flush_count)
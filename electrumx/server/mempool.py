@@ -7,16 +7,21 @@
 
 '''Mempool handling.'''
 
+import asyncio
 import itertools
+import math
+import os
+import pickle
 import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
 
 import attr
-from aiorpcx import TaskGroup, run_in_thread, sleep
+from aiorpcx import TaskGroup, ignore_after, run_in_thread, sleep
 
 from electrumx.lib.hash import hash_to_hex_str, hex_str_to_hash
-from electrumx.lib.util import class_logger, chunks, pack_le_uint32, unpack_le_uint32_from
+from electrumx.lib.util import (class_logger, chunks, open_truncate, pack_le_uint32,
+                                unpack_le_uint32_from)
 from electrumx.lib.script import Script
 from electrumx.server.db import UTXO
 
@@ -39,6 +44,22 @@ class MemPoolTx(object):
     size = attr.ib()
     out_srefs = attr.ib()
     idx_to_script = attr.ib()   # Track full output script at given output index
+    # codeScriptHash of each output (None if it cannot be computed)
+    out_cshs = attr.ib(default=())
+    # codeScriptHashes this tx is indexed under in MemPool.codeScriptHashes
+    csh_keys = attr.ib(default=())
+
+@attr.s(slots=True)
+class MemPoolHashX(object):
+    '''Running totals over the mempool txs touching one hashX.'''
+    # Unconfirmed balance change: credits less debits
+    delta = attr.ib(default=0)
+    # (tx_hash, tx_pos) -> UTXO for every mempool output paying the hashX
+    utxos = attr.ib(factory=dict)
+    # Prevouts of the txs touching the hashX.  A prevout is spent by at most
+    # one mempool tx, so removing a tx's prevouts removes only its own.
+    spends = attr.ib(factory=set)
+
 
 @attr.s(slots=True)
 class MemPoolTxSummary(object):
@@ -108,10 +129,25 @@ class MemPool(object):
 
        tx:     tx_hash -> MemPoolTx
        hashXs: hashX   -> set of all hashes of txs touching the hashX
+       codeScriptHashes: codeScriptHash -> set of hashes of txs with an
+               output of that codeScriptHash, or spending such a mempool
+               output
+       aggregates: hashX -> MemPoolHashX, kept for the same keys as hashXs
+               and updated as txs are accepted and removed
+       fee_histogram: fee rate -> total vsize of the txs paying it
     '''
 
+    # Minimum vsize of the first tranche of the compact fee histogram
+    HISTOGRAM_BIN_SIZE = 100_000
+
+    # Warm-restart snapshot of the processed mempool, relative to the DB
+    # directory.  Bump the version when the pickled structures change.
+    SNAPSHOT_FILE = 'meta/mempool'
+    SNAPSHOT_VERSION = 1
+
     def __init__(self, coin, api, refresh_secs=5.0, log_status_secs=60.0,
-                 env=None, glyph_index=None, swap_index=None, subscriptions=None):
+                 env=None, glyph_index=None, swap_index=None, subscriptions=None,
+                 reconcile_secs=30.0, persist_secs=0.0):
         assert isinstance(api, MemPoolAPI)
         self.coin = coin
         self.api = api
@@ -119,10 +155,27 @@ class MemPool(object):
         self.txs = {}
         self.hashXs = defaultdict(set)              # None can be a key
         self.outpointToRefs = defaultdict(set)      # None can be a key
-        self.codeScriptHashes = defaultdict(set)    # None can be a key
+        self.codeScriptHashes = defaultdict(set)
+        self.aggregates = defaultdict(MemPoolHashX)
+        self.fee_histogram = defaultdict(int)
+        # The compact form, recomputed at most once per refresh_secs
+        self._compact_histogram = []
+        self._histogram_dirty = False
+        self._histogram_time = None
         self.srefs = defaultdict(list) # Ordered list to keep track of first and last srefs transactions
         self.refresh_secs = refresh_secs
         self.log_status_secs = log_status_secs
+        # With a push subscriber (push.py) feeding new txs, the full
+        # getrawmempool reconciliation only runs every reconcile_secs,
+        # or when reconcile_soon() is called.
+        self.reconcile_secs = reconcile_secs
+        self.push_active = False
+        self._reconcile_event = asyncio.Event()
+        # Serialises reconciliation with acceptance of pushed txs
+        self._lock = asyncio.Lock()
+        # Seconds between snapshots to SNAPSHOT_FILE; 0 disables them
+        self.persist_secs = persist_secs
+        self._synced = False
         
         # Subscription manager (owned by the block processor) used to push
         # glyph.subscribe.balance notifications on unconfirmed balance changes.
@@ -158,24 +211,92 @@ class MemPool(object):
             await sleep(self.log_status_secs)
             await synchronized_event.wait()
 
+    def _histogram_add(self, tx, size):
+        '''Add size to the fee histogram bin of tx (remove with -size).'''
+        # 0.1 photon/byte resolution.  Rounding down is intentional: it keeps
+        # a tx inside the compact interval its fee rate belongs to.
+        fee_rate = math.floor(10 * tx.fee / tx.size) / 10 if tx.size else 0
+        histogram = self.fee_histogram
+        histogram[fee_rate] += size
+        if histogram[fee_rate] <= 0:
+            del histogram[fee_rate]
+        self._histogram_dirty = True
+
+    @staticmethod
+    def _compress_histogram(histogram, *, bin_size):
+        '''Return the compact fee histogram of mempool.get_fee_histogram:
+        [fee_rate, vsize] pairs by decreasing fee rate, where vsize is that
+        of the txs paying from fee_rate up to the previous pair's rate.
+
+        histogram maps fee rate to the total vsize of the txs paying it.
+        Tranches hold at least bin_size bytes, growing 10% each.
+        '''
+        assert bin_size > 0
+        compact = []
+        cum_size = 0
+        prev_fee_rate = None
+        for fee_rate, size in sorted(histogram.items(), reverse=True):
+            # A big lump at this rate closes the pending tranche first
+            if size > 2 * bin_size and prev_fee_rate is not None and cum_size > 0:
+                compact.append([prev_fee_rate, cum_size])
+                cum_size = 0
+                bin_size *= 1.1
+            cum_size += size
+            if cum_size > bin_size:
+                compact.append([fee_rate, cum_size])
+                cum_size = 0
+                bin_size *= 1.1
+            prev_fee_rate = fee_rate
+        return compact
+
+    @staticmethod
+    def _topological_order(tx_map):
+        '''Yield the hashes of tx_map with every tx after the txs of tx_map
+        it spends (Kahn's algorithm over prevouts).  Txs in a dependency
+        cycle, which valid txs cannot form, are not yielded.'''
+        children = defaultdict(list)
+        in_degree = {}
+        for tx_hash, tx in tx_map.items():
+            parents = {prev_hash for prev_hash, _ in tx.prevouts
+                       if prev_hash in tx_map}
+            in_degree[tx_hash] = len(parents)
+            for parent in parents:
+                children[parent].append(tx_hash)
+
+        ready = deque(tx_hash for tx_hash, count in in_degree.items() if not count)
+        while ready:
+            tx_hash = ready.popleft()
+            yield tx_hash
+            for child in children.get(tx_hash, ()):
+                in_degree[child] -= 1
+                if not in_degree[child]:
+                    ready.append(child)
+
     def _accept_transactions(self, tx_map, utxo_map, touched):
         '''Accept transactions in tx_map to the mempool if all their inputs
-        can be found in the existing mempool or a utxo_map from the
-        DB.
+        can be found in the existing mempool, earlier in tx_map, or in a
+        utxo_map from the DB.
 
-        Returns an (unprocessed tx_map, unspent utxo_map) pair.
+        Transactions are visited in dependency order, so one call accepts
+        every tx whose inputs can be found.  Returns an (unaccepted tx_map,
+        unspent utxo_map) pair; the unaccepted txs spend outputs found
+        nowhere, or outputs of such txs.
         '''
         hashXs = self.hashXs
         outpointToRefs = self.outpointToRefs
-        codeScriptHashes = self.codeScriptHashes # not used yet
+        codeScriptHashes = self.codeScriptHashes
+        aggregates = self.aggregates
         srefs = self.srefs
         txs = self.txs
         to_le_uint32 = pack_le_uint32
 
         deferred = {}
+        visited = 0
         unspent = set(utxo_map)
         # Try to find all prevouts so we can accept the TX
-        for tx_hash, tx in tx_map.items():
+        for tx_hash in self._topological_order(tx_map):
+            visited += 1
+            tx = tx_map[tx_hash]
             in_pairs = []
             try:
                 for prevout in tx.prevouts:
@@ -199,6 +320,7 @@ class MemPool(object):
             tx.fee = max(0, (sum(v for _, v in tx.in_pairs) -
                              sum(v for _, v in tx.out_pairs)))
             txs[tx_hash] = tx
+            self._histogram_add(tx, tx.size)
 
             # Index unconfirmed Glyph balance movements for this accepted tx.
             # tx.in_pairs is now resolved, so sender debits carry spent values.
@@ -212,13 +334,37 @@ class MemPool(object):
                 touched.add(hashX)
                 hashXs[hashX].add(tx_hash)
 
+            for hashX, value in tx.in_pairs:
+                aggregates[hashX].delta -= value
+            for pos, (hashX, value) in enumerate(tx.out_pairs):
+                aggregate = aggregates[hashX]
+                aggregate.delta += value
+                aggregate.utxos[(tx_hash, pos)] = UTXO(-1, pos, tx_hash, 0, value)
+
+            # Index by the codeScriptHashes of the outputs, and of the mempool
+            # outputs this tx spends (a contract's next state spends the last)
+            csh_keys = set(tx.out_cshs)
+            for prev_hash, prev_idx in tx.prevouts:
+                prev_tx = txs.get(prev_hash)
+                if prev_tx is not None and prev_idx < len(prev_tx.out_cshs):
+                    csh_keys.add(prev_tx.out_cshs[prev_idx])
+            csh_keys.discard(None)
+            tx.csh_keys = tuple(csh_keys)
+            for csh in csh_keys:
+                codeScriptHashes[csh].add(tx_hash)
+
+            tx_hashXs = set(hashX for hashX, _value in tx.in_pairs)
+            tx_hashXs.update(hashX for hashX, _value in tx.out_pairs)
             for ref_hashes in tx.out_srefs:
                 if ref_hashes:
                     for ref_hash in ref_hashes:
                         touched.add(ref_hash)
                         hashXs[ref_hash].add(tx_hash)
+                        tx_hashXs.add(ref_hash)
                         if tx_hash not in srefs[ref_hash]:
                             srefs[ref_hash].append(tx_hash)
+            for hashX in tx_hashXs:
+                aggregates[hashX].spends.update(tx.prevouts)
 
             # Check every output script for refs to build up the outpointToRefs map for quickly enumering which refs
             # are associated with each outpoint for the purposes of returning refs for unconfirmed utxos in mempool
@@ -242,6 +388,9 @@ class MemPool(object):
                     outpointToRefs[tx_hash + to_le_uint32(out_idx)] = refs_value
                 out_idx += 1 
 
+        if visited != len(tx_map):
+            deferred.update((tx_hash, tx) for tx_hash, tx in tx_map.items()
+                            if tx_hash not in txs and tx_hash not in deferred)
         return deferred, {prevout: utxo_map[prevout] for prevout in unspent}
 
     async def _refresh_hashes(self, synchronized_event):
@@ -250,24 +399,99 @@ class MemPool(object):
         # call transfers ownership
         touched = set()
         while True:
+            self._reconcile_event.clear()
             height = self.api.cached_height()
             hex_hashes = await self.api.mempool_hashes()
             if height != await self.api.height():
                 continue
             hashes = set(hex_str_to_hash(hh) for hh in hex_hashes)
-            try:
-                await self._process_mempool(hashes, touched, height)
-            except DBSyncError:
-                # The UTXO DB is not at the same height as the
-                # mempool; wait and try again
-                self.logger.debug('waiting for DB to sync')
-            else:
-                synchronized_event.set()
-                synchronized_event.clear()
+            delay = self.refresh_secs
+            async with self._lock:
+                try:
+                    await self._process_mempool(hashes, touched, height)
+                except DBSyncError:
+                    # The UTXO DB is not at the same height as the
+                    # mempool; wait and try again
+                    self.logger.debug('waiting for DB to sync')
+                else:
+                    self._synced = True
+                    synchronized_event.set()
+                    synchronized_event.clear()
+                    await self.api.on_mempool(touched, height)
+                    touched = set()
+                    await self._dispatch_glyph_balance()
+                    if self.push_active:
+                        delay = self.reconcile_secs
+            async with ignore_after(delay):
+                await self._reconcile_event.wait()
+
+    def reconcile_soon(self):
+        '''Wake the reconciliation loop, e.g. after a block is processed or
+        push messages were lost.'''
+        self._reconcile_event.set()
+
+    def set_push_active(self, active):
+        '''Called by the push subscriber as it starts and stops.'''
+        self.push_active = active
+        self.reconcile_soon()
+
+    async def accept_pushed(self, raw_txs=(), hashes=()):
+        '''Accept txs pushed by the daemon: raw txs, and the txs of hashes,
+        which are fetched.  Returns the number accepted.
+
+        Txs already in the mempool are skipped.  Nothing is accepted while
+        the DB is behind the daemon, or if a block is processed while the
+        txs are fetched and looked up, nor are txs whose inputs cannot be
+        found; the next reconciliation catches up with them.
+        '''
+        async with self._lock:
+            height = self.api.cached_height()
+            if height != self.api.db_height():
+                return 0
+            txs = self.txs
+            hashes = [tx_hash for tx_hash in hashes if tx_hash not in txs]
+            if hashes:
+                hex_hashes = (hash_to_hex_str(tx_hash) for tx_hash in hashes)
+                raw_txs = list(raw_txs)
+                raw_txs.extend(await self.api.raw_transactions(hex_hashes))
+
+            def deserialize_txs():
+                deserializer = self.coin.DESERIALIZER
+                tx_hashes, raws = [], []
+                for raw_tx in raw_txs:
+                    if not raw_tx:
+                        continue
+                    _tx, tx_hash = deserializer(raw_tx).read_tx_and_hash()
+                    if tx_hash not in txs:
+                        tx_hashes.append(tx_hash)
+                        raws.append(raw_tx)
+                return self._deserialize_txs(tx_hashes, raws)
+
+            tx_map = await run_in_thread(deserialize_txs)
+            # The daemon also publishes the txs of connected blocks; only a
+            # generation tx is recognisably not a mempool tx.
+            tx_map = {tx_hash: tx for tx_hash, tx in tx_map.items()
+                      if tx.prevouts and tx_hash not in txs}
+            if not tx_map:
+                return 0
+
+            prevouts = tuple(prevout for tx in tx_map.values()
+                             for prevout in tx.prevouts
+                             if prevout[0] not in txs and prevout[0] not in tx_map)
+            utxos = await self.api.lookup_utxos(prevouts)
+            if self.api.db_height() != height:
+                return 0
+            utxo_map = {prevout: utxo for prevout, utxo in zip(prevouts, utxos)}
+
+            touched = set()
+            deferred, _unspent = self._accept_transactions(tx_map, utxo_map, touched)
+            if deferred:
+                self.logger.debug(f'{len(deferred):,d} pushed txs left to '
+                                  f'reconciliation')
+            if touched:
                 await self.api.on_mempool(touched, height)
-                touched = set()
                 await self._dispatch_glyph_balance()
-            await sleep(self.refresh_secs)
+            return len(tx_map) - len(deferred)
 
     async def _dispatch_glyph_balance(self):
         '''Push glyph.subscribe.balance notifications for the unconfirmed
@@ -301,7 +525,8 @@ class MemPool(object):
         # Re-sync with the new set of hashes
         txs = self.txs
         hashXs = self.hashXs
-        codeScriptHashes = self.codeScriptHashes # not used yet
+        codeScriptHashes = self.codeScriptHashes
+        aggregates = self.aggregates
         outpointToRefs = self.outpointToRefs
         to_le_uint32 = pack_le_uint32
         srefs = self.srefs
@@ -312,6 +537,7 @@ class MemPool(object):
         # First handle txs that have disappeared
         for tx_hash in set(txs).difference(all_hashes):
             tx = txs.pop(tx_hash)
+            self._histogram_add(tx, -tx.size)
             # Drop any Glyph balance movements this tx contributed.
             if self.glyph_mempool:
                 try:
@@ -321,15 +547,29 @@ class MemPool(object):
             tx_hashXs = set(hashX for hashX, value in tx.in_pairs)
             tx_hashXs.update(hashX for hashX, value in tx.out_pairs)
             tx_hashXs.update(ref_hash for ref_hashes in tx.out_srefs for ref_hash in ref_hashes)
+            for hashX, value in tx.in_pairs:
+                aggregates[hashX].delta += value
+            for pos, (hashX, value) in enumerate(tx.out_pairs):
+                aggregate = aggregates[hashX]
+                aggregate.delta -= value
+                del aggregate.utxos[(tx_hash, pos)]
             for hashX in tx_hashXs:
                 hashXs[hashX].remove(tx_hash)
                 if not hashXs[hashX]:
                     del hashXs[hashX]
+                    del aggregates[hashX]
+                else:
+                    aggregates[hashX].spends.difference_update(tx.prevouts)
                 if tx_hash in srefs[hashX]:
                     srefs[hashX].remove(tx_hash)
                 if not srefs[hashX]:
                     del srefs[hashX]
             touched.update(tx_hashXs)
+            for csh in tx.csh_keys:
+                csh_txs = codeScriptHashes[csh]
+                csh_txs.discard(tx_hash)
+                if not csh_txs:
+                    del codeScriptHashes[csh]
 
             # Handle the outpoints that have disappeared from the mempool to remove the entries in outpointToRefs
             # This maintains the outpointToRefs to always contain the unconfirmed mempool outpoints which contain refs
@@ -353,69 +593,93 @@ class MemPool(object):
                 tx_map.update(deferred)
                 utxo_map.update(unspent)
 
-            prior_count = 0
-            # FIXME: this is not particularly efficient
-            while tx_map and len(tx_map) != prior_count:
-                prior_count = len(tx_map)
+            # The chunks are accepted separately, deferring txs that spend
+            # another chunk's outputs.  Those chunks are all accepted now, so
+            # one dependency-ordered pass accepts the rest; what remains are
+            # orphans.
+            if tx_map:
                 tx_map, utxo_map = self._accept_transactions(tx_map, utxo_map,
                                                              touched)
             if tx_map:
-                self.logger.error(f'{len(tx_map)} txs dropped')
+                self._report_orphans(tx_map)
 
         return touched
 
+    def _report_orphans(self, orphans):
+        '''Log mempool txs dropped because an input could not be found.'''
+        txs = self.txs
+        missing = {prev_hash for tx in orphans.values()
+                   for prev_hash, _ in tx.prevouts
+                   if prev_hash not in txs and prev_hash not in orphans}
+        sample = ', '.join(hash_to_hex_str(tx_hash)
+                           for tx_hash in itertools.islice(orphans, 3))
+        self.logger.error(f'{len(orphans):,d} txs dropped: inputs of '
+                          f'{len(missing):,d} parent txs not found '
+                          f'(e.g. {sample})')
+
+    def _deserialize_txs(self, hashes, raw_txs):
+        '''Deserialize raw txs into a tx_hash -> MemPoolTx map.  Pure.'''
+        to_hashX = self.coin.hashX_from_script
+        to_codeScriptHash = self.coin.codeScriptHash_from_script
+        deserializer = self.coin.DESERIALIZER
+
+        def codeScriptHash(pk_script):
+            try:
+                return to_codeScriptHash(pk_script)
+            except Exception:
+                return None
+
+        txs = {}
+        for tx_hash, raw_tx in zip(hashes, raw_txs):
+            # The daemon may have evicted the tx from its
+            # mempool or it may have gotten in a block
+            if not raw_tx:
+                continue
+            tx, tx_size = deserializer(raw_tx).read_tx_and_vsize()
+            # Convert the inputs and outputs into (hashX, value) pairs
+            # Drop generation-like inputs from MemPoolTx.prevouts
+            txin_pairs = tuple((txin.prev_hash, txin.prev_idx)
+                               for txin in tx.inputs
+                               if not txin.is_generation())
+            txout_pairs = tuple((to_hashX(Script.zero_refs(txout.pk_script)), txout.value)
+                                for txout in tx.outputs)
+
+            out_srefs = []
+            out_idx_to_scripts = []
+            for txout in tx.outputs:
+                out_idx_to_scripts.append(txout.pk_script)
+                normal_refs, singleton_refs = Script.get_push_input_refs(txout.pk_script)[1:]
+
+                normal_mints = []
+                for ref in normal_refs[0:3]:
+                    for txin in tx.inputs:
+                        if txin.prev_hash == ref[:32] and pack_le_uint32(txin.prev_idx) == ref[32:]:
+                            normal_mints.append(ref)
+
+                # Track all refs
+                track_refs = normal_mints + singleton_refs
+
+                if len(track_refs) > 0:
+                    ref_hashes = [to_hashX(ref) for ref in track_refs]
+                    out_srefs.append(ref_hashes)
+                else:
+                    out_srefs.append([])
+
+            out_cshs = tuple(codeScriptHash(pk_script)
+                             for pk_script in out_idx_to_scripts)
+            txs[tx_hash] = MemPoolTx(txin_pairs, None, txout_pairs,
+                                     0, tx_size, out_srefs, out_idx_to_scripts,
+                                     out_cshs)
+
+        return txs
+
     async def _fetch_and_accept(self, hashes, all_hashes, touched):
         '''Fetch a list of mempool transactions.'''
         hex_hashes_iter = (hash_to_hex_str(hash) for hash in hashes)
         raw_txs = await self.api.raw_transactions(hex_hashes_iter)
 
-        def deserialize_txs():    # This function is pure
-            to_hashX = self.coin.hashX_from_script
-            deserializer = self.coin.DESERIALIZER
-
-            txs = {}
-            for tx_hash, raw_tx in zip(hashes, raw_txs):
-                # The daemon may have evicted the tx from its
-                # mempool or it may have gotten in a block
-                if not raw_tx:
-                    continue
-                tx, tx_size = deserializer(raw_tx).read_tx_and_vsize()
-                # Convert the inputs and outputs into (hashX, value) pairs
-                # Drop generation-like inputs from MemPoolTx.prevouts
-                txin_pairs = tuple((txin.prev_hash, txin.prev_idx)
-                                   for txin in tx.inputs
-                                   if not txin.is_generation())
-                txout_pairs = tuple((to_hashX(Script.zero_refs(txout.pk_script)), txout.value)
-                                    for txout in tx.outputs)
-
-                out_srefs = []
-                out_idx_to_scripts = []
-                for txout in tx.outputs:
-                    out_idx_to_scripts.append(txout.pk_script)
-                    normal_refs, singleton_refs = Script.get_push_input_refs(txout.pk_script)[1:]
-
-                    normal_mints = []
-                    for ref in normal_refs[0:3]:
-                        for txin in tx.inputs:
-                            if txin.prev_hash == ref[:32] and pack_le_uint32(txin.prev_idx) == ref[32:]:
-                                normal_mints.append(ref)
-
-                    # Track all refs
-                    track_refs = normal_mints + singleton_refs
-
-                    if len(track_refs) > 0:
-                        ref_hashes = [to_hashX(ref) for ref in track_refs]
-                        out_srefs.append(ref_hashes)
-                    else:
-                        out_srefs.append([])
-
-                txs[tx_hash] = MemPoolTx(txin_pairs, None, txout_pairs,
-                                         0, tx_size, out_srefs, out_idx_to_scripts)
-
-            return txs
-
         # Thread this potentially slow operation so as not to block
-        tx_map = await run_in_thread(deserialize_txs)
+        tx_map = await run_in_thread(self._deserialize_txs, hashes, raw_txs)
 
         # Determine all prevouts not in the mempool, and fetch the
         # UTXO information from the database.  Failed prevout lookups
@@ -462,28 +726,130 @@ class MemPool(object):
             })
         return refs
     
+    def _snapshot(self):
+        '''The processed mempool state, pickled.'''
+        state = {
+            'version': self.SNAPSHOT_VERSION,
+            'coin': (self.coin.NAME, self.coin.NET),
+            'height': self.api.db_height(),
+            'txs': self.txs,
+            'hashXs': self.hashXs,
+            'outpointToRefs': self.outpointToRefs,
+            'codeScriptHashes': self.codeScriptHashes,
+            'srefs': self.srefs,
+            'aggregates': self.aggregates,
+            'fee_histogram': self.fee_histogram,
+            'glyph': self.glyph_mempool.snapshot() if self.glyph_mempool else None,
+        }
+        return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _write_snapshot(self, data):
+        '''Write a _snapshot() to SNAPSHOT_FILE atomically.  Blocking.'''
+        tmp = self.SNAPSHOT_FILE + '.tmp'
+        with open_truncate(tmp) as f:
+            f.write(data)
+        os.replace(tmp, self.SNAPSHOT_FILE)
+
+    def _read_snapshot(self):
+        '''The state saved by _snapshot(), or None if there is no usable
+        snapshot.  Blocking.'''
+        try:
+            with open(self.SNAPSHOT_FILE, 'rb') as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f'ignoring unreadable mempool snapshot: {e}')
+            return None
+        if (not isinstance(state, dict)
+                or state.get('version') != self.SNAPSHOT_VERSION
+                or state.get('coin') != (self.coin.NAME, self.coin.NET)):
+            self.logger.warning('ignoring mempool snapshot of another version or coin')
+            return None
+        return state
+
+    async def load_snapshot(self):
+        '''Restore the processed mempool saved by a previous run.  Returns
+        the number of txs restored.
+
+        The daemon's mempool is the authority: the next reconciliation drops
+        restored txs it no longer has and fetches only the ones missing.
+        Restored txs stay valid across blocks, as the outputs they spend
+        cannot change.
+        '''
+        state = await run_in_thread(self._read_snapshot)
+        if state is None:
+            return 0
+        async with self._lock:
+            glyph_state = state['glyph']
+            if (glyph_state is None) != (self.glyph_mempool is None) or (
+                    self.glyph_mempool and not self.glyph_mempool.restore(glyph_state)):
+                self.logger.info('ignoring mempool snapshot: glyph and swap '
+                                 'mempool indexing settings changed')
+                return 0
+            self.txs = state['txs']
+            self.hashXs = state['hashXs']
+            self.outpointToRefs = state['outpointToRefs']
+            self.codeScriptHashes = state['codeScriptHashes']
+            self.srefs = state['srefs']
+            self.aggregates = state['aggregates']
+            self.fee_histogram = state['fee_histogram']
+            self._histogram_dirty = True
+        self.logger.info(f'restored {len(self.txs):,d} txs from the mempool '
+                         f'snapshot taken at height {state["height"]:,d}')
+        return len(self.txs)
+
+    async def _persist(self):
+        '''Snapshot the mempool every persist_secs, and on shutdown.'''
+        try:
+            while True:
+                await sleep(self.persist_secs)
+                if not self._synced:
+                    continue
+                async with self._lock:
+                    data = self._snapshot()
+                await run_in_thread(self._write_snapshot, data)
+                self.logger.debug(f'saved mempool snapshot: {len(self.txs):,d} '
+                                  f'txs, {len(data):,d} bytes')
+        finally:
+            if self._synced:
+                self._write_snapshot(self._snapshot())
+                self.logger.info(f'saved mempool snapshot of {len(self.txs):,d} txs')
+
     async def keep_synchronized(self, synchronized_event):
         '''Keep the mempool synchronized with the daemon.'''
+        if self.persist_secs:
+            await self.load_snapshot()
         async with TaskGroup() as group:
             await group.spawn(self._refresh_hashes(synchronized_event))
             await group.spawn(self._logging(synchronized_event))
+            if self.persist_secs:
+                await group.spawn(self._persist())
 
             async for task in group:
                 if not task.cancelled():
                     task.result()
 
+    def compact_fee_histogram(self):
+        '''Return the compact fee histogram of the mempool (see
+        _compress_histogram).  Cached, and recomputed at most once per
+        refresh_secs while the mempool changes.'''
+        now = time.monotonic()
+        if self._histogram_dirty and (self._histogram_time is None or
+                                      now - self._histogram_time >= self.refresh_secs):
+            self._compact_histogram = self._compress_histogram(
+                self.fee_histogram, bin_size=self.HISTOGRAM_BIN_SIZE)
+            self._histogram_dirty = False
+            self._histogram_time = now
+        return self._compact_histogram
+
     async def balance_delta(self, hashX):
         '''Return the unconfirmed amount in the mempool for hashX.
 
         Can be positive or negative.
         '''
-        value = 0
-        if hashX in self.hashXs:
-            for hash_ in self.hashXs[hashX]:
-                tx = self.txs[hash_]
-                value -= sum(v for h168, v in tx.in_pairs if h168 == hashX)
-                value += sum(v for h168, v in tx.out_pairs if h168 == hashX)
-        return value
+        aggregate = self.aggregates.get(hashX)
+        return aggregate.delta if aggregate else 0
 
     async def potential_spends(self, hashX):
         '''Return a set of (prev_hash, prev_idx) pairs from mempool
@@ -492,35 +858,16 @@ class MemPool(object):
         None, some or all of these may be spends of the hashX, but all
         actual spends of it (in the DB or mempool) will be included.
         '''
-        result = set()
-        for tx_hash in self.hashXs.get(hashX, ()):
-            tx = self.txs[tx_hash]
-            result.update(tx.prevouts)
-        return result
+        aggregate = self.aggregates.get(hashX)
+        return set(aggregate.spends) if aggregate else set()
 
     def combined_mempool_state(self, hashX):
         '''Return (mempool_utxos, potential_spends, balance_delta) for hashX
-        in a single pass over the mempool txs touching hashX.
-
-        This replaces three separate iterations (unordered_UTXOs,
-        potential_spends, balance_delta) with one, cutting iteration
-        cost by 3x for listunspent and get_balance callers.
-        '''
-        utxos = []
-        spends = set()
-        delta = 0
-        for tx_hash in self.hashXs.get(hashX, ()):
-            tx = self.txs[tx_hash]
-            # UTXOs: outputs paying to hashX
-            for pos, (hX, value) in enumerate(tx.out_pairs):
-                if hX == hashX:
-                    utxos.append(UTXO(-1, pos, tx_hash, 0, value))
-            # Potential spends: all prevouts of txs touching hashX
-            spends.update(tx.prevouts)
-            # Balance delta: debits and credits
-            delta -= sum(v for h168, v in tx.in_pairs if h168 == hashX)
-            delta += sum(v for h168, v in tx.out_pairs if h168 == hashX)
-        return utxos, spends, delta
+        from its running aggregate, in time proportional to the result.'''
+        aggregate = self.aggregates.get(hashX)
+        if not aggregate:
+            return [], set(), 0
+        return list(aggregate.utxos.values()), set(aggregate.spends), aggregate.delta
 
     async def codescripthash_potential_spends(self, codeScriptHash):
         """
@@ -529,51 +876,25 @@ class MemPool(object):
 
         None, some or all of these may be spends of the codeScriptHash, but all
         actual spends of it (in the DB or mempool) will be included.
-        
-        This scans mempool transactions to find inputs that might be spending
-        UTXOs with the given codeScriptHash.
+
+        A tx touches the codeScriptHash if it creates an output with it (all
+        its prevouts are potential spends) or spends a mempool output with
+        it (that prevout is a spend).  Both kinds are indexed at acceptance.
         """
         result = set()
-        script_codeScriptHash = self.coin.codeScriptHash_from_script
-        
-        # For each transaction in mempool, check if any of its inputs
-        # might be spending a UTXO with the matching codeScriptHash
-        for tx_hash, tx in self.txs.items():
-            # Check if any output of this tx has the codeScriptHash
-            # (meaning this tx creates UTXOs with this codeScriptHash)
-            has_matching_output = False
-            for pk_script in tx.idx_to_script:
-                if pk_script is None:
-                    continue
-                try:
-                    output_csh = script_codeScriptHash(pk_script)
-                    if output_csh == codeScriptHash:
-                        has_matching_output = True
-                        break
-                except Exception:
-                    continue
-            
-            # If this tx touches the codeScriptHash (via outputs),
-            # then its prevouts are potential spends
-            if has_matching_output:
+        txs = self.txs
+        for tx_hash in self.codeScriptHashes.get(codeScriptHash, ()):
+            tx = txs[tx_hash]
+            if codeScriptHash in tx.out_cshs:
                 result.update(tx.prevouts)
-            
-            # Also check: does any input of this tx spend a mempool UTXO
-            # that has the matching codeScriptHash?
+                continue
             for prev_hash, prev_idx in tx.prevouts:
-                prev_tx = self.txs.get(prev_hash)
-                if prev_tx and prev_idx < len(prev_tx.idx_to_script):
-                    prev_script = prev_tx.idx_to_script[prev_idx]
-                    if prev_script is not None:
-                        try:
-                            prev_csh = script_codeScriptHash(prev_script)
-                            if prev_csh == codeScriptHash:
-                                result.add((prev_hash, prev_idx))
-                        except Exception:
-                            continue
-        
+                prev_tx = txs.get(prev_hash)
+                if (prev_tx is not None and prev_idx < len(prev_tx.out_cshs)
+                        and prev_tx.out_cshs[prev_idx] == codeScriptHash):
+                    result.add((prev_hash, prev_idx))
         return result
-    
+
     async def transaction_summaries(self, hashX):
         '''Return a list of MemPoolTxSummary objects for the hashX.'''
         result = []
@@ -590,44 +911,27 @@ class MemPool(object):
         This does not consider if any other mempool transactions spend
         the outputs.
         '''
-        utxos = []
-        for tx_hash in self.hashXs.get(hashX, ()):
-            tx = self.txs.get(tx_hash)
-            for pos, (hX, value) in enumerate(tx.out_pairs):
-                if hX == hashX:
-                    utxos.append(UTXO(-1, pos, tx_hash, 0, value))
-        return utxos
+        aggregate = self.aggregates.get(hashX)
+        return list(aggregate.utxos.values()) if aggregate else []
     
     async def codescripthash_unordered_UTXOs(self, codeScriptHash):
         """
         Return an unordered list of UTXO named tuples from mempool
         transactions that have outputs matching the given codeScriptHash.
-        
+
         codeScriptHash is the SHA256 hash of the code portion of a script
         (everything after the state separator).
-        
+
         This does not consider if any other mempool transactions spend
         the outputs.
         """
         utxos = []
-        script_codeScriptHash = self.coin.codeScriptHash_from_script
-        
-        for tx_hash, tx in self.txs.items():
-            # Check each output's script
-            for pos, pk_script in enumerate(tx.idx_to_script):
-                if pk_script is None:
-                    continue
-                try:
-                    output_codeScriptHash = script_codeScriptHash(pk_script)
-                    if output_codeScriptHash == codeScriptHash:
-                        # Get value from out_pairs at this position
-                        if pos < len(tx.out_pairs):
-                            _, value = tx.out_pairs[pos]
-                            utxos.append(UTXO(-1, pos, tx_hash, 0, value))
-                except Exception:
-                    # Skip outputs that can't be processed
-                    continue
-        
+        for tx_hash in self.codeScriptHashes.get(codeScriptHash, ()):
+            tx = self.txs[tx_hash]
+            for pos, csh in enumerate(tx.out_cshs):
+                if csh == codeScriptHash:
+                    _, value = tx.out_pairs[pos]
+                    utxos.append(UTXO(-1, pos, tx_hash, 0, value))
         return utxos
 
     async def first_last_summaries(self, hashX):
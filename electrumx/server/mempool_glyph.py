@@ -605,6 +605,25 @@ class MempoolGlyphIndex:
                     if not maker_set:
                         del self.swap_by_maker[swap_order.maker_scripthash]
     
+    # The structures saved in MemPool's warm-restart snapshot
+    _SNAPSHOT_FIELDS = ('glyph_txs', 'glyph_by_ref', 'glyph_by_scripthash',
+                        'swap_orders', 'swap_by_tx', 'swap_by_pair', 'swap_by_maker')
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The index structures, for MemPool's snapshot."""
+        state = {name: getattr(self, name) for name in self._SNAPSHOT_FIELDS}
+        state['enabled'] = (self.glyph_enabled, self.swap_enabled)
+        return state
+
+    def restore(self, state: Dict[str, Any]) -> bool:
+        """Adopt the structures of a snapshot().  Returns False, changing
+        nothing, if it was taken with other indexing settings."""
+        if state.get('enabled') != (self.glyph_enabled, self.swap_enabled):
+            return False
+        for name in self._SNAPSHOT_FIELDS:
+            setattr(self, name, state[name])
+        return True
+
     def get_touched_and_clear(self) -> Tuple[Set[bytes], Set[bytes]]:
         """Get and clear the touched sets for notification dispatch."""
         refs = self.touched_refs
@@ -26,6 +26,7 @@ def _noop(*a, **kw):
     class _Stub:
         def labels(self, **kw): return self
         def inc(self, v=1): pass
+        def dec(self, v=1): pass
         def set(self, v): pass
         def observe(self, v): pass
         def time(self): return _NullCtx()
@@ -94,6 +95,46 @@ rest_request_seconds = _histogram(
     buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
 )
 
+# REST reader executor (electrumx/server/read_executor.py)
+rest_reader_queue_depth = _gauge(
+    'rxindexer_rest_reader_queue_depth',
+    'REST index queries queued or running on the reader pool',
+    labels=['query'],
+)
+rest_reader_seconds = _histogram(
+    'rxindexer_rest_reader_seconds',
+    'Time from submitting a REST index query to its result (queue + run)',
+    labels=['query'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0],
+)
+rest_reader_rejected = _counter(
+    'rxindexer_rest_reader_rejected_total',
+    'REST index queries refused (queue limit) or abandoned (timeout)',
+    labels=['query', 'reason'],
+)
+
+# REST response cache (electrumx/server/response_cache.py)
+rest_cache_requests = _counter(
+    'rxindexer_rest_cache_requests_total',
+    'REST response cache lookups by result (hit, miss, not_modified)',
+    labels=['result'],
+)
+rest_cache_bytes = _gauge(
+    'rxindexer_rest_cache_bytes',
+    'Bytes of serialised bodies held by the REST response cache',
+)
+
+# REST NDJSON exports (electrumx/server/ndjson_export.py)
+rest_export_rows = _counter(
+    'rxindexer_rest_export_rows_total',
+    'Rows streamed by the REST NDJSON export endpoints',
+    labels=['dataset'],
+)
+rest_exports_active = _gauge(
+    'rxindexer_rest_exports_active',
+    'REST NDJSON exports currently streaming',
+)
+
 # R18: cache sizes
 cache_size = _gauge(
     'rxindexer_cache_size',
@@ -101,6 +142,18 @@ cache_size = _gauge(
     labels=['cache'],
 )
 
+# Byte-bounded server caches (electrumx/server/byte_cache.py)
+server_cache_requests = _counter(
+    'rxindexer_server_cache_requests_total',
+    'History, UTXO, balance and tx hash cache lookups by result (hit, miss)',
+    labels=['cache', 'result'],
+)
+server_cache_bytes = _gauge(
+    'rxindexer_server_cache_bytes',
+    'Estimated bytes held by each history, UTXO, balance and tx hash cache',
+    labels=['cache'],
+)
+
 # R18: swap
 swap_orders_total = _gauge(
     'rxindexer_swap_orders_total',
@@ -122,6 +175,18 @@ wave_parse_errors_total = _counter(
     'Total WAVE record parse errors',
 )
 
+# Background schema migrations (electrumx/server/migrations.py)
+migration_pending = _gauge(
+    'rxindexer_migration_pending',
+    '1 while a background schema migration is still running',
+    labels=['migration'],
+)
+migration_rows = _gauge(
+    'rxindexer_migration_rows_done',
+    'Source rows processed by a background schema migration',
+    labels=['migration'],
+)
+
 
 def generate_metrics_text() -> bytes:
     """Return current metrics in Prometheus text format."""
@@ -0,0 +1,190 @@
+'''Background, resumable schema migrations for the overlay indexes.
+
+An index that bumps its schema used to backfill the new rows synchronously
+in ``post_open_init``, holding the server down until the whole keyspace had
+been rewritten — and an interrupted run started again from scratch.
+
+A ``BackgroundMigration`` describes one backfill as a walk over a source key
+prefix plus a per-row function. ``schedule()`` persists a pending checkpoint
+in the same batch that stamps the new schema version, so the to-do list
+survives restarts. ``MigrationRunner`` then walks the source rows in bounded
+chunks after startup. Each chunk commits its derived rows *and* its checkpoint
+in one write batch, so a crash resumes at the last committed chunk and never
+skips or half-applies one.
+
+Query paths check ``migration.complete`` and keep serving from their pre-
+migration path until it flips. Because the chunk function only ever derives
+rows from committed source rows it must be idempotent: a row re-derived after
+a crash, or one the live write path has already written, is simply skipped or
+rewritten with the same value.
+'''
+
+import os
+import struct
+from asyncio import sleep
+from typing import Callable, List, Optional
+
+from electrumx.lib import util
+from electrumx.server import metrics as _metrics
+
+# Source rows per committed chunk. Sized like the analytics backfill: a chunk
+# is a few milliseconds of work, so block processing and serving stay live.
+MIGRATION_CHUNK_SIZE = int(os.getenv('MIGRATION_CHUNK_SIZE', '2000'))
+
+# XM + name -> rows_done(8 le) + cursor. Present only while a migration is
+# pending; deleted in the batch that commits its last chunk.
+MIGRATION_STATE = b'XM'
+
+
+class BackgroundMigration:
+    '''One resumable backfill over the rows under ``prefix``.
+
+    ``migrate_row(batch, key, value)`` writes whatever the migration derives
+    from one source row into ``batch``. The optional ``begin_chunk()`` and
+    ``end_chunk(batch)`` bracket each chunk, for migrations that aggregate
+    across rows (e.g. reference counts) and write the totals once per chunk.
+    ``complete`` is False until the state has been loaded from the DB and found
+    finished (or never scheduled).
+    '''
+
+    def __init__(self, name: str, prefix: bytes,
+                 migrate_row: Callable[[object, bytes, bytes], None],
+                 begin_chunk: Optional[Callable[[], None]] = None,
+                 end_chunk: Optional[Callable[[object], None]] = None):
+        self.name = name
+        self.prefix = prefix
+        self.migrate_row = migrate_row
+        self.begin_chunk = begin_chunk
+        self.end_chunk = end_chunk
+        self.complete = False
+        self.rows_done = 0
+        self.cursor: Optional[bytes] = None
+
+    @property
+    def state_key(self) -> bytes:
+        return MIGRATION_STATE + self.name.encode()
+
+    def _pack_state(self) -> bytes:
+        return struct.pack('<Q', self.rows_done) + (self.cursor or b'')
+
+    def load(self, utxo_db) -> bool:
+        '''Read the persisted checkpoint. Returns True if work is pending.'''
+        raw = utxo_db.get(self.state_key)
+        if raw is None:
+            self.complete = True
+            self.rows_done = 0
+            self.cursor = None
+        else:
+            self.complete = False
+            self.rows_done, = struct.unpack('<Q', raw[:8])
+            self.cursor = raw[8:] or None
+        return not self.complete
+
+    def schedule(self, batch):
+        '''Mark the migration pending from the start of the source prefix.'''
+        self.complete = False
+        self.rows_done = 0
+        self.cursor = None
+        batch.put(self.state_key, self._pack_state())
+
+    def run_chunk(self, utxo_db, limit: int = MIGRATION_CHUNK_SIZE) -> int:
+        '''Migrate up to ``limit`` source rows and commit them with the
+        checkpoint. Returns the number of source rows processed.'''
+        page = []
+        for item in utxo_db.iterator(prefix=self.prefix,
+                                     seek=self.cursor or self.prefix):
+            page.append(item)
+            if len(page) >= limit:
+                break
+        finished = len(page) < limit
+        # Resume strictly after the last key (seek is inclusive; a trailing
+        # 0x00 byte is the smallest key greater than it).
+        cursor = page[-1][0] + b'\x00' if page else self.cursor
+        rows_done = self.rows_done + len(page)
+        if self.begin_chunk is not None:
+            self.begin_chunk()
+        with utxo_db.write_batch() as batch:
+            for key, value in page:
+                self.migrate_row(batch, key, value)
+            if self.end_chunk is not None:
+                self.end_chunk(batch)
+            if finished:
+                batch.delete(self.state_key)
+            else:
+                batch.put(self.state_key,
+                          struct.pack('<Q', rows_done) + cursor)
+        self.rows_done = rows_done
+        self.cursor = cursor
+        self.complete = finished
+        return len(page)
+
+    def run_to_completion(self, utxo_db,
+                          limit: int = MIGRATION_CHUNK_SIZE) -> int:
+        '''Run every remaining chunk synchronously. Returns rows processed.'''
+        total = 0
+        while True:
+            total += self.run_chunk(utxo_db, limit)
+            if self.complete:
+                return total
+
+
+class MigrationRunner:
+    '''Drives pending ``BackgroundMigration``s in the background.
+
+    Indexes hand over their migrations with ``add()`` after their schema check
+    has run; it reloads each checkpoint and ignores completed ones. ``run()``
+    is spawned alongside block processing.
+    '''
+
+    def __init__(self, db, chunk_size: int = MIGRATION_CHUNK_SIZE):
+        self.logger = util.class_logger(__name__, self.__class__.__name__)
+        self.db = db
+        self.chunk_size = chunk_size
+        self.pending: List[BackgroundMigration] = []
+
+    def add(self, migration: BackgroundMigration):
+        if migration.load(self.db.utxo_db):
+            self.pending.append(migration)
+            _metrics.migration_pending.labels(migration=migration.name).set(1)
+            _metrics.migration_rows.labels(migration=migration.name).set(
+                migration.rows_done)
+
+    def status(self):
+        '''Progress of every migration handed to this runner.'''
+        return {m.name: {'complete': m.complete, 'rows_done': m.rows_done}
+                for m in self.pending}
+
+    async def run(self, caught_up_event=None, lock=None):
+        '''Run each pending migration to completion, a chunk at a time.
+
+        caught_up_event: waited on before the first chunk, as for the analytics
+        backfill, so the DB has been reopened for serving. lock: held per
+        chunk (the block processor's state lock) so a chunk never interleaves
+        with a flush. A failure is logged and the migration resumes from its
+        last checkpoint on the next startup.
+        '''
+        if not self.pending:
+            return
+        if caught_up_event is not None:
+            await caught_up_event.wait()
+        for migration in self.pending:
+            name = migration.name
+            self.logger.info(f'migration {name} running in the background '
+                             f'({migration.rows_done:,d} rows already done)')
+            try:
+                while not migration.complete:
+                    if lock is not None:
+                        async with lock:
+                            migration.run_chunk(self.db.utxo_db, self.chunk_size)
+                    else:
+                        migration.run_chunk(self.db.utxo_db, self.chunk_size)
+                    _metrics.migration_rows.labels(migration=name).set(
+                        migration.rows_done)
+                    await sleep(0)
+            except Exception:
+                self.logger.exception(f'migration {name} failed; it will '
+                                      f'resume from its checkpoint on restart')
+                return
+            _metrics.migration_pending.labels(migration=name).set(0)
+            self.logger.info(f'migration {name} complete: '
+                             f'{migration.rows_done:,d} rows')
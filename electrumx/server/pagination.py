@@ -0,0 +1,79 @@
+"""Shared pieces of cursor pagination (docs/pagination-cursors.md).
+
+A cursor is the opaque, URL-safe base64 encoding of the next key to serve:
+a storage key for prefix scans, or a packed sort key for lists that are
+sorted in memory. Resuming from it costs a seek, however deep the page.
+
+``offset`` is still accepted as a compatibility mode, but every call walks
+and discards ``offset`` rows, so it is capped at ``PAGINATION_MAX_OFFSET``.
+Clients paging further must follow ``next_cursor``.
+"""
+
+import base64
+import os
+from typing import Optional
+
+PAGINATION_MAX_OFFSET = int(os.getenv('PAGINATION_MAX_OFFSET', '10000'))
+
+# Rows a filtered cursor scan examines per page. A page that runs out of
+# budget comes back short with ``has_more`` set; the cursor resumes the scan.
+CURSOR_SCAN_BUDGET = int(os.getenv('CURSOR_SCAN_BUDGET', '5000'))
+
+
+def encode_cursor(key: bytes) -> str:
+    """Opaque cursor for the next key to serve."""
+    return base64.urlsafe_b64encode(key).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[bytes]:
+    """Key of a cursor, or None for no cursor (the first page).
+
+    Accepts the standard alphabet too, and a ``+`` that form decoding
+    turned into a space. Raises ValueError if the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    normalised = cursor.replace(' ', '-').replace('+', '-').replace('/', '_')
+    try:
+        key = base64.b64decode(normalised, altchars=b'-_', validate=True)
+    except Exception:
+        raise ValueError('invalid cursor') from None
+    if not key:
+        raise ValueError('invalid cursor')
+    return key
+
+
+def cursor_key(cursor: Optional[str]) -> Optional[bytes]:
+    """``decode_cursor`` for index methods that treat a malformed cursor as
+    no cursor (the first page). REST handlers reject one with 400 first."""
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        return None
+
+
+def clamp_offset(offset) -> int:
+    """A compatibility-mode offset, clamped to [0, PAGINATION_MAX_OFFSET]."""
+    return max(0, min(int(offset), PAGINATION_MAX_OFFSET))
+
+
+def check_offset(offset) -> int:
+    """Validate an offset at an API boundary. Raises ValueError past the
+    cap, naming the cursor as the way on."""
+    offset = int(offset)
+    if offset < 0:
+        raise ValueError('offset must not be negative')
+    if offset > PAGINATION_MAX_OFFSET:
+        raise ValueError(f'offset is capped at {PAGINATION_MAX_OFFSET:,d}; '
+                         f'page further with cursor')
+    return offset
+
+
+def cursor_page(entries, next_key: Optional[bytes]) -> dict:
+    """The ``{entries, next_cursor, has_more}`` shape of a cursor page."""
+    next_cursor = encode_cursor(next_key) if next_key is not None else None
+    return {
+        'entries': entries,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    }
@@ -30,6 +30,7 @@ from electrumx.lib import util
 from electrumx.lib.hash import hash_to_hex_str, hex_str_to_hash
 from electrumx.lib.util import pack_be_uint32, unpack_be_uint32, encode_undo, decode_undo
 from electrumx.lib.script import OpCodes
+from electrumx.server.pagination import clamp_offset, cursor_page, decode_cursor
 
 OP_STATESEPARATOR = 0xbd
 OP_PUSHINPUTREFSINGLETON = 0xd8
@@ -381,9 +382,30 @@ class PredictionMarketIndex:
             return None
         return MarketRecord.from_bytes(data).to_dict()
 
-    def list_markets(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+    def list_markets(self, limit: int = 50, offset: int = 0,
+                     cursor: Optional[str] = None, _use_cursor: bool = False):
+        """Markets newest-first: a list (``offset`` capped at
+        ``PAGINATION_MAX_OFFSET``), or with ``_use_cursor`` a
+        ``{entries, next_cursor, has_more}`` page resuming at the cursor."""
         limit = max(1, min(int(limit), 200))
-        offset = max(0, int(offset))
+        offset = clamp_offset(offset)
+        if _use_cursor:
+            seek = decode_cursor(cursor)
+            if seek is not None and not seek.startswith(PredictDBKeys.BY_HEIGHT):
+                raise ValueError('invalid cursor')
+            entries: List[Dict[str, Any]] = []
+            next_key = None
+            for key, _ in self.db.utxo_db.iterator(prefix=PredictDBKeys.BY_HEIGHT,
+                                                   reverse=True, seek=seek):
+                if len(entries) >= limit:
+                    next_key = key
+                    break
+                data = self.db.utxo_db.get(
+                    PredictDBKeys.MARKET + key[len(PredictDBKeys.BY_HEIGHT) + 4:])
+                if data:
+                    entries.append(MarketRecord.from_bytes(data).to_dict())
+            return cursor_page(entries, next_key)
+
         out: List[Dict[str, Any]] = []
         skipped = 0
         # newest-first by height
@@ -0,0 +1,211 @@
+'''Push notifications from the daemon (ZMQ ``hashtx``/``rawtx``/``hashblock``).
+
+Without them the mempool polls ``getrawmempool`` every ``refresh_secs`` and
+diffs the whole hash set, and the prefetcher polls for new blocks. With
+``DAEMON_ZMQ_URL`` set (the daemon's ``-zmqpub*`` endpoint) a
+``PushSubscriber`` instead:
+
+* hands ``rawtx`` bodies, and the txs named by ``hashtx``, straight to
+  ``MemPool.accept_pushed``;
+* wakes the prefetcher on ``hashblock``, so a new block is fetched at once.
+
+The daemon also publishes the txs of each connected block, coinbase first,
+just before its ``hashblock``. Those are not mempool txs, so they are
+dropped: a coinbase ``rawtx`` starts a block's txs, which run up to the next
+``hashblock``, and txs queued in the same batch as a ``hashblock`` are left
+to the reconciliation that follows the block. With only ``hashtx``
+published, the coinbase is not recognisable and only the second rule
+applies, so publish ``rawtx`` too.
+
+The full ``getrawmempool`` reconciliation keeps running as a safety net,
+every ``MEMPOOL_RECONCILE_SECS`` rather than every refresh, and right after
+each processed block. A gap in a topic's sequence numbers (ZMQ drops
+messages past its high-water mark) triggers one immediately.
+
+The transport is pluggable: ``ZMQSource`` needs pyzmq, which is optional;
+``LocalPublisher`` is an in-process stand-in used by the tests.
+'''
+
+import asyncio
+
+from electrumx.lib.util import class_logger, unpack_le_uint32_from
+
+try:
+    import zmq
+    import zmq.asyncio
+    HAS_ZMQ = True
+except ImportError:
+    HAS_ZMQ = False
+    zmq = None
+
+HASHTX = b'hashtx'
+RAWTX = b'rawtx'
+HASHBLOCK = b'hashblock'
+TOPICS = (HASHTX, RAWTX, HASHBLOCK)
+
+
+def is_generation(raw_tx):
+    '''True if raw_tx is a coinbase: one input, spending the null outpoint.'''
+    return (len(raw_tx) >= 41 and raw_tx[4] == 1 and raw_tx[5:37] == bytes(32)
+            and raw_tx[37:41] == b'\xff\xff\xff\xff')
+
+
+class ZMQSource:
+    '''Messages from a daemon's ZMQ publisher, as (topic, body, sequence).'''
+
+    def __init__(self, url, topics=TOPICS):
+        if not HAS_ZMQ:
+            raise RuntimeError('pyzmq is required for DAEMON_ZMQ_URL')
+        self.url = url
+        self.context = zmq.asyncio.Context()
+        self.socket = self.context.socket(zmq.SUB)
+        self.socket.setsockopt(zmq.RCVHWM, 0)
+        for topic in topics:
+            self.socket.setsockopt(zmq.SUBSCRIBE, topic)
+        self.socket.connect(url)
+
+    @staticmethod
+    def _message(frames):
+        topic, body, seq = frames
+        return topic, body, unpack_le_uint32_from(seq)[0]
+
+    async def recv(self):
+        return self._message(await self.socket.recv_multipart())
+
+    def poll(self):
+        '''The next message if one is queued, otherwise None.'''
+        # zmq.asyncio returns a future even with NOBLOCK; it is already done
+        future = self.socket.recv_multipart(flags=zmq.NOBLOCK)
+        try:
+            return self._message(future.result())
+        except zmq.Again:
+            return None
+
+    def close(self):
+        self.socket.close(linger=0)
+        self.context.term()
+
+
+class LocalSource:
+    '''A LocalPublisher subscription.'''
+
+    def __init__(self, topics):
+        self.topics = set(topics)
+        self.queue = asyncio.Queue()
+
+    async def recv(self):
+        return await self.queue.get()
+
+    def poll(self):
+        try:
+            return self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def close(self):
+        pass
+
+
+class LocalPublisher:
+    '''In-process stand-in for the daemon's ZMQ publisher.
+
+    Numbers each topic's messages from 0 as the daemon does; ``skip`` drops
+    sequence numbers to simulate messages lost past the high-water mark.
+    '''
+
+    def __init__(self):
+        self.sources = []
+        self.sequences = {}
+
+    def subscribe(self, topics=TOPICS):
+        source = LocalSource(topics)
+        self.sources.append(source)
+        return source
+
+    def skip(self, topic, count=1):
+        self.sequences[topic] = self.sequences.get(topic, 0) + count
+
+    def publish(self, topic, body):
+        seq = self.sequences.get(topic, 0)
+        self.sequences[topic] = seq + 1
+        for source in self.sources:
+            if topic in source.topics:
+                source.queue.put_nowait((topic, body, seq))
+
+
+class PushSubscriber:
+    '''Feeds a push source into the mempool and the prefetcher.
+
+        source - a ZMQSource or LocalSource
+        mempool - the MemPool
+        on_block - called on each ``hashblock``, e.g. Prefetcher.wake_up
+    '''
+
+    def __init__(self, source, mempool, on_block, max_batch=1000):
+        self.logger = class_logger(__name__, self.__class__.__name__)
+        self.source = source
+        self.mempool = mempool
+        self.on_block = on_block
+        self.max_batch = max_batch
+        self.sequences = {}
+        # Between a block's coinbase and its hashblock
+        self.in_block = False
+
+    def _in_sequence(self, topic, seq):
+        '''Record seq and return False if messages of topic were lost.'''
+        expected = self.sequences.get(topic)
+        self.sequences[topic] = (seq + 1) & 0xffffffff
+        return expected is None or seq == expected
+
+    async def _handle(self, messages):
+        raw_txs = []
+        hashes = []
+        new_block = False
+        gap = False
+        for topic, body, seq in messages:
+            if not self._in_sequence(topic, seq):
+                gap = True
+            if topic == RAWTX:
+                if is_generation(body):
+                    self.in_block = True
+                elif not self.in_block:
+                    raw_txs.append(body)
+            elif topic == HASHTX:
+                if not self.in_block:
+                    # Published in display order
+                    hashes.append(body[::-1])
+            elif topic == HASHBLOCK:
+                new_block = True
+                self.in_block = False
+                # Those may be the block's txs (see module doc)
+                raw_txs.clear()
+                hashes.clear()
+        if new_block:
+            self.on_block()
+        if gap:
+            self.logger.info('push messages were lost; reconciling the mempool')
+            self.mempool.reconcile_soon()
+        if raw_txs or hashes:
+            await self.mempool.accept_pushed(raw_txs, hashes)
+
+    async def run(self):
+        '''Process messages until cancelled. The mempool reconciles at the
+        longer push interval while this runs.'''
+        self.mempool.set_push_active(True)
+        try:
+            while True:
+                messages = [await self.source.recv()]
+                while len(messages) < self.max_batch:
+                    message = self.source.poll()
+                    if message is None:
+                        break
+                    messages.append(message)
+                try:
+                    await self._handle(messages)
+                except Exception:
+                    # Reconciliation picks up whatever was missed
+                    self.logger.exception('handling push messages failed')
+                    self.mempool.reconcile_soon()
+        finally:
+            self.mempool.set_push_active(False)
+            self.source.close()
@@ -0,0 +1,105 @@
+"""Bounded thread pool for the REST API's synchronous index reads.
+
+The REST app is served by uvicorn on the same event loop as the Electrum
+sessions, and its handlers call the indexes' query methods — synchronous
+RocksDB point reads and prefix scans — directly. One heavy holder scan used to
+stall every session on the loop for as long as it ran.
+
+``ReadExecutor.run()`` moves such a call to a small dedicated thread pool so
+the loop is left with I/O and serialisation:
+
+* **Per-query admission limit** — each query (keyed by the callable's name,
+  or an explicit label) may have at most ``queue_limit`` calls queued or
+  running. Past that ``ReaderBusy`` is raised at once instead of growing an
+  unbounded backlog behind one slow scan.
+* **Timeout** — a call not finished after ``timeout`` seconds raises
+  ``ReaderTimeout``. A call still waiting for a worker is cancelled outright;
+  one already running cannot be interrupted mid-scan, so it runs to the end
+  and its result is dropped. That worker is still busy in the meantime, which
+  the admission limit accounts for.
+
+RocksDB reads are thread-safe. The indexes' unflushed caches are plain dicts
+that the block processor mutates on the loop. Readers may look keys up in
+them, as single dict operations are atomic under the GIL, but must not
+iterate them: an insert or a flush's clear() mid-way raises "dictionary
+changed size during iteration". A query that needs to scan a cache takes
+its snapshot on the loop and passes it in (e.g.
+``WaveIndex.pending_duplicates``). A read racing a flush may miss a row for
+a moment, much as a request that arrived a moment earlier would have.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from electrumx.server import metrics as _metrics
+
+REST_READER_THREADS = int(os.getenv('REST_READER_THREADS', '4'))
+REST_READER_QUEUE_LIMIT = int(os.getenv('REST_READER_QUEUE_LIMIT', '32'))
+REST_READER_TIMEOUT = float(os.getenv('REST_READER_TIMEOUT', '15'))
+
+
+class ReaderBusy(Exception):
+    """Too many calls of one query are already queued or running."""
+
+
+class ReaderTimeout(Exception):
+    """A query did not finish within the executor's timeout."""
+
+
+class ReadExecutor:
+    """Runs synchronous index queries off the event loop (see module doc)."""
+
+    def __init__(self, threads: int = REST_READER_THREADS,
+                 queue_limit: int = REST_READER_QUEUE_LIMIT,
+                 timeout: float = REST_READER_TIMEOUT):
+        self.threads = max(1, threads)
+        self.queue_limit = max(1, queue_limit)
+        self.timeout = timeout
+        self.inflight: Dict[str, int] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads,
+                                            thread_name_prefix='rest-reader')
+        return self._pool
+
+    async def run(self, func: Callable, *args, label: Optional[str] = None,
+                  **kwargs):
+        """Run ``func(*args, **kwargs)`` on a reader thread and return its
+        result. Raises ReaderBusy or ReaderTimeout as described above."""
+        label = label or getattr(func, '__name__', 'query')
+        depth = self.inflight.get(label, 0)
+        if depth >= self.queue_limit:
+            _metrics.rest_reader_rejected.labels(query=label, reason='busy').inc()
+            raise ReaderBusy(label)
+        self.inflight[label] = depth + 1
+        _metrics.rest_reader_queue_depth.labels(query=label).set(depth + 1)
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor(), call), self.timeout)
+        except asyncio.TimeoutError:
+            _metrics.rest_reader_rejected.labels(query=label, reason='timeout').inc()
+            raise ReaderTimeout(label) from None
+        finally:
+            _metrics.rest_reader_seconds.labels(query=label).observe(
+                time.perf_counter() - started)
+            depth = self.inflight[label] - 1
+            if depth:
+                self.inflight[label] = depth
+            else:
+                del self.inflight[label]
+            _metrics.rest_reader_queue_depth.labels(query=label).set(depth)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
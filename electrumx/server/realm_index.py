@@ -25,6 +25,7 @@ Realms are IMMUTABLE NFTs today (no name/target "mod" path), so unlike wave name
 the cached discovery record never needs re-parsing on a mutable update.
 """
 
+import bisect
 import struct
 from typing import Optional, Dict, Any, List, Tuple
 from collections import defaultdict
@@ -32,6 +33,7 @@ from collections import defaultdict
 from electrumx.lib import util
 from electrumx.lib.hash import hash_to_hex_str, sha256
 from electrumx.lib.util import pack_be_uint32, encode_undo, decode_undo
+from electrumx.server.pagination import cursor_page, decode_cursor
 
 try:
     import cbor2
@@ -377,7 +379,8 @@ class RealmIndex:
             return 0
 
         try:
-            from electrumx.server.glyph_index import GlyphDBKeys, GlyphTokenInfo
+            from electrumx.server.glyph_index import (
+                GlyphDBKeys, GlyphTokenInfo, load_metadata_record)
         except ImportError:
             return 0
 
@@ -394,7 +397,7 @@ class RealmIndex:
             if not meta_raw:
                 continue
             try:
-                metadata = cbor2.loads(meta_raw)
+                metadata = load_metadata_record(meta_raw)
             except Exception:
                 continue
             fields = extract_realm_fields(metadata if isinstance(metadata, dict) else {})
@@ -482,10 +485,19 @@ class RealmIndex:
         return self._record_to_api(record) if record else None
 
     def list(self, kind: Optional[str] = None, owner: Optional[str] = None,
-             q: Optional[str] = None, sort: str = 'new', limit: int = 200) -> List[Dict[str, Any]]:
+             q: Optional[str] = None, sort: str = 'new', limit: int = 200,
+             cursor: Optional[str] = None, _use_cursor: bool = False):
         """List indexed realms, filtered + sorted. ``owner`` filters by CURRENT
-        holder. ``q`` is a case-insensitive substring over name + desc + id."""
+        holder. ``q`` is a case-insensitive substring over name + desc + id.
+
+        With ``_use_cursor`` returns ``{entries, next_cursor, has_more}``; the
+        cursor is the sort key of the next realm, so pages stay stable while
+        realms are registered. ValueError if it is malformed.
+        """
         limit = max(1, min(int(limit or 200), 1000))
+        after = None
+        if _use_cursor:
+            after = _decode_sort_key(cursor)
         q_low = q.lower() if isinstance(q, str) and q else None
         out: List[Dict[str, Any]] = []
         seen: set = set()
@@ -517,11 +529,22 @@ class RealmIndex:
         for key, raw in self.db.utxo_db.iterator(prefix=RealmDBKeys.REALM):
             consider(key[len(RealmDBKeys.REALM):], raw)
 
-        if sort == 'name':
-            out.sort(key=lambda r: ((r.get('name') or '').lower(), -(r.get('height') or 0)))
-        else:  # 'new' (default): newest registration first
-            out.sort(key=lambda r: -(r.get('height') or 0))
-        return out[:limit]
+        sort_key = _name_sort_key if sort == 'name' else _new_sort_key
+        out.sort(key=sort_key)
+        if not _use_cursor:
+            return out[:limit]
+        start = 0
+        if after is not None:
+            keys = [sort_key(r) for r in out]
+            try:
+                start = bisect.bisect_left(keys, after)
+            except TypeError:
+                raise ValueError('invalid cursor') from None
+        page = out[start:start + limit]
+        next_key = None
+        if start + limit < len(out):
+            next_key = cbor2.dumps(list(sort_key(out[start + limit])))
+        return cursor_page(page, next_key)
 
     def search(self, q: str, limit: int = 200) -> List[Dict[str, Any]]:
         return self.list(q=q, limit=limit)
@@ -535,6 +558,29 @@ class RealmIndex:
         }
 
 
+def _new_sort_key(record: Dict[str, Any]) -> Tuple:
+    """Newest registration first; the id breaks ties."""
+    return (-(record.get('height') or 0), record.get('id') or '')
+
+
+def _name_sort_key(record: Dict[str, Any]) -> Tuple:
+    return ((record.get('name') or '').lower(), -(record.get('height') or 0),
+            record.get('id') or '')
+
+
+def _decode_sort_key(cursor: Optional[str]) -> Optional[Tuple]:
+    key = decode_cursor(cursor)
+    if key is None:
+        return None
+    try:
+        value = cbor2.loads(key)
+    except Exception:
+        raise ValueError('invalid cursor') from None
+    if not isinstance(value, list) or not value:
+        raise ValueError('invalid cursor')
+    return tuple(value)
+
+
 # API method registration (merged into GLYPH_METHODS by glyph_api.py).
 REALM_METHODS = {
     'realm.list': 'realm_list',
@@ -0,0 +1,105 @@
+"""Height-aware LRU cache of serialised REST responses.
+
+Explorers and wallets poll the same REST URLs every few seconds, and between
+blocks almost every answer is identical. The old ``_TTLCache`` held 500
+entries with FIFO eviction and fixed TTLs, so a burst of cold keys pushed out
+the hot ones and results were recomputed on expiry even when the chain had not
+moved.
+
+``ResponseCache`` keeps finished bodies instead of Python objects:
+
+* **Generations, not TTLs.** Each entry is stored under the generation it was
+  computed at (the REST layer passes the chain tip). A lookup with another
+  generation is a miss and drops the entry, so a new block or a reorg back to
+  the same height never serves stale data. An optional ``max_age`` still
+  bounds entries whose source changes between blocks (background backfills).
+* **LRU by bytes.** Entries are sized by their encoded bodies and the least
+  recently used go first once ``max_bytes`` is exceeded.
+* **Ready to send.** The JSON body, its gzip form (when worth compressing) and
+  a strong ETag are computed once at insert time; a hit is a dict lookup plus
+  a header check, and a matching ``If-None-Match`` answers 304 with no body.
+"""
+
+import gzip
+import os
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from electrumx.lib.hash import sha256
+from electrumx.server import metrics as _metrics
+
+REST_CACHE_MAX_BYTES = int(os.getenv('REST_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Bodies smaller than this are sent as-is; matches the GZipMiddleware floor.
+GZIP_MIN_SIZE = 1024
+
+
+class CachedBody:
+    """One serialised response: body, optional gzip body and ETag."""
+
+    __slots__ = ('body', 'gzip_body', 'etag', 'media_type', 'generation',
+                 'stored_at', 'size')
+
+    def __init__(self, body: bytes, media_type: str, generation: Hashable):
+        self.body = body
+        gz = gzip.compress(body, 6) if len(body) >= GZIP_MIN_SIZE else None
+        # Only keep the compressed form if it actually saves bytes.
+        self.gzip_body = gz if gz is not None and len(gz) < len(body) else None
+        self.etag = sha256(body)[:16].hex()
+        self.media_type = media_type
+        self.generation = generation
+        self.stored_at = time.monotonic()
+        self.size = len(body) + len(self.gzip_body or b'')
+
+
+class ResponseCache:
+    """Byte-bounded LRU of ``CachedBody`` entries (see module doc)."""
+
+    def __init__(self, max_bytes: int = REST_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._store: 'OrderedDict[Hashable, CachedBody]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._store)
+
+    def get(self, key: Hashable, generation: Hashable,
+            max_age: Optional[float] = None) -> Optional[CachedBody]:
+        """Return the entry for ``key`` if it was stored at ``generation``
+        and is younger than ``max_age`` seconds, else None."""
+        entry = self._store.get(key)
+        if entry is not None:
+            if entry.generation != generation or (
+                    max_age is not None
+                    and time.monotonic() - entry.stored_at >= max_age):
+                self._remove(key)
+                entry = None
+            else:
+                self._store.move_to_end(key)
+        _metrics.rest_cache_requests.labels(
+            result='miss' if entry is None else 'hit').inc()
+        return entry
+
+    def put(self, key: Hashable, generation: Hashable, body: bytes,
+            media_type: str = 'application/json') -> CachedBody:
+        """Store ``body`` for ``key`` and return its entry. A body too large
+        to fit at all is returned without being stored."""
+        entry = CachedBody(body, media_type, generation)
+        if key in self._store:
+            self._remove(key)
+        if entry.size <= self.max_bytes:
+            self._store[key] = entry
+            self.nbytes += entry.size
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._store)))
+        _metrics.rest_cache_bytes.set(self.nbytes)
+        return entry
+
+    def clear(self):
+        self._store.clear()
+        self.nbytes = 0
+        _metrics.rest_cache_bytes.set(0)
+
+    def _remove(self, key: Hashable):
+        self.nbytes -= self._store.pop(key).size
@@ -43,9 +43,19 @@ Swap Endpoints:
   /swaps/orders                — Active swap orders
   /swaps/orders/{order_id}     — Single order detail
   /swaps/history               — Trade history
+
+Batch Endpoints (POST, JSON body):
+  /batch/glyphs                        — Glyph details for a list of refs
+  /batch/balances                      — Token balances for (scripthash, ref) pairs
+  /batch/utxos                         — Confirmed UTXOs for a list of scripthashes
+
+Bulk Export Endpoints (streamed NDJSON):
+  /export/tokens                       — Token catalogue
+  /export/tokens/{ref}/holders         — Every holder of a token
+  /export/swaps/{base_ref}/history     — A token's full trade history
 """
 
-from typing import Optional, Dict, Any, List, Set
+from typing import Optional, Dict, Any, List
 import asyncio
 import base64
 import hmac
@@ -53,22 +63,37 @@ import json
 import logging
 import os
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 from electrumx.lib.glyph import MAX_JSONSAFE_NODES, MetadataTooComplex
-from electrumx.lib.hash import hash_to_hex_str
+from electrumx.lib.hash import hash_to_hex_str, sha256
 from electrumx.server import metrics as _metrics
 from electrumx.server.rate_limiter import (
     DEFAULT_TRUSTED_PROXIES as _DEFAULT_TRUSTED_PROXIES,
     IPRateLimiter as _IPRateLimiter,
     peer_in_networks as _peer_in_networks,
 )
+from electrumx.server.pagination import PAGINATION_MAX_OFFSET, decode_cursor
+from electrumx.server.ndjson_export import (
+    NDJSON_MEDIA_TYPE, ExportSlots, NdjsonExport,
+)
+from electrumx.server.read_executor import ReadExecutor, ReaderBusy, ReaderTimeout
+from electrumx.server.response_cache import CachedBody, ResponseCache
+from electrumx.server.ws_hub import ALL_SWAPS, ALL_TOKENS, WsHub, encode_message
+
+# orjson is optional: large list responses are encoded several times faster
+# with it; without it the standard library encoder is used.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from fastapi import FastAPI, HTTPException, Query, Path, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import Response as _Response
-from pydantic import BaseModel
+from fastapi.responses import Response as _Response, StreamingResponse
+from pydantic import BaseModel, Field
 import time as _time
 
 _logger = logging.getLogger(__name__)
@@ -90,26 +115,107 @@ def _internal_error(exc: Exception, context: str = "") -> HTTPException:
     )
     return HTTPException(status_code=500, detail="Internal error")
 
-class _TTLCache:
-    """TTL cache with bounded max_size (R12: prevents unbounded memory growth)."""
-    def __init__(self, max_size: int = None):
-        self._store: Dict[str, tuple] = {}
-        self._max_size = max_size or int(os.getenv('REST_CACHE_MAX_ENTRIES', '500'))
+# Serialised responses cached per chain tip (electrumx/server/response_cache.py).
+_response_cache = ResponseCache()
+
 
-    def get(self, key, ttl=30):
-        entry = self._store.get(key)
-        if entry and _time.monotonic() - entry[1] < ttl:
-            return entry[0]
+def _chain_generation():
+    """The chain tip cached responses are keyed on, or None if unknown."""
+    if _db is None:
         return None
+    return (getattr(_db, 'db_height', None), getattr(_db, 'db_tip', None))
+
+
+def _json_bytes(content: Any) -> bytes:
+    """Serialise a handler result to compact UTF-8 JSON.
+
+    orjson encodes plain dicts, lists and scalars directly and hands anything
+    else (bytes, sets, models) to ``jsonable_encoder``. Without orjson, or for
+    values it refuses (integers beyond 64 bits), the output is what FastAPI's
+    own JSONResponse would produce.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=jsonable_encoder,
+                                option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False,
+                      allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class _FastJSONResponse(_Response):
+    """JSON response encoded by ``_json_bytes``.
+
+    It is the app's default response class. Handlers returning large lists
+    construct it themselves, which skips FastAPI's ``jsonable_encoder`` pass
+    over the whole result; GZipMiddleware still negotiates compression.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _json_bytes(content)
+
+
+def _cached_response(request: Request, entry: CachedBody) -> _Response:
+    """Send a cached body: 304 on a matching If-None-Match, the stored gzip
+    body when the client accepts it, otherwise the plain body."""
+    headers = {
+        "ETag": f'"{entry.etag}"',
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request, entry.etag):
+        _metrics.rest_cache_requests.labels(result='not_modified').inc()
+        return _Response(status_code=304, headers=headers)
+    body = entry.body
+    if entry.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        body = entry.gzip_body
+        headers["Content-Encoding"] = "gzip"    # GZipMiddleware skips it
+    return _Response(content=body, media_type=entry.media_type, headers=headers)
+
+
+async def _cached_json(request: Request, key: tuple, compute, *,
+                       max_age: Optional[float] = None) -> _Response:
+    """Answer from the response cache, computing and storing on a miss.
+
+    ``key`` identifies the route and its validated parameters; entries are
+    also bound to the current chain tip, so a new block (or a reorg) makes
+    them misses. ``compute`` is a zero-argument coroutine function returning
+    the JSON-able result; exceptions from it propagate and nothing is cached.
+    """
+    generation = _chain_generation()
+    entry = None
+    if generation is not None:
+        entry = _response_cache.get(key, generation, max_age)
+    if entry is None:
+        body = _json_bytes(await compute())
+        if generation is None:
+            entry = CachedBody(body, "application/json", None)
+        else:
+            entry = _response_cache.put(key, generation, body)
+    return _cached_response(request, entry)
+
+# Synchronous index queries run on a bounded reader pool, not the event loop
+# the Electrum sessions share (see electrumx/server/read_executor.py).
+_reader = ReadExecutor()
 
-    def put(self, key, value):
-        if key not in self._store and len(self._store) >= self._max_size:
-            # Evict oldest entry (insertion-order guaranteed in Python 3.7+)
-            oldest_key = next(iter(self._store))
-            del self._store[oldest_key]
-        self._store[key] = (value, _time.monotonic())
 
-_cache = _TTLCache()
+async def _read(func, *args, **kwargs):
+    """Run a synchronous index query on the reader pool.
+
+    A query already at its queue limit answers 503 (with Retry-After) rather
+    than queueing behind a slow scan; one that overruns the reader timeout
+    answers 504.
+    """
+    try:
+        return await _reader.run(func, *args, **kwargs)
+    except ReaderBusy:
+        raise HTTPException(status_code=503, detail="Server busy, retry shortly",
+                            headers={"Retry-After": "1"})
+    except ReaderTimeout:
+        raise HTTPException(status_code=504, detail="Query timed out")
 
 # M1 (DoS): hard cap on the rich-list pagination offset. Without this, an
 # attacker could rotate `offset` (previously only ge=0) to bust the per-(limit,
@@ -125,6 +231,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=_FastJSONResponse,
 )
 
 # REST security posture: fail closed by network EXPOSURE, not by a free-text env
@@ -204,6 +311,22 @@ def _parse_ref(ref: str) -> bytes:
         raise HTTPException(status_code=400, detail="Invalid ref format")
 
 
+def _check_cursor(cursor: Optional[str]) -> None:
+    """Reject a malformed pagination cursor with HTTP 400."""
+    try:
+        decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+_OFFSET_QUERY = dict(default=0, ge=0, le=PAGINATION_MAX_OFFSET,
+                     description="Skip this many rows; capped, page further with cursor")
+_CURSOR_QUERY = dict(default=None, max_length=400,
+                     description="Opaque pagination cursor from previous response "
+                                 "next_cursor; switches the response to "
+                                 "{entries, next_cursor, has_more}")
+
+
 def _resolve_ref(ref: str) -> bytes:
     """Resolve a path ref to the canonical 36 raw key bytes for index lookups.
 
@@ -265,6 +388,64 @@ def _resolve_dmint_ref(ref: str) -> str:
     return candidates[0].hex()
 
 
+# Content served by hash (blobs) never changes under its URL.
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=604800, immutable"
+# Icons are served by ref, and a mutable token's metadata update changes the
+# icon under the same URL: cache briefly, then revalidate by ETag.
+_REVALIDATE_CACHE_CONTROL = "public, max-age=60"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match names ``etag`` (or is ``*``)."""
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    tags = [t.strip() for t in inm.split(",")]
+    return "*" in tags or f'"{etag}"' in tags or f'W/"{etag}"' in tags
+
+
+def _bytes_response(request: Request, content: bytes, media_type: Optional[str],
+                    etag: str, cache_control: str = _IMMUTABLE_CACHE_CONTROL) -> _Response:
+    """Serve bytes with a strong ETag and single-range support.
+
+    ``If-None-Match`` on the current ETag answers 304 with no body; a single
+    ``bytes=`` range answers 206 (GZipMiddleware leaves partial responses
+    alone), an unsatisfiable one 416. Multi-range and malformed headers get the
+    whole body, which RFC 9110 allows.
+    """
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    media_type = media_type if isinstance(media_type, str) else "application/octet-stream"
+    if _etag_matches(request, etag):
+        return _Response(status_code=304, headers=headers)
+
+    rng = request.headers.get("range", "")
+    if rng.startswith("bytes=") and "," not in rng:
+        first, _, last = rng[6:].strip().partition("-")
+        size = len(content)
+        span = None
+        try:
+            if first:
+                span = (int(first), min(int(last), size - 1) if last else size - 1)
+            elif last and int(last) > 0:
+                span = (max(0, size - int(last)), size - 1)  # suffix range
+        except ValueError:
+            span = None
+        if span is not None:
+            start, end = span
+            if 0 <= start <= end:
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                return _Response(content=content[start:end + 1], status_code=206,
+                                 media_type=media_type, headers=headers)
+            if start >= size:
+                headers["Content-Range"] = f"bytes */{size}"
+                return _Response(status_code=416, headers=headers)
+    return _Response(content=content, media_type=media_type, headers=headers)
+
+
 def _resolve_scripthash(ident: str) -> bytes:
     """Resolve an ownership identifier to a 32-byte Electrum scripthash.
 
@@ -349,7 +530,11 @@ def _get_client_ip(request: Request) -> str:
     return peer if peer else 'unknown'
 
 
-def _rate_limit(request: Request):
+def _rate_limit(request: Request, cost: float = 1.0, strict: bool = True):
+    """Charge ``cost`` tokens to the client's bucket, answering 429 when it
+    cannot pay. The middleware charges 1 per request; batch endpoints charge
+    their per-item work on top. With ``strict=False`` the charge is taken even
+    if it overdraws the bucket (for work only known after it was done)."""
     global _rate_request_count, _rate_last_cleanup_ts
     limit_per_minute = int(os.getenv('REST_RATE_LIMIT_PER_MIN', '600'))
     burst = int(os.getenv('REST_RATE_LIMIT_BURST', str(limit_per_minute)))
@@ -379,9 +564,9 @@ def _rate_limit(request: Request):
     bucket.tokens = min(float(burst), bucket.tokens + elapsed * refill_per_sec)
     bucket.last_ts = now
 
-    if bucket.tokens < 1.0:
+    if strict and bucket.tokens < cost:
         raise HTTPException(status_code=429, detail='Rate limit exceeded')
-    bucket.tokens -= 1.0
+    bucket.tokens -= cost
 
 
 @app.middleware("http")
@@ -421,7 +606,7 @@ async def _security_middleware(request: Request, call_next):
         '/health', '/status',
         '/analytics', '/analytics/',
         '/blocks', '/blocks/', '/block/',
-        '/glyphs', '/glyphs/', '/glyph/',
+        '/glyphs', '/glyphs/', '/glyph/', '/blobs/',
         '/tokens', '/tokens/',
         '/transaction', '/transaction/',
         '/dmint', '/dmint/',
@@ -437,8 +622,14 @@ async def _security_middleware(request: Request, call_next):
     # Protect only write/broadcast operations (regardless of method)
     protected_operations = ('/broadcast', '/submit', '/key-reveal')
 
+    # Read-only lookups that take their keys in a POST body.
+    public_post_paths = ('/batch/',)
+
     try:
-        if request.method != 'GET' or any(path.startswith(p) for p in protected_operations):
+        if (request.method == 'POST' and path.startswith(public_post_paths)
+                and not any(path.startswith(p) for p in protected_operations)):
+            _rate_limit(request)
+        elif request.method != 'GET' or any(path.startswith(p) for p in protected_operations):
             _require_api_key(request.headers.get('x-api-key'))
             _rate_limit(request)
         elif any(path.startswith(p) for p in public_paths):
@@ -596,100 +787,138 @@ def _ensure_analytics_index():
 
 
 @app.get("/analytics/stats", tags=["Analytics"])
-def get_analytics_stats():
+async def get_analytics_stats(request: Request):
     _ensure_analytics_index()
-    c = _cache.get('a_stats', 120)
-    if c: return c
     try:
-        r = _analytics_index.get_stats()
+        return await _cached_json(
+            request, ('a_stats',),
+            lambda: _read(_analytics_index.get_stats), max_age=120)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e, "/analytics/stats")
-    _cache.put('a_stats', r)
-    return r
 
 
 @app.get("/analytics/balance-distribution", tags=["Analytics"])
-def get_balance_distribution():
+async def get_balance_distribution(request: Request):
     _ensure_analytics_index()
-    c = _cache.get('a_bdist', 30)
-    if c: return c
     try:
-        r = _analytics_index.get_balance_distribution()
+        return await _cached_json(
+            request, ('a_bdist',),
+            lambda: _read(_analytics_index.get_balance_distribution), max_age=30)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e, "/analytics/balance-distribution")
-    _cache.put('a_bdist', r)
-    return r
 
 
 @app.get("/analytics/supply-aging", tags=["Analytics"])
-def get_supply_aging():
+async def get_supply_aging(request: Request):
     _ensure_analytics_index()
-    c = _cache.get('a_aging', 30)
-    if c: return c
     try:
-        r = _analytics_index.get_supply_aging()
+        return await _cached_json(
+            request, ('a_aging',),
+            lambda: _read(_analytics_index.get_supply_aging), max_age=30)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e, "/analytics/supply-aging")
-    _cache.put('a_aging', r)
-    return r
 
 
 @app.get("/analytics/top-addresses", tags=["Analytics"])
-def get_top_addresses(
+async def get_top_addresses(
+    request: Request,
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0, le=_TOP_ADDRESSES_MAX_OFFSET),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
     _ensure_analytics_index()
-    ck = f'a_top_{limit}_{offset}'
-    c = _cache.get(ck, 120)
-    if c: return c
     try:
-        r = _analytics_index.get_top_addresses(limit=limit, offset=offset)
+        if cursor is None:
+            return await _cached_json(
+                request, ('a_top', limit, offset),
+                lambda: _read(_analytics_index.get_top_addresses, limit=limit, offset=offset),
+                max_age=120)
+        _check_cursor(cursor)
+        return await _cached_json(
+            request, ('a_top', limit, cursor),
+            lambda: _read(_analytics_index.get_top_addresses, limit=limit,
+                          cursor=cursor or None, _use_cursor=True),
+            max_age=120)
+    except HTTPException:
+        raise
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise _internal_error(e, "/analytics/top-addresses")
-    _cache.put(ck, r)
-    return r
 
 
 @app.get("/analytics/movement", tags=["Analytics"])
-def get_movement(days: int = Query(default=30, ge=1, le=3650)):
+async def get_movement(request: Request, days: int = Query(default=30, ge=1, le=3650)):
     _ensure_analytics_index()
-    ck = f'a_move_{days}'
-    c = _cache.get(ck, 300)
-    if c: return c
     try:
-        r = _analytics_index.get_movement(days=days)
+        return await _cached_json(
+            request, ('a_move', days),
+            lambda: _read(_analytics_index.get_movement, days=days), max_age=300)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e, "/analytics/movement")
-    _cache.put(ck, r)
-    return r
 
 
 # =============================================================================
 # BLOCKS & TRANSACTIONS
 # =============================================================================
 
+def _block_entry(height: int, header: bytes, summary) -> Dict[str, Any]:
+    """One block for the /blocks routes: header fields plus, when recorded,
+    the per-height summary (tx count, size, overlay activity)."""
+    import struct as _struct
+    entry = {
+        "height": height,
+        "hash": None,
+        "header_hex": header.hex() if header else None,
+        "timestamp": _struct.unpack_from('<I', header, 68)[0] if len(header) >= 80 else None,
+    }
+    coin = getattr(_db, 'coin', None)
+    if coin is not None and header:
+        try:
+            entry["hash"] = hash_to_hex_str(coin.header_hash(header))
+        except Exception:
+            pass
+    entry["summary"] = summary.to_dict() if summary is not None else None
+    return entry
+
+
 @app.get("/blocks/recent", tags=["Blocks"])
-async def get_recent_blocks(limit: int = Query(default=10, le=100)):
-    """Get recent blocks."""
+async def get_recent_blocks(
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=100),
+    before: Optional[int] = Query(default=None, ge=0, description="Return blocks below this height (for paging back)"),
+):
+    """Get recent blocks, newest first.
+
+    Served from one contiguous header read and one range scan of the per-height
+    block summaries. ``summary`` is null for blocks indexed before summaries
+    were recorded.
+    """
     if not _db:
         raise HTTPException(status_code=503, detail="Database not available")
 
     height = _db.db_height
-    blocks = []
+    top = height if before is None else min(height, before - 1)
 
-    for h in range(height, max(0, height - limit), -1):
-        try:
-            header_data, count = await _db.read_headers(h, 1)
-            if header_data and count > 0:
-                blocks.append({
-                    "height": h,
-                    "header_hex": header_data.hex(),
-                })
-        except Exception:
-            continue
+    async def recent_blocks():
+        rows = await _read(_db.fs_block_summaries, top, limit) if top >= 0 else []
+        return {"blocks": [_block_entry(*row) for row in rows],
+                "current_height": height}
 
-    return {"blocks": blocks, "current_height": height}
+    try:
+        return await _cached_json(request, ('blocks_recent', top, limit), recent_blocks)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
 
 
 @app.get("/block/{height}", tags=["Blocks"])
@@ -702,11 +931,12 @@ async def get_block(height: int = Path(..., ge=0)):
         raise HTTPException(status_code=404, detail="Block not found")
 
     try:
-        header_data, count = await _db.read_headers(height, 1)
-        return {
-            "height": height,
-            "header_hex": header_data.hex() if header_data and count > 0 else None,
-        }
+        rows = await _read(_db.fs_block_summaries, height, 1)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Block not found")
+        return _block_entry(*rows[0])
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -736,7 +966,7 @@ async def get_dmint_contract_icon_debug(ref: str = _REF_PATH):
 
 
 @app.get("/dmint/contracts/{ref}/icon", tags=["dMint"])
-async def get_dmint_contract_icon(ref: str = _REF_PATH):
+async def get_dmint_contract_icon(request: Request, ref: str = _REF_PATH):
     """Serve a contract's embedded icon as raw image bytes.
 
     Lets clients lazily fetch icons per-token (and lets the browser HTTP-cache
@@ -760,13 +990,10 @@ async def get_dmint_contract_icon(ref: str = _REF_PATH):
         except (ValueError, TypeError):
             raise HTTPException(status_code=422, detail="Icon data is not valid hex")
 
-        media_type = contract.get("icon_type") or "application/octet-stream"
-        # Icons are immutable per ref — cache hard so a token's icon is fetched once.
-        return _Response(
-            content=raw,
-            media_type=media_type,
-            headers={"Cache-Control": "public, max-age=604800, immutable"},
-        )
+        # Revalidate by content hash: the icon can change under this ref.
+        return _bytes_response(request, raw, contract.get("icon_type") or None,
+                               contract.get("icon_hash") or sha256(raw).hex(),
+                               _REVALIDATE_CACHE_CONTROL)
     except HTTPException:
         raise
     except Exception as e:
@@ -801,18 +1028,37 @@ def _ensure_glyph_index():
 
 @app.get("/glyphs", tags=["Glyphs"])
 async def get_all_glyphs(
+    request: Request,
     limit: int = Query(default=100, le=500),
-    offset: int = Query(default=0, ge=0),
-    token_type: Optional[int] = Query(default=None, description="Filter by token type ID (1=FT, 2=NFT, 3=DAT, 4=DMINT)")
+    offset: int = Query(**_OFFSET_QUERY),
+    token_type: Optional[int] = Query(default=None, description="Filter by token type ID (1=FT, 2=NFT, 3=DAT, 4=DMINT)"),
+    cursor: Optional[str] = Query(default=None, description="Opaque pagination cursor from previous response next_cursor (takes precedence over offset)"),
+    order: str = Query(default="ref", pattern="^(ref|recent|deploy)$", description="'ref' (legacy hash order), 'recent' (most recently changed first) or 'deploy' (oldest deploy first). Cursors are order-specific."),
 ):
-    """Get all indexed Glyph tokens with pagination."""
+    """Get all indexed Glyph tokens with pagination.
+
+    Rows carry icon pointers rather than inline payloads: an embedded icon is
+    described by ``embed.{type,size,hash}`` and fetched from ``embed.url``.
+    """
     _ensure_glyph_index()
 
-    try:
-        result = _glyph_index.get_all_tokens_summary(
+    async def summary_page():
+        result = await _read(_glyph_index.get_all_tokens_summary,
             limit=limit, offset=offset, token_type=token_type,
+            cursor=cursor, order=order,
         )
+        if isinstance(result, dict):
+            for item in result.get('tokens') or ():
+                embed = item.get('embed') if isinstance(item, dict) else None
+                if isinstance(embed, dict) and embed.get('size') and item.get('ref'):
+                    embed['url'] = f"/glyphs/{item['ref']}/icon"
         return result
+
+    try:
+        return await _cached_json(
+            request, ('glyphs', limit, offset, token_type, cursor, order), summary_page)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -830,21 +1076,20 @@ async def search_glyphs(
         protocol_list = None
         if protocols:
             protocol_list = [int(p.strip()) for p in protocols.split(',') if p.strip()]
-        result = _glyph_index.search_tokens(q, protocols=protocol_list, limit=limit)
-        return {"query": q, "results": result, "count": len(result)}
+        result = await _read(_glyph_index.search_tokens, q, protocols=protocol_list, limit=limit)
+        return _FastJSONResponse({"query": q, "results": result, "count": len(result)})
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
 
 @app.get("/glyphs/stats", tags=["Glyphs"])
-def get_glyph_stats():
+async def get_glyph_stats(request: Request):
     """Get Glyph token indexing statistics (counts by type and version)."""
     _ensure_glyph_index()
-    c = _cache.get('g_stats', 120)
-    if c: return c
-    r = _glyph_index.get_stats()
-    _cache.put('g_stats', r)
-    return r
+    return await _cached_json(request, ('g_stats',),
+                              lambda: _read(_glyph_index.get_stats), max_age=120)
 
 
 @app.get("/glyphs/by-type/{type_id}", tags=["Glyphs"])
@@ -858,8 +1103,10 @@ async def get_glyphs_by_type(
     _ensure_glyph_index()
 
     try:
-        result = _glyph_index.get_tokens_by_type(type_id, limit=limit, cursor=cursor, order=order)
-        return {"type_id": type_id, "order": order, **result}
+        result = await _read(_glyph_index.get_tokens_by_type, type_id, limit=limit, cursor=cursor, order=order)
+        return _FastJSONResponse({"type_id": type_id, "order": order, **result})
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -875,10 +1122,12 @@ async def get_glyphs_recent(
 
     try:
         if type_id is not None:
-            result = _glyph_index.get_tokens_by_type(type_id, limit=limit, cursor=cursor, order="recent")
+            result = await _read(_glyph_index.get_tokens_by_type, type_id, limit=limit, cursor=cursor, order="recent")
         else:
-            result = _glyph_index.get_recent_tokens(limit=limit, cursor=cursor)
-        return {"type_id": type_id, "order": "recent", **result}
+            result = await _read(_glyph_index.get_recent_tokens, limit=limit, cursor=cursor)
+        return _FastJSONResponse({"type_id": type_id, "order": "recent", **result})
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -901,26 +1150,35 @@ async def list_encrypted_tokens(
     """
     _ensure_glyph_index()
     try:
-        result = _glyph_index.list_encrypted_tokens(
+        result = await _read(_glyph_index.list_encrypted_tokens,
             limit=limit, cursor=cursor, timelocked_only=timelocked_only
         )
         return {**result, "timelocked_only": timelocked_only}
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
 
 @app.get("/glyphs/{ref}", tags=["Glyphs"])
-async def get_glyph(ref: str = _REF_PATH):
+async def get_glyph(request: Request, ref: str = _REF_PATH):
     """Get Glyph token by reference (72 hex chars = 36 bytes)."""
     _ensure_glyph_index()
 
-    try:
-        ref_bytes = _resolve_ref(ref)
+    def glyph_detail(ref_bytes):
         token = _glyph_index.get_token(ref_bytes)
-        if not token:
+        return _glyph_index._token_to_dict(token) if token else None
+
+    async def detail(ref_bytes):
+        result = await _read(glyph_detail, ref_bytes)
+        if result is None:
             raise HTTPException(status_code=404, detail="Token not found")
+        return result
 
-        return _glyph_index._token_to_dict(token)
+    try:
+        ref_bytes = _resolve_ref(ref)
+        return await _cached_json(request, ('glyph', ref_bytes),
+                                  lambda: detail(ref_bytes))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ref format")
     except HTTPException:
@@ -929,8 +1187,65 @@ async def get_glyph(ref: str = _REF_PATH):
         raise _internal_error(e)
 
 
+@app.get("/glyphs/{ref}/icon", tags=["Glyphs"])
+async def get_glyph_icon(request: Request, ref: str = _REF_PATH):
+    """Serve a token's embedded icon as raw image bytes.
+
+    The byte endpoint behind the ``embed.url`` pointers in ``/glyphs`` rows.
+    Returns 404 when the token has no embedded icon (remote icons carry their
+    own ``remote.url``).
+    """
+    _ensure_glyph_index()
+
+    try:
+        icon = await _read(_glyph_index.get_embedded_icon, _resolve_ref(ref))
+        if not icon:
+            raise HTTPException(status_code=404, detail="Token has no embedded icon")
+        raw, media_type, digest = icon
+        # A mutable token's icon can change under this ref, so clients
+        # revalidate; the ETag is the embed.hash of the summary row.
+        return _bytes_response(request, raw, media_type, digest,
+                               _REVALIDATE_CACHE_CONTROL)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+
+@app.get("/blobs/{blob_hash}", tags=["Glyphs"])
+async def get_blob(
+    request: Request,
+    blob_hash: str = Path(..., min_length=64, max_length=64,
+                          description="sha256 of the payload, 64 hex"),
+):
+    """Serve a payload from the content-addressed blob store.
+
+    Large byte strings in token metadata (embedded images, files) are stored
+    once per distinct content and addressed by their sha256 — the ``hash`` in
+    a ``/glyphs`` row's ``embed`` pointer. Supports ``ETag``/``If-None-Match``
+    and single ``Range`` requests.
+    """
+    _ensure_glyph_index()
+
+    try:
+        digest = bytes.fromhex(blob_hash)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid blob hash")
+    try:
+        blob = await _read(_glyph_index.get_blob, digest)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Blob not found")
+        payload, media_type = blob
+        return _bytes_response(request, payload, media_type, blob_hash.lower())
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+
 @app.get("/tokens/{ref}/holders", tags=["Token Analytics"])
 async def get_token_holders(
+    request: Request,
     ref: str = _REF_PATH,
     limit: int = Query(default=100, le=500),
     cursor: Optional[str] = Query(default=None, description="Opaque pagination cursor from previous response next_cursor"),
@@ -940,9 +1255,14 @@ async def get_token_holders(
 
     try:
         ref_bytes = _resolve_ref(ref)
-        return _glyph_index.get_token_holders(ref_bytes, limit=limit, cursor=cursor)
+        return await _cached_json(
+            request, ('holders', ref_bytes, limit, cursor),
+            lambda: _read(_glyph_index.get_token_holders, ref_bytes,
+                          limit=limit, cursor=cursor))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ref format")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -967,7 +1287,10 @@ async def get_address_glyphs(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid scripthash or address")
     try:
-        return _glyph_index.get_balances_for_scripthash(sh, limit=limit, cursor=cursor)
+        return _FastJSONResponse(await _read(
+            _glyph_index.get_balances_for_scripthash, sh, limit=limit, cursor=cursor))
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -977,7 +1300,8 @@ async def get_address_history(
     ident: str = Path(..., min_length=1, max_length=128,
                       description="Electrum scripthash (64 hex) or base58 address"),
     limit: int = Query(default=25, ge=1, le=200),
-    offset: int = Query(default=0, ge=0, description="Skip this many recent txs"),
+    offset: int = Query(default=0, ge=0, le=PAGINATION_MAX_OFFSET,
+                        description="Skip this many recent txs"),
 ):
     """On-chain transaction history for an address, newest first.
 
@@ -1001,12 +1325,10 @@ async def get_address_history(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid scripthash or address")
 
-        # Fetch full history newest-first to get the total count.
-        # tx hash retrieval is cheap; only getrawtransaction enrichment
-        # (below) is expensive, and that only runs on the page slice.
-        history = await _db.limited_history(hashX, limit=None, reverse=True)
-        total_count = len(history)
-        page = history[offset:offset + limit]
+        # Read only the requested slice, newest first; the rest of the
+        # history is counted but its tx hashes are never read.
+        page, total_count = await _db.history_page(
+            hashX, offset=offset, limit=limit, reverse=True)
 
         # Resolve the address for display from the owner index
         display_address = None
@@ -1022,15 +1344,27 @@ async def get_address_history(
         except Exception:
             pass
 
-        # Compute the expected scripthash for matching outputs
-        # scripthash = sha256(scriptPubKey) reversed
         import struct as _struct
         from electrumx.lib.hash import sha256 as _sha256
 
+        # One header pass and one vectored daemon request for the whole
+        # page. Block timestamps sit at offset 68 of the 80-byte header:
+        # version(4) + prevhash(32) + merkle(32) + time(4) + bits(4) + nonce(4)
+        tx_hashes_hex = [hash_to_hex_str(tx_hash) for tx_hash, _height in page]
+        try:
+            headers = await _db.raw_headers(
+                [height for _tx_hash, height in page if height > 0])
+        except Exception:
+            headers = {}
+        try:
+            raw_txs = await _daemon.getrawtransactions(tx_hashes_hex, verbose=True)
+        except Exception:
+            raw_txs = [None] * len(page)
+
         # Enrich each tx with direction and amount
         results = []
-        for tx_hash_bytes, height in page:
-            tx_hash_hex = hash_to_hex_str(tx_hash_bytes)
+        for (tx_hash_bytes, height), tx_hash_hex, raw_tx in zip(
+                page, tx_hashes_hex, raw_txs):
             entry = {
                 'txid': tx_hash_hex,
                 'height': height,
@@ -1039,21 +1373,13 @@ async def get_address_history(
                 'amount': 0,
                 'token_refs': [],
             }
+            header = headers.get(height)
+            if header:
+                entry['timestamp'] = _struct.unpack_from('<I', header, 68)[0]
 
-            # Get block timestamp from header
-            # Bitcoin header: version(4) + prevhash(32) + merkle(32) + time(4) + bits(4) + nonce(4)
-            # Timestamp is at offset 68
-            try:
-                if height > 0:
-                    header = await _db.raw_header(height)
-                    ts = _struct.unpack_from('<I', header, 68)[0]
-                    entry['timestamp'] = ts
-            except Exception:
-                pass
-
-            # Fetch raw tx to determine direction and amount
             try:
-                raw_tx = await _daemon.getrawtransaction(tx_hash_hex, True)
+                if not raw_tx:
+                    raise ValueError('transaction not found')
                 vin = raw_tx.get('vin', [])
                 vout = raw_tx.get('vout', [])
 
@@ -1123,7 +1449,7 @@ async def get_token_supply(ref: str = _REF_PATH):
 
     try:
         ref_bytes = _resolve_ref(ref)
-        result = _glyph_index.get_token_supply(ref_bytes)
+        result = await _read(_glyph_index.get_token_supply, ref_bytes)
         if not result:
             raise HTTPException(status_code=404, detail="Token not found")
         return result
@@ -1139,16 +1465,28 @@ async def get_token_supply(ref: str = _REF_PATH):
 async def get_token_burns(
     ref: str = _REF_PATH,
     limit: int = Query(default=50, le=200),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(**_OFFSET_QUERY),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
-    """Get token burn history."""
+    """Get token burn history.
+
+    Supplying ``cursor`` (empty on the first call) switches the response to
+    ``{entries, next_cursor, has_more}``. See docs/pagination-cursors.md.
+    """
     _ensure_glyph_index()
 
     try:
         ref_bytes = _resolve_ref(ref)
-        return _glyph_index.get_token_burns(ref_bytes, limit=limit, offset=offset)
+        if cursor is None:
+            return await _read(_glyph_index.get_token_burns, ref_bytes, limit=limit, offset=offset)
+        _check_cursor(cursor)
+        return await _read(_glyph_index.get_token_burns,
+            ref_bytes, limit=limit, cursor=cursor or None, _use_cursor=True
+        )
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ref format")
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1157,16 +1495,28 @@ async def get_token_burns(
 async def get_token_trades(
     ref: str = _REF_PATH,
     limit: int = Query(default=50, le=200),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(**_OFFSET_QUERY),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
-    """Get token trade/transfer history."""
+    """Get token trade/transfer history.
+
+    Supplying ``cursor`` (empty on the first call) switches the response to
+    ``{entries, next_cursor, has_more}``. See docs/pagination-cursors.md.
+    """
     _ensure_glyph_index()
 
     try:
         ref_bytes = _resolve_ref(ref)
-        return _glyph_index.get_token_trades(ref_bytes, limit=limit, offset=offset)
+        if cursor is None:
+            return await _read(_glyph_index.get_token_trades, ref_bytes, limit=limit, offset=offset)
+        _check_cursor(cursor)
+        return await _read(_glyph_index.get_token_trades,
+            ref_bytes, limit=limit, cursor=cursor or None, _use_cursor=True
+        )
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ref format")
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1181,9 +1531,11 @@ async def get_top_token_holders(
 
     try:
         ref_bytes = _resolve_ref(ref)
-        return _glyph_index.get_top_holders(ref_bytes, limit=limit)
+        return await _read(_glyph_index.get_top_holders, ref_bytes, limit=limit)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ref format")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1192,7 +1544,7 @@ async def get_top_token_holders(
 async def get_token_history(
     ref: str = _REF_PATH,
     limit: int = Query(default=100, le=500),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(**_OFFSET_QUERY),
     cursor: Optional[str] = Query(default=None),
 ):
     """Get full event history (deploy, mint, transfer, burn, update) for a token.
@@ -1207,12 +1559,14 @@ async def get_token_history(
     try:
         ref_bytes = _resolve_ref(ref)
         if cursor is None:
-            return _glyph_index.get_token_history(ref_bytes, limit=limit, offset=offset)
-        return _glyph_index.get_token_history(
+            return await _read(_glyph_index.get_token_history, ref_bytes, limit=limit, offset=offset)
+        return await _read(_glyph_index.get_token_history,
             ref_bytes, limit=limit, cursor=cursor or None, _use_cursor=True
         )
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ref format")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1282,7 +1636,7 @@ async def get_token_metadata(ref: str = _REF_PATH):
             raise HTTPException(status_code=404, detail="Token not found")
 
         if token.metadata_hash:
-            metadata = _glyph_index.get_metadata(token.metadata_hash)
+            metadata = await _read(_glyph_index.get_metadata, token.metadata_hash)
             if metadata:
                 return {"ref": ref, "metadata": _sanitize_cbor(metadata)}
         return {"ref": ref, "metadata": None}
@@ -1395,7 +1749,7 @@ async def get_dmint_contracts(
     """Get list of mineable dMint contracts."""
     _ensure_dmint()
 
-    try:
+    async def contracts_page():
         if format in ('simple', 'extended'):
             if format == 'simple':
                 return _dmint_contracts.get_contracts_simple()
@@ -1444,6 +1798,13 @@ async def get_dmint_contracts(
             return result
 
         return _dmint_contracts.get_contracts_extended(active_only=active_only)
+
+    try:
+        return await _cached_json(
+            request, ('dmint_contracts', version, view, status, algorithm_ids,
+                      sort_field, sort_dir, limit, cursor, include_icon_data,
+                      format, active_only),
+            contracts_page)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1609,16 +1970,27 @@ async def get_dmint_contract_daa(
 async def get_dmint_mint_history(
     ref: str = _REF_PATH,
     limit: int = Query(default=100, le=500),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(**_OFFSET_QUERY),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
-    """Get mint history for a dMint token, including minted amounts per event."""
+    """Get mint history for a dMint token, including minted amounts per event.
+
+    With ``cursor`` the ``mints`` page carries ``next_cursor``/``has_more``.
+    """
     _ensure_glyph_index()
 
     try:
         ref_bytes = _resolve_ref(ref)
-        return _glyph_index.get_mint_history(ref_bytes, limit=limit, offset=offset)
+        if cursor is None:
+            return await _read(_glyph_index.get_mint_history, ref_bytes, limit=limit, offset=offset)
+        _check_cursor(cursor)
+        return await _read(_glyph_index.get_mint_history,
+            ref_bytes, limit=limit, cursor=cursor or None, _use_cursor=True
+        )
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ref format")
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1633,7 +2005,10 @@ async def get_dmint_tokens(
     _ensure_glyph_index()
 
     try:
-        return _glyph_index.get_dmint_tokens(limit=limit, cursor=cursor, active_only=active_only)
+        return _FastJSONResponse(await _read(
+            _glyph_index.get_dmint_tokens, limit=limit, cursor=cursor, active_only=active_only))
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1723,10 +2098,15 @@ async def wave_resolve(
         name = name[:dot_idx]
 
     try:
-        result = _wave_index.resolve(name, include_duplicates=include_duplicates)
+        # name_cache is only safe to read on the loop (see pending_duplicates)
+        result = await _read(_wave_index.resolve, name,
+                             include_duplicates=include_duplicates,
+                             pending=_wave_index.pending_duplicates(name))
         if not result:
             return {"name": name, "available": True, "resolved": False}
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1737,7 +2117,9 @@ async def wave_check_available(name: str = Path(..., min_length=1, max_length=63
     _ensure_wave()
 
     try:
-        return _wave_index.check_available(name)
+        return await _read(_wave_index.check_available, name)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1752,10 +2134,13 @@ async def wave_get_all_registrations(name: str = Path(..., min_length=1, max_len
     _ensure_wave()
 
     try:
-        result = _wave_index.get_all_registrations(name)
+        result = await _read(_wave_index.get_all_registrations, name,
+                             pending=_wave_index.pending_duplicates(name))
         if not result or not result.get('registered', False):
             return {"name": name, "registered": False, "available": True}
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1764,13 +2149,15 @@ async def wave_get_all_registrations(name: str = Path(..., min_length=1, max_len
 async def wave_get_subdomains(
     name: str = Path(..., min_length=1, max_length=63),
     limit: int = Query(default=100, le=1000),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(**_OFFSET_QUERY),
 ):
     """Get subdomains of a parent WAVE name."""
     _ensure_wave()
 
     try:
-        return _wave_index.get_subdomains(name, limit=limit, offset=offset)
+        return await _read(_wave_index.get_subdomains, name, limit=limit, offset=offset)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1804,30 +2191,33 @@ async def wave_reverse_lookup(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid scripthash or address")
 
-    try:
-        hits = _wave_index.reverse_lookup(owner, limit=limit)
-    except Exception as e:
-        raise _internal_error(e)
-
     # The wave index stores a name_hash, not the plaintext label; the readable
     # name lives in the Glyph token (type 5). Resolve it per hit, best-effort —
     # a miss simply omits the name rather than failing the request.
-    if _glyph_index:
-        for hit in hits:
-            ref_str = hit.get("ref")
-            if not ref_str:
-                continue
-            try:
-                token = _glyph_index.get_token_by_ref_str(ref_str)
-                attrs = (token or {}).get("attrs") or {}
-                name = attrs.get("name")
-                if name:
-                    hit["name"] = name
-                    hit["full_name"] = f"{name}.{attrs.get('domain', 'rxd')}"
-            except Exception:
-                pass
+    def wave_reverse_lookup_named():
+        hits = _wave_index.reverse_lookup(owner, limit=limit)
+        if _glyph_index:
+            for hit in hits:
+                ref_str = hit.get("ref")
+                if not ref_str:
+                    continue
+                try:
+                    token = _glyph_index.get_token_by_ref_str(ref_str)
+                    attrs = (token or {}).get("attrs") or {}
+                    name = attrs.get("name")
+                    if name:
+                        hit["name"] = name
+                        hit["full_name"] = f"{name}.{attrs.get('domain', 'rxd')}"
+                except Exception:
+                    pass
+        return hits
 
-    return hits
+    try:
+        return await _read(wave_reverse_lookup_named)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
 
 
 @app.get("/wave/stats", tags=["WAVE"])
@@ -1836,7 +2226,9 @@ async def wave_stats():
     _ensure_wave()
 
     try:
-        return _wave_index.stats()
+        return await _read(_wave_index.stats)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1849,9 +2241,11 @@ _WAVE_NAMES_SCAN_CHUNK = 500   # rows fetched per underlying index page
 _WAVE_NAMES_MAX_SCAN = 5000    # hard ceiling on rows examined per request
 
 
-def _wave_name_entry(token: dict, include_duplicates: bool) -> Optional[dict]:
+def _wave_name_entry(token: dict, include_duplicates: bool,
+                     pending: Optional[dict] = None) -> Optional[dict]:
     """Build a /wave/names entry, or None if this token is not a canonical
-    registration (duplicate, or absent from the wave index)."""
+    registration (duplicate, or absent from the wave index). ``pending`` is a
+    ``pending_duplicates()`` snapshot taken on the event loop."""
     attrs = token.get('attrs') or {}
     name = attrs.get('name', '')
     if not name:
@@ -1879,7 +2273,7 @@ def _wave_name_entry(token: dict, include_duplicates: bool) -> Optional[dict]:
         'canonical': True,
     }
     if include_duplicates:
-        entry['has_duplicates'] = _wave_index._has_duplicates(name)
+        entry['has_duplicates'] = _wave_index._has_duplicates(name, pending)
     return entry
 
 
@@ -1906,9 +2300,14 @@ async def wave_list_names(
     if not _glyph_index:
         raise HTTPException(status_code=503, detail="Glyph index not available")
 
-    try:
-        from electrumx.lib.glyph import GlyphTokenType
+    from electrumx.lib.glyph import GlyphTokenType
 
+    # Runs on a reader thread: the type-5 walk and the per-name WAVE lookups in
+    # _wave_name_entry are all synchronous index reads. The unflushed
+    # duplicates are snapshotted here, on the loop.
+    pending = _wave_index.pending_duplicates() if include_duplicates else None
+
+    def wave_names_page():
         names: list = []
         seen_names: set = set()
         next_cursor = None
@@ -1932,7 +2331,7 @@ async def wave_list_names(
             resume_at = None  # index of the first token this page did NOT consume
             for i, token in enumerate(tokens):
                 scanned += 1
-                entry = _wave_name_entry(token, include_duplicates)
+                entry = _wave_name_entry(token, include_duplicates, pending)
                 if entry is None or entry['full_name'] in seen_names:
                     continue
                 seen_names.add(entry['full_name'])
@@ -1964,6 +2363,11 @@ async def wave_list_names(
             # short page from the scan ceiling still returns a cursor.
             'next_cursor': None if exhausted else next_cursor,
         }
+
+    try:
+        return await _read(wave_names_page)
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -1982,23 +2386,35 @@ async def get_swap_orders(
     base_ref: Optional[str] = Query(default=None, description="Base token ref (72 hex)"),
     quote_ref: Optional[str] = Query(default=None, description="Quote token ref (72 hex)"),
     limit: int = Query(default=50, le=200),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(**_OFFSET_QUERY),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
-    """Get active swap orders, optionally filtered by trading pair."""
+    """Get active swap orders, optionally filtered by trading pair.
+
+    ``cursor`` pages the open-order feed; the orderbook view (both refs) is
+    a snapshot and ignores it.
+    """
     _ensure_swap()
 
     try:
         base_bytes = bytes.fromhex(base_ref) if base_ref else None
         quote_bytes = bytes.fromhex(quote_ref) if quote_ref else None
         if base_bytes and quote_bytes:
-            return _swap_index.get_orderbook(
+            return _FastJSONResponse(await _read(_swap_index.get_orderbook,
                 base_bytes, quote_bytes, limit=limit,
-            )
-        return _swap_index.get_open_orders(
-            base_ref=base_bytes, limit=limit, offset=offset,
-        )
+            ))
+        if cursor is None:
+            return _FastJSONResponse(await _read(_swap_index.get_open_orders,
+                base_ref=base_bytes, limit=limit, offset=offset,
+            ))
+        _check_cursor(cursor)
+        return _FastJSONResponse(await _read(_swap_index.get_open_orders,
+            base_ref=base_bytes, limit=limit, cursor=cursor or None, _use_cursor=True,
+        ))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ref format")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -2010,7 +2426,7 @@ async def get_swap_order(order_id: str = Path(..., min_length=72, max_length=72)
 
     try:
         order_bytes = bytes.fromhex(order_id)
-        result = _swap_index.get_order(order_bytes)
+        result = await _read(_swap_index.get_order, order_bytes)
         if not result:
             raise HTTPException(status_code=404, detail="Order not found")
         return result
@@ -2026,7 +2442,8 @@ async def get_swap_order(order_id: str = Path(..., min_length=72, max_length=72)
 async def get_swap_history(
     base_ref: Optional[str] = Query(default=None, description="Base token ref (72 hex)"),
     limit: int = Query(default=50, le=200),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(**_OFFSET_QUERY),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
     """Get swap trade/fill history."""
     _ensure_swap()
@@ -2035,11 +2452,18 @@ async def get_swap_history(
         base_bytes = bytes.fromhex(base_ref) if base_ref else None
         if not base_bytes:
             return {'trades': [], 'error': 'base_ref is required'}
-        return _swap_index.get_swap_history(
-            base_bytes, limit=limit, offset=offset,
+        if cursor is None:
+            return await _read(_swap_index.get_swap_history,
+                base_bytes, limit=limit, offset=offset,
+            )
+        _check_cursor(cursor)
+        return await _read(_swap_index.get_swap_history,
+            base_bytes, limit=limit, cursor=cursor or None, _use_cursor=True,
         )
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ref format")
+    except HTTPException:
+        raise
     except Exception as e:
         raise _internal_error(e)
 
@@ -2072,7 +2496,8 @@ async def get_royalty_listings(
     ref: Optional[str] = Query(default=None, description="NFT ref, 72-hex LE (the listing's ref_le field)"),
     seller: Optional[str] = Query(default=None, description="Seller scripthash, 32-byte hex"),
     limit: int = Query(default=100, le=200),
-    offset: int = Query(default=0, ge=0),
+    offset: int = Query(**_OFFSET_QUERY),
+    cursor: Optional[str] = Query(**_CURSOR_QUERY),
 ):
     """Active royalty-covenant listings. No filter -> the global feed (newest-first);
     `ref` -> listings for one NFT; `seller` -> one seller's listings."""
@@ -2083,10 +2508,16 @@ async def get_royalty_listings(
         seller_bytes = bytes.fromhex(seller) if seller else None
         if seller_bytes is not None and len(seller_bytes) != 32:
             raise HTTPException(status_code=400, detail="seller must be a 32-byte scripthash hex")
-        return _royalty_index.get_listings(
+        if cursor is None:
+            return _FastJSONResponse(await _read(_royalty_index.get_listings,
+                ref=ref_bytes, seller_scripthash=seller_bytes,
+                limit=limit, offset=offset,
+            ))
+        _check_cursor(cursor)
+        return _FastJSONResponse(await _read(_royalty_index.get_listings,
             ref=ref_bytes, seller_scripthash=seller_bytes,
-            limit=limit, offset=offset,
-        )
+            limit=limit, cursor=cursor or None, _use_cursor=True,
+        ))
     except HTTPException:
         raise
     except ValueError:
@@ -2245,28 +2676,258 @@ async def mempool_glyph_stats():
 
 
 # =============================================================================
-# WEBSOCKET SUBSCRIPTIONS
+# BATCH LOOKUPS
 # =============================================================================
 
-@dataclass
-class _WsClient:
-    ws: Any
-    subscribed_refs: Set[str] = field(default_factory=set)
-    subscribed_scripthashes: Set[str] = field(default_factory=set)
-    subscribe_all_tokens: bool = False
-    subscribe_all_swaps: bool = False
+# A wallet portfolio view needs glyph details, balances and UTXOs for dozens
+# of tokens and addresses. These POST endpoints resolve a whole list with
+# batched multi-key reads in one reader-pool call and one serialisation pass.
+# Each item costs REST_BATCH_ITEM_COST rate-limit tokens on top of the request.
+_BATCH_MAX_ITEMS = int(os.getenv('REST_BATCH_MAX_ITEMS', '200'))
+_BATCH_ITEM_COST = float(os.getenv('REST_BATCH_ITEM_COST', '0.1'))
+# Extra cost per UTXO returned, as blockchain.scripthash.listunspent charges.
+_BATCH_UTXO_COST = 1 / 50
+
+
+class BatchRefsRequest(BaseModel):
+    refs: List[str] = Field(..., min_length=1, max_length=_BATCH_MAX_ITEMS)
+
+
+class BatchBalancePair(BaseModel):
+    scripthash: str
+    ref: str
+
+
+class BatchBalancesRequest(BaseModel):
+    pairs: List[BatchBalancePair] = Field(..., min_length=1, max_length=_BATCH_MAX_ITEMS)
 
 
-_ws_clients: Dict[int, _WsClient] = {}
+class BatchScripthashesRequest(BaseModel):
+    scripthashes: List[str] = Field(..., min_length=1, max_length=_BATCH_MAX_ITEMS)
+
+
+def _batch_ref(ref: str) -> Optional[List[bytes]]:
+    """Candidate key bytes for a ref in either form, or None if invalid."""
+    from electrumx.server.glyph_index import parse_ref_candidates
+    try:
+        return parse_ref_candidates(ref)
+    except Exception:
+        return None
+
+
+def _batch_scripthash(ident: str) -> Optional[bytes]:
+    try:
+        return _resolve_scripthash(ident)
+    except Exception:
+        return None
+
+
+@app.post("/batch/glyphs", tags=["Batch"])
+async def batch_glyphs(request: Request, body: BatchRefsRequest):
+    """Glyph details for up to ``REST_BATCH_MAX_ITEMS`` refs.
+
+    ``glyphs`` is in request order; each entry has the ``ref`` as sent and
+    ``token`` (the ``/glyphs/{ref}`` body, or null if unknown), or ``error``
+    for a malformed ref.
+    """
+    _ensure_glyph_index()
+    _rate_limit(request, cost=len(body.refs) * _BATCH_ITEM_COST)
+
+    def glyph_batch(refs):
+        candidates = [_batch_ref(ref) for ref in refs]
+        keys = list(dict.fromkeys(c for cands in candidates if cands for c in cands))
+        found = dict(zip(keys, _glyph_index.get_tokens(keys)))
+        results = []
+        for ref, cands in zip(refs, candidates):
+            if cands is None:
+                results.append({'ref': ref, 'error': 'Invalid ref format'})
+                continue
+            # As _resolve_ref: the first candidate that is a known token.
+            token = next((found[c] for c in cands if found[c] is not None), None)
+            results.append({'ref': ref,
+                            'token': _glyph_index._token_to_dict(token) if token else None})
+        return {'glyphs': results}
+
+    try:
+        return _FastJSONResponse(await _read(glyph_batch, body.refs))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+
+@app.post("/batch/balances", tags=["Batch"])
+async def batch_balances(request: Request, body: BatchBalancesRequest):
+    """Confirmed token balances for up to ``REST_BATCH_MAX_ITEMS``
+    ``(scripthash, ref)`` pairs. ``scripthash`` may also be a base58 address.
+    """
+    _ensure_glyph_index()
+    _rate_limit(request, cost=len(body.pairs) * _BATCH_ITEM_COST)
+
+    def balance_batch(pairs):
+        keys = []
+        for pair in pairs:
+            sh = _batch_scripthash(pair.scripthash)
+            cands = _batch_ref(pair.ref)
+            keys.append((sh, cands[0]) if sh is not None and cands else None)
+        valid = [key for key in keys if key is not None]
+        balances = iter(_glyph_index.get_balances(valid))
+        results = []
+        for pair, key in zip(pairs, keys):
+            entry = {'scripthash': pair.scripthash, 'ref': pair.ref}
+            if key is None:
+                entry['error'] = 'Invalid scripthash or ref'
+            else:
+                entry['balance'] = next(balances)
+            results.append(entry)
+        return {'balances': results}
+
+    try:
+        return _FastJSONResponse(await _read(balance_batch, body.pairs))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+
+@app.post("/batch/utxos", tags=["Batch"])
+async def batch_utxos(request: Request, body: BatchScripthashesRequest):
+    """Confirmed UTXOs, with their refs, for up to ``REST_BATCH_MAX_ITEMS``
+    scripthashes (or base58 addresses). Mempool effects are not applied.
+    """
+    from electrumx.lib.util import pack_le_uint32
+    from electrumx.server.session import scripthash_to_hashX
+
+    if _db is None:
+        raise HTTPException(status_code=503, detail="Database not available")
+    _rate_limit(request, cost=len(body.scripthashes) * _BATCH_ITEM_COST)
+
+    try:
+        scripthashes = [_batch_scripthash(ident) for ident in body.scripthashes]
+        hashXs = [scripthash_to_hashX(sh.hex()) if sh is not None else None
+                  for sh in scripthashes]
+        by_hashX = await _db.all_utxos_batch(
+            [hashX for hashX in hashXs if hashX is not None])
+        utxo_lists = [sorted(by_hashX[hashX]) if hashX is not None else None
+                      for hashX in hashXs]
+        outpoints = [utxo.tx_hash + pack_le_uint32(utxo.tx_pos)
+                     for utxos in utxo_lists if utxos for utxo in utxos]
+        refs = iter(await _read(_db.get_refs_by_outpoints, outpoints))
+        _rate_limit(request, cost=len(outpoints) * _BATCH_UTXO_COST, strict=False)
+
+        results = []
+        for ident, utxos in zip(body.scripthashes, utxo_lists):
+            if utxos is None:
+                results.append({'scripthash': ident,
+                                'error': 'Invalid scripthash or address'})
+                continue
+            results.append({'scripthash': ident, 'utxos': [
+                {'tx_hash': hash_to_hex_str(utxo.tx_hash),
+                 'tx_pos': utxo.tx_pos,
+                 'height': utxo.height,
+                 'value': utxo.value,
+                 'refs': next(refs)}
+                for utxo in utxos]})
+        return _FastJSONResponse({'utxos': results})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+
+# =============================================================================
+# BULK EXPORTS (NDJSON)
+# =============================================================================
+
+# Streaming exports hold a database snapshot for their whole run, so only a
+# few may run at once (electrumx/server/ndjson_export.py).
+_export_slots = ExportSlots()
+
+
+def _ndjson_export(storage, dataset: str, rows, after: Optional[str]):
+    """Stream ``rows(snapshot, seek)`` from a fresh snapshot of ``storage``.
+
+    ``after`` is the ``cursor`` of the last line a client received; the
+    export resumes with the row after it.
+    """
+    try:
+        seek = decode_cursor(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not _export_slots.acquire():
+        raise HTTPException(status_code=503, detail="Too many exports running, retry later",
+                            headers={'Retry-After': '30'})
+    try:
+        height = getattr(_db, 'db_height', None)
+        snapshot = storage.snapshot()
+    except Exception:
+        _export_slots.release()
+        raise
+    export = NdjsonExport(snapshot, rows(snapshot, seek), dataset,
+                          after=seek, release=_export_slots.release)
+    headers = {'Cache-Control': 'no-store'}
+    if height is not None:
+        headers['X-Export-Height'] = str(height)
+    return StreamingResponse(export, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+@app.get("/export/tokens", tags=["Export"])
+async def export_tokens(
+    after: Optional[str] = Query(default=None, max_length=200, description="Resume after the line with this cursor"),
+):
+    """Stream the whole token catalogue as NDJSON, one summary row per line
+    in ref order. Each line's ``cursor`` resumes the export via ``after``."""
+    _ensure_glyph_index()
+    return _ndjson_export(_glyph_index.db.utxo_db, 'tokens',
+                          _glyph_index.export_tokens, after)
+
+
+@app.get("/export/tokens/{ref}/holders", tags=["Export"])
+async def export_token_holders(
+    ref: str = _REF_PATH,
+    after: Optional[str] = Query(default=None, max_length=200, description="Resume after the line with this cursor"),
+):
+    """Stream every holder of a token as NDJSON (address, scripthash,
+    hashX, amount)."""
+    _ensure_glyph_index()
+    ref_bytes = _resolve_ref(ref)
+    return _ndjson_export(
+        _glyph_index.db.utxo_db, 'holders',
+        lambda snapshot, seek: _glyph_index.export_holders(snapshot, ref_bytes, seek),
+        after)
+
+
+@app.get("/export/swaps/{base_ref}/history", tags=["Export"])
+async def export_swap_history(
+    base_ref: str = _REF_PATH,
+    after: Optional[str] = Query(default=None, max_length=200, description="Resume after the line with this cursor"),
+):
+    """Stream a token's complete trade history as NDJSON, newest first."""
+    _ensure_swap()
+    base_bytes = _parse_ref(base_ref)
+    return _ndjson_export(
+        _swap_index.db.utxo_db, 'swap_history',
+        lambda snapshot, seek: _swap_index.export_history(snapshot, base_bytes, seek),
+        after)
+
+
+# =============================================================================
+# WEBSOCKET SUBSCRIPTIONS
+# =============================================================================
+
+# Subscriptions are indexed by topic and each client has its own bounded send
+# queue and writer task (electrumx/server/ws_hub.py).
+_ws_hub = WsHub()
 _ws_broadcast_task = None
+_WS_POLL_INTERVAL = float(os.getenv('WS_POLL_INTERVAL', '2.0'))
 
 
 async def _ws_broadcast_loop():
-    """Poll mempool touched sets and broadcast to subscribed WebSocket clients."""
+    """Poll mempool touched sets and publish them to subscribed clients."""
     while True:
-        await asyncio.sleep(2.0)
+        await asyncio.sleep(_WS_POLL_INTERVAL)
         mp = _get_mempool_glyph()
-        if not mp or not _ws_clients:
+        if not mp or not _ws_hub.clients:
             continue
 
         try:
@@ -2274,32 +2935,40 @@ async def _ws_broadcast_loop():
         except Exception:
             continue
 
-        if not touched_refs and not touched_shs:
-            continue
+        if touched_refs or touched_shs:
+            _ws_hub.publish(touched_refs, touched_shs)
 
-        ref_hexes = {r.hex() for r in touched_refs}
-        sh_hexes = {s.hex() for s in touched_shs}
-
-        dead = []
-        for cid, client in _ws_clients.items():
-            matched_refs = ref_hexes & client.subscribed_refs if client.subscribed_refs else set()
-            matched_shs = sh_hexes & client.subscribed_scripthashes if client.subscribed_scripthashes else set()
-            send_token = client.subscribe_all_tokens and ref_hexes
-            send_swap = client.subscribe_all_swaps and ref_hexes
-
-            if matched_refs or matched_shs or send_token or send_swap:
-                msg = {
-                    'event': 'update',
-                    'touched_refs': list(matched_refs or (ref_hexes if send_token or send_swap else set())),
-                    'touched_scripthashes': list(matched_shs),
-                }
-                try:
-                    await client.ws.send_json(msg)
-                except Exception:
-                    dead.append(cid)
 
-        for cid in dead:
-            _ws_clients.pop(cid, None)
+def _ws_ref_topic(ref: Any) -> Optional[tuple]:
+    """('ref', 72-hex) for a ref in either accepted form, else None."""
+    from electrumx.server.glyph_index import parse_ref_any
+    try:
+        return ('ref', parse_ref_any(str(ref)).hex())
+    except Exception:
+        return None
+
+
+def _ws_scripthash_topic(sh: Any) -> Optional[tuple]:
+    """('sh', scripthash hex, hashX) for a 64-hex scripthash, else None.
+
+    The mempool reports touched hashXs, so the topic carries the hashX to
+    match on and the scripthash to echo back to the client."""
+    from electrumx.server.session import scripthash_to_hashX
+    try:
+        sh = str(sh).lower()
+        return ('sh', sh, scripthash_to_hashX(sh))
+    except Exception:
+        return None
+
+
+def _ws_subscriptions(client) -> Dict[str, Any]:
+    kinds = [topic[0] for topic in client.topics]
+    return {
+        'refs': kinds.count('ref'),
+        'scripthashes': kinds.count('sh'),
+        'all_tokens': ALL_TOKENS in client.topics,
+        'all_swaps': ALL_SWAPS in client.topics,
+    }
 
 
 @app.websocket("/ws")
@@ -2313,66 +2982,76 @@ async def websocket_endpoint(ws: WebSocket):
       {"action": "subscribe", "all_swaps": true}
       {"action": "unsubscribe", "refs": ["aabb...00"]}
       {"action": "ping"}
+
+    Updates arrive as {"event": "update", "touched_refs": [...],
+    "touched_scripthashes": [...]}, at most one message per client per poll,
+    listing every ref and scripthash it subscribes to that changed (wildcard
+    subscribers get every touched ref). A client that falls too far behind
+    is disconnected with close code 1013.
     """
     global _ws_broadcast_task
     await ws.accept()
 
-    cid = id(ws)
-    client = _WsClient(ws=ws)
-    _ws_clients[cid] = client
+    client = _ws_hub.connect(ws)
 
     # Start broadcast loop if not running
     if _ws_broadcast_task is None or _ws_broadcast_task.done():
         _ws_broadcast_task = asyncio.get_event_loop().create_task(_ws_broadcast_loop())
 
+    def reply(msg: Dict[str, Any]):
+        if not client.send(encode_message(msg)):
+            _ws_hub.drop(client)
+
     try:
-        await ws.send_json({'event': 'connected', 'message': 'RXinDexer WebSocket ready'})
-        while True:
+        reply({'event': 'connected', 'message': 'RXinDexer WebSocket ready'})
+        while not client.closed:
             raw = await ws.receive_text()
             try:
                 msg = json.loads(raw)
             except (json.JSONDecodeError, ValueError):
-                await ws.send_json({'event': 'error', 'message': 'Invalid JSON'})
+                reply({'event': 'error', 'message': 'Invalid JSON'})
+                continue
+            if not isinstance(msg, dict):
+                reply({'event': 'error', 'message': 'Invalid JSON'})
                 continue
 
             action = msg.get('action', '')
 
             if action == 'ping':
-                await ws.send_json({'event': 'pong'})
+                reply({'event': 'pong'})
             elif action == 'subscribe':
-                for ref in msg.get('refs', []):
-                    client.subscribed_refs.add(ref)
-                for sh in msg.get('scripthashes', []):
-                    client.subscribed_scripthashes.add(sh)
+                topics = [_ws_ref_topic(ref) for ref in msg.get('refs') or []]
+                topics += [_ws_scripthash_topic(sh) for sh in msg.get('scripthashes') or []]
                 if msg.get('all_tokens'):
-                    client.subscribe_all_tokens = True
+                    topics.append(ALL_TOKENS)
                 if msg.get('all_swaps'):
-                    client.subscribe_all_swaps = True
-                await ws.send_json({
-                    'event': 'subscribed',
-                    'refs': len(client.subscribed_refs),
-                    'scripthashes': len(client.subscribed_scripthashes),
-                    'all_tokens': client.subscribe_all_tokens,
-                    'all_swaps': client.subscribe_all_swaps,
-                })
+                    topics.append(ALL_SWAPS)
+                capped = False
+                for topic in topics:
+                    if topic is not None and not _ws_hub.subscribe(client, topic):
+                        capped = True
+                if capped:
+                    reply({'event': 'error', 'message': 'Subscription limit reached'})
+                reply({'event': 'subscribed', **_ws_subscriptions(client)})
             elif action == 'unsubscribe':
-                for ref in msg.get('refs', []):
-                    client.subscribed_refs.discard(ref)
-                for sh in msg.get('scripthashes', []):
-                    client.subscribed_scripthashes.discard(sh)
+                topics = [_ws_ref_topic(ref) for ref in msg.get('refs') or []]
+                topics += [_ws_scripthash_topic(sh) for sh in msg.get('scripthashes') or []]
                 if msg.get('all_tokens') is False:
-                    client.subscribe_all_tokens = False
+                    topics.append(ALL_TOKENS)
                 if msg.get('all_swaps') is False:
-                    client.subscribe_all_swaps = False
-                await ws.send_json({'event': 'unsubscribed'})
+                    topics.append(ALL_SWAPS)
+                for topic in topics:
+                    if topic is not None:
+                        _ws_hub.unsubscribe(client, topic)
+                reply({'event': 'unsubscribed'})
             else:
-                await ws.send_json({'event': 'error', 'message': f'Unknown action: {action}'})
+                reply({'event': 'error', 'message': f'Unknown action: {action}'})
     except WebSocketDisconnect:
         pass
     except Exception:
         pass
     finally:
-        _ws_clients.pop(cid, None)
+        _ws_hub.disconnect(client)
 
 
 # =============================================================================
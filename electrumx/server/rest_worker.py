@@ -0,0 +1,201 @@
+"""REST API worker processes over a read-only view of the databases.
+
+By default the REST API runs inside the indexer process: every query shares
+its event loop and GIL with block processing, and a burst of REST load slows
+indexing (and vice versa). With ``REST_WORKERS=N`` the indexer starts N
+worker processes instead. Each one:
+
+* **Opens the databases read-only** (``DB.open_for_reading``) and builds its
+  own index objects over them. Nothing is written; recovery, compaction and
+  migrations stay with the indexer. RocksDB only: LevelDB locks the whole
+  directory to one process.
+* **Follows the indexer.** After every flush, forward or reorg, the indexer
+  rewrites ``DB.TIP_FILE``. A worker that sees it change calls
+  ``DB.catch_up()``, which moves it to the indexer's last committed state in
+  one step and drops cached reads if the tip moved, as ``poll`` does for the
+  index objects' own read caches. Cached REST responses are keyed on
+  (height, tip), so none survive a reorg.
+* **Shares the port.** Each worker binds ``REST_API_HOST:REST_API_PORT`` with
+  ``SO_REUSEPORT`` and the kernel spreads connections across them.
+
+The mempool lives in the indexer process, so workers answer the mempool
+routes as a server with the mempool disabled would.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+from typing import List
+
+from aiorpcx import TaskGroup, sleep
+
+from electrumx.lib import util
+from electrumx.server.db import DB
+
+REST_WORKERS = int(os.getenv('REST_WORKERS', '0'))
+REST_WORKER_POLL_SECS = float(os.getenv('REST_WORKER_POLL_SECS', '0.5'))
+
+
+def rest_socket(host: str, port: int) -> socket.socket:
+    """A listening socket on the REST address that other workers can bind
+    too."""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.setblocking(False)
+    return sock
+
+
+def build_indexes(db, env) -> dict:
+    """The query-side index objects over ``db``, as ``set_indexer``
+    keywords. Mirrors the block processor's choice of enabled indexes."""
+    from electrumx.server.analytics_index import AnalyticsIndex
+    from electrumx.server.dmint_contracts import DMintContractsManager
+    from electrumx.server.glyph_index import GlyphIndex
+    from electrumx.server.royalty_index import RoyaltyIndex
+    from electrumx.server.swap_index import SwapIndex
+    from electrumx.server.wave_index import WaveIndex
+
+    glyph_index = None
+    if getattr(env, 'glyph_index', True):
+        glyph_index = GlyphIndex(db, env)
+        glyph_index.load_migrations()
+    indexes = {
+        'glyph_index': glyph_index,
+        'wave_index': (WaveIndex(db, env)
+                       if getattr(env, 'wave_index', True) else None),
+        'swap_index': (SwapIndex(db, env)
+                       if getattr(env, 'swap_index', True) else None),
+        'royalty_index': (RoyaltyIndex(db, env)
+                          if getattr(env, 'royalty_index', False) else None),
+        'analytics_index': (AnalyticsIndex(db, env)
+                            if getattr(env, 'analytics_index', True) else None),
+        'dmint_contracts': None,
+    }
+    if glyph_index:
+        indexes['dmint_contracts'] = DMintContractsManager(
+            getattr(env, 'db_dir', 'data'), glyph_index)
+    return indexes
+
+
+class RestWorker:
+    """One REST worker process (see module doc)."""
+
+    def __init__(self, env, number: int, poll_secs: float = REST_WORKER_POLL_SECS):
+        self.logger = util.class_logger(__name__, self.__class__.__name__)
+        self.env = env
+        self.number = number
+        self.poll_secs = poll_secs
+        self.db = None
+        self.indexes = {}
+        self.tip_file = None
+
+    async def open(self):
+        self.db = DB(self.env)
+        self.tip_file = DB.read_tip_file()
+        await self.db.open_for_reading()
+        self.indexes = build_indexes(self.db, self.env)
+
+    async def poll(self) -> bool:
+        """Catch up if the indexer has flushed since the last poll. Returns
+        True if the chain tip moved."""
+        tip_file = DB.read_tip_file()
+        if tip_file == self.tip_file:
+            return False
+        moved = await self.db.catch_up()
+        self.tip_file = tip_file
+        if not moved:
+            return False
+        glyph_index = self.indexes.get('glyph_index')
+        if glyph_index:
+            # A background migration may have finished in the indexer.
+            glyph_index.load_migrations()
+        wave_index = self.indexes.get('wave_index')
+        if wave_index:
+            # Only the indexer's process_tx invalidates resolved names, so a
+            # zone or owner update, or a reorg, would otherwise be missed.
+            wave_index.hot_names.clear()
+        dmint_contracts = self.indexes.get('dmint_contracts')
+        if dmint_contracts:
+            dmint_contracts.reload()
+        self.logger.debug(f'caught up to height {self.db.db_height:,d}')
+        return True
+
+    async def follow(self):
+        while True:
+            await sleep(self.poll_secs)
+            try:
+                await self.poll()
+            except Exception:
+                # The indexer may be mid-flush; the next poll retries.
+                self.logger.exception('catching up with the indexer failed')
+
+    async def serve(self, sock):
+        import uvicorn
+        from electrumx.server.rest_api import app as rest_app, set_indexer
+
+        await self.open()
+        self.logger.info(f'REST worker {self.number} serving at height '
+                         f'{self.db.db_height:,d}')
+        async with self.env.coin.DAEMON(self.env.coin, self.env.daemon_url) as daemon:
+            set_indexer(self.indexes['glyph_index'], self.db, daemon,
+                        wave_index=self.indexes['wave_index'],
+                        swap_index=self.indexes['swap_index'],
+                        royalty_index=self.indexes['royalty_index'],
+                        analytics_index=self.indexes['analytics_index'],
+                        dmint_contracts=self.indexes['dmint_contracts'])
+            config = uvicorn.Config(
+                rest_app,
+                log_level=os.getenv('REST_LOG_LEVEL', 'info').strip().lower(),
+                access_log=False,
+            )
+            server = uvicorn.Server(config)
+            async with TaskGroup() as group:
+                follower = await group.spawn(self.follow())
+                await server.serve(sockets=[sock])
+                follower.cancel()
+
+
+def run_worker(number: int):
+    """Process entry point of REST worker ``number``."""
+    from electrumx.server.env import Env
+
+    log_fmt = Env.default('LOG_FORMAT', '%(levelname)s:%(name)s:%(message)s')
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(util.CompactFormatter(log_fmt))
+    logger = util.make_logger('electrumx', handler=handler, level='INFO')
+    env = Env()
+    logger.setLevel(env.log_level)
+    host = os.getenv('REST_API_HOST', '0.0.0.0').strip()
+    port = int(os.getenv('REST_API_PORT', '8000'))
+    asyncio.run(RestWorker(env, number).serve(rest_socket(host, port)))
+
+
+def start_workers(count: int) -> List[multiprocessing.Process]:
+    # 'spawn' so workers do not inherit the indexer's open DB handles.
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for number in range(count):
+        process = context.Process(target=run_worker, args=(number,),
+                                  name=f'rest-worker-{number}', daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def stop_workers(processes, timeout: float = 10.0):
+    """Blocking: ask the workers to exit, killing any that do not."""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+            process.join()
@@ -36,6 +36,7 @@ from electrumx.lib import util
 from electrumx.lib.hash import hash_to_hex_str, sha256, Base58
 from electrumx.lib.util import pack_be_uint32, encode_undo, decode_undo
 from electrumx.lib.script import OpCodes
+from electrumx.server.pagination import clamp_offset, cursor_page, decode_cursor
 
 try:
     import cbor2
@@ -634,10 +635,17 @@ class RoyaltyIndex:
         return RoyaltyListingInfo.from_bytes(data)
 
     def get_listings(self, ref: bytes = None, seller_scripthash: bytes = None,
-                     limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Active listings: for one NFT (ref), one seller, or global (newest-first)."""
+                     limit: int = 100, offset: int = 0,
+                     cursor: Optional[str] = None, _use_cursor: bool = False):
+        """Active listings: for one NFT (ref), one seller, or global (newest-first).
+
+        Legacy shape: a list, ``offset`` capped at ``PAGINATION_MAX_OFFSET``.
+        With ``_use_cursor``: ``{entries, next_cursor, has_more}``, resuming
+        at the cursor key (ValueError if it is malformed or from another
+        feed).
+        """
         limit = max(1, min(int(limit), 200))
-        offset = max(0, int(offset))
+        offset = clamp_offset(offset)
         if ref:
             prefix = RoyaltyDBKeys.ACTIVE_BY_REF + ref
             reverse = False
@@ -647,6 +655,22 @@ class RoyaltyIndex:
         else:
             prefix = RoyaltyDBKeys.ACTIVE_ALL
             reverse = True  # global browse: newest-first
+        if _use_cursor:
+            seek = decode_cursor(cursor)
+            if seek is not None and not seek.startswith(prefix):
+                raise ValueError('invalid cursor')
+            entries: List[Dict[str, Any]] = []
+            next_key = None
+            for key, _ in self.db.utxo_db.iterator(prefix=prefix, reverse=reverse,
+                                                   seek=seek):
+                if len(entries) >= limit:
+                    next_key = key
+                    break
+                rec = self._get_listing(key[-36:])
+                if rec and rec.status == RoyaltyStatus.ACTIVE:
+                    entries.append(rec.to_dict())
+            return cursor_page(entries, next_key)
+
         out: List[Dict[str, Any]] = []
         skipped = 0
         for key, _ in self.db.utxo_db.iterator(prefix=prefix, reverse=reverse):
@@ -8,6 +8,7 @@
 '''Classes for local RPC server and remote client TCP/SSL servers.'''
 
 import codecs
+import hashlib
 import itertools
 import json
 import math
@@ -21,8 +22,8 @@ from ipaddress import IPv4Address, IPv6Address, ip_address
 import attr
 from aiorpcx import (
     RPCSession, JSONRPCAutoDetect, JSONRPCConnection, serve_rs, serve_ws, NewlineFramer,
-    TaskGroup, handler_invocation, RPCError, Request, sleep, Event, ReplyAndDisconnect,
-    timeout_after, run_in_thread
+    TaskGroup, handler_invocation, RPCError, Request, Notification, sleep, Event,
+    ReplyAndDisconnect, timeout_after, run_in_thread
 )
 from electrumx.lib.util import (
     pack_le_uint32
@@ -37,6 +38,8 @@ from electrumx.lib import util
 from electrumx.lib.hash import (sha256, hash_to_hex_str, hex_str_to_hash, HASHX_LEN, Base58Error,
                                 double_sha256)
 from electrumx.lib.util import hex_to_bytes
+from electrumx.server import byte_cache
+from electrumx.server.byte_cache import ByteLRUCache, PackedHistory
 from electrumx.server.daemon import DaemonError
 from electrumx.server.peers import PeerManager
 from electrumx.server.rate_limiter import init_rate_limiters
@@ -173,17 +176,19 @@ class SessionManager:
         self.start_time = time.time()
         self._method_counts = defaultdict(int)
         self._reorg_count = 0
-        self._history_cache = pylru.lrucache(1000)
-        self._history_lookups = 0
-        self._history_hits = 0
-        # Confirmed-only address-status cache (hashX -> status hex | None).
+        # hashX -> PackedHistory (or the RPCError of one too large to send)
+        self._history_cache = ByteLRUCache(
+            'history', env.history_cache_MB * byte_cache.MB, byte_cache.history_size)
+        # Confirmed-history address-status cache
+        # (hashX -> (sha256 hasher, status hex | None)).
         # blockchain.scripthash.subscribe hashes a scripthash's ENTIRE confirmed
         # history. For scripthashes with very large histories (e.g. an active
         # FT-by-owner address) that is many seconds of CPU, and it was recomputed
-        # on every subscribe/notify, pegging the server. The confirmed-only
-        # status is stable until the hashX is touched by a new block, so cache it
-        # and invalidate on the same touched set as _history_cache (see
-        # _notify_sessions). The mempool portion is recomputed every call.
+        # on every subscribe/notify, pegging the server. The confirmed part is
+        # stable until the hashX is touched by a new block, so cache the hash
+        # state over it and invalidate on the same touched set as
+        # _history_cache (see _notify_sessions). A status with mempool entries
+        # copies the state and hashes only the mempool suffix.
         self._status_cache = pylru.lrucache(4096)
         self._status_lookups = 0
         self._status_hits = 0
@@ -198,6 +203,13 @@ class SessionManager:
         self._tx_hashes_hits = 0
         # Really a MerkleCache cache
         self._merkle_cache = pylru.lrucache(1000)
+        # Notification fan-out indexes: hashX -> sessions subscribed to it, and
+        # the sessions subscribed to headers.  _notify_sessions schedules only
+        # the sessions these name, not every connection.
+        self._hashX_sessions = defaultdict(set)
+        self._header_sessions = set()
+        # Encoded header notification per JSON-RPC protocol, for hsub_results.
+        self._hsub_messages = {}
         self._merkle_lookups = 0
         self._merkle_hits = 0
         self.notified_height = None
@@ -390,9 +402,9 @@ class SessionManager:
             'daemon height': self.daemon.cached_height(),
             'db height': self.db.db_height,
             'db_flush_count': self.db.history.flush_count,
+            'db caches': self.db.cache_info(),
             'groups': len(self.session_groups),
-            'history cache': cache_fmt.format(
-                self._history_lookups, self._history_hits, len(self._history_cache)),
+            'history cache': self._history_cache.info(),
             'status cache': cache_fmt.format(
                 self._status_lookups, self._status_hits, len(self._status_cache)),
             'merkle cache': cache_fmt.format(
@@ -462,8 +474,34 @@ class SessionManager:
         height = min(height, self.db.db_height)
         raw = await self.raw_header(height)
         self.hsub_results = {'hex': raw.hex(), 'height': height}
+        self._hsub_messages.clear()
         self.notified_height = height
 
+    def header_notification(self, connection):
+        '''The blockchain.headers.subscribe notification of hsub_results as
+        an encoded message for the connection's protocol.  Encoded once per
+        protocol per height and shared by every subscribed session.'''
+        protocol = connection._protocol
+        message = self._hsub_messages.get(protocol)
+        if message is None:
+            message = protocol.notification_message(
+                Notification('blockchain.headers.subscribe', (self.hsub_results, )))
+            self._hsub_messages[protocol] = message
+        return message
+
+    def subscribe_hashX(self, session, hashX):
+        self._hashX_sessions[hashX].add(session)
+
+    def unsubscribe_hashX(self, session, hashX):
+        sessions = self._hashX_sessions.get(hashX)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._hashX_sessions[hashX]
+
+    def subscribe_headers(self, session):
+        self._header_sessions.add(session)
+
     def _session_references(self, items, special_strings):
         '''Return a SessionReferences object.'''
         if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
@@ -917,20 +955,21 @@ class SessionManager:
     async def limited_history(self, hashX):
         '''Returns a pair (history, cost).
 
-        History is a sorted list of (tx_hash, height) tuples, or an RPCError.'''
+        History is a PackedHistory, iterating as sorted (tx_hash, height)
+        pairs; an RPCError is raised if it is too large to send.'''
         # History DoS limit.  Each element of history is about 99 bytes when encoded
         # as JSON.
         limit = self.env.max_send // 99
         cost = 0.1
-        self._history_lookups += 1
         try:
             result = self._history_cache[hashX]
-            self._history_hits += 1
         except KeyError:
-            result = await self.db.limited_history(hashX, limit=limit)
-            cost += 0.1 + len(result) * 0.001
-            if len(result) >= limit:
+            history = await self.db.limited_history(hashX, limit=limit)
+            cost += 0.1 + len(history) * 0.001
+            if len(history) >= limit:
                 result = RPCError(BAD_REQUEST, 'history too large', cost=cost)
+            else:
+                result = PackedHistory(history)
             self._history_cache[hashX] = result
 
         if isinstance(result, Exception):
@@ -938,19 +977,20 @@ class SessionManager:
         return result, cost
 
     def cached_status(self, hashX):
-        '''Return the cached confirmed-only address status (hex str or None).
+        '''Return the cached (hasher, status) pair of a hashX's confirmed history.
 
-        Raises KeyError on a miss so callers can branch like the other caches.
-        The cached value is the status with NO mempool entries; it is valid only
-        while the caller has no mempool summaries for the hashX.'''
+        ``hasher`` is a sha256 object fed the confirmed ``txid:height:``
+        string; callers must copy() it before appending mempool entries.
+        ``status`` is the status with NO mempool entries (hex str or None).
+        Raises KeyError on a miss so callers can branch like the other caches.'''
         self._status_lookups += 1
-        status = self._status_cache[hashX]
+        state = self._status_cache[hashX]
         self._status_hits += 1
-        return status
+        return state
 
-    def cache_status(self, hashX, status):
-        '''Cache the confirmed-only address status for a hashX.'''
-        self._status_cache[hashX] = status
+    def cache_status(self, hashX, hasher, status):
+        '''Cache the confirmed-history hash state and status for a hashX.'''
+        self._status_cache[hashX] = (hasher, status)
 
     async def ref_get_db(self, ref):
         '''Returns the mint and location for a ref'''
@@ -993,9 +1033,28 @@ class SessionManager:
                 del cache[hashX]
 
         async with TaskGroup() as group:
-            for session in self.sessions:
+            for session in self._sessions_to_notify(touched, height_changed):
                 await group.spawn(session.notify, touched, height_changed)
 
+    def _sessions_to_notify(self, touched, height_changed):
+        '''The sessions a notification can concern: those subscribed to a
+        touched hashX and, on a new height, those subscribed to headers or
+        holding mempool statuses (which a block can change untouched).'''
+        index = self._hashX_sessions
+        sessions = set()
+        if len(touched) <= len(index):
+            for hashX in touched:
+                sessions.update(index.get(hashX, ()))
+        else:
+            for hashX, subscribed in index.items():
+                if hashX in touched:
+                    sessions.update(subscribed)
+        if height_changed:
+            sessions.update(self._header_sessions)
+            sessions.update(session for session in self.sessions
+                            if getattr(session, 'mempool_statuses', None))
+        return sessions
+
     def _ip_addr_group_name(self, session):
         limiter = self.ip_rate_limiter
         # Proxy-aware grouping: when a trusted proxy is configured the socket
@@ -1165,6 +1224,9 @@ class SessionManager:
         groups = self.sessions.pop(session)
         if session.session_id is not None:
             self.sessions_by_id.pop(session.session_id, None)
+        for hashX in getattr(session, 'hashX_subs', ()):
+            self.unsubscribe_hashX(session, hashX)
+        self._header_sessions.discard(session)
         for group in groups:
             # Fold this session's cost into the group's retained memory, capped at
             # the per-session hard limit so a reconnect storm can't run it away to
@@ -1439,6 +1501,7 @@ class ElectrumX(SessionBase):
 
     def unsubscribe_hashX(self, hashX):
         self.mempool_statuses.pop(hashX, None)
+        self.session_mgr.unsubscribe_hashX(self, hashX)
         return self.hashX_subs.pop(hashX, None)
 
     async def notify(self, touched, height_changed):
@@ -1454,8 +1517,7 @@ class ElectrumX(SessionBase):
         updates or new blocks) and height.
         '''
         if height_changed and self.subscribe_headers:
-            args = (await self.subscribe_headers_result(), )
-            await self.send_notification('blockchain.headers.subscribe', args)
+            await self._send_message(self.session_mgr.header_notification(self.connection))
 
         touched = touched.intersection(self.hashX_subs)
         if touched or (height_changed and self.mempool_statuses):
@@ -1492,6 +1554,7 @@ class ElectrumX(SessionBase):
     async def headers_subscribe(self):
         '''Subscribe to get raw headers of new blocks.'''
         self.subscribe_headers = True
+        self.session_mgr.subscribe_headers(self)
         self.bump_cost(0.25)
         return await self.subscribe_headers_result()
 
@@ -1515,52 +1578,46 @@ class ElectrumX(SessionBase):
         # For mempool, height is -1 if it has unconfirmed inputs, otherwise 0
         mempool = await self.mempool.transaction_summaries(hashX)
 
-        # Fast path: with no mempool entries the status depends only on the
-        # confirmed history, which is stable until the hashX is touched by a new
+        # The confirmed history is stable until the hashX is touched by a new
         # block (see _notify_sessions, which invalidates _status_cache on the
-        # touched set). Returning the cached status avoids re-hashing the full
-        # history every call — the CPU-peg / "continuous sync error" path for
-        # scripthashes with very large histories.
-        if not mempool:
-            try:
-                status = self.session_mgr.cached_status(hashX)
-                self.bump_cost(0.1)
-                self.mempool_statuses.pop(hashX, None)
-                return status
-            except KeyError:
-                pass
-
+        # touched set), so its hash state is cached. Mempool entries are
+        # appended to a copy of it: a busy address with a large history costs
+        # O(mempool entries) per call, not a re-hash of the full history —
+        # the CPU-peg / "continuous sync error" path.
         try:
-            db_history, cost = await self.session_mgr.limited_history(hashX)
-        except RPCError:
-            # History too large for send limit, but we only need it for
-            # status hash computation (never sent raw to client).
-            # Fetch unlimited history directly from DB.
-            db_history = await self.db.limited_history(hashX, limit=None)
-            cost = 0.1 + len(db_history) * 0.001
-
-        status = ''.join(f'{hash_to_hex_str(tx_hash)}:'
-                         f'{height:d}:'
-                         for tx_hash, height in db_history)
-        status += ''.join(f'{hash_to_hex_str(tx.hash)}:'
-                          f'{-tx.has_unconfirmed_inputs:d}:'
-                          for tx in mempool)
-
-        # Add status hashing cost
-        self.bump_cost(cost + 0.1 + len(status) * 0.00002)
-
-        if status:
-            status = sha256(status.encode()).hex()
-        else:
-            status = None
+            hasher, status = self.session_mgr.cached_status(hashX)
+            cost = 0.1
+        except KeyError:
+            try:
+                db_history, cost = await self.session_mgr.limited_history(hashX)
+            except RPCError:
+                # History too large for send limit, but we only need it for
+                # status hash computation (never sent raw to client).
+                # Fetch unlimited history directly from DB.
+                db_history = await self.db.limited_history(hashX, limit=None)
+                cost = 0.1 + len(db_history) * 0.001
+
+            confirmed = ''.join(f'{hash_to_hex_str(tx_hash)}:'
+                                f'{height:d}:'
+                                for tx_hash, height in db_history)
+            hasher = hashlib.sha256(confirmed.encode())
+            status = hasher.hexdigest() if confirmed else None
+            cost += 0.1 + len(confirmed) * 0.00002
+            self.session_mgr.cache_status(hashX, hasher, status)
 
-        if mempool:
-            self.mempool_statuses[hashX] = status
-        else:
+        if not mempool:
+            self.bump_cost(cost)
             self.mempool_statuses.pop(hashX, None)
-            # Cache the confirmed-only status for the fast path above.
-            self.session_mgr.cache_status(hashX, status)
-
+            return status
+
+        unconfirmed = ''.join(f'{hash_to_hex_str(tx.hash)}:'
+                              f'{-tx.has_unconfirmed_inputs:d}:'
+                              for tx in mempool)
+        hasher = hasher.copy()
+        hasher.update(unconfirmed.encode())
+        status = hasher.hexdigest()
+        self.bump_cost(cost + len(unconfirmed) * 0.00002)
+        self.mempool_statuses[hashX] = status
         return status
 
     async def subscription_address_status(self, hashX):
@@ -1572,56 +1629,54 @@ class ElectrumX(SessionBase):
             self.unsubscribe_hashX(hashX)
             return None
 
-    def get_refs_by_outpoint(self, outpoint):
-        '''Get refs by the outpoint
-        '''
-        refs = self.mempool.get_refs_by_outpoint(outpoint)
-        if len(refs):
-            return refs
-        # Not found in the mempool, check the database
-        return self.db.get_refs_by_outpoint(outpoint)
+    def _unspent_entries(self, utxos, spends, refs):
+        '''The listunspent entries of the utxos not in spends.  refs maps
+        (tx_hash, tx_pos) to the raw refs of confirmed UTXOs; mempool UTXOs
+        take theirs from the mempool.  Refs are formatted here, once.'''
+        mempool_refs = self.mempool.outpointToRefs
+        decode_refs = self.db.decode_refs
+        entries = []
+        for utxo in utxos:
+            outpoint = (utxo.tx_hash, utxo.tx_pos)
+            if outpoint in spends:
+                continue
+            raw_refs = refs.get(outpoint)
+            if raw_refs is None:
+                raw_refs = mempool_refs.get(utxo.tx_hash + pack_le_uint32(utxo.tx_pos))
+            entries.append({'tx_hash': hash_to_hex_str(utxo.tx_hash),
+                            'tx_pos': utxo.tx_pos,
+                            'height': utxo.height, 'value': utxo.value,
+                            'refs': decode_refs(raw_refs)})
+        return entries
 
     async def hashX_listunspent(self, hashX):
         '''Return the list of UTXOs of a script hash, including mempool
         effects.'''
-        utxos = await self.db.all_utxos(hashX)
-        utxos = sorted(utxos)
-        mempool_utxos, spends, _delta = await run_in_thread(
-            self.mempool.combined_mempool_state, hashX)
+        db_utxos = await self.db.all_utxos(hashX)
+        refs = await self.db.utxo_refs(hashX, db_utxos)
+        utxos = sorted(db_utxos)
+        mempool_utxos, spends, _delta = self.mempool.combined_mempool_state(hashX)
         utxos.extend(mempool_utxos)
         self.bump_cost(1.0 + len(utxos) / 50)
-
-        return [{'tx_hash': hash_to_hex_str(utxo.tx_hash),
-                 'tx_pos': utxo.tx_pos,
-                 'height': utxo.height, 'value': utxo.value, 
-                 'refs': self.get_refs_by_outpoint(utxo.tx_hash + pack_le_uint32(utxo.tx_pos))}
-                for utxo in utxos
-                if (utxo.tx_hash, utxo.tx_pos) not in spends]
+        return self._unspent_entries(utxos, spends, refs)
 
     async def codescripthash_listunspent(self, codeScriptHash):
         '''Return the list of UTXOs of a code script hash, including mempool
         effects.'''
         hashX = hex_to_bytes(codeScriptHash)
         utxos = await self.db.codescripthash_all_utxos(hashX)
+        refs = await run_in_thread(self.db.read_utxo_refs, utxos)
         utxos = sorted(utxos)
-        # the following codescripthash_unordered_UTXOs is not implemented yet
-        # Need a way to track codescripthash and hashX together
         utxos.extend(await self.mempool.codescripthash_unordered_UTXOs(hashX))
         self.bump_cost(1.0 + len(utxos) / 50)
-         # the following codescripthash_potential_spends is not implemented yet either
         spends = await self.mempool.codescripthash_potential_spends(hashX)
-
-        return [{'tx_hash': hash_to_hex_str(utxo.tx_hash),
-                 'tx_pos': utxo.tx_pos,
-                 'height': utxo.height, 'value': utxo.value, 
-                 'refs': self.get_refs_by_outpoint(utxo.tx_hash + pack_le_uint32(utxo.tx_pos))}
-                for utxo in utxos
-                if (utxo.tx_hash, utxo.tx_pos) not in spends]
+        return self._unspent_entries(utxos, spends, refs)
     
     async def hashX_subscribe(self, hashX, alias):
         # Store the subscription only after address_status succeeds
         result = await self.address_status(hashX)
         self.hashX_subs[hashX] = alias
+        self.session_mgr.subscribe_hashX(self, hashX)
         return result
 
     async def get_balance(self, hashX):
@@ -1638,8 +1693,7 @@ class ElectrumX(SessionBase):
             cost = 1.0 + len(utxos) / 50
         else:
             cost = 1.0
-        _utxos, _spends, unconfirmed = await run_in_thread(
-            self.mempool.combined_mempool_state, hashX)
+        _utxos, _spends, unconfirmed = self.mempool.combined_mempool_state(hashX)
         self.bump_cost(cost)
         return {'confirmed': confirmed, 'unconfirmed': unconfirmed}
 
@@ -1963,7 +2017,7 @@ class ElectrumX(SessionBase):
 
     async def compact_fee_histogram(self):
         self.bump_cost(1.0)
-        return []
+        return self.mempool.compact_fee_histogram()
 
     def set_request_handlers(self, ptuple):
         self.protocol_tuple = ptuple
@@ -25,8 +25,12 @@ def db_class(name):
 class Storage(object):
     '''Abstract base class of the DB backend abstraction.'''
 
-    def __init__(self, name, for_sync):
+    def __init__(self, name, for_sync, read_only=False):
+        self.name = name
+        self.read_only = read_only
         self.is_new = not os.path.exists(name)
+        if read_only and self.is_new:
+            raise RuntimeError(f'cannot open missing DB "{name}" read-only')
         self.for_sync = for_sync or self.is_new
         self.open(name, create=self.is_new)
 
@@ -43,12 +47,30 @@ class Storage(object):
         '''Close an existing database.'''
         raise NotImplementedError
 
+    def catch_up(self):
+        '''Bring a read-only handle up to date with the process writing
+        the database.
+
+        Read-only handles see the database as it was when they were
+        opened; the REST workers (electrumx/server/rest_worker.py) call
+        this on every new block.
+        '''
+        raise NotImplementedError
+
     def get(self, key):
         raise NotImplementedError
 
     def put(self, key, value):
         raise NotImplementedError
 
+    def multi_get(self, keys):
+        '''Return the values for `keys`, in order, with None where absent.
+
+        Engines with a native batched read override this; the default is
+        one point get per key.
+        '''
+        return [self.get(key) for key in keys]
+
     def write_batch(self):
         '''Return a context manager that provides `put` and `delete`.
 
@@ -74,6 +96,44 @@ class Storage(object):
         '''
         raise NotImplementedError
 
+    def snapshot(self):
+        '''Return a `Snapshot`: a read-only view of the database as of now.
+
+        Long scans (the NDJSON exports) read through a snapshot so that
+        flushes landing mid-scan are not seen.  Engines without snapshots
+        return a view of the live database.
+        '''
+        return Snapshot(self.get, self.iterator)
+
+
+class Snapshot(object):
+    '''Point-in-time read view returned by `Storage.snapshot()`.
+
+    Provides `get` and `iterator` with the `Storage` signatures.  Close it
+    (or use it as a context manager) to release the engine snapshot.
+    '''
+
+    def __init__(self, get, iterator, release=None):
+        self.get = get
+        self._iterator = iterator
+        self._release = release
+
+    def iterator(self, prefix=b'', reverse=False, seek=None,
+                 include_value=True):
+        return self._iterator(prefix=prefix, reverse=reverse, seek=seek,
+                              include_value=include_value)
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 # pylint:disable=W0223
 
 
@@ -86,6 +146,12 @@ class LevelDB(Storage):
         cls.module = plyvel
 
     def open(self, name, create):
+        if self.read_only:
+            # LevelDB takes an exclusive lock on the whole directory, so a
+            # second process cannot open it even for reading.
+            raise RuntimeError('LevelDB cannot be opened read-only alongside '
+                               'the indexer; REST workers need DB_ENGINE='
+                               'rocksdb')
         mof = 512 if self.for_sync else 128
         # Use snappy compression (the default)
         self.db = self.module.DB(name, create_if_missing=create,
@@ -96,6 +162,13 @@ class LevelDB(Storage):
         self.write_batch = partial(self.db.write_batch, transaction=True,
                                    sync=True)
 
+    def snapshot(self):
+        snap = self.db.snapshot()
+        release = getattr(snap, 'close', None) or snap.release
+        return Snapshot(snap.get,
+                        partial(self._iterator, snap, fill_cache=False),
+                        release)
+
     def iterator(self, prefix=b'', reverse=False, seek=None,
                  include_value=True):
         '''Prefix iterator with RocksDB-compatible cursor semantics.
@@ -114,7 +187,15 @@ class LevelDB(Storage):
         ``seek``.  The cursor key itself is therefore included in both
         directions, matching RocksDB's Seek/SeekForPrev positioning.
         '''
+        return self._iterator(self.db, prefix, reverse, seek, include_value)
+
+    @staticmethod
+    def _iterator(source, prefix=b'', reverse=False, seek=None,
+                  include_value=True, fill_cache=True):
+        '''`iterator` over a plyvel DB or snapshot.'''
         kwargs = {'reverse': reverse, 'include_value': include_value}
+        if not fill_cache:
+            kwargs['fill_cache'] = False
         start = prefix
         stop = util.increment_byte_string(prefix) if prefix else None
         if seek and seek >= prefix:
@@ -131,7 +212,7 @@ class LevelDB(Storage):
             kwargs['start'] = start
         if stop:
             kwargs['stop'] = stop
-        return self.db.iterator(**kwargs)
+        return source.iterator(**kwargs)
 
 
 # pylint:disable=E1101
@@ -208,9 +289,21 @@ class RocksDB(Storage):
             compression_name, self.module.CompressionType.lz4_compression
         )
 
-        self.db = self.module.DB(name, options)
-        self.get = self.db.get
-        self.put = self.db.put
+        self._options = options
+        self._set_db(self.module.DB(name, options, read_only=self.read_only))
+
+    def _set_db(self, db):
+        self.db = db
+        self.get = db.get
+        self.put = db.put
+
+    def catch_up(self):
+        # python-rocksdb has no secondary-instance API, so a read-only handle
+        # catches up by reopening: that replays the primary's MANIFEST and
+        # WAL.  The new handle is installed before the old one is dropped;
+        # iterators and snapshots still reading the old one keep it alive
+        # until they finish.
+        self._set_db(self.module.DB(self.name, self._options, read_only=True))
 
     def close(self):
         # R24: del self.db first so python-rocksdb destructor fires and closes
@@ -223,6 +316,11 @@ class RocksDB(Storage):
         del db
         gc.collect()
 
+    def multi_get(self, keys):
+        keys = list(keys)
+        found = self.db.multi_get(keys)
+        return [found.get(key) for key in keys]
+
     def write_batch(self):
         return RocksDBWriteBatch(self.db)
 
@@ -231,6 +329,21 @@ class RocksDB(Storage):
         return RocksDBIterator(self.db, prefix, reverse, seek=seek,
                                include_value=include_value)
 
+    def snapshot(self):
+        # python-rocksdb releases the snapshot when the object is freed.
+        db = self.db
+        read_opts = {'snapshot': db.snapshot(), 'fill_cache': False}
+
+        def get(key):
+            return db.get(key, **read_opts)
+
+        def iterator(prefix=b'', reverse=False, seek=None, include_value=True):
+            return RocksDBIterator(db, prefix, reverse, seek=seek,
+                                   include_value=include_value,
+                                   read_opts=read_opts)
+
+        return Snapshot(get, iterator, read_opts.clear)
+
 
 class RocksDBWriteBatch(object):
     '''A write batch for RocksDB.'''
@@ -266,9 +379,12 @@ class RocksDBIterator(object):
     which would start the page *above* the cursor and re-serve it.
     '''
 
-    def __init__(self, db, prefix, reverse, seek=None, include_value=True):
+    def __init__(self, db, prefix, reverse, seek=None, include_value=True,
+                 read_opts=None):
         self.prefix = prefix
-        source = db.iteritems() if include_value else db.iterkeys()
+        read_opts = read_opts or {}
+        source = (db.iteritems(**read_opts) if include_value
+                  else db.iterkeys(**read_opts))
         if reverse:
             self.iterator = reversed(source)
             nxt_prefix = util.increment_byte_string(prefix)
@@ -8,7 +8,6 @@ and swap history.
 Designed to serve explorers, wallets, DEX interfaces, and market data APIs.
 """
 
-import base64
 import struct
 import time
 from typing import Optional, Dict, Any, List, Tuple
@@ -19,6 +18,7 @@ from electrumx.lib.hash import hash_to_hex_str, hex_str_to_hash, sha256, Base58,
 from electrumx.lib.util import pack_be_uint32, encode_undo, decode_undo
 from electrumx.lib.script import OpCodes, Script, ScriptError
 from electrumx.server.metrics import swap_parse_errors_total as _swap_parse_errors
+from electrumx.server.pagination import clamp_offset, cursor_key, encode_cursor
 
 try:
     import cbor2
@@ -27,31 +27,6 @@ except ImportError:
     HAS_CBOR = False
 
 
-def _encode_cursor(raw_key: bytes) -> str:
-    """Encode raw RocksDB seek key to an opaque cursor.
-
-    URL-safe base64 (``-_`` not ``+/``): cursors travel in REST query strings,
-    where a ``+`` is form-decoded to a space and silently reset pagination to
-    page 1. Shared helper for cursor pagination. See docs/pagination-cursors.md.
-    """
-    return base64.urlsafe_b64encode(raw_key).decode()
-
-
-def _decode_cursor(cursor: Optional[str]) -> Optional[bytes]:
-    """Decode opaque cursor back to seek key. Returns None on failure.
-
-    Accepts both the URL-safe and legacy standard alphabets, and restores a
-    ``+`` that a query-string parser turned into a space.
-    """
-    if not cursor:
-        return None
-    try:
-        normalised = cursor.replace(' ', '+').replace('-', '+').replace('_', '/')
-        return base64.b64decode(normalised)
-    except Exception:
-        return None
-
-
 # Database key prefixes for Swap data
 class SwapDBKeys:
     """Database key prefixes for Swap index."""
@@ -1210,11 +1185,11 @@ class SwapIndex:
 
         if _use_cursor:
             entries = []
-            seek = _decode_cursor(cursor) or prefix
+            seek = cursor_key(cursor) or prefix
             next_cursor = None
             for key, _ in self.db.utxo_db.iterator(prefix=prefix, seek=seek):
                 if len(entries) >= limit:
-                    next_cursor = _encode_cursor(key)
+                    next_cursor = encode_cursor(key)
                     break
                 order_id = key[-36:]
                 order = self.get_order(order_id)
@@ -1226,6 +1201,7 @@ class SwapIndex:
                 'has_more': next_cursor is not None,
             }
 
+        offset = clamp_offset(offset)
         results = []
         count = 0
         for key, _ in self.db.utxo_db.iterator(prefix=prefix):
@@ -1278,14 +1254,14 @@ class SwapIndex:
 
         if _use_cursor:
             entries = []
-            seek = _decode_cursor(cursor)
+            seek = cursor_key(cursor)
             it_kwargs = {'prefix': prefix, 'reverse': True}
             if seek is not None:
                 it_kwargs['seek'] = seek
             next_cursor = None
             for key, value in self.db.utxo_db.iterator(**it_kwargs):
                 if len(entries) >= limit:
-                    next_cursor = _encode_cursor(key)
+                    next_cursor = encode_cursor(key)
                     break
                 if HAS_CBOR:
                     try:
@@ -1298,6 +1274,7 @@ class SwapIndex:
                 'has_more': next_cursor is not None,
             }
 
+        offset = clamp_offset(offset)
         results = []
         count = 0
         for key, value in self.db.utxo_db.iterator(prefix=prefix, reverse=True):
@@ -1317,6 +1294,25 @@ class SwapIndex:
 
         return results
     
+    def export_history(self, snapshot, base_ref: bytes,
+                       seek: Optional[bytes] = None):
+        """Yield ``(key, entry)`` for a token's trade history read from
+        ``snapshot``, newest first from ``seek`` (the order of
+        ``get_swap_history``). Backs the NDJSON swap history export."""
+        if not HAS_CBOR:
+            return
+        prefix = SwapDBKeys.HISTORY + base_ref
+        it_kwargs = {'prefix': prefix, 'reverse': True}
+        if seek and seek.startswith(prefix):
+            it_kwargs['seek'] = seek
+        for key, value in snapshot.iterator(**it_kwargs):
+            try:
+                entry = cbor2.loads(value)
+            except Exception:
+                continue
+            if isinstance(entry, dict):
+                yield key, entry
+
     def get_swap_count(self, base_ref: bytes) -> int:
         """Get total swap count for a token."""
         count = 0
@@ -24,6 +24,7 @@ from electrumx.lib import util
 from electrumx.lib.hash import hash_to_hex_str, hex_str_to_hash, sha256
 from electrumx.lib.util import pack_be_uint32, encode_undo, decode_undo
 from electrumx.lib.glyph import GlyphProtocol, to_jsonsafe
+from electrumx.server.pagination import cursor_page, decode_cursor
 
 try:
     import cbor2
@@ -952,7 +953,8 @@ class WaveIndex:
         count = 0
 
         try:
-            from electrumx.server.glyph_index import GlyphDBKeys, GlyphTokenInfo
+            from electrumx.server.glyph_index import (
+                GlyphDBKeys, GlyphTokenInfo, load_metadata_record)
         except ImportError:
             self.logger.warning('Cannot import GlyphIndex — backfill aborted')
             return 0
@@ -1009,7 +1011,7 @@ class WaveIndex:
                 meta_raw = self.db.utxo_db.get(GlyphDBKeys.METADATA + metadata_hash)
                 if meta_raw:
                     try:
-                        full_metadata = cbor2.loads(meta_raw)
+                        full_metadata = load_metadata_record(meta_raw)
                         zone = WaveZoneRecords.from_metadata(full_metadata)
                     except Exception:
                         pass
@@ -1033,7 +1035,8 @@ class WaveIndex:
     # Query Methods (API)
     # ========================================================================
     
-    def resolve(self, name: str, include_duplicates: bool = False) -> Optional[Dict[str, Any]]:
+    def resolve(self, name: str, include_duplicates: bool = False,
+                pending: Optional[Dict[bytes, bytes]] = None) -> Optional[Dict[str, Any]]:
         """
         Resolve a WAVE name to its zone records and owner.
         
@@ -1043,6 +1046,7 @@ class WaveIndex:
         Args:
             name: The WAVE name to resolve
             include_duplicates: If True, include list of duplicate registrations
+            pending: a pending_duplicates() snapshot, required off the event loop
         
         Returns None if name is not registered.
         """
@@ -1056,7 +1060,7 @@ class WaveIndex:
             info = self.hot_names[normalized]
             result = self._name_info_to_dict(info)
             if include_duplicates:
-                result['duplicates'] = self._get_duplicate_registrations(name)
+                result['duplicates'] = self._get_duplicate_registrations(name, pending)
             return result
         
         # Look up canonical ref (first registration)
@@ -1075,7 +1079,7 @@ class WaveIndex:
         target = zone_dict.get('address')
         
         # Check if there are duplicates
-        has_duplicates = self._has_duplicates(name)
+        has_duplicates = self._has_duplicates(name, pending)
 
         # Populate hot cache on successful resolve
         if len(self.hot_names) < self.hot_name_limit:
@@ -1098,52 +1102,76 @@ class WaveIndex:
         }
         
         if include_duplicates:
-            result['duplicates'] = self._get_duplicate_registrations(name)
+            result['duplicates'] = self._get_duplicate_registrations(name, pending)
         
         return result
     
-    def _has_duplicates(self, name: str) -> bool:
-        """Check if a name has any duplicate registrations."""
-        name_hash = name_to_hash(name)
-        prefix = WaveDBKeys.DUPLICATE + name_hash
-        
-        # Check cache first
-        for key in self.name_cache:
-            if key.startswith(prefix):
-                return True
-        
+    def pending_duplicates(self, name: Optional[str] = None) -> Dict[bytes, bytes]:
+        """Unflushed duplicate registrations of ``name`` (of every name if
+        None), as WD key -> ref.
+
+        The block processor mutates ``name_cache`` on the event loop, and
+        iterating it from a REST reader thread can fail mid-way. REST handlers
+        call this on the loop and pass the result to the threaded lookup.
+        """
+        prefix = WaveDBKeys.DUPLICATE
+        if name is not None:
+            prefix += name_to_hash(name)
+        return {key: ref for key, ref in self.name_cache.items()
+                if key.startswith(prefix)}
+
+    def _has_duplicates(self, name: str,
+                        pending: Optional[Dict[bytes, bytes]] = None) -> bool:
+        """Check if a name has any duplicate registrations.
+
+        ``pending`` is a ``pending_duplicates()`` snapshot taken on the event
+        loop; without it the cache is read here, so the caller must be on the
+        loop.
+        """
+        prefix = WaveDBKeys.DUPLICATE + name_to_hash(name)
+        if pending is None:
+            pending = self.pending_duplicates(name)
+        if any(key.startswith(prefix) for key in pending):
+            return True
+
         # Check database
         for _key, _value in self.db.utxo_db.iterator(prefix=prefix):
             return True
         return False
     
-    def _get_duplicate_registrations(self, name: str) -> List[Dict[str, Any]]:
-        """Get all duplicate registrations for a name."""
+    def _get_duplicate_registrations(
+            self, name: str,
+            pending: Optional[Dict[bytes, bytes]] = None) -> List[Dict[str, Any]]:
+        """Get all duplicate registrations for a name. ``pending`` is as for
+        ``_has_duplicates``."""
         name_hash = name_to_hash(name)
         prefix = WaveDBKeys.DUPLICATE + name_hash
         duplicates = []
-        
+        if pending is None:
+            pending = self.pending_duplicates(name)
+
         # Check cache
-        for key, ref in self.name_cache.items():
-            if key.startswith(prefix):
-                # Parse height and tx_idx from key: WD + name_hash(16) + height(4) + tx_idx(4)
-                height = struct.unpack('<I', key[18:22])[0]
-                tx_idx = struct.unpack('<I', key[22:26])[0]
-                zone = self._get_zone_records(ref)
-                owner = self._get_owner(ref)
-                duplicates.append({
-                    'ref': self._format_ref(ref),
-                    'height': height,
-                    'tx_idx': tx_idx,
-                    'target': zone.address if zone else None,
-                    'owner': owner.hex() if owner else None,
-                    'is_duplicate': True,
-                })
+        for key, ref in pending.items():
+            if not key.startswith(prefix):
+                continue
+            # Parse height and tx_idx from key: WD + name_hash(16) + height(4) + tx_idx(4)
+            height = struct.unpack('<I', key[18:22])[0]
+            tx_idx = struct.unpack('<I', key[22:26])[0]
+            zone = self._get_zone_records(ref)
+            owner = self._get_owner(ref)
+            duplicates.append({
+                'ref': self._format_ref(ref),
+                'height': height,
+                'tx_idx': tx_idx,
+                'target': zone.address if zone else None,
+                'owner': owner.hex() if owner else None,
+                'is_duplicate': True,
+            })
         
         # Check database
         for key, ref in self.db.utxo_db.iterator(prefix=prefix):
             # Skip if already in cache
-            if key in self.name_cache:
+            if key in pending:
                 continue
             height = struct.unpack('<I', key[18:22])[0]
             tx_idx = struct.unpack('<I', key[22:26])[0]
@@ -1162,9 +1190,10 @@ class WaveIndex:
         duplicates.sort(key=lambda x: (x['height'], x['tx_idx']))
         return duplicates
     
-    def get_all_registrations(self, name: str) -> Dict[str, Any]:
+    def get_all_registrations(self, name: str,
+                              pending: Optional[Dict[bytes, bytes]] = None) -> Dict[str, Any]:
         """Get canonical registration plus all duplicates for a name."""
-        result = self.resolve(name, include_duplicates=True)
+        result = self.resolve(name, include_duplicates=True, pending=pending)
         if not result:
             return {'name': name, 'registered': False}
         return result
@@ -1366,24 +1395,28 @@ class WaveIndex:
         vout = struct.unpack('<I', ref[32:36])[0]
         return hash_to_hex_str(txid) + '_' + str(vout)
     
-    def list_names(self, limit: int = 500, cursor: Optional[bytes] = None) -> Dict[str, Any]:
+    def list_names(self, limit: int = 500, cursor: Optional[str] = None) -> Dict[str, Any]:
         """
         List canonical WAVE names by iterating the WN (NAME) prefix directly.
         Returns only canonical (first-registration-wins) entries.
-        Cursor is the raw DB key bytes for pagination.
+        ``cursor`` is the opaque ``next_cursor`` of the previous page
+        (ValueError if malformed).
         """
         results = []
-        next_cursor = None
+        next_key = None
         count = 0
 
         # Iterate DB entries with WN prefix
         iter_kwargs: Dict[str, Any] = {'prefix': WaveDBKeys.NAME}
-        if cursor:
-            iter_kwargs['seek'] = cursor
+        seek = decode_cursor(cursor)
+        if seek is not None:
+            if not seek.startswith(WaveDBKeys.NAME):
+                raise ValueError('invalid cursor')
+            iter_kwargs['seek'] = seek
 
         for key, ref_bytes in self.db.utxo_db.iterator(**iter_kwargs):
             if count >= limit:
-                next_cursor = key
+                next_key = key
                 break
             if len(ref_bytes) < 36:
                 continue
@@ -1395,7 +1428,7 @@ class WaveIndex:
             })
             count += 1
 
-        return {'entries': results, 'next_cursor': next_cursor}
+        return cursor_page(results, next_key)
 
     def _count_db_prefix(self, prefix: bytes, limit: int = 0) -> int:
         """Count entries in the DB with a given key prefix.
@@ -0,0 +1,207 @@
+"""Topic-indexed fan-out for the REST ``/ws`` endpoint.
+
+The broadcaster used to walk every connected client for every poll,
+intersect its subscription sets with the touched refs and scripthashes,
+serialise a message per client and ``await send_json`` on each in turn. CPU
+grew with clients x events, and one slow socket delayed every client behind
+it.
+
+``WsHub`` inverts that:
+
+* **Topic index.** Subscriptions are stored from topic to subscribers:
+  ``('ref', ref_hex)``, ``('sh', scripthash_hex, hashX)``, ``ALL_TOKENS`` and
+  ``ALL_SWAPS``. ``publish()`` only touches subscribers of the topics that
+  changed.
+* **One message per client per publish.** A client gets a single update
+  listing every subscribed ref and scripthash that was touched, so its
+  queue grows by one per poll however many of its topics changed. Wildcard
+  subscribers get every touched ref. Clients with the same matches share
+  one encoded message.
+* **Per-client queues.** Each client has a bounded outgoing queue drained by
+  its own writer task, so ``publish()`` never awaits a socket.
+* **Backpressure.** A client whose queue is full is dropped: it is
+  unsubscribed, its writer is cancelled and the socket is closed with 1013
+  (try again later). Healthy clients are unaffected.
+"""
+
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from electrumx.lib import util
+
+WS_CLIENT_QUEUE = int(os.getenv('WS_CLIENT_QUEUE', '256'))
+WS_MAX_SUBSCRIPTIONS = int(os.getenv('WS_MAX_SUBSCRIPTIONS', '1000'))
+
+ALL_TOKENS = ('all_tokens',)
+ALL_SWAPS = ('all_swaps',)
+
+# Close code for a dropped slow consumer (RFC 6455 "Try Again Later").
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
+
+def encode_message(msg: dict) -> str:
+    return json.dumps(msg, separators=(',', ':'))
+
+
+def update_message(refs=(), scripthashes=()) -> str:
+    return encode_message({'event': 'update',
+                           'touched_refs': list(refs),
+                           'touched_scripthashes': list(scripthashes)})
+
+
+class WsSubscriber:
+    """One connected client: its topics, outgoing queue and writer task."""
+
+    def __init__(self, ws, queue_size: int):
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.topics: Set[tuple] = set()
+        self.closed = False
+        self.writer: Optional[asyncio.Task] = None
+
+    def send(self, text: str) -> bool:
+        """Queue pre-serialised text. False if the client is closed or its
+        queue is full."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def run_writer(self):
+        while True:
+            await self.ws.send_text(await self.queue.get())
+
+
+class WsHub:
+    """Subscription index and fan-out for ``/ws`` clients (see module doc)."""
+
+    def __init__(self, queue_size: int = WS_CLIENT_QUEUE,
+                 max_subscriptions: int = WS_MAX_SUBSCRIPTIONS):
+        self.logger = util.class_logger(__name__, self.__class__.__name__)
+        self.queue_size = queue_size
+        self.max_subscriptions = max_subscriptions
+        self.clients: Set[WsSubscriber] = set()
+        self.subscribers: Dict[tuple, Set[WsSubscriber]] = defaultdict(set)
+        # hashX -> scripthash topics, as the mempool reports touched hashXs.
+        self.sh_topics: Dict[bytes, Set[tuple]] = defaultdict(set)
+        self.dropped = 0
+
+    def connect(self, ws) -> WsSubscriber:
+        client = WsSubscriber(ws, self.queue_size)
+        client.writer = asyncio.get_running_loop().create_task(self._write(client))
+        self.clients.add(client)
+        return client
+
+    def disconnect(self, client: WsSubscriber):
+        """Forget a client and stop its writer. Idempotent."""
+        client.closed = True
+        if client.writer is not None:
+            client.writer.cancel()
+        for topic in list(client.topics):
+            self.unsubscribe(client, topic)
+        self.clients.discard(client)
+
+    def subscribe(self, client: WsSubscriber, topic: tuple) -> bool:
+        """Add a topic. False once the client is at its subscription cap."""
+        if topic in client.topics:
+            return True
+        if len(client.topics) >= self.max_subscriptions:
+            return False
+        client.topics.add(topic)
+        self.subscribers[topic].add(client)
+        if topic[0] == 'sh':
+            self.sh_topics[topic[2]].add(topic)
+        return True
+
+    def unsubscribe(self, client: WsSubscriber, topic: tuple):
+        client.topics.discard(topic)
+        subs = self.subscribers.get(topic)
+        if subs is None:
+            return
+        subs.discard(client)
+        if not subs:
+            del self.subscribers[topic]
+            if topic[0] == 'sh':
+                topics = self.sh_topics[topic[2]]
+                topics.discard(topic)
+                if not topics:
+                    del self.sh_topics[topic[2]]
+
+    def publish(self, touched_refs: Iterable[bytes],
+                touched_hashXs: Iterable[bytes]) -> int:
+        """Queue one update message per affected client, listing every
+        subscribed ref and scripthash it touched. Returns the number of
+        messages queued."""
+        # client -> (touched ref hexes, touched scripthash hexes)
+        matched: Dict[WsSubscriber, Tuple[list, list]] = {}
+
+        def match(client):
+            entry = matched.get(client)
+            if entry is None:
+                entry = matched[client] = ([], [])
+            return entry
+
+        ref_hexes = sorted(ref.hex() for ref in touched_refs)
+        if ref_hexes:
+            wildcard = (self.subscribers.get(ALL_TOKENS, set())
+                        | self.subscribers.get(ALL_SWAPS, set()))
+            for client in wildcard:
+                matched[client] = (ref_hexes, [])
+            for ref_hex in ref_hexes:
+                for client in self.subscribers.get(('ref', ref_hex), ()):
+                    if client not in wildcard:
+                        match(client)[0].append(ref_hex)
+
+        for hashX in touched_hashXs:
+            for topic in self.sh_topics.get(hashX, ()):
+                for client in self.subscribers[topic]:
+                    match(client)[1].append(topic[1])
+
+        # Clients with the same matches share one encoded message
+        messages: Dict[tuple, str] = {}
+        queued = 0
+        slow = []
+        for client, (refs, scripthashes) in matched.items():
+            key = (tuple(refs), tuple(sorted(scripthashes)))
+            text = messages.get(key)
+            if text is None:
+                text = messages[key] = update_message(*key)
+            if client.send(text):
+                queued += 1
+            else:
+                slow.append(client)
+
+        for client in slow:
+            self.drop(client)
+        return queued
+
+    def drop(self, client: WsSubscriber):
+        """Disconnect a client that is not keeping up."""
+        if client.closed:
+            return
+        self.dropped += 1
+        self.logger.debug(f'dropping slow websocket client '
+                          f'({client.queue.qsize()} messages queued)')
+        self.disconnect(client)
+        asyncio.get_running_loop().create_task(self._close(client))
+
+    async def _write(self, client: WsSubscriber):
+        try:
+            await client.run_writer()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket went away; the endpoint's receive loop notices too.
+            self.disconnect(client)
+
+    async def _close(self, client: WsSubscriber):
+        try:
+            await client.ws.close(code=WS_CLOSE_TRY_AGAIN_LATER)
+        except Exception:
+            pass
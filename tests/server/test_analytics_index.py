@@ -199,6 +199,30 @@ def test_top_addresses_offset_clamped_to_pool():
     assert db.utxo_db.balance_scan_count == 1
 
 
+def test_top_addresses_cursor_survives_pool_refresh():
+    """A cursor resumes at its (balance, hashX) even after the pool is rebuilt
+    with a new address ranked above it."""
+    from electrumx.server.analytics_index import AnalyticsDBKeys, AnalyticsIndex
+
+    db = FakeDB()
+    env = FakeEnv()
+    _seed_balances(db, env, n=10)
+    idx = AnalyticsIndex(db, env)
+
+    page = idx.get_top_addresses(limit=4, _use_cursor=True)
+    seen = [r['balance'] for r in page['rows']]
+    assert page['has_more']
+
+    db.utxo_db._store[AnalyticsDBKeys.BALANCE + b'\xee' * 13] = struct.pack(
+        "<Q", 100 * env.coin.VALUE_PER_COIN)
+    idx._top_pool = None
+    while page['has_more']:
+        page = idx.get_top_addresses(limit=4, cursor=page['next_cursor'],
+                                     _use_cursor=True)
+        seen.extend(r['balance'] for r in page['rows'])
+    assert seen == [n * env.coin.VALUE_PER_COIN for n in range(10, 0, -1)]
+
+
 # ---------------------------------------------------------------------------
 # Async backfill tests
 # ---------------------------------------------------------------------------
@@ -0,0 +1,149 @@
+"""Per-block aggregation of glyph balance deltas.
+
+update_balance used to read the current balance and undo-record both the GB
+and GR keys on every credit and debit, so a batch transfer touching one
+(hashX, ref) many times in a block repeated all of it. Deltas are now folded
+per (hashX, ref) and applied once per block with one batched read.
+"""
+import contextlib
+import struct
+
+from electrumx.server.glyph_index import (
+    GlyphDBKeys,
+    GlyphIndex,
+    GlyphTokenInfo,
+    pack_balance_key,
+    pack_holder_key,
+)
+from electrumx.lib.util import decode_undo
+from tests.support import FakeEnv
+
+HASHX = b'\xaa' * 11
+OTHER = b'\xcc' * 11
+REF = b'\xbb' * 36
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self._store = store
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def delete(self, key):
+        self._store.pop(key, None)
+
+
+class _CountingUtxoDB:
+    def __init__(self):
+        self._store = {}
+        self.gets = 0
+        self.multi_gets = []
+
+    def get(self, key):
+        self.gets += 1
+        return self._store.get(key)
+
+    def multi_get(self, keys):
+        self.multi_gets.append(list(keys))
+        return [self._store.get(key) for key in keys]
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        items = sorted((k, v) for k, v in self._store.items() if k.startswith(prefix))
+        if reverse:
+            items.reverse()
+        if include_value:
+            return iter(items)
+        return iter([k for k, _v in items])
+
+    @contextlib.contextmanager
+    def write_batch(self):
+        yield _FakeBatch(self._store)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.utxo_db = _CountingUtxoDB()
+        self.db_height = 500
+
+
+def _make_index(balance=None):
+    db = _FakeDB()
+    if balance is not None:
+        db.utxo_db._store[pack_balance_key(HASHX, REF)] = struct.pack('<Q', balance)
+        db.utxo_db._store[pack_holder_key(REF, HASHX)] = struct.pack('<Q', balance)
+    idx = GlyphIndex(db, FakeEnv())
+    idx.token_cache[REF] = GlyphTokenInfo()   # known token
+    return idx, db
+
+
+def _block(idx, height, n):
+    """A batch transfer: n round trips of 1 photon between HASHX and OTHER."""
+    for _ in range(n):
+        idx.process_balance_changes(
+            height, debits=[(HASHX, 1, REF + b'\x00')], credits=[(OTHER, 1, [REF])])
+        idx.process_balance_changes(
+            height, debits=[(OTHER, 1, REF + b'\x00')], credits=[(HASHX, 1, [REF])])
+    idx.apply_balance_deltas()
+
+
+def test_repeated_touches_read_once_and_undo_once():
+    idx, db = _make_index(balance=10)
+    db.utxo_db.gets = 0
+    _block(idx, 501, 50)
+
+    assert db.utxo_db.gets == 0
+    assert len(db.utxo_db.multi_gets) == 1
+    assert len(db.utxo_db.multi_gets[0]) == 4      # GB + GR for each hashX
+    undo_keys = [key for key, _prev in idx._undo_cache[501]]
+    assert sorted(undo_keys) == sorted(set(undo_keys))
+    assert len(undo_keys) == 4
+    assert idx.balance_cache[pack_balance_key(HASHX, REF)] == 10
+    assert pack_balance_key(OTHER, REF) in idx.balance_deletes
+
+
+def test_fold_keeps_per_step_clamping():
+    # Debit more than held, then credit: applied one by one the balance
+    # clamps at 0 before the credit, so the result is 3, not 10 - 12 + 3.
+    idx, _db = _make_index(balance=10)
+    idx.update_balance(501, HASHX, REF, -12)
+    idx.update_balance(501, HASHX, REF, +3)
+    idx.apply_balance_deltas()
+    assert idx.balance_cache[pack_balance_key(HASHX, REF)] == 3
+
+
+def test_pending_deltas_are_visible_before_apply():
+    idx, _db = _make_index(balance=10)
+    idx.update_balance(501, HASHX, REF, -4)
+    scripthash = (HASHX + bytes(21))[::-1]   # Electrum scripthash of HASHX
+    assert idx.get_balance(scripthash, REF) == 6
+
+
+def test_new_height_applies_previous_block():
+    idx, _db = _make_index(balance=10)
+    idx.update_balance(501, HASHX, REF, -4)
+    idx.update_balance(502, HASHX, REF, -1)
+    assert idx.balance_cache[pack_balance_key(HASHX, REF)] == 6
+    assert idx.balance_height[pack_balance_key(HASHX, REF)] == 501
+    idx.apply_balance_deltas()
+    assert idx.balance_cache[pack_balance_key(HASHX, REF)] == 5
+
+
+def test_flush_applies_pending_and_backup_restores():
+    idx, db = _make_index(balance=10)
+    _block(idx, 501, 3)
+    idx.update_balance(501, HASHX, REF, -10)   # left pending for flush
+    idx.flush(_FakeBatch(db.utxo_db._store))
+
+    store = db.utxo_db._store
+    assert pack_balance_key(HASHX, REF) not in store
+    undo = decode_undo(store[GlyphDBKeys.UNDO + (501).to_bytes(4, 'big')])
+    assert len(undo) == 4
+
+    idx.backup(_FakeBatch(store), 501)
+    assert store[pack_balance_key(HASHX, REF)] == struct.pack('<Q', 10)
+    assert store[pack_holder_key(REF, HASHX)] == struct.pack('<Q', 10)
+    assert pack_balance_key(OTHER, REF) not in store
@@ -0,0 +1,186 @@
+"""Batched multi-key reads behind the /batch REST endpoints.
+
+Covers:
+- GlyphIndex.get_tokens / get_balances read all uncached keys with one
+  multi_get, honour the flush caches and pending deltas, and keep order
+- DB.all_utxos_batch serves cached lists and reads the rest in one pass
+- DB.get_refs_by_outpoints decodes the same records as get_refs_by_outpoint
+- DB.utxo_refs reads a UTXO list's refs in one multi_get and caches them
+  with that list; listunspent formats confirmed and mempool refs once
+"""
+import asyncio
+import struct
+from types import SimpleNamespace
+
+import pylru
+
+from electrumx.server.db import DB, UTXO
+from electrumx.server.glyph_index import (
+    GlyphIndex,
+    GlyphTokenInfo,
+    pack_balance_key,
+    pack_token_key,
+)
+from electrumx.server.session import ElectrumX
+from tests.support import FakeEnv
+
+
+class _CountingUtxoDB:
+    def __init__(self):
+        self._store = {}
+        self.gets = 0
+        self.multi_gets = []
+
+    def get(self, key):
+        self.gets += 1
+        return self._store.get(key)
+
+    def multi_get(self, keys):
+        self.multi_gets.append(list(keys))
+        return [self._store.get(key) for key in keys]
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        return iter([])
+
+
+def _index():
+    db = SimpleNamespace(utxo_db=_CountingUtxoDB(), db_height=10)
+    return GlyphIndex(db, FakeEnv()), db.utxo_db
+
+
+def _token(ref, name):
+    token = GlyphTokenInfo()
+    token.ref = ref
+    token.name = name
+    return token
+
+
+REFS = [bytes([i]) * 36 for i in range(4)]
+
+
+def test_get_tokens_one_multi_get_in_order():
+    idx, store = _index()
+    store._store[pack_token_key(REFS[0])] = _token(REFS[0], 'a').to_bytes()
+    store._store[pack_token_key(REFS[2])] = _token(REFS[2], 'c').to_bytes()
+    idx.token_cache[REFS[3]] = _token(REFS[3], 'd')      # unflushed
+
+    tokens = idx.get_tokens(REFS)
+
+    assert [t and t.name for t in tokens] == ['a', None, 'c', 'd']
+    assert store.gets == 0
+    assert store.multi_gets == [[pack_token_key(r) for r in REFS[:3]]]
+
+
+def test_get_balances_matches_get_balance():
+    idx, store = _index()
+    shs = [bytes([0x10 + i]) * 32 for i in range(3)]
+    hashXs = [idx._scripthash_to_hashX(sh) for sh in shs]
+    store._store[pack_balance_key(hashXs[0], REFS[0])] = struct.pack('<Q', 5)
+    store._store[pack_balance_key(hashXs[1], REFS[0])] = struct.pack('<Q', 9)
+    idx.balance_deletes.add(pack_balance_key(hashXs[1], REFS[0]))
+    idx.balance_cache[pack_balance_key(hashXs[2], REFS[1])] = 7
+    idx._pending_balances[(hashXs[0], REFS[0])] = (0, 3)
+
+    pairs = [(shs[0], REFS[0]), (shs[1], REFS[0]), (shs[2], REFS[1]),
+             (shs[2], REFS[2])]
+    balances = idx.get_balances(pairs)
+
+    assert balances == [8, 0, 7, 0]
+    assert len(store.multi_gets) == 1 and len(store.multi_gets[0]) == 2
+    assert balances == [idx.get_balance(sh, ref) for sh, ref in pairs]
+
+
+def test_all_utxos_batch_reads_uncached_in_one_pass():
+    reads = []
+
+    def read_utxos(hashX):
+        reads.append(hashX)
+        return [SimpleNamespace(tx_hash=hashX, tx_pos=0)]
+
+    cached = [SimpleNamespace(tx_hash=b'c', tx_pos=1)]
+    refs_cache = {b'A': (id(cached), {}), b'B': (0, {})}
+    db = SimpleNamespace(_utxo_list_cache={b'A': cached}, _read_utxos=read_utxos,
+                         _utxo_refs_cache=refs_cache, logger=None)
+
+    result = asyncio.run(DB.all_utxos_batch(db, [b'A', b'B', b'C', b'B']))
+    assert result[b'A'] is cached
+    assert [u.tx_hash for u in result[b'B']] == [b'B']
+    assert reads == [b'B', b'C']
+    assert set(db._utxo_list_cache) == {b'A', b'B', b'C'}
+    # Refs cached for an older list of a re-read address are dropped
+    assert set(refs_cache) == {b'A'}
+
+
+def test_get_refs_by_outpoints():
+    outpoint = bytes(32) + struct.pack('<I', 1)
+    ref = bytes(range(32)) + struct.pack('<I', 2)
+    store = _CountingUtxoDB()
+    store._store[b'ri' + outpoint] = ref + b'\x01' + ref + b'\x00'
+    db = SimpleNamespace(utxo_db=store)
+    db.decode_refs = lambda value: DB.decode_refs(db, value)
+    db.outpoint_to_str = lambda op: DB.outpoint_to_str(db, op)
+
+    other = bytes([1]) * 36
+    refs = DB.get_refs_by_outpoints(db, [outpoint, other])
+
+    assert refs == [[{'ref': DB.outpoint_to_str(db, ref), 'type': 'single'},
+                     {'ref': DB.outpoint_to_str(db, ref), 'type': 'normal'}], []]
+    assert refs[0] == DB.get_refs_by_outpoint(db, outpoint)
+    assert len(store.multi_gets) == 1
+
+
+def _refs_db(store):
+    db = SimpleNamespace(utxo_db=store, _utxo_refs_cache=pylru.lrucache(10))
+    db.read_utxo_refs = lambda utxos: DB.read_utxo_refs(db, utxos)
+    db.decode_refs = lambda value: DB.decode_refs(db, value)
+    db.outpoint_to_str = lambda op: DB.outpoint_to_str(db, op)
+    return db
+
+
+def test_utxo_refs_cached_with_the_utxo_list():
+    ref = bytes(range(32)) + struct.pack('<I', 2)
+    store = _CountingUtxoDB()
+    utxos = [UTXO(n, n, bytes([n]) * 32, 5, 100) for n in range(3)]
+    store._store[b'ri' + utxos[1].tx_hash + struct.pack('<I', 1)] = ref + b'\x01'
+    db = _refs_db(store)
+
+    refs = asyncio.run(DB.utxo_refs(db, b'X', utxos))
+    assert refs == {(utxos[1].tx_hash, 1): ref + b'\x01'}
+    assert len(store.multi_gets) == 1 and len(store.multi_gets[0]) == 3
+    assert store.gets == 0
+    # Same list: served from the cache.  A new list is read again.
+    assert asyncio.run(DB.utxo_refs(db, b'X', utxos)) is refs
+    assert len(store.multi_gets) == 1
+    asyncio.run(DB.utxo_refs(db, b'X', list(utxos)))
+    assert len(store.multi_gets) == 2
+    # The cache does not keep the list it was read for alive
+    assert not any(isinstance(part, list) for part in db._utxo_refs_cache[b'X'])
+
+
+def test_listunspent_formats_confirmed_and_mempool_refs():
+    ref = bytes(range(32)) + struct.pack('<I', 2)
+    store = _CountingUtxoDB()
+    confirmed = [UTXO(1, 0, b'\x01' * 32, 5, 100), UTXO(2, 0, b'\x02' * 32, 6, 200)]
+    store._store[b'ri' + confirmed[0].tx_hash + struct.pack('<I', 0)] = ref + b'\x00'
+    db = _refs_db(store)
+
+    async def all_utxos(hashX):
+        return confirmed
+    db.all_utxos = all_utxos
+    db.utxo_refs = lambda hashX, utxos: DB.utxo_refs(db, hashX, utxos)
+
+    mempool_utxo = UTXO(-1, 1, b'\x03' * 32, 0, 50)
+    mempool = SimpleNamespace(
+        outpointToRefs={mempool_utxo.tx_hash + struct.pack('<I', 1): ref + b'\x01'},
+        combined_mempool_state=lambda hashX: (
+            [mempool_utxo], {(confirmed[1].tx_hash, 0)}, 0))
+    session = SimpleNamespace(db=db, mempool=mempool, bump_cost=lambda cost: None)
+    session._unspent_entries = lambda *args: ElectrumX._unspent_entries(session, *args)
+
+    entries = asyncio.run(ElectrumX.hashX_listunspent(session, b'X'))
+    ref_str = DB.outpoint_to_str(db, ref)
+    assert [(e['tx_pos'], e['height'], e['refs']) for e in entries] == [
+        (0, 5, [{'ref': ref_str, 'type': 'normal'}]),
+        (1, 0, [{'ref': ref_str, 'type': 'single'}]),
+    ]
+    assert store.gets == 0 and len(store.multi_gets) == 1
@@ -0,0 +1,278 @@
+"""
+v6 content-addressed blob store (BLOB / BLOB_REFS).
+
+Covers:
+- Splitting a metadata body: large byte strings become pointers, small stay
+- Blobs are stored once per content and reference-counted per GM record
+- get_metadata reads blobs back in place; resolve_blobs=False keeps pointers
+- Reorg: backup() releases only the references its block added, per height,
+  leaving those the backfill added since
+- Denylist scrub releases references and deletes orphaned blobs
+- In-place v5 -> v6 backfill of existing GM rows
+"""
+
+import contextlib
+import struct
+
+import pytest
+
+try:
+    import cbor2
+    HAS_CBOR = True
+except ImportError:
+    HAS_CBOR = False
+
+from electrumx.lib.hash import sha256
+from electrumx.server.glyph_index import (
+    BLOB_MIN_SIZE,
+    BLOB_REF_TAG,
+    CURRENT_SCHEMA_VERSION,
+    SPLIT_RECORD_MARKER,
+    BlobRef,
+    GlyphDBKeys,
+    GlyphIndex,
+    GlyphTokenInfo,
+    decode_blob,
+    encode_blob,
+    load_metadata_record,
+    pack_blob_key,
+    pack_blob_refs_key,
+    pack_ref,
+    pack_token_key,
+    split_metadata_blobs,
+)
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self._store = store
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def delete(self, key):
+        self._store.pop(key, None)
+
+
+class _FakeUtxoDB:
+    def __init__(self):
+        self._store = {}
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        items = sorted((k, v) for k, v in self._store.items() if k.startswith(prefix))
+        if seek:
+            items = [(k, v) for k, v in items if k >= seek]
+        if include_value:
+            return iter(items)
+        return iter([k for k, _v in items])
+
+    @contextlib.contextmanager
+    def write_batch(self):
+        yield _FakeBatch(self._store)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.utxo_db = _FakeUtxoDB()
+        self.db_height = 1000
+
+
+class _FakeEnv:
+    glyph_index = True
+    reorg_limit = 0
+
+    def __init__(self, denylist=()):
+        self.dmint_denylist = set(denylist)
+
+
+pytestmark = pytest.mark.skipif(not HAS_CBOR, reason="cbor2 required")
+
+ICON = b"\x89PNG" + bytes(range(256)) * 20
+
+
+def _meta(name, icon=ICON):
+    return cbor2.dumps({"p": [2], "name": name,
+                        "main": {"t": "image/png", "b": icon}})
+
+
+def _refs(db, blob_hash):
+    raw = db.utxo_db.get(pack_blob_refs_key(blob_hash))
+    return struct.unpack('<I', raw)[0] if raw else 0
+
+
+def _flush_meta(idx, db, meta, height):
+    h = sha256(meta)
+    idx.metadata_cache[h] = meta
+    idx.metadata_height[h] = height
+    idx.flush(_FakeBatch(db.utxo_db._store))
+    return h
+
+
+class TestSplit:
+    def test_large_bytes_move_small_stay(self):
+        meta = cbor2.dumps({"main": {"t": "image/png", "b": ICON},
+                            "hs": b"x" * (BLOB_MIN_SIZE - 1)})
+        record, blobs = split_metadata_blobs(meta)
+        assert record[:1] == SPLIT_RECORD_MARKER
+        assert blobs == {sha256(ICON): (ICON, "image/png")}
+        out = load_metadata_record(record)
+        assert out["main"]["b"] == BlobRef(sha256(ICON), len(ICON))
+        assert out["hs"] == b"x" * (BLOB_MIN_SIZE - 1)
+
+    def test_nothing_to_move_is_unchanged(self):
+        meta = cbor2.dumps({"name": "small", "b": b"abc"})
+        assert split_metadata_blobs(meta) == (meta, {})
+        assert load_metadata_record(meta) == {"name": "small", "b": b"abc"}
+
+    def test_existing_pointer_tag_is_not_split(self):
+        meta = cbor2.dumps({"b": ICON, "x": cbor2.CBORTag(BLOB_REF_TAG, [b"", 0])})
+        assert split_metadata_blobs(meta) == (meta, {})
+
+    def test_blob_codecs_round_trip(self):
+        for payload in (ICON, bytes(5000), b""):
+            assert decode_blob(encode_blob(payload, "image/png")) == (payload, "image/png")
+        # Compressible payloads are stored compressed; the rest raw.
+        assert len(encode_blob(bytes(5000), None)) < 100
+        assert decode_blob(encode_blob(b"abc", None)) == (b"abc", None)
+
+
+class TestFlush:
+    def test_identical_embeds_share_one_blob(self):
+        db = _FakeDB()
+        idx = GlyphIndex(db, _FakeEnv())
+        h1 = _flush_meta(idx, db, _meta("A"), 100)
+        h2 = _flush_meta(idx, db, _meta("B"), 101)
+        blob_hash = sha256(ICON)
+        assert len([k for k in db.utxo_db._store if k.startswith(GlyphDBKeys.BLOB)]) == 1
+        assert _refs(db, blob_hash) == 2
+        for h in (h1, h2):
+            assert len(db.utxo_db.get(GlyphDBKeys.METADATA + h)) < 200
+            assert idx.get_metadata(h)["main"]["b"] == ICON
+        pointer = idx.get_metadata(h1, resolve_blobs=False)["main"]["b"]
+        assert pointer == BlobRef(blob_hash, len(ICON))
+        assert idx.get_blob(blob_hash) == (ICON, "image/png")
+
+    def test_reflush_of_same_record_is_not_recounted(self):
+        db = _FakeDB()
+        idx = GlyphIndex(db, _FakeEnv())
+        _flush_meta(idx, db, _meta("A"), 100)
+        _flush_meta(idx, db, _meta("A"), 105)
+        assert _refs(db, sha256(ICON)) == 1
+
+    def test_backup_restores_blob_rows(self):
+        db = _FakeDB()
+        idx = GlyphIndex(db, _FakeEnv())
+        store = db.utxo_db._store
+        _flush_meta(idx, db, _meta("A"), 100)
+        h2 = _flush_meta(idx, db, _meta("B"), 101)
+        idx.backup(_FakeBatch(store), 101)
+        assert GlyphDBKeys.METADATA + h2 not in store
+        assert _refs(db, sha256(ICON)) == 1
+        idx.backup(_FakeBatch(store), 100)
+        assert not any(k.startswith((GlyphDBKeys.BLOB, GlyphDBKeys.BLOB_REFS,
+                                     GlyphDBKeys.METADATA)) for k in store)
+
+    def test_backup_releases_only_its_blocks_references(self):
+        db = _FakeDB()
+        idx = GlyphIndex(db, _FakeEnv())
+        store = db.utxo_db._store
+        blob_hash = sha256(ICON)
+        _flush_meta(idx, db, _meta("A"), 100)
+        # A v5 record the backfill splits after the flush: its reference
+        # has no undo, so the reorg must leave it and the blob in place.
+        meta_b = _meta("B")
+        store[GlyphDBKeys.METADATA + sha256(meta_b)] = meta_b
+        with db.utxo_db.write_batch() as batch:
+            idx.blob_migration.schedule(batch)
+        idx.blob_migration.run_to_completion(db.utxo_db)
+        assert _refs(db, blob_hash) == 2
+
+        idx.backup(_FakeBatch(store), 100)
+        assert _refs(db, blob_hash) == 1
+        assert idx.get_metadata(sha256(meta_b))["main"]["b"] == ICON
+
+    def test_one_flush_undoes_each_height(self):
+        db = _FakeDB()
+        idx = GlyphIndex(db, _FakeEnv())
+        store = db.utxo_db._store
+        blob_hash = sha256(ICON)
+        for name, height in (("A", 100), ("B", 101), ("C", 101)):
+            meta = _meta(name)
+            idx.metadata_cache[sha256(meta)] = meta
+            idx.metadata_height[sha256(meta)] = height
+        idx.flush(_FakeBatch(store))
+        assert _refs(db, blob_hash) == 3
+
+        idx.backup(_FakeBatch(store), 101)
+        assert _refs(db, blob_hash) == 1
+        assert idx.get_metadata(sha256(_meta("A")))["main"]["b"] == ICON
+        idx.backup(_FakeBatch(store), 100)
+        assert pack_blob_key(blob_hash) not in store
+        assert pack_blob_refs_key(blob_hash) not in store
+
+
+class TestScrub:
+    def _token(self, db, ref, meta_hash):
+        t = GlyphTokenInfo()
+        t.ref = ref
+        t.deploy_txid = bytes(32)
+        t.metadata_hash = meta_hash
+        db.utxo_db.put(pack_token_key(ref), t.to_bytes())
+
+    def test_scrub_releases_shared_blob_last(self):
+        db = _FakeDB()
+        idx = GlyphIndex(db, _FakeEnv())
+        ha = _flush_meta(idx, db, _meta("A"), 100)
+        hb = _flush_meta(idx, db, _meta("B"), 101)
+        ref_a = pack_ref(b"\x0a" * 32, 0)
+        ref_b = pack_ref(b"\x0b" * 32, 0)
+        self._token(db, ref_a, ha)
+        self._token(db, ref_b, hb)
+        blob_hash = sha256(ICON)
+
+        idx = GlyphIndex(db, _FakeEnv([ref_a.hex()]))
+        idx._scrub_denylist_metadata()
+        assert _refs(db, blob_hash) == 1
+        assert idx.get_metadata(hb)["main"]["b"] == ICON
+
+        idx = GlyphIndex(db, _FakeEnv([ref_a.hex(), ref_b.hex()]))
+        idx._scrub_denylist_metadata()
+        assert pack_blob_key(blob_hash) not in db.utxo_db._store
+        assert pack_blob_refs_key(blob_hash) not in db.utxo_db._store
+
+
+class TestBlobMigration:
+    def test_v5_records_are_split_in_place(self):
+        db = _FakeDB()
+        store = db.utxo_db._store
+        metas = [_meta("A"), _meta("B"), cbor2.dumps({"name": "tiny"})]
+        for meta in metas:
+            store[GlyphDBKeys.METADATA + sha256(meta)] = meta
+        store[GlyphDBKeys.SCHEMA_VERSION] = bytes([5])
+
+        idx = GlyphIndex(db, _FakeEnv())
+        idx._check_schema_version()
+        assert store[GlyphDBKeys.SCHEMA_VERSION] == bytes([CURRENT_SCHEMA_VERSION])
+        assert not idx.blob_migration.complete
+        # Unsplit rows stay readable while the backfill is pending.
+        assert idx.get_metadata(sha256(metas[0]))["main"]["b"] == ICON
+
+        idx.blob_migration.run_to_completion(db.utxo_db, limit=1)
+        assert idx.blob_migration.complete
+        assert _refs(db, sha256(ICON)) == 2
+        assert store[GlyphDBKeys.METADATA + sha256(metas[0])][:1] == SPLIT_RECORD_MARKER
+        assert store[GlyphDBKeys.METADATA + sha256(metas[2])] == metas[2]
+        for meta in metas:
+            assert idx.get_metadata(sha256(meta)) == cbor2.loads(meta)
+
+        # Rerunning over already-split rows counts nothing twice.
+        with db.utxo_db.write_batch() as batch:
+            idx.blob_migration.schedule(batch)
+        idx.blob_migration.run_to_completion(db.utxo_db)
+        assert _refs(db, sha256(ICON)) == 2
@@ -0,0 +1,75 @@
+"""Per-height block summaries (BS rows) and the range read behind /blocks.
+
+Covers:
+- BlockSummary packs and unpacks losslessly
+- fs_block_summaries serves a newest-first window from one header read and
+  one reverse range scan, with None for heights that have no summary
+- The window is clamped to the flushed height and to genesis
+"""
+import struct
+from types import SimpleNamespace
+
+from electrumx.server.db import (
+    BLOCK_SUMMARY_PREFIX,
+    DB,
+    BlockSummary,
+    block_summary_key,
+)
+
+
+class _FakeUtxoDB:
+    def __init__(self):
+        self._store = {}
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        items = sorted((k, v) for k, v in self._store.items() if k.startswith(prefix))
+        if seek is not None:
+            items = [(k, v) for k, v in items if (k <= seek if reverse else k >= seek)]
+        if reverse:
+            items.reverse()
+        return iter(items)
+
+
+class _FakeHeaders:
+    def __init__(self, count):
+        self.data = b''.join(bytes(68) + struct.pack('<I', 1000 + h) + bytes(8)
+                             for h in range(count))
+        self.reads = []
+
+    def read(self, offset, size):
+        self.reads.append((offset, size))
+        return self.data[offset:offset + size]
+
+
+def _db(height, summarised):
+    db = SimpleNamespace(db_height=height, headers_file=_FakeHeaders(height + 1),
+                         utxo_db=_FakeUtxoDB())
+    for h in summarised:
+        db.utxo_db._store[block_summary_key(h)] = BlockSummary(
+            timestamp=1000 + h, tx_count=h, size=200 + h).to_bytes()
+    return db
+
+
+def test_round_trip():
+    summary = BlockSummary(timestamp=1, tx_count=2, size=3, input_count=4,
+                           output_count=5, output_value=6 * 10 ** 12,
+                           glyph_txs=7, ref_outputs=8, ref_mints=9)
+    assert BlockSummary.from_bytes(summary.to_bytes()) == summary
+    assert block_summary_key(5) == BLOCK_SUMMARY_PREFIX + bytes([0, 0, 0, 5])
+
+
+def test_window_is_newest_first_with_gaps():
+    db = _db(20, summarised=[18, 20])
+    rows = DB.fs_block_summaries(db, 20, 3)
+    assert [h for h, _header, _s in rows] == [20, 19, 18]
+    assert rows[0][2].tx_count == 20 and rows[2][2].size == 218
+    assert rows[1][2] is None                     # indexed before summaries
+    assert struct.unpack_from('<I', rows[1][1], 68)[0] == 1019
+    assert db.headers_file.reads == [(18 * 80, 3 * 80)]
+
+
+def test_window_is_clamped():
+    db = _db(4, summarised=range(5))
+    assert [h for h, _header, _s in DB.fs_block_summaries(db, 10, 3)] == [4, 3, 2]
+    assert [h for h, _header, _s in DB.fs_block_summaries(db, 1, 10)] == [1, 0]
+    assert DB.fs_block_summaries(db, -1, 10) == []
@@ -0,0 +1,110 @@
+"""Byte-bounded server caches (electrumx/server/byte_cache.py).
+
+Covers:
+- LRU eviction by estimated bytes, hot keys surviving cold inserts
+- byte accounting through replace, pop, del and clear
+- hit and miss counts
+- PackedHistory iterates as the (tx_hash, height) list it packs, smaller
+- SessionManager.limited_history caches packed histories and the error of
+  one too large to send
+"""
+import os
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from aiorpcx import RPCError
+
+from electrumx.server import byte_cache
+from electrumx.server.byte_cache import ByteLRUCache, PackedHistory
+from electrumx.server.session import SessionManager
+
+
+def _by_length(key, value):
+    return len(value)
+
+
+def test_lru_eviction_by_bytes():
+    cache = ByteLRUCache('test', 300, _by_length)
+    for key in 'abc':
+        cache[key] = bytes(100)
+    cache['a']                          # 'a' is now the most recent
+    cache['d'] = bytes(100)
+    assert 'b' not in cache
+    assert list(cache) == ['c', 'a', 'd']
+    assert cache.nbytes == 300
+
+    # One large entry pushes out as many as it needs
+    cache['e'] = bytes(250)
+    assert list(cache) == ['e'] and cache.nbytes == 250
+
+
+def test_oversized_entry_is_not_stored():
+    cache = ByteLRUCache('test', 10, _by_length)
+    cache['k'] = bytes(5)
+    cache['k'] = bytes(11)
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_byte_accounting():
+    cache = ByteLRUCache('test', 1000, _by_length)
+    cache['a'] = bytes(100)
+    cache['a'] = bytes(40)
+    cache['b'] = bytes(60)
+    assert cache.nbytes == 100
+    assert cache.pop('a') == bytes(40)
+    assert cache.pop('a') is None
+    assert cache.nbytes == 60
+    del cache['b']
+    assert not cache and cache.nbytes == 0
+    with pytest.raises(KeyError):
+        del cache['b']
+    cache['c'] = bytes(10)
+    cache.clear()
+    assert not cache and cache.nbytes == 0
+
+
+def test_hits_and_misses():
+    cache = ByteLRUCache('test', 1000, _by_length)
+    cache['a'] = b'x'
+    assert cache.get('a') == b'x'
+    assert cache.get('b') is None
+    with pytest.raises(KeyError):
+        cache['b']
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.info().startswith('3 lookups 1 hits 1 entries')
+
+
+def test_packed_history():
+    history = [(os.urandom(32), height) for height in range(800_000, 801_000)]
+    packed = PackedHistory(history)
+    assert len(packed) == len(history)
+    assert list(packed) == history
+    assert list(PackedHistory([])) == []
+    assert packed.nbytes < 40 * len(history)
+
+
+def test_utxo_list_size_grows_with_the_list():
+    small = byte_cache.utxo_list_size(b'x', [None] * 10)
+    large = byte_cache.utxo_list_size(b'x', [None] * 1000)
+    assert large - small == 990 * byte_cache.UTXO_SIZE
+
+
+@pytest.mark.asyncio
+async def test_limited_history_is_cached_packed():
+    history = [(os.urandom(32), height) for height in range(10)]
+    sm = SessionManager.__new__(SessionManager)
+    sm.env = SimpleNamespace(max_send=99 * 20)
+    sm.db = SimpleNamespace(limited_history=mock.AsyncMock(return_value=history))
+    sm._history_cache = ByteLRUCache('history', 10**6, byte_cache.history_size)
+
+    result, cost = await sm.limited_history(b'A')
+    assert isinstance(result, PackedHistory) and list(result) == history
+    assert await sm.limited_history(b'A') == (result, 0.1)
+    assert sm.db.limited_history.await_count == 1
+
+    sm.db.limited_history.return_value = history * 2
+    for _ in range(2):
+        with pytest.raises(RPCError, match='too large'):
+            await sm.limited_history(b'B')
+    assert sm.db.limited_history.await_count == 2
@@ -319,6 +319,15 @@ async def test_get_raw_transactions(daemon):
     assert await daemon.getrawtransactions(hex_hashes) == raw_txs
 
 
+@pytest.mark.asyncio
+async def test_get_raw_transactions_verbose(daemon):
+    hex_hashes = ['deadbeef0', 'deadbeef1']
+    args_list = [[hex_hash, 1] for hex_hash in hex_hashes]
+    decoded = [{'txid': 'deadbeef0', 'vout': []}, {'txid': 'deadbeef1', 'vout': []}]
+    daemon.session = ClientSessionGood(('getrawtransaction', args_list, decoded))
+    assert await daemon.getrawtransactions(hex_hashes, verbose=True) == decoded
+
+
 # Other tests
 
 @pytest.mark.asyncio
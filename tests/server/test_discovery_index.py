@@ -86,6 +86,7 @@ class _FakeEnv:
 def _make_index():
     db = _FakeDB()
     idx = GlyphIndex(db, _FakeEnv())
+    idx.load_migrations()       # as post_open_init does; none are pending
     return idx, db
 
 
@@ -402,9 +403,48 @@ class TestMigration:
 
         idx._check_schema_version()
 
+        # Stamped at once; the backfill itself is scheduled, not run inline.
         assert store[GlyphDBKeys.SCHEMA_VERSION] == bytes([CURRENT_SCHEMA_VERSION])
+        assert not idx.discovery_migration.complete
+        # Meanwhile the lists are served from GT.
         assert _names(idx.get_recent_tokens()) == ["A"]
 
+        for migration in idx.background_migrations():
+            migration.run_to_completion(db.utxo_db)
+        assert _names(idx.get_recent_tokens()) == ["A"]
+
+    def test_lists_fall_back_to_gt_while_backfill_pending(self):
+        idx, db = _make_index()
+        toks = [
+            _token("FT", "e1" * 32, 100, GlyphTokenType.FT, [GlyphProtocol.GLYPH_FT]),
+            _token("ENC", "e2" * 32, 130, GlyphTokenType.NFT,
+                   [GlyphProtocol.GLYPH_NFT, GlyphProtocol.GLYPH_ENCRYPTED]),
+            _token("NFT", "e3" * 32, 120, GlyphTokenType.NFT, [GlyphProtocol.GLYPH_NFT]),
+        ]
+        # A v3 DB had GT and the ref-ordered BY_TYPE rows, but no v4 rows.
+        _deploy(idx, db, *toks)
+        store = db.utxo_db._store
+        for key in [k for k in store if k.startswith((GlyphDBKeys.GLOBAL_RECENT,
+                                                      GlyphDBKeys.BY_TYPE_RECENT,
+                                                      GlyphDBKeys.BY_PROTO))]:
+            del store[key]
+        with db.utxo_db.write_batch() as batch:
+            idx.discovery_migration.schedule(batch)
+        assert not idx.discovery_rows_ready
+
+        # Ref order rather than recency, but complete.
+        assert _names(idx.get_recent_tokens()) == ["FT", "ENC", "NFT"]
+        assert _names(idx.get_tokens_by_type(GlyphTokenType.NFT, order="recent")) == [
+            "ENC", "NFT"]
+        assert _names(idx.get_tokens_by_protocol(GlyphProtocol.GLYPH_ENCRYPTED)) == ["ENC"]
+        assert _names(idx.list_encrypted_tokens()) == ["ENC"]
+        page = idx.get_recent_tokens(limit=2)
+        assert _names(page) == ["FT", "ENC"]
+        assert _names(idx.get_recent_tokens(cursor=page["next_cursor"])) == ["NFT"]
+
+        idx.discovery_migration.run_to_completion(db.utxo_db)
+        assert _names(idx.get_recent_tokens()) == ["ENC", "NFT", "FT"]
+
     def test_fresh_db_stamps_current_version(self):
         idx, db = _make_index()
         store = db.utxo_db._store
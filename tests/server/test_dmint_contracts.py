@@ -4,6 +4,7 @@ import os
 import pytest
 from unittest.mock import Mock, patch
 
+from electrumx.lib.hash import sha256
 from electrumx.server.dmint_contracts import DMintContractsManager
 
 
@@ -199,6 +200,11 @@ def test_get_contracts_v2_memoizes_token_summary_at_same_height(dmint_manager):
         assert build.call_count == first_calls + len(dmint_manager.contracts)
         assert dmint_manager._token_summary_cache is not cached_base
 
+        # A REST worker's reload may bring back an earlier height after a
+        # reorg, so it drops the cache whatever the height.
+        dmint_manager.reload()
+        assert dmint_manager._token_summary_cache is None
+
 
 def test_get_contracts_v2_cache_invalidated_when_denylist_changes(dmint_manager):
     """Editing the denylist (new file mtime) rebuilds the memoized base so a
@@ -506,10 +512,16 @@ def test_sync_from_index_normalizes_embedded_icon_data(tmp_path):
     c = mgr.contracts[0]
     assert c["icon_type"] == "image/webp"
     assert c["icon_data"] == "aabbccdd"
+    assert c["icon_hash"] == sha256(bytes.fromhex("aabbccdd")).hex()
 
     response = mgr.get_contracts_v2({"version": 2, "view": "token_summary", "filters": {"status": "all"}})
     assert response["items"][0]["icon"]["data_hex"] == "aabbccdd"
 
+    # A metadata update that changes the icon re-hashes it
+    glyph_index.get_tokens_by_type.return_value[0]["embed"]["data"] = b"\x01\x02"
+    mgr.sync_from_index(502)
+    assert c["icon_hash"] == sha256(b"\x01\x02").hex()
+
 
 def _dmint_token(ref_internal, *, total_supply, mined_supply, percent_mined,
                  mineable=None, live_contracts=None, is_spent=False):
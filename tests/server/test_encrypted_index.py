@@ -399,7 +399,9 @@ class TestListEncryptedTokens:
     def _make_index(self):
         db = make_mock_db()
         env = make_mock_env()
-        return GlyphIndex(db, env), db
+        idx = GlyphIndex(db, env)
+        idx.load_migrations()       # as post_open_init does; none are pending
+        return idx, db
 
     def _enc_token(self, name, ref_hex, height, timelocked=False):
         protos = [GlyphProtocol.GLYPH_NFT, GlyphProtocol.GLYPH_ENCRYPTED]
@@ -0,0 +1,181 @@
+"""Known-ref membership filter for GlyphIndex._is_known_token.
+
+Most ref-carrying outputs seen during sync are not glyph tokens; each used to
+cost a GT point read. The filter is loaded from the GT keyspace at startup and
+extended at flush, so a definite miss never touches the DB. It only grows, so
+a reorg that unwinds a token leaves a false positive the DB read resolves —
+never a false negative.
+"""
+import contextlib
+
+from electrumx.server.glyph_index import (
+    GlyphIndex,
+    GlyphTokenInfo,
+    KnownRefFilter,
+    pack_ref,
+    pack_token_key,
+)
+from tests.support import FakeEnv
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self._store = store
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def delete(self, key):
+        self._store.pop(key, None)
+
+
+class _CountingUtxoDB:
+    def __init__(self):
+        self._store = {}
+        self.token_gets = 0
+
+    def get(self, key):
+        if key.startswith(b'GT'):
+            self.token_gets += 1
+        return self._store.get(key)
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        items = sorted((k, v) for k, v in self._store.items() if k.startswith(prefix))
+        if reverse:
+            items.reverse()
+        if seek:
+            items = [(k, v) for k, v in items if k >= seek]
+        if include_value:
+            return iter(items)
+        return iter([k for k, _v in items])
+
+    @contextlib.contextmanager
+    def write_batch(self):
+        yield _FakeBatch(self._store)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.utxo_db = _CountingUtxoDB()
+        self.db_height = 1000
+
+
+def _ref(i):
+    return pack_ref(i.to_bytes(32, 'big'), 0)
+
+
+def _store_token(db, ref, height=100):
+    t = GlyphTokenInfo()
+    t.ref = ref
+    t.deploy_height = height
+    t.deploy_txid = bytes(32)
+    db.utxo_db._store[pack_token_key(ref)] = t.to_bytes()
+    return t
+
+
+def _make_index(*refs):
+    db = _FakeDB()
+    for ref in refs:
+        _store_token(db, ref)
+    idx = GlyphIndex(db, FakeEnv())
+    idx.post_open_init()
+    db.utxo_db.token_gets = 0
+    return idx, db
+
+
+def test_filter_has_no_false_negatives():
+    f = KnownRefFilter(1000)
+    refs = [_ref(i) for i in range(1000)]
+    for ref in refs:
+        f.add(ref)
+    assert all(ref in f for ref in refs)
+    misses = sum(_ref(i) in f for i in range(10_000, 20_000))
+    assert misses < 200  # ~1% target; generous bound
+
+
+def test_sibling_vouts_hash_independently():
+    f = KnownRefFilter(10)
+    txid = b'\x11' * 32
+    f.add(pack_ref(txid, 0))
+    assert pack_ref(txid, 0) in f
+    assert sum(pack_ref(txid, v) in f for v in range(1, 200)) < 10
+
+
+def test_readding_a_ref_is_not_counted():
+    f = KnownRefFilter(10)
+    for _ in range(3):
+        f.add(_ref(1))
+    f.add(_ref(2))
+    assert f.count == 2
+
+
+def test_repeated_flushes_do_not_saturate():
+    idx, db = _make_index()
+    t = GlyphTokenInfo()
+    t.ref = _ref(8)
+    t.deploy_height = 101
+    t.deploy_txid = bytes(32)
+    count = idx._ref_filter.count
+    # A token updated in later blocks is re-added at each flush
+    for height in range(101, 106):
+        idx.token_cache[t.ref] = t
+        idx.token_height[t.ref] = height
+        idx.flush(_FakeBatch(db.utxo_db._store))
+    assert idx._ref_filter.count == count + 1
+
+
+def test_unknown_ref_skips_the_db_read():
+    idx, db = _make_index(_ref(1), _ref(2))
+    assert idx._is_known_token(_ref(1))
+    assert db.utxo_db.token_gets == 1
+    for i in range(1000, 1100):
+        assert not idx._is_known_token(_ref(i))
+    assert db.utxo_db.token_gets < 10
+
+
+def test_flushed_token_is_added():
+    idx, db = _make_index()
+    t = GlyphTokenInfo()
+    t.ref = _ref(7)
+    t.deploy_height = 101
+    t.deploy_txid = bytes(32)
+    idx.token_cache[t.ref] = t
+    idx.token_height[t.ref] = 101
+    idx.flush(_FakeBatch(db.utxo_db._store))
+    assert t.ref in idx._ref_filter
+    assert idx._is_known_token(t.ref)
+
+
+def test_reorged_token_stays_correct():
+    idx, db = _make_index(_ref(3))
+    del db.utxo_db._store[pack_token_key(_ref(3))]   # what backup() would do
+    idx.backup(_FakeBatch(db.utxo_db._store), 100)
+    assert _ref(3) in idx._ref_filter                # stale "maybe" ...
+    assert not idx._is_known_token(_ref(3))          # ... resolved by the DB
+
+
+def test_saturated_filter_is_rebuilt_at_flush():
+    idx, db = _make_index()
+    idx._ref_filter = KnownRefFilter(0)
+    idx._ref_filter.count = idx._ref_filter.capacity  # one more add saturates
+    t = GlyphTokenInfo()
+    t.ref = _ref(9)
+    t.deploy_height = 101
+    t.deploy_txid = bytes(32)
+    idx.token_cache[t.ref] = t
+    idx.token_height[t.ref] = 101
+    idx.flush(_FakeBatch(db.utxo_db._store))
+    assert not idx._ref_filter.saturated
+    assert t.ref in idx._ref_filter
+
+
+def test_index_without_filter_falls_back_to_db():
+    db = _FakeDB()
+    _store_token(db, _ref(5))
+    idx = GlyphIndex(db, FakeEnv())          # post_open_init not run
+    assert idx._is_known_token(_ref(5))
+    assert not idx._is_known_token(_ref(6))
+    assert db.utxo_db.token_gets == 2
@@ -1,5 +1,6 @@
 import datetime
 import logging
+import math
 import os
 from collections import defaultdict
 from functools import partial
@@ -8,7 +9,7 @@ from random import randrange, choice, seed
 import pytest
 from aiorpcx import Event, TaskGroup, sleep, ignore_after
 
-from electrumx.server.mempool import MemPool, MemPoolAPI
+from electrumx.server.mempool import MemPool, MemPoolAPI, MemPoolTx
 # This fork ships only the Radiant coin family (no Bitcoin class). Radiant
 # inherits the generic DESERIALIZER / hashX machinery from the base Coin, so
 # these coin-agnostic mempool tests run against it unchanged.
@@ -383,6 +384,136 @@ async def test_unordered_UTXOs():
         assert set(our_result) == set(mempool_result)
 
 
+@pytest.mark.asyncio
+async def test_codescripthash_index():
+    api = API()
+    api.initialize()
+    mempool = MemPool(coin, api, refresh_secs=0.01)
+    event = Event()
+    async with TaskGroup() as group:
+        await group.spawn(mempool.keep_synchronized, event)
+        await event.wait()
+
+        # Reference: the full sweep the index replaces.
+        csh_of = coin.codeScriptHash_from_script
+        utxos, spends = defaultdict(set), defaultdict(set)
+        for tx_hash, tx in api.txs.items():
+            prevouts = [(i.prev_hash, i.prev_idx) for i in tx.inputs
+                        if not i.is_generation()]
+            for n, output in enumerate(tx.outputs):
+                csh = csh_of(output.pk_script)
+                utxos[csh].add((tx_hash, n, output.value))
+                spends[csh].update(prevouts)
+            for prev_hash, prev_idx in prevouts:
+                if prev_hash in api.txs:
+                    script = api.txs[prev_hash].outputs[prev_idx].pk_script
+                    spends[csh_of(script)].add((prev_hash, prev_idx))
+        assert set(mempool.codeScriptHashes) == set(utxos)
+        for csh in utxos:
+            result = await mempool.codescripthash_unordered_UTXOs(csh)
+            assert {(u.tx_hash, u.tx_pos, u.value) for u in result} == utxos[csh]
+            assert await mempool.codescripthash_potential_spends(csh) == spends[csh]
+        assert await mempool.codescripthash_unordered_UTXOs(os.urandom(32)) == []
+
+        api.txs.clear()
+        api.raw_txs.clear()
+        await event.wait()
+        assert not mempool.codeScriptHashes
+        await group.cancel_remaining()
+
+
+def _chain(length, root):
+    '''A chain of one-in one-out MemPoolTxs spending root, child last.'''
+    hashX = os.urandom(HASHX_LEN)
+    chain, prevout = {}, root
+    for n in range(length):
+        tx_hash = os.urandom(32)
+        chain[tx_hash] = MemPoolTx((prevout, ), None, ((hashX, 1000 - n), ),
+                                   0, 100, [[]], [b''])
+        prevout = (tx_hash, 0)
+    return chain
+
+
+def test_accept_deep_chain_in_one_pass(caplog):
+    mempool = MemPool(coin, API())
+    root = (os.urandom(32), 0)
+    chain = _chain(200, root)
+    orphans = _chain(3, (os.urandom(32), 0))
+    tx_map = dict(reversed(list(chain.items())))    # children first
+    tx_map.update(orphans)
+    touched = set()
+
+    deferred, unspent = mempool._accept_transactions(
+        tx_map, {root: (os.urandom(HASHX_LEN), 1001)}, touched)
+
+    assert set(mempool.txs) == set(chain)
+    assert set(deferred) == set(orphans)
+    assert not unspent
+    assert all(mempool.txs[h].fee == 1 for h in list(chain)[1:])
+    with caplog.at_level(logging.ERROR):
+        mempool._report_orphans(deferred)
+    assert in_caplog(caplog, '3 txs dropped: inputs of 1 parent txs not found')
+
+
+async def _test_aggregates(mempool, api):
+    # The running aggregates match a recount over the remaining txs
+    assert set(mempool.aggregates) == set(mempool.hashXs)
+    deltas = api.balance_deltas()
+    utxos = api.UTXOs()
+    spends = api.spends()
+    for hashX in api.hashXs:
+        mempool_utxos, potential_spends, delta = mempool.combined_mempool_state(hashX)
+        assert delta == deltas.get(hashX, 0)
+        assert set(mempool_utxos) == set(utxos.get(hashX, []))
+        assert set(spends.get(hashX, [])).issubset(potential_spends)
+        assert potential_spends == set().union(
+            *(mempool.txs[tx_hash].prevouts
+              for tx_hash in mempool.hashXs.get(hashX, ())))
+        assert potential_spends == await mempool.potential_spends(hashX)
+
+
+@pytest.mark.asyncio
+async def test_compact_fee_histogram():
+    api = API()
+    api.initialize()
+    mempool = MemPool(coin, api, refresh_secs=0.01)
+    assert mempool.compact_fee_histogram() == []
+    event = Event()
+    async with TaskGroup() as group:
+        await group.spawn(mempool.keep_synchronized, event)
+        await event.wait()
+        # The incremental histogram matches a recount
+        recount = defaultdict(int)
+        for tx in mempool.txs.values():
+            recount[math.floor(10 * tx.fee / tx.size) / 10] += tx.size
+        assert mempool.fee_histogram == recount
+
+        histogram = mempool.compact_fee_histogram()
+        assert histogram == MemPool._compress_histogram(
+            recount, bin_size=MemPool.HISTOGRAM_BIN_SIZE)
+        # Cached until the mempool changes
+        assert mempool.compact_fee_histogram() is histogram
+
+        api.txs.clear()
+        api.raw_txs.clear()
+        await event.wait()
+        await sleep(mempool.refresh_secs)
+        assert not mempool.fee_histogram
+        assert mempool.compact_fee_histogram() == []
+        await group.cancel_remaining()
+
+
+def test_compress_histogram():
+    histogram = {50.0: 300, 20.5: 700, 10.0: 5000, 5.0: 800, 1.0: 900}
+    compact = MemPool._compress_histogram(histogram, bin_size=1000)
+    # 50 and 20.5 close before the 5000-byte lump at 10, which then
+    # exceeds a 1100-byte bin on its own; the rest fills one more tranche
+    assert compact == [[20.5, 1000], [10.0, 5000], [1.0, 1700]]
+    rates = [rate for rate, _size in compact]
+    assert rates == sorted(rates, reverse=True)
+    assert sum(size for _rate, size in compact) == sum(histogram.values())
+
+
 @pytest.mark.asyncio
 async def test_mempool_removals():
     api = API()
@@ -401,6 +532,7 @@ async def test_mempool_removals():
         await _test_summaries(mempool, api)
         # Removed hashXs should have key destroyed
         assert all(mempool.hashXs.values())
+        await _test_aggregates(mempool, api)
         # Remove the rest
         api.txs.clear()
         api.raw_txs.clear()
@@ -408,6 +540,7 @@ async def test_mempool_removals():
         await _test_summaries(mempool, api)
         assert not mempool.hashXs
         assert not mempool.txs
+        assert not mempool.aggregates
         await group.cancel_remaining()
 
 
@@ -513,3 +646,76 @@ async def test_dropped_txs(caplog):
             await group.cancel_remaining()
 
     assert in_caplog(caplog, 'txs dropped')
+
+
+class FetchCountAPI(API):
+
+    def __init__(self):
+        super().__init__()
+        self.fetched = set()
+
+    async def raw_transactions(self, hex_hashes):
+        hex_hashes = list(hex_hashes)
+        self.fetched.update(hex_str_to_hash(hex_hash) for hex_hash in hex_hashes)
+        return await super().raw_transactions(hex_hashes)
+
+
+async def _synced_mempool(api, **kwargs):
+    mempool = MemPool(coin, api, **kwargs)
+    event = Event()
+    async with TaskGroup() as group:
+        await group.spawn(mempool.keep_synchronized, event)
+        await event.wait()
+        await group.cancel_remaining()
+    return mempool
+
+
+@pytest.mark.asyncio
+async def test_snapshot_warm_restart(tmpdir, monkeypatch):
+    snapshot_file = str(tmpdir.join('mempool'))
+    monkeypatch.setattr(MemPool, 'SNAPSHOT_FILE', snapshot_file)
+    api = FetchCountAPI()
+    api.initialize()
+    raw_txs, txs = api.raw_txs.copy(), api.txs.copy()
+    n = len(api.ordered_adds) // 2
+    first_hashes = api.ordered_adds[:n]
+    api.raw_txs = {tx_hash: raw_txs[tx_hash] for tx_hash in first_hashes}
+    api.txs = {tx_hash: txs[tx_hash] for tx_hash in first_hashes}
+
+    # Cancelling the synchronized mempool saves its snapshot
+    first = await _synced_mempool(api, persist_secs=60)
+    assert set(first.txs) == set(first_hashes)
+    assert os.path.exists(snapshot_file)
+
+    # The daemon's mempool grew while we were down: the restart fetches
+    # only the new txs and ends up where a cold start does
+    api.raw_txs, api.txs = raw_txs, txs
+    api.fetched.clear()
+    warm = await _synced_mempool(api, persist_secs=60)
+    assert api.fetched == set(api.ordered_adds[n:])
+    assert set(warm.txs) == set(txs)
+    await _test_summaries(warm, api)
+    await _test_aggregates(warm, api)
+    assert warm.fee_histogram == (await _synced_mempool(api)).fee_histogram
+
+
+@pytest.mark.asyncio
+async def test_unusable_snapshot_ignored(tmpdir, caplog):
+    api = API()
+    api.initialize()
+    mempool = MemPool(coin, api)
+    mempool.SNAPSHOT_FILE = str(tmpdir.join('mempool'))
+    assert await mempool.load_snapshot() == 0
+
+    with open(mempool.SNAPSHOT_FILE, 'wb') as f:
+        f.write(b'not a pickle')
+    with caplog.at_level(logging.WARNING):
+        assert await mempool.load_snapshot() == 0
+    assert in_caplog(caplog, 'ignoring unreadable mempool snapshot')
+
+    mempool.SNAPSHOT_VERSION += 1
+    mempool._write_snapshot(mempool._snapshot())
+    del mempool.SNAPSHOT_VERSION
+    with caplog.at_level(logging.WARNING):
+        assert await mempool.load_snapshot() == 0
+    assert in_caplog(caplog, 'another version or coin')
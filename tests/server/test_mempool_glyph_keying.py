@@ -21,6 +21,7 @@ faked with the same hashX formula the real ones use
 
 import asyncio
 import hashlib
+import pickle
 import struct
 import types
 
@@ -253,3 +254,27 @@ def test_subscription_no_match_for_other_address():
 
     asyncio.run(run())
     assert received == []
+
+
+def test_snapshot_restore_roundtrip():
+    recipient = _p2pkh(0x77)
+    token_out = _token_script(REF, recipient)
+    memtx = _MemTx([], [], [(_hashX(token_out), 1)], [token_out])
+    idx = _make_index(known={REF}, kv={})
+    txh = b'\x0a' * 32
+    idx.process_mempool_tx(txh, memtx)
+
+    # The snapshot survives pickling (MemPool writes it to disk)
+    state = pickle.loads(pickle.dumps(idx.snapshot()))
+    restored = _make_index(known={REF}, kv={})
+    assert restored.restore(state)
+    client_sh = _client_scripthash(recipient)
+    assert restored.get_unconfirmed_glyph_balance(client_sh, REF) == 1
+    restored.remove_tx(txh)
+    assert restored.get_unconfirmed_glyph_balance(client_sh, REF) == 0
+
+    # Taken with other settings: refused, nothing changed
+    other = _make_index(known={REF}, kv={})
+    other.swap_enabled = not other.swap_enabled
+    assert not other.restore(state)
+    assert not other.glyph_txs
@@ -0,0 +1,250 @@
+"""Background, resumable schema migrations (electrumx/server/migrations.py).
+
+Covers:
+- Chunks commit derived rows and the checkpoint together
+- A restarted migration resumes from the checkpoint, not the beginning
+- MigrationRunner runs pending work under the lock and survives failures
+- GlyphIndex schedules its upgrade instead of running it inline, and query
+  paths keep the pre-migration path until the backfill completes
+"""
+import asyncio
+import contextlib
+
+import pytest
+
+from electrumx.server.glyph_index import (
+    CURRENT_SCHEMA_VERSION,
+    GlyphDBKeys,
+    GlyphIndex,
+    GlyphTokenInfo,
+    pack_ref,
+    pack_summary_key,
+    pack_token_key,
+)
+from electrumx.server.migrations import (
+    MIGRATION_STATE,
+    BackgroundMigration,
+    MigrationRunner,
+)
+from tests.support import FakeEnv
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self._store = store
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def delete(self, key):
+        self._store.pop(key, None)
+
+
+class _FakeUtxoDB:
+    def __init__(self):
+        self._store = {}
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        items = sorted((k, v) for k, v in self._store.items() if k.startswith(prefix))
+        if seek:
+            items = [(k, v) for k, v in items if k >= seek]
+        if include_value:
+            return iter(items)
+        return iter([k for k, _v in items])
+
+    @contextlib.contextmanager
+    def write_batch(self):
+        # Stage writes so a failing chunk commits nothing, like RocksDB.
+        staged = {}
+        deleted = set()
+
+        class _Batch:
+            def put(self, key, value):
+                staged[key] = value
+                deleted.discard(key)
+
+            def delete(self, key):
+                staged.pop(key, None)
+                deleted.add(key)
+
+        yield _Batch()
+        for key in deleted:
+            self._store.pop(key, None)
+        self._store.update(staged)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.utxo_db = _FakeUtxoDB()
+        self.db_height = 1000
+
+
+def _copy_migration(db, seen):
+    def migrate_row(batch, key, value):
+        seen.append(key)
+        batch.put(b'dst' + key[3:], value)
+    return BackgroundMigration('copy', b'src', migrate_row)
+
+
+def _seed(db, n):
+    for i in range(n):
+        db.utxo_db.put(b'src' + i.to_bytes(2, 'big'), bytes([i]))
+
+
+class TestBackgroundMigration:
+    def test_unscheduled_migration_is_complete(self):
+        db = _FakeDB()
+        m = _copy_migration(db, [])
+        assert not m.complete          # unknown until loaded
+        assert m.load(db.utxo_db) is False
+        assert m.complete
+
+    def test_chunks_checkpoint_and_finish(self):
+        db = _FakeDB()
+        _seed(db, 25)
+        seen = []
+        m = _copy_migration(db, seen)
+        with db.utxo_db.write_batch() as batch:
+            m.schedule(batch)
+
+        assert m.run_chunk(db.utxo_db, 10) == 10
+        assert not m.complete
+        assert m.state_key in db.utxo_db._store
+
+        assert m.run_to_completion(db.utxo_db, 10) == 15
+        assert m.complete and m.rows_done == 25
+        assert m.state_key not in db.utxo_db._store
+        assert len([k for k in db.utxo_db._store if k.startswith(b'dst')]) == 25
+        assert len(seen) == 25
+
+    def test_restart_resumes_from_checkpoint(self):
+        db = _FakeDB()
+        _seed(db, 25)
+        first = _copy_migration(db, [])
+        with db.utxo_db.write_batch() as batch:
+            first.schedule(batch)
+        first.run_chunk(db.utxo_db, 10)
+
+        seen = []
+        again = _copy_migration(db, seen)    # a new process after a restart
+        assert again.load(db.utxo_db) is True
+        assert again.rows_done == 10
+        again.run_to_completion(db.utxo_db, 10)
+        assert seen[0] == b'src' + (10).to_bytes(2, 'big')
+        assert len(seen) == 15
+
+    def test_failed_chunk_commits_nothing(self):
+        db = _FakeDB()
+        _seed(db, 5)
+
+        def migrate_row(batch, key, value):
+            batch.put(b'dst' + key[3:], value)
+            if key.endswith(b'\x00\x03'):
+                raise ValueError('bad row')
+        m = BackgroundMigration('copy', b'src', migrate_row)
+        with db.utxo_db.write_batch() as batch:
+            m.schedule(batch)
+        with pytest.raises(ValueError):
+            m.run_chunk(db.utxo_db, 10)
+        assert not any(k.startswith(b'dst') for k in db.utxo_db._store)
+        assert m.load(db.utxo_db) and m.rows_done == 0
+
+
+class TestMigrationRunner:
+    def test_runs_pending_under_lock(self):
+        db = _FakeDB()
+        _seed(db, 7)
+        m = _copy_migration(db, [])
+        with db.utxo_db.write_batch() as batch:
+            m.schedule(batch)
+        runner = MigrationRunner(db, chunk_size=3)
+        runner.add(m)
+        runner.add(BackgroundMigration('never', b'zz', lambda *a: None))  # not scheduled
+
+        asyncio.run(runner.run(lock=asyncio.Lock()))
+        assert m.complete
+        assert runner.status() == {'copy': {'complete': True, 'rows_done': 7}}
+        assert not any(k.startswith(MIGRATION_STATE) for k in db.utxo_db._store)
+
+    def test_failure_is_logged_and_resumable(self):
+        db = _FakeDB()
+        _seed(db, 7)
+
+        def migrate_row(batch, key, value):
+            if key.endswith(b'\x00\x05'):
+                raise ValueError('bad row')
+            batch.put(b'dst' + key[3:], value)
+        m = BackgroundMigration('copy', b'src', migrate_row)
+        with db.utxo_db.write_batch() as batch:
+            m.schedule(batch)
+        runner = MigrationRunner(db, chunk_size=3)
+        runner.add(m)
+
+        asyncio.run(runner.run())          # must not raise
+        assert not m.complete
+        assert m.rows_done == 3
+        assert m.state_key in db.utxo_db._store
+
+
+def _token(name, ref_hex, height):
+    t = GlyphTokenInfo()
+    t.ref = pack_ref(bytes.fromhex(ref_hex), 0)
+    t.name = name
+    t.token_type = 2
+    t.deploy_height = height
+    t.deploy_txid = bytes(32)
+    return t
+
+
+class TestGlyphUpgrade:
+    def _v4_db(self):
+        db = _FakeDB()
+        for t in (_token("X", "e1" * 32, 120), _token("Y", "e2" * 32, 110)):
+            db.utxo_db.put(pack_token_key(t.ref), t.to_bytes())
+        db.utxo_db.put(GlyphDBKeys.SCHEMA_VERSION, bytes([4]))
+        return db
+
+    def test_upgrade_is_scheduled_and_survives_restart(self):
+        db = self._v4_db()
+        idx = GlyphIndex(db, FakeEnv())
+        idx._check_schema_version()
+        assert db.utxo_db.get(GlyphDBKeys.SCHEMA_VERSION) == bytes([CURRENT_SCHEMA_VERSION])
+        assert idx.discovery_migration.complete      # v4 rows already exist
+        assert not idx.summary_rows_ready
+
+        # Restart before the backfill ran: still pending, still falling back.
+        idx = GlyphIndex(db, FakeEnv())
+        idx._check_schema_version()
+        assert not idx.summary_rows_ready
+        listing = idx.get_all_tokens_summary(order="recent")
+        assert sorted(t["name"] for t in listing["tokens"]) == ["X", "Y"]
+        assert listing["next_cursor"] is None        # GT fallback
+
+        runner = MigrationRunner(db, chunk_size=1)
+        for m in idx.background_migrations():
+            runner.add(m)
+        asyncio.run(runner.run())
+        assert idx.summary_rows_ready
+        assert [t["name"] for t in idx.get_all_tokens_summary(order="recent")["tokens"]] == ["X", "Y"]
+
+    def test_summary_backfill_keeps_rows_written_by_flush(self):
+        db = self._v4_db()
+        idx = GlyphIndex(db, FakeEnv())
+        idx._check_schema_version()
+        x = GlyphTokenInfo.from_bytes(db.utxo_db.get(pack_token_key(_token("X", "e1" * 32, 0).ref)))
+        x.current_supply = 9
+        idx.token_cache[x.ref] = x
+        idx.token_height[x.ref] = 200
+        idx.flush(_FakeBatch(db.utxo_db._store))
+        live_row = db.utxo_db.get(pack_summary_key(x.ref))
+
+        idx.summary_migration.run_to_completion(db.utxo_db)
+        assert db.utxo_db.get(pack_summary_key(x.ref)) == live_row
+        top = idx.get_all_tokens_summary(order="recent")["tokens"][0]
+        assert top["name"] == "X" and top["activity_height"] == 200
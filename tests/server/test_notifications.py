@@ -43,3 +43,22 @@ async def test_enter_mempool_quick_blocks_2():
     # Now mempool refreshes
     await n.on_mempool(set(), 8)
     assert notified == [(5, set()), (5, {'a'}), (8, {'a', 'b', 'c'})]
+
+
+@pytest.mark.asyncio
+async def test_mempool_reports_merge_while_block_pending():
+    n = Notifications()
+    notified = []
+    async def notify(height, touched):
+        notified.append((height, touched))
+    await n.start(5, notify)
+    processed = []
+    n.block_processed = lambda: processed.append(True)
+
+    # Pushed txs report twice at the new height before its block is done
+    await n.on_mempool({'a'}, 6)
+    await n.on_mempool({'b'}, 6)
+    assert notified == [(5, set())]
+    await n.on_block({'c'}, 6)
+    assert processed == [True]
+    assert notified == [(5, set()), (6, {'a', 'b', 'c'})]
@@ -0,0 +1,87 @@
+"""Notification fan-out through the hashX -> session index.
+
+Covers:
+- a mempool tick schedules only the sessions subscribed to a touched hashX
+- a new height also reaches header subscribers and sessions with mempool
+  statuses, and nobody else
+- unsubscribing keeps the index free of empty entries
+- the header notification is encoded once per protocol and height
+"""
+from collections import defaultdict
+from unittest import mock
+
+import pylru
+import pytest
+from aiorpcx import JSONRPCv2, Notification
+
+from electrumx.server.session import SessionManager
+
+
+class _Session:
+    def __init__(self):
+        self.notified = []
+        self.mempool_statuses = {}
+        self.hashX_subs = {}
+
+    async def notify(self, touched, height_changed):
+        self.notified.append((touched, height_changed))
+
+
+def _mk_mgr(sessions):
+    sm = SessionManager.__new__(SessionManager)
+    sm.sessions = {session: [] for session in sessions}
+    sm._hashX_sessions = defaultdict(set)
+    sm._header_sessions = set()
+    sm._hsub_messages = {}
+    sm._history_cache = pylru.lrucache(16)
+    sm._ref_get_cache = pylru.lrucache(16)
+    sm._status_cache = pylru.lrucache(16)
+    sm.notified_height = 100
+    sm._refresh_hsub_results = mock.AsyncMock()
+    return sm
+
+
+A, B, C = (bytes([n]) * 11 for n in (1, 2, 3))
+
+
+@pytest.mark.asyncio
+async def test_only_affected_sessions_are_scheduled():
+    sub_a, sub_b, headers, pending, idle = (_Session() for _ in range(5))
+    sm = _mk_mgr([sub_a, sub_b, headers, pending, idle])
+    sm.subscribe_hashX(sub_a, A)
+    sm.subscribe_hashX(sub_b, B)
+    sm.subscribe_headers(headers)
+    pending.mempool_statuses[C] = 'status'
+
+    await sm._notify_sessions(100, {A, C})
+    assert sub_a.notified == [({A, C}, False)]
+    assert not (sub_b.notified or headers.notified or pending.notified
+                or idle.notified)
+
+    await sm._notify_sessions(101, {B})
+    assert sub_b.notified == [({B}, True)]
+    assert headers.notified == [({B}, True)]
+    assert pending.notified == [({B}, True)]
+    assert len(sub_a.notified) == 1 and not idle.notified
+
+
+def test_unsubscribe_drops_empty_entries():
+    one, two = _Session(), _Session()
+    sm = _mk_mgr([one, two])
+    sm.subscribe_hashX(one, A)
+    sm.subscribe_hashX(two, A)
+    sm.unsubscribe_hashX(one, A)
+    assert sm._hashX_sessions[A] == {two}
+    sm.unsubscribe_hashX(two, A)
+    sm.unsubscribe_hashX(two, A)
+    assert A not in sm._hashX_sessions
+
+
+def test_header_notification_encoded_once_per_height():
+    sm = _mk_mgr([])
+    sm.hsub_results = {'hex': '00' * 80, 'height': 7}
+    connection = mock.Mock(_protocol=JSONRPCv2)
+    message = sm.header_notification(connection)
+    assert message == JSONRPCv2.notification_message(
+        Notification('blockchain.headers.subscribe', (sm.hsub_results, )))
+    assert sm.header_notification(mock.Mock(_protocol=JSONRPCv2)) is message
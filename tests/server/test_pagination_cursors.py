@@ -225,8 +225,8 @@ class TestCursorShape:
         result = idx.get_token_history(
             ref, limit=10, cursor="not-a-valid-cursor!!!", _use_cursor=True
         )
-        # _decode_cursor returns None on failure; we fall back to the prefix
-        # and return all entries.
+        # cursor_key reads a malformed cursor as none; we fall back to the
+        # prefix and return all entries.
         assert isinstance(result, dict)
         assert len(result['entries']) == 1
 
@@ -268,6 +268,65 @@ class TestCursorShape:
         # prefix-scoped so this is implicit; the count is the proof.
 
 
+# ---------------------------------------------------------------------------
+# Burns / trades — cursor pages over one event type
+# ---------------------------------------------------------------------------
+
+class TestEventCursor:
+    def _seed(self, idx, ref):
+        # Every third row is a burn, the rest transfers.
+        seed_history(idx, ref, [
+            (h, 0, GlyphEventType.BURN if h % 3 == 0 else GlyphEventType.TRANSFER,
+             bytes(32)) for h in range(100, 130)
+        ])
+
+    def test_burns_full_walk(self):
+        idx = make_index()
+        ref = make_ref()
+        self._seed(idx, ref)
+        heights, cursor = [], None
+        while True:
+            r = idx.get_token_burns(ref, limit=4, cursor=cursor, _use_cursor=True)
+            heights.extend(e['height'] for e in r['entries'])
+            if not r['has_more']:
+                break
+            cursor = r['next_cursor']
+        assert heights == [h for h in range(100, 130) if h % 3 == 0]
+        legacy = idx.get_token_burns(ref, limit=100)
+        assert [b['height'] for b in legacy['burns']] == heights
+
+    def test_scan_budget_returns_short_page(self, monkeypatch):
+        from electrumx.server import glyph_index
+        monkeypatch.setattr(glyph_index, 'CURSOR_SCAN_BUDGET', 5)
+        idx = make_index()
+        ref = make_ref()
+        self._seed(idx, ref)
+        r = idx.get_token_burns(ref, limit=50, _use_cursor=True)
+        assert [e['height'] for e in r['entries']] == [102]
+        assert r['has_more']
+        r = idx.get_token_burns(ref, limit=50, cursor=r['next_cursor'], _use_cursor=True)
+        assert [e['height'] for e in r['entries']] == [105, 108]
+
+    def test_bad_cursors_raise(self):
+        idx = make_index()
+        ref, other = make_ref(0x01), make_ref(0x02)
+        self._seed(idx, other)
+        page = idx.get_token_trades(other, limit=2, _use_cursor=True)
+        for cursor in ('!!', page['next_cursor']):
+            with pytest.raises(ValueError):
+                idx.get_token_trades(ref, limit=2, cursor=cursor, _use_cursor=True)
+
+    def test_legacy_offset_is_clamped(self, monkeypatch):
+        from electrumx.server import pagination
+        monkeypatch.setattr(pagination, 'PAGINATION_MAX_OFFSET', 3)
+        idx = make_index()
+        ref = make_ref()
+        self._seed(idx, ref)
+        assert idx.get_token_burns(ref, offset=10**9)['offset'] == 3
+        with pytest.raises(ValueError, match='cursor'):
+            pagination.check_offset(4)
+
+
 # ---------------------------------------------------------------------------
 # search_tokens — cursor pagination over BY_NAME prefix
 # ---------------------------------------------------------------------------
@@ -608,11 +667,10 @@ class TestCursorUrlSafety:
     RAW = bytes(range(248, 256)) * 3
 
     def _codecs(self):
-        from electrumx.server.glyph_index import GlyphIndex
-        from electrumx.server import swap_index
+        from electrumx.server import pagination
         return [
-            (GlyphIndex._encode_cursor, GlyphIndex._decode_cursor),
-            (swap_index._encode_cursor, swap_index._decode_cursor),
+            (pagination.encode_cursor, pagination.decode_cursor),
+            (pagination.encode_cursor, pagination.cursor_key),
         ]
 
     def test_encoders_emit_urlsafe(self):
@@ -0,0 +1,227 @@
+"""Daemon push notifications (electrumx/server/push.py) over a local publisher.
+
+Covers:
+- pushed raw txs are accepted without a reconciliation, children before
+  parents included, and reported through on_mempool
+- hashtx pushes fetch the raw tx; known txs are not refetched
+- nothing is accepted while the DB is behind the daemon, or if a block is
+  processed during acceptance
+- the txs of a connected block (coinbase up to hashblock) and txs batched
+  with a hashblock are not accepted
+- hashblock wakes the block fetcher once per batch; a sequence gap wakes
+  reconciliation
+- while a subscriber runs, reconciliation waits reconcile_secs unless woken
+"""
+import asyncio
+
+import pytest
+from aiorpcx import Event, TaskGroup, ignore_after, sleep
+
+from electrumx.lib.hash import hash_to_hex_str
+from electrumx.server.mempool import MemPool
+from electrumx.server.push import (HASHBLOCK, HASHTX, RAWTX, LocalPublisher,
+                                   PushSubscriber, is_generation)
+from tests.server.test_mempool import API, coin
+
+
+class _CountingAPI(API):
+    def __init__(self):
+        super().__init__()
+        self.fetched = []
+        self.polls = 0
+
+    async def raw_transactions(self, hex_hashes):
+        hex_hashes = list(hex_hashes)
+        self.fetched.extend(hex_hashes)
+        return await super().raw_transactions(hex_hashes)
+
+    async def mempool_hashes(self):
+        self.polls += 1
+        return await super().mempool_hashes()
+
+
+async def _until(predicate, timeout=2):
+    async with ignore_after(timeout):
+        while not predicate():
+            await sleep(0.001)
+    assert predicate()
+
+
+def _chained_hashes(api):
+    '''Mempool tx hashes, children first where they spend each other.'''
+    return list(reversed(api.ordered_adds))
+
+
+@pytest.mark.asyncio
+async def test_raw_txs_accepted_on_push():
+    api = _CountingAPI()
+    api.initialize(mempool_size=30)
+    mempool = MemPool(coin, api)
+    publisher = LocalPublisher()
+    subscriber = PushSubscriber(publisher.subscribe(), mempool, lambda: None)
+
+    async with TaskGroup() as group:
+        await group.spawn(subscriber.run())
+        for tx_hash in _chained_hashes(api):
+            publisher.publish(RAWTX, api.raw_txs[tx_hash])
+        await _until(lambda: len(mempool.txs) == len(api.txs))
+        await group.cancel_remaining()
+
+    assert set(mempool.txs) == set(api.txs)
+    assert not api.fetched
+    assert api.polls == 0
+    touched = set().union(*(touched for touched, _ in api.on_mempool_calls))
+    assert touched == api.touched(api.txs)
+    for hashX, delta in api.balance_deltas().items():
+        assert await mempool.balance_delta(hashX) == delta
+
+
+@pytest.mark.asyncio
+async def test_hashtx_fetches_unknown_txs():
+    api = _CountingAPI()
+    api.initialize(mempool_size=5)
+    mempool = MemPool(coin, api)
+    first, *rest = api.ordered_adds
+    await mempool.accept_pushed([api.raw_txs[first]])
+    assert list(mempool.txs) == [first]
+
+    publisher = LocalPublisher()
+    subscriber = PushSubscriber(publisher.subscribe(), mempool, lambda: None)
+    async with TaskGroup() as group:
+        await group.spawn(subscriber.run())
+        for tx_hash in api.ordered_adds:
+            publisher.publish(HASHTX, tx_hash[::-1])
+        await _until(lambda: len(mempool.txs) == len(api.txs))
+        await group.cancel_remaining()
+
+    assert sorted(api.fetched) == sorted(hash_to_hex_str(tx_hash)
+                                         for tx_hash in rest)
+
+
+@pytest.mark.asyncio
+async def test_nothing_accepted_while_db_behind():
+    api = API()
+    api.initialize(mempool_size=5)
+    mempool = MemPool(coin, api)
+    api._cached_height = api._db_height + 1
+    raw_txs = [api.raw_txs[tx_hash] for tx_hash in api.ordered_adds]
+    assert await mempool.accept_pushed(raw_txs) == 0
+    assert not mempool.txs and not api.on_mempool_calls
+
+    api._cached_height = api._db_height
+    assert await mempool.accept_pushed(raw_txs) == len(raw_txs)
+    assert await mempool.accept_pushed(raw_txs) == 0
+
+
+@pytest.mark.asyncio
+async def test_nothing_accepted_if_a_block_is_processed_meanwhile():
+    class BlockDuringLookup(API):
+        async def lookup_utxos(self, prevouts):
+            self._height = self._cached_height = self._db_height = self._db_height + 1
+            return await super().lookup_utxos(prevouts)
+
+    api = BlockDuringLookup()
+    api.initialize(mempool_size=5)
+    mempool = MemPool(coin, api)
+    raw_txs = [api.raw_txs[tx_hash] for tx_hash in api.ordered_adds]
+    assert await mempool.accept_pushed(raw_txs) == 0
+    assert not mempool.txs and not api.on_mempool_calls
+
+
+# One input spending the null outpoint, one output
+COINBASE = (bytes(4) + b'\x01' + bytes(32) + b'\xff' * 4 + b'\x00'
+            + b'\xff' * 4 + b'\x01' + bytes(8) + b'\x00' + bytes(4))
+
+
+@pytest.mark.asyncio
+async def test_block_txs_are_not_accepted():
+    api = _CountingAPI()
+    api.initialize(mempool_size=5)
+    assert is_generation(COINBASE)
+    assert not any(is_generation(raw) for raw in api.raw_txs.values())
+    mempool = MemPool(coin, api)
+    publisher = LocalPublisher()
+    subscriber = PushSubscriber(publisher.subscribe(), mempool, lambda: None)
+    first, *mined = api.ordered_adds
+
+    # A connected block's txs, then a tx that reached the mempool after it.
+    publisher.publish(RAWTX, COINBASE)
+    for tx_hash in mined:
+        publisher.publish(RAWTX, api.raw_txs[tx_hash])
+    publisher.publish(HASHBLOCK, bytes(32))
+    publisher.publish(RAWTX, api.raw_txs[first])
+    async with TaskGroup() as group:
+        await group.spawn(subscriber.run())
+        await _until(lambda: mempool.txs)
+        await sleep(0.01)
+        await group.cancel_remaining()
+    assert list(mempool.txs) == [first]
+    assert not subscriber.in_block
+
+    # Without rawtx the coinbase is not seen; txs batched with the
+    # hashblock are dropped all the same.
+    mempool = MemPool(coin, api)
+    subscriber = PushSubscriber(publisher.subscribe(), mempool, lambda: None)
+    for tx_hash in mined:
+        publisher.publish(HASHTX, tx_hash[::-1])
+    publisher.publish(HASHBLOCK, bytes(32))
+    async with TaskGroup() as group:
+        await group.spawn(subscriber.run())
+        await _until(lambda: mempool.push_active)
+        await sleep(0.01)
+        await group.cancel_remaining()
+    assert not mempool.txs and not api.fetched
+
+
+@pytest.mark.asyncio
+async def test_hashblock_and_sequence_gaps():
+    api = API()
+    mempool = MemPool(coin, api)
+    publisher = LocalPublisher()
+    blocks = []
+    subscriber = PushSubscriber(publisher.subscribe(), mempool,
+                                lambda: blocks.append(True))
+
+    async with TaskGroup() as group:
+        await group.spawn(subscriber.run())
+        await _until(lambda: mempool.push_active)
+        mempool._reconcile_event.clear()
+
+        # Messages that queue up together wake the fetcher once
+        publisher.publish(HASHBLOCK, bytes(32))
+        publisher.publish(HASHBLOCK, bytes(32))
+        await _until(lambda: len(blocks) == 1)
+        publisher.publish(HASHBLOCK, bytes(32))
+        await _until(lambda: len(blocks) == 2)
+        assert not mempool._reconcile_event.is_set()
+
+        publisher.skip(HASHBLOCK)
+        publisher.publish(HASHBLOCK, bytes(32))
+        await _until(lambda: len(blocks) == 3)
+        assert mempool._reconcile_event.is_set()
+        await group.cancel_remaining()
+
+    assert not mempool.push_active
+
+
+@pytest.mark.asyncio
+async def test_reconcile_interval_while_push_active():
+    api = _CountingAPI()
+    mempool = MemPool(coin, api, refresh_secs=0.001, reconcile_secs=60)
+    event = Event()
+    async with TaskGroup() as group:
+        await group.spawn(mempool.keep_synchronized, event)
+        await event.wait()
+        mempool.set_push_active(True)
+        await event.wait()
+        polls = api.polls
+        await asyncio.sleep(0.05)
+        assert api.polls == polls
+
+        mempool.reconcile_soon()
+        await event.wait()
+        assert api.polls == polls + 1
+
+        mempool.set_push_active(False)
+        await _until(lambda: api.polls > polls + 5)
+        await group.cancel_remaining()
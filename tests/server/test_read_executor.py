@@ -0,0 +1,88 @@
+"""Bounded reader pool for REST index queries (electrumx/server/read_executor.py)."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from electrumx.server.read_executor import ReadExecutor, ReaderBusy, ReaderTimeout
+
+
+def test_runs_off_the_event_loop_thread():
+    pool = ReadExecutor(threads=2)
+
+    async def main():
+        return await pool.run(threading.get_ident)
+
+    assert asyncio.run(main()) != threading.get_ident()
+    assert pool.inflight == {}
+
+
+def test_loop_stays_responsive_during_a_slow_query():
+    pool = ReadExecutor(threads=1)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(pool.run(time.sleep, 0.1), ticker())
+
+    asyncio.run(main())
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.09
+
+
+def test_queue_limit_is_per_query():
+    pool = ReadExecutor(threads=1, queue_limit=2)
+    release = threading.Event()
+
+    def slow_scan():
+        release.wait(1)
+        return 'scan'
+
+    def point_read():
+        return 'point'
+
+    async def main():
+        first = asyncio.ensure_future(pool.run(slow_scan))
+        second = asyncio.ensure_future(pool.run(slow_scan))
+        await asyncio.sleep(0)
+        with pytest.raises(ReaderBusy):
+            await pool.run(slow_scan)
+        # A different query still gets in (and queues behind the worker).
+        other = asyncio.ensure_future(pool.run(point_read))
+        await asyncio.sleep(0)
+        assert pool.inflight == {'slow_scan': 2, 'point_read': 1}
+        release.set()
+        return await asyncio.gather(first, second, other)
+
+    assert asyncio.run(main()) == ['scan', 'scan', 'point']
+    assert pool.inflight == {}
+
+
+def test_timeout_releases_the_slot():
+    pool = ReadExecutor(threads=1, queue_limit=1, timeout=0.05)
+
+    async def main():
+        with pytest.raises(ReaderTimeout):
+            await pool.run(time.sleep, 0.2, label='sleepy')
+        assert pool.inflight == {}
+
+    asyncio.run(main())
+
+
+def test_errors_propagate():
+    pool = ReadExecutor()
+
+    def broken():
+        raise KeyError('x')
+
+    async def main():
+        with pytest.raises(KeyError):
+            await pool.run(broken)
+
+    asyncio.run(main())
+    assert pool.inflight == {}
@@ -269,6 +269,26 @@ class TestIndexAndQuery:
         assert [r['id'] for r in index.search('beta')] == ['beta-arena']
         assert index.search('zzz') == []
 
+    def test_list_cursor_walk(self, index):
+        # Two realms share a height: the id keeps their order stable.
+        for n, (rid, height) in enumerate([('realm-a', 420001), ('realm-b', 420003),
+                                           ('realm-c', 420003), ('realm-d', 420002)]):
+            _mint(index, _realm_payload(id=rid, name=rid.upper()),
+                  singleton=_singleton(f'{n + 1}{n + 1}'),
+                  tx_hash=bytes([0xa0 + n]) * 32, height=height)
+        for sort, order in (('new', 'bcda'), ('name', 'abcd')):
+            expected = ['realm-' + c for c in order]
+            seen, cursor = [], None
+            while True:
+                page = index.list(sort=sort, limit=3, cursor=cursor, _use_cursor=True)
+                seen.extend(r['id'] for r in page['entries'])
+                if not page['has_more']:
+                    break
+                cursor = page['next_cursor']
+            assert seen == expected
+        with pytest.raises(ValueError):
+            index.list(cursor='!!', _use_cursor=True)
+
     def test_list_filters_by_current_owner(self, index):
         r1 = _mint(index, _realm_payload(id='one'), singleton=_singleton('11'),
                    tx_hash=bytes.fromhex('a1' * 32))
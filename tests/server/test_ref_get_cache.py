@@ -44,6 +44,8 @@ def _arm_notify(sm):
     sm.notified_height = 100
     sm._refresh_hsub_results = mock.AsyncMock()
     sm.sessions = []
+    sm._hashX_sessions = {}
+    sm._header_sessions = set()
 
 
 @pytest.mark.asyncio
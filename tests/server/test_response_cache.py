@@ -0,0 +1,52 @@
+"""Height-aware REST response cache (electrumx/server/response_cache.py).
+
+Covers:
+- Entries are bound to the generation they were stored at
+- LRU eviction by encoded size, hot keys surviving cold inserts
+- Pre-compressed bodies and stable ETags
+- Optional max_age for sources that change between blocks
+"""
+import gzip
+
+from electrumx.server.response_cache import GZIP_MIN_SIZE, ResponseCache
+
+
+class TestResponseCache:
+    def test_generation_mismatch_is_a_miss(self):
+        cache = ResponseCache()
+        cache.put('k', (100, 'tip'), b'{"a":1}')
+        assert cache.get('k', (100, 'tip')).body == b'{"a":1}'
+        # A reorg back to the same height has another tip.
+        assert cache.get('k', (100, 'other')) is None
+        assert len(cache) == 0 and cache.nbytes == 0
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=300)
+        for key in 'abc':
+            cache.put(key, 1, bytes(100))
+        cache.get('a', 1)                   # 'a' is now the most recent
+        cache.put('d', 1, bytes(100))
+        assert cache.get('b', 1) is None
+        assert all(cache.get(key, 1) for key in 'acd')
+        assert cache.nbytes == 300
+
+    def test_oversized_body_is_not_stored(self):
+        cache = ResponseCache(max_bytes=10)
+        entry = cache.put('k', 1, b'x' * 11)
+        assert entry.body == b'x' * 11
+        assert len(cache) == 0
+
+    def test_bodies_are_precompressed_with_stable_etag(self):
+        cache = ResponseCache()
+        body = b'[' + b'"abc",' * GZIP_MIN_SIZE + b'"abc"]'
+        entry = cache.put('k', 1, body)
+        assert gzip.decompress(entry.gzip_body) == body
+        assert entry.size == len(body) + len(entry.gzip_body)
+        assert cache.put('k2', 2, body).etag == entry.etag
+        assert cache.put('small', 1, b'{}').gzip_body is None
+
+    def test_max_age(self):
+        cache = ResponseCache()
+        cache.put('k', 1, b'{}')
+        assert cache.get('k', 1, max_age=60) is not None
+        assert cache.get('k', 1, max_age=0) is None
@@ -301,9 +301,79 @@ class TestGlyphEndpoints:
         resp = client.get('/glyphs?token_type=1')
         assert resp.status_code == 200
         mock_glyph_index.get_all_tokens_summary.assert_called_with(
-            limit=100, offset=0, token_type=1,
+            limit=100, offset=0, token_type=1, cursor=None, order='ref',
         )
 
+    def test_get_all_glyphs_cursor_and_order_passthrough(self, client, mock_glyph_index):
+        resp = client.get('/glyphs?order=recent&cursor=abc')
+        assert resp.status_code == 200
+        mock_glyph_index.get_all_tokens_summary.assert_called_with(
+            limit=100, offset=0, token_type=None, cursor='abc', order='recent',
+        )
+
+    def test_get_all_glyphs_rejects_unknown_order(self, client, mock_glyph_index):
+        resp = client.get('/glyphs?order=bogus')
+        assert resp.status_code == 422
+
+    def test_get_all_glyphs_embed_gets_icon_pointer(self, client, mock_glyph_index):
+        ref = 'aa' * 32 + '_0'
+        mock_glyph_index.get_all_tokens_summary.return_value = {
+            'total': 1, 'tokens': [{'ref': ref, 'embed': {'type': 'image/png', 'size': 3, 'data': None}}],
+        }
+        resp = client.get('/glyphs')
+        assert resp.json()['tokens'][0]['embed']['url'] == f'/glyphs/{ref}/icon'
+
+    def test_get_glyph_icon_serves_bytes(self, client, mock_glyph_index):
+        mock_glyph_index.get_embedded_icon = Mock(
+            return_value=(b'\x89PNG', 'image/png', 'ab' * 32))
+        resp = client.get(f'/glyphs/{_make_ref()}/icon')
+        assert resp.status_code == 200
+        assert resp.content == b'\x89PNG'
+        assert resp.headers['content-type'] == 'image/png'
+
+    def test_get_glyph_icon_404_without_embed(self, client, mock_glyph_index):
+        mock_glyph_index.get_embedded_icon = Mock(return_value=None)
+        resp = client.get(f'/glyphs/{_make_ref()}/icon')
+        assert resp.status_code == 404
+
+    def test_get_glyph_icon_revalidates_by_etag(self, client, mock_glyph_index):
+        mock_glyph_index.get_embedded_icon = Mock(
+            return_value=(b'\x89PNG', 'image/png', 'ab' * 32))
+        resp = client.get(f'/glyphs/{_make_ref()}/icon')
+        etag = resp.headers['etag']
+        # Served by ref, so not immutable: a metadata update can change it
+        assert etag == '"' + 'ab' * 32 + '"'
+        assert 'immutable' not in resp.headers['cache-control']
+        resp = client.get(f'/glyphs/{_make_ref()}/icon', headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+        assert resp.content == b''
+
+    def test_get_blob_serves_ranges(self, client, mock_glyph_index):
+        payload = bytes(range(256)) * 8
+        mock_glyph_index.get_blob = Mock(return_value=(payload, 'video/mp4'))
+        url = '/blobs/' + 'ab' * 32
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.content == payload
+        assert resp.headers['etag'] == '"' + 'ab' * 32 + '"'
+        assert resp.headers['accept-ranges'] == 'bytes'
+
+        resp = client.get(url, headers={'Range': 'bytes=10-19'})
+        assert resp.status_code == 206
+        assert resp.content == payload[10:20]
+        assert resp.headers['content-range'] == f'bytes 10-19/{len(payload)}'
+
+        resp = client.get(url, headers={'Range': 'bytes=-4'})
+        assert resp.content == payload[-4:]
+
+        resp = client.get(url, headers={'Range': f'bytes={len(payload)}-'})
+        assert resp.status_code == 416
+
+    def test_get_blob_404_and_bad_hash(self, client, mock_glyph_index):
+        mock_glyph_index.get_blob = Mock(return_value=None)
+        assert client.get('/blobs/' + 'ab' * 32).status_code == 404
+        assert client.get('/blobs/' + 'zz' * 32).status_code == 400
+
     def test_search_glyphs(self, client, mock_glyph_index):
         mock_glyph_index.search_tokens.return_value = [{'ref': 'a'*72, 'name': 'Test'}]
         resp = client.get('/glyphs/search?q=Test')
@@ -426,6 +496,33 @@ class TestTokenAnalyticsEndpoints:
         resp = client.get(f'/tokens/{ref}/trades?limit=10')
         assert resp.status_code == 200
 
+    def test_burns_cursor_and_offset_cap(self, client, mock_glyph_index):
+        from electrumx.server.pagination import PAGINATION_MAX_OFFSET
+        ref = _make_ref()
+        mock_glyph_index.get_token_burns.return_value = {
+            'entries': [], 'next_cursor': None, 'has_more': False}
+        resp = client.get(f'/tokens/{ref}/burns?cursor=')
+        assert resp.status_code == 200
+        assert mock_glyph_index.get_token_burns.call_args.kwargs == {
+            'limit': 50, 'cursor': None, '_use_cursor': True}
+        resp = client.get(f'/tokens/{ref}/burns?cursor=!!')
+        assert resp.status_code == 400
+        assert resp.json()['detail'] == 'Invalid cursor'
+        resp = client.get(f'/tokens/{ref}/burns?offset={PAGINATION_MAX_OFFSET + 1}')
+        assert resp.status_code == 422
+
+    def test_cursor_from_another_token_is_an_invalid_cursor(self, client, mock_glyph_index):
+        from electrumx.server.pagination import encode_cursor
+        ref = _make_ref()
+        cursor = encode_cursor(b'GH' + bytes(42))
+        for method, path in (('get_token_burns', f'/tokens/{ref}/burns'),
+                             ('get_token_trades', f'/tokens/{ref}/trades'),
+                             ('get_mint_history', f'/dmint/contracts/{ref}/mints')):
+            getattr(mock_glyph_index, method).side_effect = ValueError('invalid cursor')
+            resp = client.get(f'{path}?cursor={cursor}')
+            assert resp.status_code == 400
+            assert resp.json()['detail'] == 'Invalid cursor'
+
     def test_get_top_holders(self, client, mock_glyph_index):
         ref = _make_ref()
         resp = client.get(f'/tokens/{ref}/top-holders?limit=50')
@@ -529,6 +626,18 @@ class TestDMintEndpoints:
         assert resp.headers['content-type'] == 'image/png'
         assert resp.content == bytes.fromhex('aabbccdd')
         assert 'max-age' in resp.headers.get('cache-control', '')
+        assert 'immutable' not in resp.headers['cache-control']
+
+    def test_get_contract_icon_etag_is_the_stored_hash(self, client, mock_dmint_contracts):
+        ref = _make_ref()
+        mock_dmint_contracts.get_contract.return_value = {
+            'ref': ref,
+            'icon_type': 'image/png',
+            'icon_data': 'aabbccdd',
+            'icon_hash': 'cd' * 32,
+        }
+        resp = client.get(f'/dmint/contracts/{ref}/icon')
+        assert resp.headers['etag'] == '"' + 'cd' * 32 + '"'
 
     def test_get_contract_icon_404_when_no_embedded(self, client, mock_dmint_contracts):
         ref = _make_ref()
@@ -657,6 +766,13 @@ class TestSwapEndpoints:
         assert resp.status_code == 200
         mock_swap_index.get_orderbook.assert_called_once()
 
+    def test_get_orders_cursor(self, client, mock_swap_index):
+        mock_swap_index.get_open_orders.return_value = {
+            'entries': [], 'next_cursor': None, 'has_more': False}
+        resp = client.get('/swaps/orders?cursor=QUJD')
+        assert resp.status_code == 200
+        assert mock_swap_index.get_open_orders.call_args.kwargs['cursor'] == 'QUJD'
+
     def test_get_single_order(self, client, mock_swap_index):
         oid = _make_ref()
         mock_swap_index.get_order.return_value = {'order_id': oid}
@@ -992,6 +1108,179 @@ class TestErrorSanitization:
         assert 'SECRET_DB_PATH' not in resp.text
 
 
+class TestReaderPoolErrors:
+    """Index queries run on the bounded reader pool; its refusals map to
+    503/504 instead of being swallowed as generic 500s."""
+
+    def test_busy_query_is_503_with_retry_after(self, client, mock_glyph_index):
+        from electrumx.server import rest_api
+        from electrumx.server.read_executor import ReaderBusy
+        with patch.object(rest_api._reader, 'run', side_effect=ReaderBusy('q')):
+            resp = client.get(f'/tokens/{_make_ref()}/holders')
+        assert resp.status_code == 503
+        assert resp.headers['retry-after'] == '1'
+
+    def test_timed_out_query_is_504(self, client, mock_analytics_index):
+        from electrumx.server import rest_api
+        from electrumx.server.read_executor import ReaderTimeout
+        with patch.object(rest_api._reader, 'run', side_effect=ReaderTimeout('q')):
+            resp = client.get('/analytics/top-addresses?limit=7&offset=3')
+        assert resp.status_code == 504
+
+
+class TestResponseCaching:
+    """Cacheable routes answer from serialised bodies bound to the chain tip,
+    with ETag revalidation and stored gzip bodies."""
+
+    def test_repeat_request_is_served_from_cache(self, client, mock_glyph_index):
+        ref = _make_ref()
+        first = client.get(f'/tokens/{ref}/holders')
+        second = client.get(f'/tokens/{ref}/holders')
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json() == {'holders': []}
+        assert first.headers['etag'] == second.headers['etag']
+        assert mock_glyph_index.get_token_holders.call_count == 1
+
+    def test_if_none_match_answers_304(self, client):
+        etag = client.get('/glyphs').headers['etag']
+        resp = client.get('/glyphs', headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+        assert resp.content == b''
+
+    def test_new_block_invalidates(self, client, mock_db, mock_glyph_index):
+        ref = _make_ref()
+        client.get(f'/tokens/{ref}/holders')
+        mock_db.db_height += 1
+        mock_glyph_index.get_token_holders.return_value = {'holders': [{'balance': 1}]}
+        assert client.get(f'/tokens/{ref}/holders').json()['holders'] == [{'balance': 1}]
+        assert mock_glyph_index.get_token_holders.call_count == 2
+
+    def test_large_body_sent_precompressed(self, client, mock_glyph_index):
+        mock_glyph_index.get_all_tokens_summary.return_value = {
+            'total': 300, 'tokens': [{'ref': 'ab' * 36, 'name': 'token'}] * 300}
+        resp = client.get('/glyphs?limit=300', headers={'Accept-Encoding': 'gzip'})
+        assert resp.status_code == 200
+        assert resp.headers['content-encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resp.headers['vary']
+        assert len(resp.json()['tokens']) == 300
+
+    def test_errors_are_not_cached(self, client, mock_glyph_index):
+        mock_glyph_index.get_token.return_value = None
+        ref = _make_ref('ee' * 32)
+        assert client.get(f'/glyphs/{ref}').status_code == 404
+        mock_glyph_index.get_token.return_value = object()
+        mock_glyph_index._token_to_dict.return_value = {'name': 'late'}
+        assert client.get(f'/glyphs/{ref}').json() == {'name': 'late'}
+
+
+class TestJSONEncoding:
+    """Responses are encoded by _json_bytes: orjson when installed, the
+    standard library otherwise, with identical JSON either way."""
+
+    _VALUE = {'tokens': [{'ref': 'ab' * 36, 'amount': 10 ** 30, 'raw': b'hi'}],
+              'ids': (1, 2), 'by_height': {120: 'x'}, 'ratio': 0.5}
+
+    def _decoded(self):
+        import json
+        from electrumx.server import rest_api
+        return json.loads(rest_api._json_bytes(self._VALUE))
+
+    def test_orjson_and_stdlib_agree(self):
+        from electrumx.server import rest_api
+        expected = {'tokens': [{'ref': 'ab' * 36, 'amount': 10 ** 30, 'raw': 'hi'}],
+                    'ids': [1, 2], 'by_height': {'120': 'x'}, 'ratio': 0.5}
+        assert self._decoded() == expected
+        with patch.object(rest_api, 'orjson', None):
+            assert self._decoded() == expected
+
+    def test_list_endpoint_returns_json(self, client, mock_glyph_index):
+        mock_glyph_index.search_tokens.return_value = [{'ref': 'ab' * 36, 'name': 'x'}]
+        resp = client.get('/glyphs/search?q=x')
+        assert resp.status_code == 200
+        assert resp.headers['content-type'] == 'application/json'
+        assert resp.json() == {'query': 'x', 'results': [{'ref': 'ab' * 36, 'name': 'x'}],
+                               'count': 1}
+
+
+class TestBlocks:
+    """/blocks/recent and /block/{height} read summaries in one range."""
+
+    @staticmethod
+    def _rows(top, count):
+        from electrumx.server.db import BlockSummary
+        return [(h, bytes(68) + struct.pack('<I', 1700000000 + h) + bytes(8),
+                 BlockSummary(timestamp=1700000000 + h, tx_count=3) if h % 2 else None)
+                for h in range(top, top - count, -1)]
+
+    def test_recent_blocks(self, client, mock_db):
+        mock_db.fs_block_summaries = Mock(side_effect=self._rows)
+        resp = client.get('/blocks/recent?limit=3&before=100')
+        assert resp.status_code == 200
+        data = resp.json()
+        mock_db.fs_block_summaries.assert_called_once_with(99, 3)
+        assert [b['height'] for b in data['blocks']] == [99, 98, 97]
+        assert data['blocks'][0]['timestamp'] == 1700000099
+        assert data['blocks'][0]['summary']['tx_count'] == 3
+        assert data['blocks'][1]['summary'] is None
+        assert data['current_height'] == 100000
+
+    def test_single_block(self, client, mock_db):
+        mock_db.fs_block_summaries = Mock(side_effect=self._rows)
+        assert client.get('/block/7').json()['summary']['tx_count'] == 3
+        assert client.get('/block/200000').status_code == 404
+
+
+class TestAddressHistory:
+    """/addresses/{ident}/history reads only its page and enriches it with one
+    header pass and one vectored daemon request."""
+
+    _SH = 'cd' * 32
+
+    def _wire(self, mock_db, mock_daemon, page, total, txs):
+        from unittest.mock import AsyncMock
+        mock_db.history_page = AsyncMock(return_value=(page, total))
+        mock_db.raw_headers = AsyncMock(return_value={
+            height: bytes(68) + struct.pack('<I', 1700000000 + height) + bytes(8)
+            for _tx_hash, height in page})
+        mock_db.utxo_db.get = Mock(return_value=None)
+        mock_daemon.getrawtransactions = AsyncMock(return_value=txs)
+        mock_daemon.getrawtransaction = AsyncMock(side_effect=AssertionError)
+
+    def test_page_is_enriched_in_one_batch(self, client, mock_db, mock_daemon):
+        from electrumx.lib.hash import sha256
+        spk = '51'
+        sh = sha256(bytes.fromhex(spk))[::-1].hex()
+        page = [(b'\x01' * 32, 120), (b'\x02' * 32, 110)]
+        txs = [
+            {'vin': [{'txid': 'ee' * 32}],
+             'vout': [{'n': 0, 'value': 1.5, 'scriptPubKey': {'hex': spk}}]},
+            None,
+        ]
+        self._wire(mock_db, mock_daemon, page, 5, txs)
+        resp = client.get(f'/addresses/{sh}/history?limit=2&offset=3')
+        assert resp.status_code == 200
+        data = resp.json()
+        mock_db.history_page.assert_awaited_once()
+        assert mock_db.history_page.call_args.kwargs == {
+            'offset': 3, 'limit': 2, 'reverse': True}
+        mock_daemon.getrawtransactions.assert_awaited_once_with(
+            ['01' * 32, '02' * 32], verbose=True)
+        mock_db.raw_headers.assert_awaited_once()
+        first, second = data['history']
+        assert first['direction'] == 'received' and first['amount'] == 1.5
+        assert first['timestamp'] == 1700000120
+        assert second['direction'] == 'unknown'
+        assert second['timestamp'] == 1700000110
+        assert data['total_count'] == 5 and data['has_more'] is False
+
+    def test_empty_history(self, client, mock_db, mock_daemon):
+        self._wire(mock_db, mock_daemon, [], 0, [])
+        resp = client.get(f'/addresses/{self._SH}/history')
+        assert resp.status_code == 200
+        assert resp.json()['history'] == []
+        assert resp.json()['total_count'] == 0
+
+
 # ===========================================================================
 # M1 — Analytics rich-list offset cap (DoS)
 # ===========================================================================
@@ -1066,11 +1355,11 @@ class TestTopAddressesOffsetCap:
 
         # Swap the real analytics index in for this test only.
         prev = rest_api._analytics_index
-        prev_cache = rest_api._cache
+        prev_cache = rest_api._response_cache
         try:
             rest_api._analytics_index = real_idx
-            # Fresh REST TTL cache so prior tests' entries don't interfere.
-            rest_api._cache = type(prev_cache)()
+            # Fresh REST response cache so prior tests' entries don't interfere.
+            rest_api._response_cache = type(prev_cache)()
             for off in range(0, 25, 5):
                 r = client.get(f'/analytics/top-addresses?limit=5&offset={off}')
                 assert r.status_code == 200
@@ -1078,7 +1367,7 @@ class TestTopAddressesOffsetCap:
             assert scan_count['n'] == 1
         finally:
             rest_api._analytics_index = prev
-            rest_api._cache = prev_cache
+            rest_api._response_cache = prev_cache
 
 
 # ===========================================================================
@@ -1275,3 +1564,146 @@ class TestWaveNamesPagination:
     def test_limit_zero_is_rejected(self, client, monkeypatch):
         _wire_wave_names(monkeypatch, [])
         assert client.get('/wave/names?limit=0').status_code == 422
+
+
+class TestWebSocket:
+    def test_subscribe_is_indexed_and_cleaned_up(self, client):
+        from electrumx.server import rest_api
+        sh = 'ab' * 32
+        ref = 'cd' * 32 + '_0'
+        with client.websocket_connect('/ws') as ws:
+            assert ws.receive_json()['event'] == 'connected'
+            ws.send_json({'action': 'subscribe', 'refs': [ref, 'junk'],
+                          'scripthashes': [sh], 'all_swaps': True})
+            assert ws.receive_json() == {'event': 'subscribed', 'refs': 1,
+                                         'scripthashes': 1, 'all_tokens': False,
+                                         'all_swaps': True}
+            assert len(rest_api._ws_hub.subscribers) == 3
+            ws.send_json({'action': 'unsubscribe', 'scripthashes': [sh]})
+            assert ws.receive_json() == {'event': 'unsubscribed'}
+            assert not rest_api._ws_hub.sh_topics
+            ws.send_json({'action': 'ping'})
+            assert ws.receive_json() == {'event': 'pong'}
+        assert not rest_api._ws_hub.subscribers
+
+    def test_subscription_limit(self, client, monkeypatch):
+        from electrumx.server import rest_api
+        monkeypatch.setattr(rest_api._ws_hub, 'max_subscriptions', 1)
+        with client.websocket_connect('/ws') as ws:
+            ws.receive_json()
+            ws.send_json({'action': 'subscribe', 'all_tokens': True,
+                          'all_swaps': True})
+            assert ws.receive_json()['message'] == 'Subscription limit reached'
+            assert ws.receive_json()['all_tokens'] is True
+
+
+class TestExport:
+    class _Snapshot:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def _wire(self, mock_glyph_index, rows):
+        snapshot = self._Snapshot()
+        mock_glyph_index.db.utxo_db.snapshot = Mock(return_value=snapshot)
+
+        def export_holders(snap, ref, seek=None):
+            for key, row in rows:
+                if seek is None or key >= seek:
+                    yield key, dict(row)
+        mock_glyph_index.export_holders = export_holders
+        return snapshot
+
+    def test_holders_stream_as_ndjson(self, client, mock_glyph_index):
+        import json
+        rows = [(bytes([i]), {'amount': i}) for i in range(3)]
+        snapshot = self._wire(mock_glyph_index, rows)
+
+        resp = client.get(f'/export/tokens/{_make_ref()}/holders')
+
+        assert resp.status_code == 200
+        assert resp.headers['content-type'] == 'application/x-ndjson'
+        assert resp.headers['x-export-height'] == '100000'
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert [line['amount'] for line in lines] == [0, 1, 2]
+        assert snapshot.closed
+
+        resp = client.get(f'/export/tokens/{_make_ref()}/holders',
+                          params={'after': lines[0]['cursor']})
+        assert [json.loads(line)['amount'] for line in resp.text.splitlines()] == [1, 2]
+
+    def test_bad_cursor_and_busy(self, client, mock_glyph_index, monkeypatch):
+        from electrumx.server import rest_api
+        from electrumx.server.ndjson_export import ExportSlots
+        self._wire(mock_glyph_index, [])
+        url = f'/export/tokens/{_make_ref()}/holders'
+        assert client.get(url, params={'after': '!!'}).status_code == 400
+
+        slots = ExportSlots(1)
+        slots.acquire()
+        monkeypatch.setattr(rest_api, '_export_slots', slots)
+        resp = client.get(url)
+        assert resp.status_code == 503
+        assert resp.headers['retry-after'] == '30'
+
+
+class TestBatch:
+    def test_glyphs_in_request_order(self, client, mock_glyph_index):
+        known = _make_ref_bytes('bb' * 32, 1)
+        token = Mock()
+        mock_glyph_index.get_tokens = Mock(
+            side_effect=lambda keys: [token if k == known else None for k in keys])
+        mock_glyph_index._token_to_dict = Mock(return_value={'name': 'B'})
+
+        resp = client.post('/batch/glyphs', json={
+            'refs': ['bb' * 32 + '_1', 'junk', _make_ref()]})
+
+        assert resp.status_code == 200
+        glyphs = resp.json()['glyphs']
+        assert glyphs[0] == {'ref': 'bb' * 32 + '_1', 'token': {'name': 'B'}}
+        assert glyphs[1]['error'] == 'Invalid ref format'
+        assert glyphs[2]['token'] is None
+        assert mock_glyph_index.get_tokens.call_count == 1
+
+    def test_balances(self, client, mock_glyph_index):
+        mock_glyph_index.get_balances = Mock(return_value=[7])
+        resp = client.post('/batch/balances', json={'pairs': [
+            {'scripthash': 'ab' * 32, 'ref': _make_ref()},
+            {'scripthash': 'nope', 'ref': _make_ref()},
+        ]})
+        balances = resp.json()['balances']
+        assert balances[0]['balance'] == 7 and 'error' in balances[1]
+        (pairs,), _kw = mock_glyph_index.get_balances.call_args
+        assert pairs == [(bytes.fromhex('ab' * 32), _make_ref_bytes())]
+
+    def test_utxos(self, client, mock_db):
+        from unittest.mock import AsyncMock
+        from electrumx.lib.util import pack_le_uint32
+        from electrumx.server.session import scripthash_to_hashX
+        from types import SimpleNamespace
+        sh = 'cd' * 32
+        hashX = scripthash_to_hashX(sh)
+        utxo = SimpleNamespace(tx_hash=bytes(32), tx_pos=3, height=9, value=600)
+        mock_db.all_utxos_batch = AsyncMock(return_value={hashX: [utxo]})
+        mock_db.get_refs_by_outpoints = Mock(return_value=[[{'ref': 'r', 'type': 'normal'}]])
+
+        resp = client.post('/batch/utxos', json={'scripthashes': [sh]})
+
+        assert resp.json()['utxos'] == [{'scripthash': sh, 'utxos': [{
+            'tx_hash': '00' * 32, 'tx_pos': 3, 'height': 9, 'value': 600,
+            'refs': [{'ref': 'r', 'type': 'normal'}]}]}]
+        mock_db.get_refs_by_outpoints.assert_called_once_with(
+            [bytes(32) + pack_le_uint32(3)])
+
+    def test_limits_and_cost(self, client, monkeypatch):
+        from electrumx.server import rest_api
+        too_many = ['aa' * 36] * (rest_api._BATCH_MAX_ITEMS + 1)
+        assert client.post('/batch/glyphs', json={'refs': too_many}).status_code == 422
+        assert client.post('/batch/glyphs', json={'refs': []}).status_code == 422
+
+        # Public like the GET routes, but charged per item.
+        monkeypatch.setenv('REST_API_KEY', 'secret')
+        monkeypatch.setattr(rest_api, '_BATCH_ITEM_COST', 10_000.0)
+        resp = client.post('/batch/glyphs', json={'refs': [_make_ref()]})
+        assert resp.status_code == 429
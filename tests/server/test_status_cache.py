@@ -3,11 +3,12 @@
 blockchain.scripthash.subscribe hashes a scripthash's entire confirmed history.
 For scripthashes with very large histories the status was recomputed (full DB
 history read + hash) on every call, pegging the server. address_status now caches
-the confirmed-only status per hashX and invalidates it on the same touched set as
-the history cache. These tests pin that behaviour without standing up a full
-session/db.
+the hash state over the confirmed history per hashX and invalidates it on the
+same touched set as the history cache; mempool entries are hashed onto a copy.
+These tests pin that behaviour without standing up a full session/db.
 """
 import asyncio
+import hashlib
 from unittest import mock
 
 import pylru
@@ -67,19 +68,44 @@ async def test_status_cached_when_no_mempool():
     assert HX in sm._status_cache
 
 
+def _full_status(history, mempool_txs):
+    status = ''.join(f'{h[::-1].hex()}:{height:d}:' for h, height in history)
+    status += ''.join(f'{tx.hash[::-1].hex()}:{-tx.has_unconfirmed_inputs:d}:'
+                      for tx in mempool_txs)
+    return hashlib.sha256(status.encode()).hexdigest() if status else None
+
+
 @pytest.mark.asyncio
-async def test_status_not_cached_while_mempool_present():
+async def test_mempool_status_extends_cached_confirmed_state():
     sm = _mk_mgr()
-    s = _mk_session(sm, [(b"\xaa" * 32, 100)], [_mp_tx(b"\xcc" * 32)])
+    history = [(b"\xaa" * 32, 100), (b"\xbb" * 32, 101)]
+    s = _mk_session(sm, history, [_mp_tx(b"\xcc" * 32)])
 
-    await s.address_status(HX)
-    await s.address_status(HX)
+    st1 = await s.address_status(HX)
+    assert st1 == _full_status(history, [_mp_tx(b"\xcc" * 32)])
+    assert s.mempool_statuses[HX] == st1
 
-    # With mempool entries the status changes with the mempool, so it is
-    # recomputed every call and never cached.
-    assert s.db.limited_history.await_count == 2
-    assert HX in s.mempool_statuses
-    assert HX not in sm._status_cache
+    # The mempool grows: only the suffix is re-hashed, the history is not re-read.
+    grown = [_mp_tx(b"\xcc" * 32), _mp_tx(b"\xdd" * 32)]
+    s.mempool.transaction_summaries = mock.AsyncMock(return_value=grown)
+    st2 = await s.address_status(HX)
+    assert st2 == _full_status(history, grown)
+    assert s.db.limited_history.await_count == 1
+
+    # Mempool cleared: back to the confirmed-only status, cached state unharmed.
+    s.mempool.transaction_summaries = mock.AsyncMock(return_value=[])
+    assert await s.address_status(HX) == _full_status(history, [])
+    assert HX not in s.mempool_statuses
+
+
+@pytest.mark.asyncio
+async def test_mempool_only_address():
+    sm = _mk_mgr()
+    tx = _mp_tx(b"\xcc" * 32)
+    s = _mk_session(sm, [], [tx])
+    assert await s.address_status(HX) == _full_status([], [tx])
+    s.mempool.transaction_summaries = mock.AsyncMock(return_value=[])
+    assert await s.address_status(HX) is None
 
 
 @pytest.mark.asyncio
@@ -91,6 +117,8 @@ async def test_notify_invalidates_status_cache():
     sm.notified_height = 100
     sm._refresh_hsub_results = mock.AsyncMock()
     sm.sessions = []
+    sm._hashX_sessions = {}
+    sm._header_sessions = set()
 
     await sm._notify_sessions(101, {HX})  # height changed + hashX touched
 
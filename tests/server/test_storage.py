@@ -68,6 +68,28 @@ def test_iterator_reverse(db):
         ]
 
 
+def test_multi_get(db):
+    db.put(b"a", b"1")
+    db.put(b"c", b"3")
+    assert db.multi_get([b"c", b"b", b"a"]) == [b"3", None, b"1"]
+    assert db.multi_get([]) == []
+
+
+def test_snapshot_isolation(db):
+    db.put(b"a1", b"1")
+    db.put(b"a2", b"2")
+    with db.snapshot() as snap:
+        with db.write_batch() as b:
+            b.put(b"a3", b"3")
+            b.delete(b"a1")
+        assert snap.get(b"a1") == b"1"
+        assert snap.get(b"a3") is None
+        assert list(snap.iterator(prefix=b"a")) == [(b"a1", b"1"), (b"a2", b"2")]
+        assert list(snap.iterator(prefix=b"a", reverse=True, seek=b"a1",
+                                  include_value=False)) == [b"a1"]
+    assert list(db.iterator(prefix=b"a", include_value=False)) == [b"a2", b"a3"]
+
+
 def test_close(db):
     db.put(b"a", b"b")
     db.close()
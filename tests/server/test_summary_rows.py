@@ -0,0 +1,294 @@
+"""
+v5 materialised list-summary rows (SUMMARY / SUMMARY_BY_ACTIVITY / SUMMARY_BY_DEPLOY).
+
+Covers:
+- flush() writes one GA row per changed token, with icon pointers, not blobs
+- 'recent' (last change) and 'deploy' orders, per type and across types
+- Opaque cursor pagination, and offset as a compatibility mode
+- Re-flushing a changed token moves (not duplicates) its order rows
+- Reorg: backup() restores the previous row and order keys
+- In-place v4 -> v5 backfill, and the GT fallback until it has run
+"""
+
+import contextlib
+
+import pytest
+
+try:
+    import cbor2
+    HAS_CBOR = True
+except ImportError:
+    HAS_CBOR = False
+
+from electrumx.lib.glyph import GlyphProtocol, GlyphTokenType
+from electrumx.lib.hash import sha256
+from electrumx.server.glyph_index import (
+    GlyphIndex,
+    GlyphTokenInfo,
+    GlyphDBKeys,
+    CURRENT_SCHEMA_VERSION,
+    pack_ref,
+    pack_summary_key,
+    pack_token_key,
+)
+
+
+class _FakeBatch:
+    def __init__(self, store):
+        self._store = store
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def delete(self, key):
+        self._store.pop(key, None)
+
+
+class _FakeUtxoDB:
+    def __init__(self):
+        self._store = {}
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def put(self, key, value):
+        self._store[key] = value
+
+    def iterator(self, prefix=b"", reverse=False, include_value=True, seek=None):
+        items = [(k, v) for k, v in self._store.items() if k.startswith(prefix)]
+        items.sort(key=lambda kv: kv[0], reverse=reverse)
+        if seek:
+            items = [(k, v) for k, v in items if k >= seek]
+        if include_value:
+            return iter(items)
+        return iter([k for k, _v in items])
+
+    @contextlib.contextmanager
+    def write_batch(self):
+        yield _FakeBatch(self._store)
+
+
+class _FakeDB:
+    def __init__(self):
+        self.utxo_db = _FakeUtxoDB()
+        self.db_height = 1000
+
+
+class _FakeEnv:
+    glyph_index = True
+    reorg_limit = 0
+
+
+def _make_index(ready=True):
+    db = _FakeDB()
+    idx = GlyphIndex(db, _FakeEnv())
+    if ready:
+        idx._check_schema_version()  # fresh DB -> stamps v5, rows ready
+    return idx, db
+
+
+def _token(name, ref_hex, height, token_type=GlyphTokenType.NFT,
+           protocols=(GlyphProtocol.GLYPH_NFT,)):
+    t = GlyphTokenInfo()
+    t.ref = pack_ref(bytes.fromhex(ref_hex), 0)
+    t.name = name
+    t.token_type = token_type
+    t.protocols = list(protocols)
+    t.deploy_height = height
+    t.deploy_txid = bytes(32)
+    return t
+
+
+def _flush(idx, db, *tokens, height):
+    for t in tokens:
+        idx.token_cache[t.ref] = t
+        idx.token_height[t.ref] = height
+    idx.flush(_FakeBatch(db.utxo_db._store))
+
+
+def _names(result):
+    return [t["name"] for t in result["tokens"]]
+
+
+pytestmark = pytest.mark.skipif(not HAS_CBOR, reason="cbor2 required")
+
+
+class TestSummaryRowContent:
+    def test_embed_is_a_pointer_not_a_blob(self):
+        idx, db = _make_index()
+        icon = b"\x89PNG" + bytes(5000)
+        meta = cbor2.dumps({"p": [2], "name": "PIC",
+                            "main": {"t": "image/png", "b": icon}})
+        t = _token("PIC", "a1" * 32, 100)
+        t.metadata_hash = sha256(meta)
+        idx.metadata_cache[t.metadata_hash] = meta
+        idx.metadata_height[t.metadata_hash] = 100
+        _flush(idx, db, t, height=100)
+
+        raw = db.utxo_db._store[pack_summary_key(t.ref)]
+        assert len(raw) < 1000  # the 5 KB payload is not in the row
+        row = idx.get_all_tokens_summary()["tokens"][0]
+        assert row["embed"] == {"type": "image/png", "size": len(icon),
+                                "hash": sha256(icon).hex(), "data": None}
+        assert idx.get_embedded_icon(t.ref) == (icon, "image/png", sha256(icon).hex())
+
+    def test_remote_hashstamp_is_sized_not_inlined(self):
+        idx, db = _make_index()
+        meta = cbor2.dumps({"p": [2], "remote": {"t": "image/webp", "u": "ipfs://x",
+                                                 "hs": bytes(64)}})
+        t = _token("R", "a2" * 32, 100)
+        t.metadata_hash = sha256(meta)
+        idx.metadata_cache[t.metadata_hash] = meta
+        _flush(idx, db, t, height=100)
+        remote = idx.get_all_tokens_summary()["tokens"][0]["remote"]
+        assert remote["url"] == "ipfs://x"
+        assert remote["hashstamp"] is None
+        assert remote["hashstamp_size"] == 64
+
+    def test_unchanged_metadata_reuses_media_without_reading_gm(self):
+        idx, db = _make_index()
+        meta = cbor2.dumps({"main": {"t": "image/png", "b": b"abc"}})
+        t = _token("M", "a3" * 32, 100)
+        t.metadata_hash = sha256(meta)
+        idx.metadata_cache[t.metadata_hash] = meta
+        _flush(idx, db, t, height=100)
+
+        # A later supply change: the GM blob is gone (e.g. scrubbed), yet the
+        # pointer survives because the metadata hash did not move.
+        db.utxo_db._store.pop(GlyphDBKeys.METADATA + t.metadata_hash, None)
+        t.current_supply = 7
+        _flush(idx, db, t, height=110)
+        row = idx.get_all_tokens_summary()["tokens"][0]
+        assert row["current_supply"] == 7
+        assert row["embed"]["size"] == 3
+
+
+class TestSummaryOrders:
+    def _seed(self):
+        idx, db = _make_index()
+        a = _token("A", "01" * 32, 100)
+        b = _token("B", "02" * 32, 200, GlyphTokenType.FT, [GlyphProtocol.GLYPH_FT])
+        c = _token("C", "03" * 32, 300)
+        _flush(idx, db, a, height=100)
+        _flush(idx, db, b, height=200)
+        _flush(idx, db, c, height=300)
+        return idx, db, a, b, c
+
+    def test_recent_is_last_changed_first(self):
+        idx, db, a, _b, _c = self._seed()
+        assert _names(idx.get_all_tokens_summary(order="recent")) == ["C", "B", "A"]
+        a.current_supply = 1
+        _flush(idx, db, a, height=400)
+        assert _names(idx.get_all_tokens_summary(order="recent")) == ["A", "C", "B"]
+        # Moved, not duplicated.
+        gE = [k for k in db.utxo_db._store if k.startswith(GlyphDBKeys.SUMMARY_BY_ACTIVITY)]
+        assert len(gE) == 6  # 3 tokens x (all-types + own type)
+
+    def test_deploy_order_is_oldest_first_and_stable(self):
+        idx, db, a, _b, _c = self._seed()
+        a.current_supply = 1
+        _flush(idx, db, a, height=400)
+        assert _names(idx.get_all_tokens_summary(order="deploy")) == ["A", "B", "C"]
+
+    def test_type_filter_uses_scoped_rows(self):
+        idx, *_ = self._seed()
+        r = idx.get_all_tokens_summary(order="recent", token_type=GlyphTokenType.NFT)
+        assert _names(r) == ["C", "A"]
+        r = idx.get_all_tokens_summary(order="ref", token_type=GlyphTokenType.FT)
+        assert _names(r) == ["B"]
+
+    def test_cursor_walk_has_no_gaps_or_dupes(self):
+        idx, *_ = self._seed()
+        for order in ("ref", "recent", "deploy"):
+            seen, cursor = [], None
+            while True:
+                page = idx.get_all_tokens_summary(limit=2, cursor=cursor, order=order)
+                seen += _names(page)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            assert sorted(seen) == ["A", "B", "C"], order
+
+    def test_offset_still_supported_without_cursor(self):
+        idx, *_ = self._seed()
+        assert _names(idx.get_all_tokens_summary(offset=1, order="deploy")) == ["B", "C"]
+
+
+class TestSummaryReorg:
+    def test_backup_restores_previous_row(self):
+        idx, db, = _make_index()
+        store = db.utxo_db._store
+        t = _token("T", "0a" * 32, 100)
+        _flush(idx, db, t, height=100)
+        t.current_supply = 5
+        _flush(idx, db, t, height=101)
+        assert idx.get_all_tokens_summary(order="recent")["tokens"][0]["activity_height"] == 101
+
+        idx.backup(_FakeBatch(store), 101)
+        row = idx.get_all_tokens_summary(order="recent")["tokens"][0]
+        assert row["activity_height"] == 100
+        assert row["current_supply"] == 0
+
+        idx.backup(_FakeBatch(store), 100)
+        assert not any(k.startswith((GlyphDBKeys.SUMMARY, GlyphDBKeys.SUMMARY_BY_ACTIVITY,
+                                     GlyphDBKeys.SUMMARY_BY_DEPLOY)) for k in store)
+
+
+class TestSummaryMigration:
+    def test_v4_db_is_backfilled(self):
+        idx, db = _make_index(ready=False)
+        store = db.utxo_db._store
+        for t in (_token("X", "b1" * 32, 120), _token("Y", "b2" * 32, 110)):
+            store[pack_token_key(t.ref)] = t.to_bytes()
+        store[GlyphDBKeys.SCHEMA_VERSION] = bytes([4])
+
+        idx._check_schema_version()
+        assert store[GlyphDBKeys.SCHEMA_VERSION] == bytes([CURRENT_SCHEMA_VERSION])
+        assert not idx.summary_rows_ready
+        idx.summary_migration.run_to_completion(db.utxo_db)
+
+        assert idx.summary_rows_ready
+        # activity_height starts at the deploy height after a backfill.
+        assert _names(idx.get_all_tokens_summary(order="recent")) == ["X", "Y"]
+        assert _names(idx.get_all_tokens_summary(order="deploy")) == ["Y", "X"]
+
+    def test_reorg_after_backfill_passed_keeps_the_row(self):
+        idx, db = _make_index(ready=False)
+        store = db.utxo_db._store
+        t = _token("R", "d1" * 32, 100)
+        store[pack_token_key(t.ref)] = t.to_bytes()
+        store[GlyphDBKeys.SCHEMA_VERSION] = bytes([4])
+        idx._check_schema_version()
+
+        # A block after the upgrade changes the token before the backfill
+        # reaches it; the backfill then skips the newer row.
+        t.current_supply = 7
+        _flush(idx, db, t, height=101)
+        idx.summary_migration.run_to_completion(db.utxo_db)
+        assert idx.get_all_tokens_summary()["tokens"][0]["current_supply"] == 7
+
+        # Reorging that block restores the pre-flush row, not nothing.
+        idx.backup(_FakeBatch(store), 101)
+        for order in ("ref", "recent", "deploy"):
+            rows = idx.get_all_tokens_summary(order=order)["tokens"]
+            assert [(r["name"], r["current_supply"], r["activity_height"])
+                    for r in rows] == [("R", 0, 100)]
+
+    def test_reorg_of_a_deploy_during_backfill_removes_the_row(self):
+        idx, db = _make_index(ready=False)
+        store = db.utxo_db._store
+        store[GlyphDBKeys.SCHEMA_VERSION] = bytes([4])
+        idx._check_schema_version()
+        t = _token("N", "d2" * 32, 101)
+        _flush(idx, db, t, height=101)
+        idx.backup(_FakeBatch(store), 101)
+        assert not any(k.startswith((GlyphDBKeys.SUMMARY, GlyphDBKeys.SUMMARY_BY_ACTIVITY,
+                                     GlyphDBKeys.SUMMARY_BY_DEPLOY)) for k in store)
+
+    def test_gt_fallback_until_rows_are_ready(self):
+        idx, db = _make_index(ready=False)
+        t = _token("G", "c1" * 32, 100)
+        db.utxo_db._store[pack_token_key(t.ref)] = t.to_bytes()
+        out = idx.get_all_tokens_summary(order="recent")
+        assert _names(out) == ["G"]
+        assert out["next_cursor"] is None
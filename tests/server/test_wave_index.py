@@ -434,6 +434,29 @@ class TestWaveIndex:
         # Should return None or dict without data
         assert result is None or (isinstance(result, dict) and not result.get('address'))
 
+    def test_pending_duplicates_snapshot(self, wave_index):
+        """Duplicate lookups run on REST reader threads take a snapshot of the
+        unflushed duplicates from the loop instead of iterating name_cache."""
+        import struct
+        from electrumx.server.wave_index import WaveDBKeys, name_to_hash
+        dup_key = WaveDBKeys.DUPLICATE + name_to_hash('alice') + struct.pack('<II', 7, 1)
+        other = WaveDBKeys.DUPLICATE + name_to_hash('bob') + struct.pack('<II', 7, 2)
+        wave_index.name_cache[name_to_hash('alice')] = b'\x01' * 36
+        wave_index.name_cache[dup_key] = b'\x02' * 36
+        wave_index.name_cache[other] = b'\x03' * 36
+
+        assert wave_index.pending_duplicates('alice') == {dup_key: b'\x02' * 36}
+        snapshot = wave_index.pending_duplicates()
+        assert set(snapshot) == {dup_key, other}
+
+        # The snapshot is used as given; the live cache is not read.
+        wave_index.name_cache.clear()
+        assert wave_index._has_duplicates('alice', snapshot) is True
+        assert wave_index._has_duplicates('carol', snapshot) is False
+        dups = wave_index._get_duplicate_registrations('alice', snapshot)
+        assert [(d['height'], d['tx_idx']) for d in dups] == [(7, 1)]
+        assert wave_index._has_duplicates('alice') is False
+
     def test_name_info_to_dict_includes_target(self, wave_index):
         """_name_info_to_dict must include top-level 'target' matching cold-cache resolve().
         Photonic Wallet reads result.target || result.zone?.address — both paths must work."""
@@ -0,0 +1,126 @@
+"""Topic-indexed /ws fan-out (electrumx/server/ws_hub.py).
+
+Covers:
+- publish() reaches only subscribers of touched topics, one message per client
+- wildcard subscribers get a single message listing every touched ref
+- scripthash topics match the hashX the mempool reports
+- a client with a full queue is dropped without affecting the others
+- the subscription cap
+"""
+import asyncio
+import json
+
+from electrumx.server.ws_hub import ALL_TOKENS, WS_CLOSE_TRY_AGAIN_LATER, WsHub
+
+
+class _FakeWs:
+    def __init__(self, block=False):
+        self.sent = []
+        self.closed_with = None
+        self._gate = asyncio.Event()
+        if not block:
+            self._gate.set()
+
+    async def send_text(self, text):
+        await self._gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+REF_A = bytes([0xaa]) * 36
+REF_B = bytes([0xbb]) * 36
+SH = 'cd' * 32
+HASHX = bytes.fromhex(SH)[::-1][:11]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_fanout_by_topic():
+    async def main():
+        hub = WsHub()
+        a, b, wild = (hub.connect(_FakeWs()) for _ in range(3))
+        hub.subscribe(a, ('ref', REF_A.hex()))
+        hub.subscribe(b, ('sh', SH, HASHX))
+        hub.subscribe(wild, ALL_TOKENS)
+        hub.subscribe(wild, ('ref', REF_A.hex()))   # covered by the wildcard
+        assert hub.publish({REF_A, REF_B}, {HASHX}) == 3
+        await asyncio.sleep(0)
+        return a.ws.sent, b.ws.sent, wild.ws.sent
+
+    a_sent, b_sent, wild_sent = _run(main())
+    assert a_sent == [{'event': 'update', 'touched_refs': [REF_A.hex()],
+                       'touched_scripthashes': []}]
+    assert b_sent == [{'event': 'update', 'touched_refs': [],
+                       'touched_scripthashes': [SH]}]
+    assert wild_sent == [{'event': 'update',
+                          'touched_refs': sorted([REF_A.hex(), REF_B.hex()]),
+                          'touched_scripthashes': []}]
+
+
+def test_one_message_per_client_per_publish():
+    async def main():
+        hub = WsHub(queue_size=2)
+        client = hub.connect(_FakeWs())
+        refs = [bytes([n]) * 36 for n in range(10)]
+        for ref in refs:
+            hub.subscribe(client, ('ref', ref.hex()))
+        hub.subscribe(client, ('sh', SH, HASHX))
+        assert hub.publish(set(refs), {HASHX}) == 1
+        await asyncio.sleep(0)
+        return hub, client, refs
+
+    hub, client, refs = _run(main())
+    assert client in hub.clients and not hub.dropped
+    assert client.ws.sent == [{'event': 'update',
+                               'touched_refs': sorted(ref.hex() for ref in refs),
+                               'touched_scripthashes': [SH]}]
+
+
+def test_untouched_topics_cost_nothing():
+    async def main():
+        hub = WsHub()
+        client = hub.connect(_FakeWs())
+        hub.subscribe(client, ('ref', REF_B.hex()))
+        return hub.publish({REF_A}, set())
+
+    assert _run(main()) == 0
+
+
+def test_slow_client_is_dropped():
+    async def main():
+        hub = WsHub(queue_size=2)
+        slow = hub.connect(_FakeWs(block=True))
+        fast = hub.connect(_FakeWs())
+        for client in (slow, fast):
+            hub.subscribe(client, ('ref', REF_A.hex()))
+        for _ in range(4):
+            hub.publish({REF_A}, set())
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return hub, slow, fast
+
+    hub, slow, fast = _run(main())
+    assert slow.closed and slow not in hub.clients
+    assert slow.ws.closed_with == WS_CLOSE_TRY_AGAIN_LATER
+    assert ('ref', REF_A.hex()) in hub.subscribers
+    assert hub.subscribers[('ref', REF_A.hex())] == {fast}
+    assert len(fast.ws.sent) == 4
+    assert hub.dropped == 1
+
+
+def test_unsubscribe_and_cap():
+    async def main():
+        hub = WsHub(max_subscriptions=1)
+        client = hub.connect(_FakeWs())
+        assert hub.subscribe(client, ('sh', SH, HASHX))
+        assert not hub.subscribe(client, ('ref', REF_A.hex()))
+        hub.unsubscribe(client, ('sh', SH, HASHX))
+        assert not hub.subscribers and not hub.sh_topics
+        hub.disconnect(client)
+        return hub
+
+    assert not _run(main()).clients